@@ -6,17 +6,31 @@ import pandas as pd
 from pandasai.data_loader.semantic_layer_schema import SQLConnectionConfig
 
 
+def _statement_timeout_options(timeout: Optional[float]) -> dict:
+    """Connection options having PostgreSQL cancel the statements running
+    for more than `timeout` seconds."""
+    if timeout is None:
+        return {}
+    return {"options": f"-c statement_timeout={max(int(timeout * 1000), 1)}"}
+
+
 def load_from_mysql(
-    connection_info: SQLConnectionConfig, query: str, params: Optional[list] = None
+    connection_info: SQLConnectionConfig,
+    query: str,
+    params: Optional[list] = None,
+    timeout: Optional[float] = None,
 ):
     import pymysql
 
+    # The connection is dropped if the query does not return within the timeout
+    timeout_options = {} if timeout is None else {"read_timeout": max(timeout, 0.001)}
     conn = pymysql.connect(
         host=connection_info.host,
         user=connection_info.user,
         password=connection_info.password,
         database=connection_info.database,
         port=connection_info.port,
+        **timeout_options,
     )
     # Suppress warnings of SqlAlchemy
     # TODO - Later can be removed when SqlAlchemy is to used
@@ -26,7 +40,10 @@ def load_from_mysql(
 
 
 def load_from_postgres(
-    connection_info: SQLConnectionConfig, query: str, params: Optional[list] = None
+    connection_info: SQLConnectionConfig,
+    query: str,
+    params: Optional[list] = None,
+    timeout: Optional[float] = None,
 ):
     import psycopg2
 
@@ -36,6 +53,7 @@ def load_from_postgres(
         password=connection_info.password,
         dbname=connection_info.database,
         port=connection_info.port,
+        **_statement_timeout_options(timeout),
     )
     # Suppress warnings of SqlAlchemy
     # TODO - Later can be removed when SqlAlchemy is to used
@@ -45,7 +63,10 @@ def load_from_postgres(
 
 
 def load_from_cockroachdb(
-    connection_info: SQLConnectionConfig, query: str, params: Optional[list] = None
+    connection_info: SQLConnectionConfig,
+    query: str,
+    params: Optional[list] = None,
+    timeout: Optional[float] = None,
 ):
     import psycopg2
 
@@ -55,6 +76,7 @@ def load_from_cockroachdb(
         password=connection_info.password,
         dbname=connection_info.database,
         port=connection_info.port,
+        **_statement_timeout_options(timeout),
     )
     # Suppress warnings of SqlAlchemy
     # TODO - Later can be removed when SqlAlchemy is to used
@@ -236,6 +236,56 @@ class TestDatabaseLoader(unittest.TestCase):
         self.assertIsInstance(result, pd.DataFrame)
         self.assertEqual(result.shape, (2, 2))
 
+    @patch("psycopg2.connect")
+    @patch("pandas.read_sql")
+    def test_load_from_postgres_with_timeout(
+        self, mock_read_sql, mock_psycopg2_connect
+    ):
+        mock_read_sql.return_value = pd.DataFrame({"column1": [1]})
+
+        connection_config = SQLConnectionConfig(
+            host="localhost",
+            user="postgres",
+            password="password",
+            database="test_db",
+            port=5432,
+        )
+
+        load_from_postgres(connection_config, "SELECT * FROM test_table", timeout=2.5)
+
+        mock_psycopg2_connect.assert_called_once_with(
+            host="localhost",
+            user="postgres",
+            password="password",
+            dbname="test_db",
+            port=5432,
+            options="-c statement_timeout=2500",
+        )
+
+    @patch("pymysql.connect")
+    @patch("pandas.read_sql")
+    def test_load_from_mysql_with_timeout(self, mock_read_sql, mock_pymysql_connect):
+        mock_read_sql.return_value = pd.DataFrame({"column1": [1]})
+
+        connection_config = SQLConnectionConfig(
+            host="localhost",
+            user="root",
+            password="password",
+            database="test_db",
+            port=3306,
+        )
+
+        load_from_mysql(connection_config, "SELECT * FROM test_table", timeout=2.5)
+
+        mock_pymysql_connect.assert_called_once_with(
+            host="localhost",
+            user="root",
+            password="password",
+            database="test_db",
+            port=3306,
+            read_timeout=2.5,
+        )
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -1,4 +1,4 @@
-from litellm import completion
+from litellm import acompletion, completion
 
 from pandasai.agent.state import AgentState
 from pandasai.core.prompts.base import BasePrompt
@@ -15,6 +15,11 @@ class LiteLLM(LLM):
 
     Args:
         model (str): The name of the language model to use.
+        stream (bool): Whether to stream the completions, stopping as soon as
+            their code is complete.
+        cache_prompt_prefix (bool): Whether to mark the stable prefix of the
+            prompts as cacheable, for the providers caching the prompts on
+            demand only, like Anthropic.
         **kwargs: Additional parameters for the model's completion settings.
 
     Properties:
@@ -24,16 +29,27 @@ class LiteLLM(LLM):
         call(instruction: BasePrompt, _: AgentState = None) -> str:
             Generates a response based on the provided instruction."""
 
-    def __init__(self, model: str, **kwargs):
+    def __init__(
+        self,
+        model: str,
+        stream: bool = False,
+        cache_prompt_prefix: bool = False,
+        **kwargs,
+    ):
         """
         Initializes the wrapper with the model name and any additional parameters.
 
         Args:
             model (str): The name of the LLM model.
+            stream (bool): Whether to stream the completions.
+            cache_prompt_prefix (bool): Whether to mark the prompt prefix as
+                cacheable.
             **kwargs: Any additional parameters required for completion.
         """
         super().__init__(api_key=None)
         self.model = model
+        self.stream = stream
+        self.cache_prompt_prefix = cache_prompt_prefix
         self.params = kwargs
         logging.getLogger("LiteLLM").setLevel(logging.ERROR)
 
@@ -48,28 +64,89 @@ class LiteLLM(LLM):
             str: The type of the model."""
         return f"litellm"
 
-    def call(self, instruction: BasePrompt, _: AgentState = None) -> str:
+    def _get_messages(self, instruction: BasePrompt) -> list:
+        prefix, suffix = instruction.to_segments()
+        if not prefix:
+            return [{"content": suffix, "role": "user"}]
+
+        # The stable prefix goes first, so that the providers and the local
+        # servers, like Ollama, can reuse it from one question to the next
+        system = prefix
+        if self.cache_prompt_prefix:
+            system = [
+                {
+                    "type": "text",
+                    "text": prefix,
+                    "cache_control": {"type": "ephemeral"},
+                }
+            ]
+        return [
+            {"content": system, "role": "system"},
+            {"content": suffix.lstrip("\n"), "role": "user"},
+        ]
+
+    def _get_completion_params(
+        self, instruction: BasePrompt, context: AgentState = None
+    ) -> dict:
+        params = dict(self.params)
+        timeout = self._get_request_timeout(context, params.get("timeout"))
+        if timeout is not None:
+            params["timeout"] = timeout
+        if self.stream:
+            params["stream"] = True
+            # The usage is only reported by the last chunk
+            params["stream_options"] = {"include_usage": True}
+
+        return {
+            "model": self.model,
+            "messages": self._get_messages(instruction),
+            **params,
+        }
+
+    def call(self, instruction: BasePrompt, context: AgentState = None) -> str:
         """Generates a completion response based on the provided instruction.
 
         This method converts the given instruction into a user prompt string and
         sends it to a model for processing. It returns the content of the first
-        message from the model's response.
+        message from the model's response. A streamed response is read until
+        its code is complete.
 
         Args:
             instruction (BasePrompt): The instruction to convert into a prompt.
-            _ (AgentState, optional): An optional state of the agent. Defaults to None.
+            context (AgentState, optional): An optional state of the agent, the
+                token usage is recorded to and the request times out with.
+                Defaults to None.
 
         Returns:
             str: The content of the model's response to the user prompt."""
 
-        user_prompt = instruction.to_string()
+        response = completion(**self._get_completion_params(instruction, context))
+        if self.stream:
+            return self._read_stream(response, instruction.to_string(), context)
 
-        return (
-            completion(
-                model=self.model,
-                messages=[{"content": user_prompt, "role": "user"}],
-                **self.params,
-            )
-            .choices[0]
-            .message.content
+        self._record_token_usage(context, getattr(response, "usage", None))
+
+        return response.choices[0].message.content
+
+    async def acall(self, instruction: BasePrompt, context: AgentState = None) -> str:
+        """Async counterpart of `call`, awaiting the native litellm completion.
+
+        Args:
+            instruction (BasePrompt): The instruction to convert into a prompt.
+            context (AgentState, optional): An optional state of the agent.
+                Defaults to None.
+
+        Returns:
+            str: The content of the model's response to the user prompt."""
+
+        response = await acompletion(
+            **self._get_completion_params(instruction, context)
         )
+        if self.stream:
+            return await self._aread_stream(
+                response, instruction.to_string(), context
+            )
+
+        self._record_token_usage(context, getattr(response, "usage", None))
+
+        return response.choices[0].message.content
@@ -1,6 +1,7 @@
+import asyncio
 import os
 import unittest
-from unittest.mock import MagicMock, patch
+from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 from litellm.exceptions import AuthenticationError
@@ -183,3 +184,84 @@ def test_completion_with_extra_params(prompt):
         args, kwargs = completion_patch.call_args
 
         assert kwargs["extra_param"] == 10
+
+
+@patch("os.environ", {"OPENAI_API_KEY": "key"})
+def test_acall_awaits_async_completion(llm, prompt):
+    """Test that the async call awaits litellm's native async completion."""
+    mock_message = MagicMock()
+    mock_message.content = "I'm doing well, thank you!"
+    mock_choice = MagicMock()
+    mock_choice.message = mock_message
+    mock_response = MagicMock()
+    mock_response.choices = [mock_choice]
+
+    with patch(
+        "extensions.llms.litellm.pandasai_litellm.litellm.acompletion",
+        new_callable=AsyncMock,
+        return_value=mock_response,
+    ) as acompletion_patch, patch(
+        "extensions.llms.litellm.pandasai_litellm.litellm.completion"
+    ) as completion_patch:
+        result = asyncio.run(llm.acall(prompt))
+
+    assert result == "I'm doing well, thank you!"
+    acompletion_patch.assert_awaited_once()
+    assert acompletion_patch.call_args.kwargs["messages"] == [
+        {"content": "Hello, how are you?", "role": "user"}
+    ]
+    completion_patch.assert_not_called()
+
+
+@patch("os.environ", {"OPENAI_API_KEY": "key"})
+def test_streamed_completion_stops_at_end_of_code(prompt):
+    """Test that a streamed completion is read until its code is complete."""
+    llm = LiteLLM(model="gpt-3.5-turbo", stream=True)
+    chunks = []
+    for text in ["```python\nresult = 1\n", "```", "\nSome explanation."]:
+        chunk = MagicMock()
+        chunk.choices[0].delta.content = text
+        chunk.usage = None
+        chunks.append(chunk)
+
+    with patch(
+        "extensions.llms.litellm.pandasai_litellm.litellm.completion",
+        return_value=iter(chunks),
+    ) as completion_patch:
+        response = llm.call(prompt)
+
+    assert response == "```python\nresult = 1\n```"
+    kwargs = completion_patch.call_args.kwargs
+    assert kwargs["stream"] is True
+    assert kwargs["stream_options"] == {"include_usage": True}
+
+
+@patch("os.environ", {"OPENAI_API_KEY": "key"})
+def test_call_sends_prompt_prefix_as_system_message(prompt):
+    """Test that the stable prefix of the prompt is sent as a cacheable
+    system message."""
+    llm = LiteLLM(model="claude-3-5-sonnet-20240620", cache_prompt_prefix=True)
+    mock_response = MagicMock()
+    mock_response.choices[0].message.content = "I'm doing well, thank you!"
+
+    with patch.object(
+        prompt, "to_segments", return_value=("<tables></tables>", "\n\nHi")
+    ), patch(
+        "extensions.llms.litellm.pandasai_litellm.litellm.completion",
+        return_value=mock_response,
+    ) as completion_patch:
+        llm.call(prompt)
+
+    assert completion_patch.call_args.kwargs["messages"] == [
+        {
+            "content": [
+                {
+                    "type": "text",
+                    "text": "<tables></tables>",
+                    "cache_control": {"type": "ephemeral"},
+                }
+            ],
+            "role": "system",
+        },
+        {"content": "Hi", "role": "user"},
+    ]
@@ -30,6 +30,8 @@ class BaseOpenAI(LLM):
     request_timeout: Union[float, Tuple[float, float], Any, None] = None
     max_retries: int = 2
     seed: Optional[int] = None
+    # Stream the completions, stopping as soon as their code is complete
+    stream: bool = False
     # support explicit proxy for OpenAI
     openai_proxy: Optional[str] = None
     default_headers: Union[Mapping[str, str], None] = None
@@ -38,6 +40,7 @@ class BaseOpenAI(LLM):
     # [httpx documentation](https://www.python-httpx.org/api/#client) for more details.
     http_client: Union[Any, None] = None
     client: Any
+    async_client: Any
     _is_chat_model: bool
 
     def _set_params(self, **kwargs):
@@ -45,7 +48,8 @@ class BaseOpenAI(LLM):
         Set Parameters
         Args:
             **kwargs: ["model", "deployment_name", "temperature","max_tokens",
-            "top_p", "frequency_penalty", "presence_penalty", "stop", "seed"]
+            "top_p", "frequency_penalty", "presence_penalty", "stop", "seed",
+            "stream"]
 
         Returns:
             None.
@@ -62,6 +66,7 @@ class BaseOpenAI(LLM):
             "presence_penalty",
             "stop",
             "seed",
+            "stream",
         ]
         for key, value in kwargs.items():
             if key in valid_params:
@@ -94,8 +99,14 @@ class BaseOpenAI(LLM):
     def _invocation_params(self) -> Dict[str, Any]:
         """Get the parameters used to invoke the model."""
         openai_creds: Dict[str, Any] = {}
+        params = {**openai_creds, **self._default_params}
 
-        return {**openai_creds, **self._default_params}
+        if self.stream:
+            params["stream"] = True
+            # The usage is only reported by the last chunk
+            params["stream_options"] = {"include_usage": True}
+
+        return params
 
     @property
     def _client_params(self) -> Dict[str, any]:
@@ -109,60 +120,151 @@ class BaseOpenAI(LLM):
             "http_client": self.http_client,
         }
 
-    def completion(self, prompt: str, memory: Memory) -> str:
+    @property
+    def _async_client_params(self) -> Dict[str, any]:
+        # a custom httpx client is synchronous, the async client uses its own
+        return {**self._client_params, "http_client": None}
+
+    def _get_completion_params(
+        self, prompt: str, context: AgentState = None
+    ) -> Dict[str, Any]:
+        params = {**self._invocation_params, "prompt": prompt}
+
+        if self.stop is not None:
+            params["stop"] = [self.stop]
+
+        timeout = self._get_request_timeout(context, self.request_timeout)
+        if timeout is not None:
+            params["timeout"] = timeout
+
+        return params
+
+    def _get_chat_completion_params(
+        self,
+        value: str,
+        memory: Memory,
+        context: AgentState = None,
+        prefix: str = "",
+    ) -> Dict[str, Any]:
+        params = {
+            **self._invocation_params,
+            "messages": self.get_chat_messages(value, memory, prefix),
+        }
+
+        if self.stop is not None:
+            params["stop"] = [self.stop]
+
+        timeout = self._get_request_timeout(context, self.request_timeout)
+        if timeout is not None:
+            params["timeout"] = timeout
+
+        return params
+
+    def completion(
+        self,
+        prompt: str,
+        memory: Memory,
+        context: AgentState = None,
+        prefix: str = "",
+    ) -> str:
         """
-        Query the completion API
+        Query the completion API, reading the completion as it is streamed
+        with `stream`.
 
         Args:
             prompt (str): A string representation of the prompt.
+            context (AgentState, optional): context the token usage is recorded to,
+                the request times out with the query.
+            prefix (str): The stable prefix of the prompt, sent before the
+                conversation so that it can be cached.
 
         Returns:
             str: LLM response.
 
         """
-        prompt = self.prepend_system_prompt(prompt, memory)
+        prompt = prefix + self.prepend_system_prompt(prompt, memory)
 
-        params = {**self._invocation_params, "prompt": prompt}
+        response = self.client.create(**self._get_completion_params(prompt, context))
+        self.last_prompt = prompt
+        if self.stream:
+            return self._read_stream(response, prompt, context)
 
-        if self.stop is not None:
-            params["stop"] = [self.stop]
+        self._record_token_usage(context, getattr(response, "usage", None))
 
-        response = self.client.create(**params)
+        return response.choices[0].text
+
+    async def acompletion(
+        self,
+        prompt: str,
+        memory: Memory,
+        context: AgentState = None,
+        prefix: str = "",
+    ) -> str:
+        """
+        Async counterpart of `completion`, using the async OpenAI client.
+        """
+        prompt = prefix + self.prepend_system_prompt(prompt, memory)
 
+        response = await self.async_client.create(
+            **self._get_completion_params(prompt, context)
+        )
         self.last_prompt = prompt
+        if self.stream:
+            return await self._aread_stream(response, prompt, context)
+
+        self._record_token_usage(context, getattr(response, "usage", None))
 
         return response.choices[0].text
 
-    def chat_completion(self, value: str, memory: Memory) -> str:
+    def chat_completion(
+        self,
+        value: str,
+        memory: Memory,
+        context: AgentState = None,
+        prefix: str = "",
+    ) -> str:
         """
-        Query the chat completion API
+        Query the chat completion API, reading the completion as it is
+        streamed with `stream`.
 
         Args:
             value (str): Prompt
+            context (AgentState, optional): context the token usage is recorded to,
+                the request times out with the query.
+            prefix (str): The stable prefix of the prompt, sent as the system
+                message so that OpenAI caches it across the questions.
 
         Returns:
             str: LLM response.
 
         """
-        messages = memory.to_openai_messages() if memory else []
-
-        # adding current prompt as latest query message
-        messages.append(
-            {
-                "role": "user",
-                "content": value,
-            },
+        response = self.client.create(
+            **self._get_chat_completion_params(value, memory, context, prefix)
         )
+        if self.stream:
+            return self._read_stream(response, prefix + value, context)
 
-        params = {
-            **self._invocation_params,
-            "messages": messages,
-        }
+        self._record_token_usage(context, getattr(response, "usage", None))
 
-        if self.stop is not None:
-            params["stop"] = [self.stop]
+        return response.choices[0].message.content
 
-        response = self.client.create(**params)
+    async def achat_completion(
+        self,
+        value: str,
+        memory: Memory,
+        context: AgentState = None,
+        prefix: str = "",
+    ) -> str:
+        """
+        Async counterpart of `chat_completion`, using the async OpenAI client.
+        """
+        response = await self.async_client.create(
+            **self._get_chat_completion_params(value, memory, context, prefix)
+        )
+        if self.stream:
+            return await self._aread_stream(response, prefix + value, context)
+
+        self._record_token_usage(context, getattr(response, "usage", None))
 
         return response.choices[0].message.content
 
@@ -181,11 +283,34 @@ class BaseOpenAI(LLM):
             str: Response
         """
         self.last_prompt = instruction.to_string()
+        prefix, suffix = instruction.to_segments()
 
         memory = context.memory if context else None
 
         return (
-            self.chat_completion(self.last_prompt, memory)
+            self.chat_completion(suffix, memory, context, prefix)
+            if self._is_chat_model
+            else self.completion(suffix, memory, context, prefix)
+        )
+
+    async def acall(self, instruction: BasePrompt, context: AgentState = None):
+        """
+        Call the OpenAI LLM without blocking the event loop.
+
+        Args:
+            instruction (BasePrompt): A prompt object with instruction for LLM.
+            context (AgentState): context to pass.
+
+        Returns:
+            str: Response
+        """
+        self.last_prompt = instruction.to_string()
+        prefix, suffix = instruction.to_segments()
+
+        memory = context.memory if context else None
+
+        return await (
+            self.achat_completion(suffix, memory, context, prefix)
             if self._is_chat_model
-            else self.completion(self.last_prompt, memory)
+            else self.acompletion(suffix, memory, context, prefix)
         )
@@ -1,5 +1,6 @@
 """Unit tests for the openai LLM class"""
 
+import asyncio
 import os
 from unittest import mock
 
@@ -138,3 +139,75 @@ class TestOpenAILLM:
 
         result = openai.call(instruction=prompt)
         assert result == "response"
+
+    def test_chat_completion_records_token_usage(self, mocker):
+        openai = OpenAI(api_token="test", model="gpt-4")
+        response = mock.MagicMock()
+        response.choices[0].message.content = "response"
+        response.usage = OpenAIObject({"prompt_tokens": 12, "completion_tokens": 5})
+        mocker.patch.object(openai, "client", create=True)
+        openai.client.create.return_value = response
+        context = mock.MagicMock()
+
+        result = openai.chat_completion("Hi", None, context)
+
+        assert result == "response"
+        context.stats.add_token_usage.assert_called_once_with(12, 5)
+
+    def test_acall_uses_async_client(self, mocker, prompt):
+        openai = OpenAI(api_token="test", model="gpt-4")
+        response = mock.MagicMock()
+        response.choices[0].message.content = "response"
+        response.usage = OpenAIObject({"prompt_tokens": 12, "completion_tokens": 5})
+        mocker.patch.object(openai, "client", create=True)
+        mocker.patch.object(openai, "async_client", create=True)
+        openai.async_client.create = mock.AsyncMock(return_value=response)
+        context = mock.MagicMock()
+        context.memory = None
+
+        result = asyncio.run(openai.acall(prompt, context))
+
+        assert result == "response"
+        openai.async_client.create.assert_awaited_once()
+        openai.client.create.assert_not_called()
+        context.stats.add_token_usage.assert_called_once_with(12, 5)
+
+    def test_chat_completion_stream_stops_at_end_of_code(self, mocker):
+        openai = OpenAI(api_token="test", model="gpt-4", stream=True)
+        chunks = []
+        for text in ["```python\nresult = 1\n", "```", "\nSome explanation."]:
+            chunk = mock.MagicMock()
+            chunk.choices[0].delta.content = text
+            chunk.usage = None
+            chunks.append(chunk)
+        stream = mock.MagicMock()
+        stream.__iter__.return_value = iter(chunks)
+        mocker.patch.object(openai, "client", create=True)
+        openai.client.create.return_value = stream
+        context = mock.MagicMock()
+
+        result = openai.chat_completion("Hi", None, context)
+
+        assert result == "```python\nresult = 1\n```"
+        stream.close.assert_called_once()
+        params = openai.client.create.call_args.kwargs
+        assert params["stream"] is True
+        assert params["stream_options"] == {"include_usage": True}
+        context.emit.assert_any_call("llm_token", token="```")
+
+    def test_call_sends_prompt_prefix_as_system_message(self, mocker, prompt):
+        openai = OpenAI(api_token="test", model="gpt-4")
+        response = mock.MagicMock()
+        response.choices[0].message.content = "response"
+        mocker.patch.object(openai, "client", create=True)
+        openai.client.create.return_value = response
+        mocker.patch.object(
+            prompt, "to_segments", return_value=("<tables></tables>", "\n\nHi")
+        )
+
+        assert openai.call(prompt) == "response"
+
+        assert openai.client.create.call_args.kwargs["messages"] == [
+            {"role": "system", "content": "<tables></tables>"},
+            {"role": "user", "content": "Hi"},
+        ]
@@ -30,7 +30,7 @@ from pandasai.helpers.session import get_pandaai_session
 from pandasai.query_builders import SqlQueryBuilder
 from pandasai.sandbox.sandbox import Sandbox
 
-from .agent import Agent
+from .agent import Agent, AgentManager
 from .constants import LOCAL_SOURCE_TYPES, SQL_SOURCE_TYPES
 from .data_loader.loader import DatasetLoader
 from .data_loader.semantic_layer_schema import (
@@ -315,6 +315,7 @@ def read_csv(filepath: str) -> DataFrame:
 
 __all__ = [
     "Agent",
+    "AgentManager",
     "DataFrame",
     "VirtualDataFrame",
     "pandas",
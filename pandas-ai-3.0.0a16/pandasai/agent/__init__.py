@@ -1,3 +1,6 @@
 from .base import Agent
+from .intent_router import IntentRouter
+from .manager import AgentManager
+from .schema_retriever import SchemaRetriever
 
-__all__ = ["Agent"]
+__all__ = ["Agent", "AgentManager", "IntentRouter", "SchemaRetriever"]
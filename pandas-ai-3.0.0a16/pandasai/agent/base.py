@@ -1,16 +1,28 @@
+import asyncio
+import copy
+import queue
+import threading
+import time
 import traceback
 import warnings
-from typing import Any, List, Optional, Union
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, AsyncIterator, Iterator, List, Optional, Tuple, Union
 
 import pandas as pd
 
 from pandasai.core.code_execution.code_executor import CodeExecutor
 from pandasai.core.code_generation.base import CodeGenerator
+from pandasai.core.code_generation.code_cleaning import CodeCleaner
+from pandasai.core.code_generation.code_cache import CodeCache
+from pandasai.core.code_generation.code_repair import CodeRepairer
 from pandasai.core.prompts import (
+    BasePrompt,
+    GeneratePythonCodeWithSQLPrompt,
     get_chat_prompt_for_sql,
     get_correct_error_prompt_for_sql,
     get_correct_output_type_error_prompt,
 )
+from pandasai.core.response.base import BaseResponse
 from pandasai.core.response.error import ErrorResponse
 from pandasai.core.response.parser import ResponseParser
 from pandasai.core.user_query import UserQuery
@@ -19,15 +31,26 @@ from pandasai.dataframe.virtual_dataframe import VirtualDataFrame
 from pandasai.exceptions import (
     CodeExecutionError,
     InvalidLLMOutputType,
+    InvalidOutputValueMismatch,
     MissingVectorStoreError,
+    NoResultFoundError,
+    QueryAbortedError,
+    QueryTimeoutError,
 )
+from pandasai.helpers.metrics import QueryStats, Stage, metrics
+from pandasai.llm.base import LLM, RateLimiter
 from pandasai.sandbox import Sandbox
 from pandasai.vectorstores.vectorstore import VectorStore
 
 from ..config import Config
 from ..data_loader.duck_db_connection_manager import DuckDBConnectionManager
+from ..data_loader.query_cache import QueryCache
+from ..data_loader.query_result import DuckDBQueryResult, QueryResult
 from ..query_builders.base_query_builder import BaseQueryBuilder
 from ..query_builders.sql_parser import SQLParser
+from .events import AgentEvent, EventType
+from .intent_router import IntentRouter
+from .schema_retriever import SchemaRetriever
 from .state import AgentState
 from .Readfile import read_file
 
@@ -38,6 +61,11 @@ class Agent:
     Base Agent class to improve the conversational experience in PandaAI
     """
 
+    # Seconds between two checks for an abort while waiting for the candidates
+    _candidates_poll_interval = 0.1
+    # Temperature added for each speculative candidate after the first one
+    _candidates_temperature_step = 0.3
+
     def __init__(
         self,
         dfs: Union[
@@ -48,6 +76,9 @@ class Agent:
         vectorstore: Optional[VectorStore] = None,
         description: str = None,
         sandbox: Sandbox = None,
+        code_cache: Optional[CodeCache] = None,
+        intent_router: Optional[IntentRouter] = None,
+        schema_retriever: Optional[SchemaRetriever] = None,
     ):
         """
         Args:
@@ -56,6 +87,14 @@ class Agent:
             memory_size (Optional[int]): The size of the memory.
             vectorstore (Optional[VectorStore]): The vectorstore to be used for the conversation.
             description (str): The description of the agent.
+            code_cache (Optional[CodeCache]): The cache of the generated code, a default
+                one is used when `enable_cache` is set in the config.
+            intent_router (Optional[IntentRouter]): The router answering simple questions
+                without the LLM, a default one is used when `enable_intent_router` is
+                set in the config.
+            schema_retriever (Optional[SchemaRetriever]): Selects the datasets and
+                columns described in the prompt, a default one is used when
+                `enable_schema_pruning` is set in the config.
         """
 
         # Deprecation warnings
@@ -77,11 +116,45 @@ class Agent:
         self.description = description
         self._state = AgentState()
         self._state.initialize(dfs, config, memory_size, vectorstore, description)
+        if code_cache is None and self._state.config.enable_cache:
+            code_cache = CodeCache()
+        self._state.code_cache = code_cache
+        if intent_router is None and self._state.config.enable_intent_router:
+            intent_router = IntentRouter()
+        self._state.intent_router = intent_router
+        if schema_retriever is None and self._state.config.enable_schema_pruning:
+            schema_retriever = SchemaRetriever()
+        self._state.schema_retriever = schema_retriever
 
         self._code_generator = CodeGenerator(self._state)
+        self._code_repairer = CodeRepairer(self._state)
         self._response_parser = ResponseParser()
         self._sandbox = sandbox
 
+    @classmethod
+    def _from_state(
+        cls,
+        state: AgentState,
+        sandbox: Sandbox = None,
+        description: str = None,
+    ) -> "Agent":
+        """
+        Create an agent around an already initialized state, skipping the
+        dataset validation and the state setup done in the constructor.
+        """
+        agent = cls.__new__(cls)
+        agent.description = description
+        agent._state = state
+        agent._code_generator = CodeGenerator(state)
+        agent._code_repairer = CodeRepairer(state)
+        agent._response_parser = ResponseParser()
+        agent._sandbox = sandbox
+        return agent
+
+    def _fork(self) -> "Agent":
+        """Create an agent with an independent conversation on the same datasets."""
+        return self._from_state(self._state.fork(), self._sandbox, self.description)
+
     #1. read excel
     def readFile(self, file_path, file_name):
         self.df_list = read_file(pai_=self.llm, file_path=file_path, file_name=file_name)
@@ -89,19 +162,231 @@ class Agent:
 
     #2. 基本對話功能
 
-    def chat(self, query: str, output_type: Optional[str] = None):
+    def chat(
+        self,
+        query: str,
+        output_type: Optional[str] = None,
+        timeout: Optional[float] = None,
+        session_id: Optional[str] = None,
+    ):
         """
         Start a new chat interaction with the assistant on Dataframe.
+
+        Args:
+            query (str): The question.
+            output_type (Optional[str]): The expected output type of the response.
+            timeout (Optional[float]): Number of seconds after which the processing
+                of the query is stopped and a QueryTimeoutError is raised, defaults
+                to `query_timeout` of the config.
+            session_id (Optional[str]): Session of the `memory_store` of the config
+                persisting the conversation, replacing its previous one.
         """
+        if session_id is not None:
+            self._state.bind_session(session_id)
         self.start_new_conversation()
-        return self._process_query(query, output_type)
+        return self._process_query(query, output_type, timeout)
 
-    def follow_up(self, query: str, output_type: Optional[str] = None):
+    def follow_up(
+        self,
+        query: str,
+        output_type: Optional[str] = None,
+        timeout: Optional[float] = None,
+        session_id: Optional[str] = None,
+    ):
         """
         Continue the existing chat interaction with the assistant on Dataframe.
+
+        Args:
+            query (str): The question.
+            output_type (Optional[str]): The expected output type of the response.
+            timeout (Optional[float]): Number of seconds the query may take.
+            session_id (Optional[str]): Session of the `memory_store` of the config
+                to resume, whichever process answered its previous questions.
+                A conversation already persisted is reloaded from the store.
+        """
+        self._state.load_session(session_id)
+        return self._process_query(query, output_type, timeout)
+
+    def chat_many(
+        self,
+        queries: List[str],
+        output_type: Optional[str] = None,
+        max_concurrency: int = 4,
+        timeout: Optional[float] = None,
+    ) -> List[BaseResponse]:
+        """
+        Answer several independent questions on the Dataframes concurrently.
+
+        Every query runs in its own conversation, the <tables> block of the prompt
+        is serialized once and shared by all of them, unless the schema is pruned
+        for each question. The conversation of this
+        agent is left untouched. Their calls to the LLM have the batch priority
+        in its rate limiter, behind the interactive queries.
+
+        Args:
+            queries (List[str]): The questions to answer.
+            output_type (Optional[str]): The expected output type of every response.
+            max_concurrency (int): Maximum number of queries processed at once.
+            timeout (Optional[float]): Number of seconds each query may take.
+
+        Returns:
+            List[BaseResponse]: The responses, in the same order as the queries.
+                A query that fails gets an ErrorResponse instead of raising.
+        """
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be a positive integer.")
+
+        if not queries:
+            return []
+
+        shared_state = self._state.fork()
+        shared_state.priority = RateLimiter.BATCH
+        if shared_state.schema_retriever is None:
+            shared_state.add(
+                "serialized_dataframes",
+                GeneratePythonCodeWithSQLPrompt.serialize_dataframes(shared_state.dfs),
+            )
+
+        def answer(query: str) -> BaseResponse:
+            agent = self._from_state(
+                shared_state.fork(), self._sandbox, self.description
+            )
+            try:
+                return agent.chat(query, output_type, timeout)
+            except Exception:
+                return agent._handle_exception(agent.last_generated_code)
+
+        self._state.logger.log(
+            f"Processing {len(queries)} queries with concurrency {max_concurrency}..."
+        )
+        with ThreadPoolExecutor(
+            max_workers=min(max_concurrency, len(queries))
+        ) as executor:
+            return list(executor.map(answer, queries))
+
+    async def achat(
+        self,
+        query: str,
+        output_type: Optional[str] = None,
+        timeout: Optional[float] = None,
+        session_id: Optional[str] = None,
+    ):
+        """
+        Async counterpart of `chat`: starts a new chat interaction without blocking
+        the event loop on the LLM, the SQL queries or the code execution.
+        """
+        if session_id is not None:
+            self._state.bind_session(session_id)
+        self.start_new_conversation()
+        return await self._aprocess_query(query, output_type, timeout)
+
+    async def afollow_up(
+        self,
+        query: str,
+        output_type: Optional[str] = None,
+        timeout: Optional[float] = None,
+        session_id: Optional[str] = None,
+    ):
+        """
+        Async counterpart of `follow_up`.
+        """
+        self._state.load_session(session_id)
+        return await self._aprocess_query(query, output_type, timeout)
+
+    def stream(
+        self,
+        query: str,
+        output_type: Optional[str] = None,
+        follow_up: bool = False,
+        timeout: Optional[float] = None,
+    ) -> Iterator[AgentEvent]:
+        """
+        Process the query like `chat`, or like `follow_up` if `follow_up` is set,
+        yielding an event as each stage completes. The last event is of type
+        `EventType.RESPONSE` and holds the final response.
+
+        Closing the generator before the last event aborts the processing of the
+        query: it returns once the running stage is complete.
+        """
+        events = queue.Queue()
+        self._state.abort_requested.clear()
+        self._state.listeners.append(events.put)
+
+        def process():
+            try:
+                if follow_up:
+                    response = self.follow_up(query, output_type, timeout)
+                else:
+                    response = self.chat(query, output_type, timeout)
+                events.put(
+                    AgentEvent(type=EventType.RESPONSE, data={"response": response})
+                )
+            except Exception as e:
+                events.put(e)
+
+        worker = threading.Thread(target=process, daemon=True)
+        worker.start()
+        try:
+            while True:
+                event = events.get()
+                if isinstance(event, Exception):
+                    raise event
+                yield event
+                if event.type == EventType.RESPONSE:
+                    break
+        finally:
+            if worker.is_alive():
+                self._state.logger.log("Aborting the processing of the query...")
+                self._state.abort_requested.set()
+                worker.join()
+                self._state.abort_requested.clear()
+            self._state.listeners.remove(events.put)
+
+    async def astream(
+        self,
+        query: str,
+        output_type: Optional[str] = None,
+        follow_up: bool = False,
+        timeout: Optional[float] = None,
+    ) -> AsyncIterator[AgentEvent]:
         """
-        return self._process_query(query, output_type)
-    
+        Async counterpart of `stream`. Closing the iterator, or cancelling the
+        task consuming it, aborts the processing of the query.
+        """
+        loop = asyncio.get_running_loop()
+        events = asyncio.Queue()
+
+        def listener(event: AgentEvent):
+            # Events are also emitted by the threads running the blocking stages
+            loop.call_soon_threadsafe(events.put_nowait, event)
+
+        self._state.abort_requested.clear()
+        self._state.listeners.append(listener)
+
+        if follow_up:
+            task = asyncio.ensure_future(self.afollow_up(query, output_type, timeout))
+        else:
+            task = asyncio.ensure_future(self.achat(query, output_type, timeout))
+        task.add_done_callback(lambda _: events.put_nowait(None))
+
+        try:
+            while True:
+                event = await events.get()
+                if event is None:
+                    break
+                yield event
+
+            yield AgentEvent(type=EventType.RESPONSE, data={"response": task.result()})
+        finally:
+            if not task.done():
+                self._state.logger.log("Aborting the processing of the query...")
+                self._state.abort_requested.set()
+                await asyncio.wait([task])
+                # The task ends with a QueryAbortedError nobody is waiting for
+                task.exception()
+                self._state.abort_requested.clear()
+            self._state.listeners.remove(listener)
+
     #3. 程式碼處理流程
 
     def generate_code(self, query: Union[UserQuery, str]) -> str:
@@ -109,6 +394,10 @@ class Agent:
 
         self._state.memory.add(str(query), is_user=True)
 
+        cached_code = self._get_cached_code(query)
+        if cached_code is not None:
+            return cached_code
+
         self._state.logger.log("Generating new code...")
         prompt = get_chat_prompt_for_sql(self._state)
 
@@ -116,17 +405,104 @@ class Agent:
         self._state.last_prompt_used = prompt
         return code
 
+    def _is_code_cacheable(self) -> bool:
+        """Only the code of the first query of a conversation does not depend on
+        the previous messages and can be cached."""
+        return self._state.code_cache is not None and self._state.memory.count() == 1
+
+    def _get_cached_code(self, query: Union[UserQuery, str]) -> Optional[str]:
+        """Get the code cached for the query, validated and cleaned like new code."""
+        if not self._is_code_cacheable():
+            return None
+
+        code = self._state.code_cache.get(
+            str(query), self._state.dfs, self._state.output_type
+        )
+        if code is None:
+            return None
+
+        self._state.emit(
+            EventType.CODE_GENERATED, "Using cached code...", code=code, cached=True
+        )
+        try:
+            cleaned_code = self._code_generator.validate_and_clean_code(code)
+        except Exception as e:
+            self._state.logger.log(f"Cached code is not valid anymore: {e}")
+            return None
+
+        self._state.last_code_generated = code
+        return cleaned_code
+
+    def _cache_code(self, query: Union[UserQuery, str]) -> None:
+        """Cache the code that answered the query successfully."""
+        if self._is_code_cacheable():
+            self._state.code_cache.set(
+                str(query),
+                self._state.dfs,
+                self._state.last_code_generated,
+                self._state.output_type,
+            )
+
     def execute_code(self, code: str) -> dict:
         """Execute the generated code."""
         self._state.logger.log(f"Executing code: {code}")
 
-        code_executor = CodeExecutor(self._state.config)
-        code_executor.add_to_env("execute_sql_query", self._execute_sql_query)
+        code_executor = self._get_code_executor()
+
+        with self._state.stats.measure(Stage.CODE_EXECUTION):
+            if self._sandbox:
+                return self._sandbox.execute(code, code_executor.environment)
+
+            return code_executor.execute_and_return_result(self._make_lazy(code))
+
+    async def agenerate_code(self, query: Union[UserQuery, str]) -> str:
+        """Generate code using the LLM without blocking the event loop."""
+
+        self._state.memory.add(str(query), is_user=True)
+
+        cached_code = self._get_cached_code(query)
+        if cached_code is not None:
+            return cached_code
+
+        self._state.logger.log("Generating new code...")
+        prompt = get_chat_prompt_for_sql(self._state)
+        # Rendering serializes the datasets, which may query remote sources
+        await asyncio.to_thread(self._code_generator.render_prompt, prompt)
+
+        code = await self._code_generator.agenerate_code(prompt)
+        self._state.last_prompt_used = prompt
+        return code
+
+    async def aexecute_code(self, code: str) -> dict:
+        """Execute the generated code without blocking the event loop."""
+        self._state.logger.log(f"Executing code: {code}")
+
+        code_executor = self._get_code_executor()
+
+        with self._state.stats.measure(Stage.CODE_EXECUTION):
+            if self._sandbox:
+                return await self._sandbox.aexecute(code, code_executor.environment)
 
-        if self._sandbox:
-            return self._sandbox.execute(code, code_executor.environment)
+            return await asyncio.to_thread(
+                code_executor.execute_and_return_result, self._make_lazy(code)
+            )
+
+    def _get_code_executor(self) -> CodeExecutor:
+        code_executor = CodeExecutor(self._state.config, self._state.time_left())
+        code_executor.add_to_env("execute_sql_query", self._execute_sql_query)
+        code_executor.add_to_env(
+            "execute_sql_query_lazy", self._execute_sql_query_lazy
+        )
+        return code_executor
 
-        return code_executor.execute_and_return_result(code)
+    def _make_lazy(self, code: str) -> str:
+        """
+        Fetch lazily the results of the SQL queries returned as is by the code,
+        when lazy results are enabled. Sandboxes always run the code unchanged.
+        """
+        if not self._state.config.enable_lazy_results:
+            return code
+        return CodeCleaner(self._state).make_sql_results_lazy(code)
 
     def _execute_sql_query(self, query: str) -> pd.DataFrame:
         """
@@ -138,29 +514,161 @@ class Agent:
         Returns:
             pd.DataFrame: The result of the SQL query as a pandas DataFrame.
         """
+        self._emit_sql_query_started(query)
+        start = time.perf_counter()
+        result = self._run_sql_query(query)
+        self._emit_sql_query_finished(query, result, time.perf_counter() - start)
+        return result
+
+    def _execute_sql_query_lazy(self, query: str) -> QueryResult:
+        """
+        Prepare an SQL query on the DataFrames, whose result is only fetched
+        when and as much as needed, for the result of the code.
+
+        Args:
+            query (str): The SQL query to execute.
+
+        Returns:
+            QueryResult: The lazy result, the query is validated without rows.
+        """
+        if not self._state.dfs:
+            raise ValueError("No DataFrames available to register for query execution.")
+
+        self._emit_sql_query_started(query)
+        start = time.perf_counter()
+        final_query = self._rewrite_sql_query(query)
+
+        virtual_dfs = [df for df in self._state.dfs if hasattr(df, "query_builder")]
+        if virtual_dfs:
+            result = virtual_dfs[-1].get_sql_query_result(
+                final_query, config=self._state.config
+            )
+        else:
+            result = DuckDBQueryResult(
+                final_query, tables={df.schema.name: df for df in self._state.dfs}
+            )
+        # Errors in the query are raised while the code is executed
+        columns = result.columns
+
+        seconds = time.perf_counter() - start
+        # No rows are fetched yet
+        self._state.stats.add_sql_query(query, seconds, rows=0, size=0)
+        self._state.emit(
+            EventType.SQL_QUERY_FINISHED,
+            f"SQL query prepared, its {len(columns)} columns are fetched lazily.",
+            query=query,
+            rows=None,
+            result=result,
+        )
+        return result
+
+    def _emit_sql_query_started(self, query: str) -> None:
+        self._state.emit(
+            EventType.SQL_QUERY_STARTED, f"Executing SQL query: {query}", query=query
+        )
+
+    def _emit_sql_query_finished(
+        self, query: str, result: pd.DataFrame, seconds: float
+    ) -> None:
+        self._state.stats.add_sql_query(
+            query,
+            seconds,
+            rows=len(result),
+            size=int(result.memory_usage(index=True, deep=True).sum()),
+        )
+        self._state.emit(
+            EventType.SQL_QUERY_FINISHED,
+            f"SQL query returned {len(result)} rows.",
+            query=query,
+            rows=len(result),
+            result=result,
+        )
+
+    def _run_sql_query(self, query: str) -> pd.DataFrame:
+        """Run the SQL query on the DataFrames, through their loader if they have one."""
         if not self._state.dfs:
             raise ValueError("No DataFrames available to register for query execution.")
 
+        cache_key = self._get_query_cache_key(query)
+        if cache_key is not None:
+            result = QueryCache.get(cache_key)
+            if result is not None:
+                return result
+
         db_manager = DuckDBConnectionManager()
 
-        table_mapping = {}
+        final_query = self._rewrite_sql_query(query)
         df_executor = None
 
-        for df in self._state.dfs:
-            if hasattr(df, "query_builder"):
-                # df is a valid dataset with query builder, loader and execute_sql_query method
-                table_mapping[df.schema.name] = df.query_builder._get_table_expression()
-                df_executor = df.execute_sql_query
-            else:
-                # dataset created from loading a csv, no query builder available
-                db_manager.register(df.schema.name, df)
+        # Registration and querying share the connection, keep them under one lock
+        with db_manager.lock:
+            for df in self._state.dfs:
+                if hasattr(df, "query_builder"):
+                    # df is a valid dataset with query builder, loader and execute_sql_query method
+                    df_executor = df.execute_sql_query
+                else:
+                    # dataset created from loading a csv, registered once as long as
+                    # its columns do not change, and unregistered with this state
+                    db_manager.register(df.schema.name, df, owner=self._state)
 
-        final_query = SQLParser.replace_table_and_column_names(query, table_mapping)
+            if not df_executor:
+                with db_manager.interrupt_after(self._state.time_left()):
+                    result = db_manager.sql(final_query).df()
+                if cache_key is not None:
+                    QueryCache.set(cache_key, result)
+                return result
 
-        if not df_executor:
-            return db_manager.sql(final_query).df()
-        else:
-            return df_executor(final_query)
+        try:
+            return df_executor(
+                final_query,
+                timeout=self._state.time_left(),
+                config=self._state.config,
+            )
+        except Exception:
+            # Queries cancelled by the database at the deadline are timeouts
+            self._state.check_aborted()
+            raise
+
+    def _rewrite_sql_query(self, query: str) -> str:
+        """
+        Replace the names of the datasets with a query builder by their table
+        expression and quote the identifiers. Rewritten queries are cached, as
+        the code often runs the same queries again.
+        """
+        final_query = self._state.sql_rewrites.get(query)
+        if final_query is None:
+            table_mapping = {
+                df.schema.name: df.query_builder._get_table_expression()
+                for df in self._state.dfs
+                if hasattr(df, "query_builder")
+            }
+            final_query = SQLParser.replace_table_and_column_names(query, table_mapping)
+            self._state.sql_rewrites.set(query, final_query)
+        return final_query
+
+    def _get_query_cache_key(self, query: str) -> Optional[str]:
+        """
+        Key of the cached result of a query on the in-memory datasets, None if
+        the SQL cache is disabled. Queries on datasets with a loader are cached
+        by the loader itself.
+
+        The datasets are identified by object, columns and shape: changing the
+        values of a DataFrame in place during a conversation is not detected,
+        call `QueryCache.clear()` after doing so.
+        """
+        if not self._state.config.enable_sql_cache or any(
+            hasattr(df, "query_builder") for df in self._state.dfs
+        ):
+            return None
+
+        version = "|".join(
+            [self._state.cache_scope]
+            + [
+                f"{df.schema.name}:{id(df)}:{df.column_hash}:{df.shape}"
+                for df in self._state.dfs
+            ]
+        )
+        return QueryCache.get_key(query, version)
 
     def generate_code_with_retries(self, query: str) -> Any:
         """Execute the code with retry logic."""
@@ -168,6 +676,8 @@ class Agent:
         attempts = 0
         try:
             return self.generate_code(query)
+        except QueryAbortedError:
+            raise
         except Exception as e:
             exception = e
             while attempts <= max_retries:
@@ -175,6 +685,8 @@ class Agent:
                     return self._regenerate_code_after_error(
                         self._state.last_code_generated, exception
                     )
+                except QueryAbortedError:
+                    raise
                 except Exception as e:
                     exception = e
                     attempts += 1
@@ -183,29 +695,341 @@ class Agent:
                             f"Maximum retry attempts exceeded. Last error: {e}"
                         )
                         raise
-                    self._state.logger.log(
-                        f"Retrying Code Generation ({attempts}/{max_retries})..."
+                    self._state.stats.add_retry()
+                    self._state.emit(
+                        EventType.RETRY,
+                        f"Retrying Code Generation ({attempts}/{max_retries})...",
+                        attempt=attempts,
+                        error=str(e),
                     )
 
     def execute_with_retries(self, code: str) -> Any:
         """Execute the code with retry logic."""
         max_retries = self._state.config.max_retries
         attempts = 0
+        # Errors repaired without the LLM since the code was last generated
+        repairs = 0
 
         while attempts <= max_retries:
             try:
                 result = self.execute_code(code)
-                return self._response_parser.parse(result, code)
-            except CodeExecutionError as e:
+                self._state.emit(
+                    EventType.CODE_EXECUTED,
+                    "Code executed successfully.",
+                    result=result,
+                )
+                response = self._parse_response(result, code)
+                self._state.emit(EventType.RESPONSE_PARSED, response=response)
+                self._state.stats.add_repair(repairs)
+                return response
+            except (
+                CodeExecutionError,
+                NoResultFoundError,
+                InvalidOutputValueMismatch,
+            ) as e:
+                repaired_code = self._repair_code(code, e, repairs)
+                if repaired_code is not None:
+                    code = repaired_code
+                    repairs += 1
+                    continue
+                if not isinstance(e, CodeExecutionError) and not repairs:
+                    raise
+
+                repairs = 0
                 attempts += 1
                 if attempts > max_retries:
                     self._state.logger.log(f"Max retries reached. Error: {e}")
                     raise
-                self._state.logger.log(
-                    f"Retrying execution ({attempts}/{max_retries})..."
+                self._state.stats.add_retry()
+                self._state.emit(
+                    EventType.RETRY,
+                    f"Retrying execution ({attempts}/{max_retries})...",
+                    attempt=attempts,
+                    error=str(e),
                 )
                 code = self._regenerate_code_after_error(code, e)
-                
+
+    async def agenerate_code_with_retries(self, query: str) -> Any:
+        """Async counterpart of `generate_code_with_retries`."""
+        max_retries = self._state.config.max_retries
+        attempts = 0
+        try:
+            return await self.agenerate_code(query)
+        except QueryAbortedError:
+            raise
+        except Exception as e:
+            exception = e
+            while attempts <= max_retries:
+                try:
+                    return await self._aregenerate_code_after_error(
+                        self._state.last_code_generated, exception
+                    )
+                except QueryAbortedError:
+                    raise
+                except Exception as e:
+                    exception = e
+                    attempts += 1
+                    if attempts > max_retries:
+                        self._state.logger.log(
+                            f"Maximum retry attempts exceeded. Last error: {e}"
+                        )
+                        raise
+                    self._state.stats.add_retry()
+                    self._state.emit(
+                        EventType.RETRY,
+                        f"Retrying Code Generation ({attempts}/{max_retries})...",
+                        attempt=attempts,
+                        error=str(e),
+                    )
+
+    async def aexecute_with_retries(self, code: str) -> Any:
+        """Async counterpart of `execute_with_retries`."""
+        max_retries = self._state.config.max_retries
+        attempts = 0
+        # Errors repaired without the LLM since the code was last generated
+        repairs = 0
+
+        while attempts <= max_retries:
+            try:
+                result = await self.aexecute_code(code)
+                self._state.emit(
+                    EventType.CODE_EXECUTED,
+                    "Code executed successfully.",
+                    result=result,
+                )
+                response = self._parse_response(result, code)
+                self._state.emit(EventType.RESPONSE_PARSED, response=response)
+                self._state.stats.add_repair(repairs)
+                return response
+            except (
+                CodeExecutionError,
+                NoResultFoundError,
+                InvalidOutputValueMismatch,
+            ) as e:
+                repaired_code = self._repair_code(code, e, repairs)
+                if repaired_code is not None:
+                    code = repaired_code
+                    repairs += 1
+                    continue
+                if not isinstance(e, CodeExecutionError) and not repairs:
+                    raise
+
+                repairs = 0
+                attempts += 1
+                if attempts > max_retries:
+                    self._state.logger.log(f"Max retries reached. Error: {e}")
+                    raise
+                self._state.stats.add_retry()
+                self._state.emit(
+                    EventType.RETRY,
+                    f"Retrying execution ({attempts}/{max_retries})...",
+                    attempt=attempts,
+                    error=str(e),
+                )
+                code = await self._aregenerate_code_after_error(code, e)
+
+    def generate_and_execute_candidates(
+        self, query: Union[UserQuery, str]
+    ) -> Tuple[str, Optional[BaseResponse]]:
+        """
+        Speculatively generate `speculative_candidates` codes for the query at
+        once and execute each of them as soon as it is generated. The first
+        candidate producing a valid response wins, the others are cancelled.
+
+        Returns:
+            Tuple[str, Optional[BaseResponse]]: The winning code and its response.
+                If every candidate failed, the code of a failed candidate corrected
+                by the LLM and None, to be executed with the usual retry logic.
+        """
+        self._state.memory.add(str(query), is_user=True)
+
+        cached_code = self._get_cached_code(query)
+        if cached_code is not None:
+            return cached_code, None
+
+        prompt = self._get_candidates_prompt()
+        cancelled = threading.Event()
+
+        def run_candidate(
+            index: int,
+        ) -> Tuple["Agent", Optional[str], Optional[str], Any]:
+            candidate = self._get_candidate_agent(cancelled)
+            raw_code = code = None
+            try:
+                with candidate._state.stats.measure(Stage.LLM_CALL):
+                    raw_code = self._get_candidate_llm(index).generate_code(
+                        prompt, candidate._state
+                    )
+                candidate._state.stats.add_llm_call()
+                candidate._state.check_aborted()
+                code = candidate._code_generator.validate_and_clean_code(raw_code)
+                candidate._state.check_aborted()
+                result = candidate.execute_code(code)
+                response = candidate._parse_response(result, code)
+                return candidate, raw_code, code, response
+            except Exception as e:
+                return candidate, raw_code, code, e
+
+        executor = ThreadPoolExecutor(
+            max_workers=self._state.config.speculative_candidates
+        )
+        pending = {
+            executor.submit(run_candidate, index)
+            for index in range(self._state.config.speculative_candidates)
+        }
+        try:
+            failures = []
+            while pending:
+                done, pending = wait(
+                    pending,
+                    timeout=self._candidates_poll_interval,
+                    return_when=FIRST_COMPLETED,
+                )
+                # The candidates are not bound to this state, stop them on abort
+                self._state.check_aborted()
+                for future in done:
+                    candidate, raw_code, code, outcome = future.result()
+                    self._state.stats.merge(candidate._state.stats)
+                    if not isinstance(outcome, Exception):
+                        return self._select_candidate(raw_code, code, outcome)
+                    if isinstance(outcome, QueryAbortedError):
+                        raise outcome
+                    self._state.logger.log(f"Candidate code failed: {outcome}")
+                    failures.append((raw_code, code, outcome))
+        finally:
+            # The running candidates stop at their next stage, their results and
+            # stats are discarded
+            cancelled.set()
+            executor.shutdown(wait=False, cancel_futures=True)
+
+        raw_code, code, error = failures[0]
+        self._state.last_code_generated = raw_code
+        return self._regenerate_code_after_error(code or raw_code, error), None
+
+    async def agenerate_and_execute_candidates(
+        self, query: Union[UserQuery, str]
+    ) -> Tuple[str, Optional[BaseResponse]]:
+        """Async counterpart of `generate_and_execute_candidates`."""
+        self._state.memory.add(str(query), is_user=True)
+
+        cached_code = self._get_cached_code(query)
+        if cached_code is not None:
+            return cached_code, None
+
+        prompt = await asyncio.to_thread(self._get_candidates_prompt)
+        cancelled = threading.Event()
+
+        async def run_candidate(
+            index: int,
+        ) -> Tuple["Agent", Optional[str], Optional[str], Any]:
+            candidate = self._get_candidate_agent(cancelled)
+            raw_code = code = None
+            try:
+                with candidate._state.stats.measure(Stage.LLM_CALL):
+                    raw_code = await self._get_candidate_llm(index).agenerate_code(
+                        prompt, candidate._state
+                    )
+                candidate._state.stats.add_llm_call()
+                candidate._state.check_aborted()
+                code = candidate._code_generator.validate_and_clean_code(raw_code)
+                candidate._state.check_aborted()
+                result = await candidate.aexecute_code(code)
+                response = candidate._parse_response(result, code)
+                return candidate, raw_code, code, response
+            except Exception as e:
+                return candidate, raw_code, code, e
+
+        pending = {
+            asyncio.ensure_future(run_candidate(index))
+            for index in range(self._state.config.speculative_candidates)
+        }
+        try:
+            failures = []
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending,
+                    timeout=self._candidates_poll_interval,
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+                self._state.check_aborted()
+                for task in done:
+                    candidate, raw_code, code, outcome = task.result()
+                    self._state.stats.merge(candidate._state.stats)
+                    if not isinstance(outcome, Exception):
+                        return self._select_candidate(raw_code, code, outcome)
+                    if isinstance(outcome, QueryAbortedError):
+                        raise outcome
+                    self._state.logger.log(f"Candidate code failed: {outcome}")
+                    failures.append((raw_code, code, outcome))
+        finally:
+            # Code executed in a thread cannot be cancelled, it stops at its next
+            # stage
+            cancelled.set()
+            for task in pending:
+                task.cancel()
+
+        raw_code, code, error = failures[0]
+        self._state.last_code_generated = raw_code
+        return await self._aregenerate_code_after_error(code or raw_code, error), None
+
+    def _get_candidate_agent(self, cancelled: threading.Event) -> "Agent":
+        """
+        Agent running a candidate on a copy of the state with its own stats and
+        the deadline of the current query, so that a losing candidate still
+        running never updates the state of the next query. Setting `cancelled`
+        stops the candidate at its next stage.
+        """
+        state = copy.copy(self._state)
+        state.stats = QueryStats()
+        state.abort_requested = cancelled
+        state.listeners = list(self._state.listeners)
+        return self._from_state(state, self._sandbox, self.description)
+
+    def _get_candidate_llm(self, index: int) -> LLM:
+        """
+        LLM generating the candidate of the given index. A deterministic LLM
+        would generate the same code for all the candidates, so the candidates
+        after the first one are sampled with an increasing temperature and their
+        own seed, for the LLMs supporting them.
+        """
+        llm = self._state.config.llm
+        if index == 0 or not hasattr(llm, "temperature"):
+            return llm
+
+        candidate_llm = copy.copy(llm)
+        candidate_llm.temperature = max(
+            llm.temperature, min(self._candidates_temperature_step * index, 1.0)
+        )
+        if getattr(llm, "seed", None) is not None:
+            candidate_llm.seed = llm.seed + index
+        return candidate_llm
+
+    def _get_candidates_prompt(self) -> BasePrompt:
+        """Build and render once the prompt shared by all the candidates."""
+        self._state.logger.log(
+            f"Generating {self._state.config.speculative_candidates} candidate codes..."
+        )
+        prompt = get_chat_prompt_for_sql(self._state)
+        self._state.logger.log(
+            f"Using Prompt: {self._code_generator.render_prompt(prompt)}"
+        )
+        self._state.last_prompt_used = prompt
+        return prompt
+
+    def _parse_response(self, result: dict, code: str) -> BaseResponse:
+        with self._state.stats.measure(Stage.RESPONSE_PARSE):
+            return self._response_parser.parse(result, code)
+
+    def _select_candidate(
+        self, raw_code: str, code: str, response: BaseResponse
+    ) -> Tuple[str, BaseResponse]:
+        self._state.last_code_generated = raw_code
+        self._state.emit(
+            EventType.CODE_GENERATED, f"Code Generated:\n{raw_code}", code=raw_code
+        )
+        self._state.logger.log("Candidate code executed successfully.")
+        return code, response
+
 #4. 學習與記憶
 
     def train(
@@ -261,7 +1085,12 @@ class Agent:
         """
         self.clear_memory()
 
-    def _process_query(self, query: str, output_type: Optional[str] = None):
+    def _process_query(
+        self,
+        query: str,
+        output_type: Optional[str] = None,
+        timeout: Optional[float] = None,
+    ):
         """Process a user query and return the result."""
         query = UserQuery(query)
         self._state.logger.log(f"Question: {query}")
@@ -270,35 +1099,227 @@ class Agent:
         )
 
         self._state.output_type = output_type
+        self._state.stats = QueryStats()
+        self._state.deadline = self._get_deadline(timeout)
+        response = None
+        timed_out = False
+        try:
+            with self._state.stats.measure(Stage.TOTAL):
+                response = self._answer_query(query)
+            return response
+        except QueryTimeoutError:
+            timed_out = True
+            raise
+        finally:
+            self._state.deadline = None
+            self._state.save_session()
+            self._record_stats(response, timed_out)
+
+    def _answer_query(self, query: UserQuery) -> BaseResponse:
         try:
             self._state.assign_prompt_id()
 
-            # Generate code
-            code = self.generate_code_with_retries(query)
+            routed_response = self._answer_with_router(query)
+            if routed_response is not None:
+                return routed_response
 
-            # Execute code with retries
-            result = self.execute_with_retries(code)
+            result = None
+            if self._state.config.speculative_candidates > 1:
+                code, result = self.generate_and_execute_candidates(query)
+            else:
+                # Generate code
+                code = self.generate_code_with_retries(query)
+
+            if result is None:
+                # Execute code with retries
+                result = self.execute_with_retries(code)
+            self._cache_code(query)
 
             self._state.logger.log("Response generated successfully.")
             # Generate and return the final response
             return result
 
         except CodeExecutionError:
+            # Failures caused by the deadline, like an interrupted query, are timeouts
+            self._state.check_aborted()
             return self._handle_exception(code)
 
+    async def _aprocess_query(
+        self,
+        query: str,
+        output_type: Optional[str] = None,
+        timeout: Optional[float] = None,
+    ):
+        """Async counterpart of `_process_query`."""
+        query = UserQuery(query)
+        self._state.logger.log(f"Question: {query}")
+        self._state.logger.log(
+            f"Running PandaAI with {self._state.config.llm.type} LLM..."
+        )
+
+        self._state.output_type = output_type
+        self._state.stats = QueryStats()
+        self._state.deadline = self._get_deadline(timeout)
+        response = None
+        timed_out = False
+        try:
+            with self._state.stats.measure(Stage.TOTAL):
+                response = await asyncio.wait_for(
+                    self._aanswer_query(query), timeout=self._state.time_left()
+                )
+            return response
+        except asyncio.TimeoutError as e:
+            timed_out = True
+            raise QueryTimeoutError("The processing of the query timed out.") from e
+        except QueryTimeoutError:
+            timed_out = True
+            raise
+        finally:
+            self._state.deadline = None
+            self._state.save_session()
+            self._record_stats(response, timed_out)
+
+    async def _aanswer_query(self, query: UserQuery) -> BaseResponse:
+        try:
+            self._state.assign_prompt_id()
+
+            routed_response = await asyncio.to_thread(self._answer_with_router, query)
+            if routed_response is not None:
+                return routed_response
+
+            result = None
+            if self._state.config.speculative_candidates > 1:
+                code, result = await self.agenerate_and_execute_candidates(query)
+            else:
+                # Generate code
+                code = await self.agenerate_code_with_retries(query)
+
+            if result is None:
+                # Execute code with retries
+                result = await self.aexecute_with_retries(code)
+            self._cache_code(query)
+
+            self._state.logger.log("Response generated successfully.")
+            # Generate and return the final response
+            return result
+
+        except CodeExecutionError:
+            self._state.check_aborted()
+            return self._handle_exception(code)
+
+    def _answer_with_router(self, query: UserQuery) -> Optional[BaseResponse]:
+        """
+        Answer the query with the intent router, without the LLM.
+
+        Returns:
+            Optional[BaseResponse]: The response, None if there is no router, the
+                router does not recognize the query or its SQL query fails.
+        """
+        if self._state.intent_router is None:
+            return None
+
+        intent = self._state.intent_router.route(
+            str(query), self._state.dfs, self._state.output_type
+        )
+        if intent is None:
+            return None
+
+        self._state.emit(
+            EventType.CODE_GENERATED,
+            f"Query routed to {intent.name}: {intent.sql}",
+            code=intent.code,
+            routed=True,
+        )
+        try:
+            result = self.execute_code(intent.code)
+            response = self._parse_response(result, intent.code)
+        except QueryAbortedError:
+            raise
+        except Exception as e:
+            self._state.logger.log(f"Routed query failed, using the LLM instead: {e}")
+            return None
+
+        self._state.memory.add(str(query), is_user=True)
+        self._state.last_code_generated = intent.code
+        self._state.emit(EventType.CODE_EXECUTED, result=result)
+        self._state.emit(EventType.RESPONSE_PARSED, response=response)
+        return response
+
+    def _get_deadline(self, timeout: Optional[float]) -> Optional[float]:
+        """Deadline of a query processed from now, None if it has no timeout."""
+        if timeout is None:
+            timeout = self._state.config.query_timeout
+        if timeout is None:
+            return None
+        if timeout <= 0:
+            raise ValueError("timeout must be a positive number of seconds.")
+        return time.monotonic() + timeout
+
+    def _record_stats(
+        self, response: Optional[BaseResponse], timed_out: bool = False
+    ) -> None:
+        """Attach the stats of the processed query to its response and aggregate them."""
+        if timed_out:
+            status = "timeout"
+        elif response is None:
+            status = "failed"
+        elif isinstance(response, ErrorResponse):
+            status = "error"
+        else:
+            status = "success"
+
+        if isinstance(response, BaseResponse):
+            response.stats = self._state.stats
+        metrics.record_query(self._state.stats, status)
+
+    def _repair_code(
+        self, code: str, error: Exception, repairs: int
+    ) -> Optional[str]:
+        """
+        Repair the code after the error without calling the LLM, if possible.
+
+        Returns:
+            Optional[str]: The repaired code, None if the LLM has to correct it.
+        """
+        if (
+            not self._state.config.enable_code_repair
+            or repairs >= CodeRepairer.max_repairs
+        ):
+            return None
+
+        repaired_code = self._code_repairer.repair(code, error)
+        if repaired_code is not None:
+            self._state.last_code_generated = repaired_code
+            self._state.emit(
+                EventType.CODE_REPAIRED,
+                f"Code repaired without the LLM:\n{repaired_code}",
+                code=repaired_code,
+                error=str(error),
+            )
+        return repaired_code
+
     def _regenerate_code_after_error(self, code: str, error: Exception) -> str:
         """Generate a new code snippet based on the error."""
-        error_trace = traceback.format_exc()
+        prompt = self._get_error_prompt(code, error)
+        return self._code_generator.generate_code(prompt)
+
+    async def _aregenerate_code_after_error(self, code: str, error: Exception) -> str:
+        """Async counterpart of `_regenerate_code_after_error`."""
+        prompt = self._get_error_prompt(code, error)
+        await asyncio.to_thread(self._code_generator.render_prompt, prompt)
+        return await self._code_generator.agenerate_code(prompt)
+
+    def _get_error_prompt(self, code: str, error: Exception) -> BasePrompt:
+        """Build the prompt asking the LLM to fix the code after the error."""
+        error_trace = "".join(
+            traceback.format_exception(type(error), error, error.__traceback__)
+        )
         self._state.logger.log(f"Execution failed with error: {error_trace}")
 
         if isinstance(error, InvalidLLMOutputType):
-            prompt = get_correct_output_type_error_prompt(
-                self._state, code, error_trace
-            )
-        else:
-            prompt = get_correct_error_prompt_for_sql(self._state, code, error_trace)
+            return get_correct_output_type_error_prompt(self._state, code, error_trace)
 
-        return self._code_generator.generate_code(prompt)
+        return get_correct_error_prompt_for_sql(self._state, code, error_trace)
 
     def _handle_exception(self, code: str) -> str:
         """Handle exceptions and return an error message."""
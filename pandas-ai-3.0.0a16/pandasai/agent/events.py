@@ -0,0 +1,34 @@
+import time
+from typing import Any, Dict, Optional
+
+from pydantic import BaseModel, ConfigDict, Field
+
+
+class EventType:
+    """Types of the events emitted while the agent processes a query."""
+
+    PROMPT_BUILT = "prompt_built"
+    # Emitted by the LLMs streaming their completions, one event per chunk
+    LLM_TOKEN = "llm_token"
+    CODE_GENERATED = "code_generated"
+    CODE_VALIDATED = "code_validated"
+    SQL_QUERY_STARTED = "sql_query_started"
+    SQL_QUERY_FINISHED = "sql_query_finished"
+    CODE_EXECUTED = "code_executed"
+    # Emitted when an error is repaired without the LLM, before re-executing
+    CODE_REPAIRED = "code_repaired"
+    RESPONSE_PARSED = "response_parsed"
+    RETRY = "retry"
+    # Last event of a stream, holding the final response
+    RESPONSE = "response"
+
+
+class AgentEvent(BaseModel):
+    """Event emitted while the agent processes a query."""
+
+    type: str
+    message: Optional[str] = None
+    data: Dict[str, Any] = Field(default_factory=dict)
+    time: float = Field(default_factory=time.time)
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
@@ -0,0 +1,413 @@
+import re
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Callable, List, Optional, Union
+
+from sqlglot import exp, select
+
+from pandasai.data_loader.semantic_layer_schema import Column
+
+if TYPE_CHECKING:
+    from pandasai.dataframe import DataFrame, VirtualDataFrame
+
+
+@dataclass
+class Intent:
+    """A question compiled to a SQL query on a dataset."""
+
+    name: str
+    sql: str
+    output_type: str
+
+    @property
+    def code(self) -> str:
+        """Code answering the question, run like the code generated by the LLM."""
+        if self.output_type == "number":
+            value = "df.iloc[0, 0].item() if len(df) else 0"
+        else:
+            value = "df"
+        return (
+            f"df = execute_sql_query({self.sql!r})\n"
+            f'result = {{"type": "{self.output_type}", "value": {value}}}'
+        )
+
+
+_PREFIX = re.compile(
+    r"^(?:please\s+)?"
+    r"(?:(?:show|list|give|get|find|display|return|select|fetch)(?:\s+me)?\s+"
+    r"|(?:what|which)\s+(?:is|are)\s+|tell\s+me\s+)?"
+    r"(?:all\s+)?(?:the\s+)?",
+    re.IGNORECASE,
+)
+_SUFFIX = re.compile(r"[\s?.!]*$")
+
+_ROWS = r"(?:rows|records|entries|items|data|lines)"
+_GROUP = r"(?:by|per|for\s+each|for\s+every|in\s+each|grouped\s+by)"
+_WHERE = r"(?:where|with|whose|having|that\s+have|which\s+have|for\s+which)"
+
+_OPERATORS = {
+    ">=": exp.GTE,
+    "<=": exp.LTE,
+    "!=": exp.NEQ,
+    "<>": exp.NEQ,
+    "==": exp.EQ,
+    "=": exp.EQ,
+    ">": exp.GT,
+    "<": exp.LT,
+    "is greater than or equal to": exp.GTE,
+    "greater than or equal to": exp.GTE,
+    "is at least": exp.GTE,
+    "at least": exp.GTE,
+    "is less than or equal to": exp.LTE,
+    "less than or equal to": exp.LTE,
+    "is at most": exp.LTE,
+    "at most": exp.LTE,
+    "is greater than": exp.GT,
+    "greater than": exp.GT,
+    "is more than": exp.GT,
+    "more than": exp.GT,
+    "is higher than": exp.GT,
+    "higher than": exp.GT,
+    "is above": exp.GT,
+    "above": exp.GT,
+    "over": exp.GT,
+    "exceeds": exp.GT,
+    "is less than": exp.LT,
+    "less than": exp.LT,
+    "fewer than": exp.LT,
+    "is lower than": exp.LT,
+    "lower than": exp.LT,
+    "is below": exp.LT,
+    "below": exp.LT,
+    "under": exp.LT,
+    "is not equal to": exp.NEQ,
+    "not equal to": exp.NEQ,
+    "is not": exp.NEQ,
+    "is equal to": exp.EQ,
+    "equal to": exp.EQ,
+    "equals": exp.EQ,
+    "is": exp.EQ,
+}
+_SYMBOLS = [op for op in _OPERATORS if not op[0].isalpha()]
+_WORDS = [op for op in _OPERATORS if op[0].isalpha()]
+_CONDITION = re.compile(
+    r"(?P<column>.+?)\s*(?P<op>"
+    + "|".join(re.escape(op) for op in _SYMBOLS)
+    + r"|\s(?:"
+    + "|".join(op.replace(" ", r"\s+") for op in _WORDS)
+    + r")\s)\s*(?P<value>.+)",
+    re.IGNORECASE,
+)
+# Unquoted values chaining several conditions are left to the LLM
+_COMPOUND_VALUE = re.compile(
+    r"\b(?:and|or|by|per|where|with|group|order|sort|top|limit)\b", re.IGNORECASE
+)
+
+_AGGREGATIONS = {
+    "total": exp.Sum,
+    "sum": exp.Sum,
+    "average": exp.Avg,
+    "avg": exp.Avg,
+    "mean": exp.Avg,
+    "maximum": exp.Max,
+    "max": exp.Max,
+    "highest": exp.Max,
+    "largest": exp.Max,
+    "minimum": exp.Min,
+    "min": exp.Min,
+    "lowest": exp.Min,
+    "smallest": exp.Min,
+}
+
+_NUMERIC_TYPES = ("integer", "float")
+
+
+class IntentRouter:
+    """
+    Answer simple questions on a single dataset without the LLM.
+
+    The question is matched against common shapes: filters on a column, top-N
+    rows, count/sum/average/minimum/maximum of a column, possibly by group, and
+    distinct values of a column. The columns named in the question must match
+    the columns of the schema of the dataset. A matching question is compiled to
+    a SQL query, any other one returns None and is answered by the LLM.
+
+    Subclasses can support more shapes by adding methods to `matchers`.
+
+    Example:
+        ```python
+        agent = Agent(df, intent_router=IntentRouter())
+        agent.chat("Show the rows where storage days > 200")
+        ```
+    """
+
+    def __init__(self):
+        self.matchers: List[Callable[[str, "DataFrame"], Optional[Intent]]] = [
+            self._match_count_distinct,
+            self._match_count,
+            self._match_distinct,
+            self._match_top_n,
+            self._match_aggregation,
+            self._match_filter,
+        ]
+
+    def route(
+        self,
+        query: str,
+        dfs: List[Union["DataFrame", "VirtualDataFrame"]],
+        output_type: Optional[str] = None,
+    ) -> Optional[Intent]:
+        """
+        Compile the question to a SQL query.
+
+        Returns:
+            Optional[Intent]: The compiled question, None if the question does not
+                match any known shape or does not give the expected output type.
+        """
+        if len(dfs) != 1 or not dfs[0].schema.columns:
+            return None
+
+        text = _SUFFIX.sub("", _PREFIX.sub("", query.strip(), count=1))
+        for matcher in self.matchers:
+            intent = matcher(text, dfs[0])
+            if intent is not None:
+                if output_type is not None and output_type != intent.output_type:
+                    return None
+                return intent
+
+        return None
+
+    def _match_count_distinct(self, text: str, df: "DataFrame") -> Optional[Intent]:
+        match = re.fullmatch(
+            r"(?:how\s+many|(?:number|count)\s+of)\s+(?:distinct|unique|different)\s+"
+            r"(?P<column>.+?)(?:\s+(?:are\s+there|values|exist))?"
+            rf"(?:\s+{_WHERE}\s+(?P<condition>.+))?",
+            text,
+            re.IGNORECASE,
+        )
+        if not match:
+            return None
+
+        column = self._resolve_column(match["column"], df)
+        if column is None:
+            return None
+
+        count = exp.Count(this=exp.Distinct(expressions=[self._column(column)]))
+        query = select(count.as_("count")).from_(self._table(df))
+        return self._intent("count_distinct", query, match["condition"], df, "number")
+
+    def _match_count(self, text: str, df: "DataFrame") -> Optional[Intent]:
+        match = re.fullmatch(
+            r"(?:how\s+many|count(?:\s+the)?|(?:number|count)\s+of)"
+            rf"(?:\s+(?:{_ROWS}|(?P<noun>\w+)))?"
+            r"(?:\s+(?:are\s+there|exist|do\s+we\s+have))?"
+            rf"(?:\s+{_GROUP}\s+(?P<group>.+?))?"
+            rf"(?:\s+(?:{_WHERE}|have|has)\s+(?P<condition>.+?))?"
+            r"(?:\s+are\s+there)?",
+            text,
+            re.IGNORECASE,
+        )
+        if not match:
+            return None
+
+        # "how many orders" counts the rows of the orders table, not a column
+        if match["noun"] and self._resolve_column(match["noun"], df) is not None:
+            return None
+
+        count = exp.Count(this=exp.Star()).as_("count")
+        if match["group"] is None:
+            query = select(count).from_(self._table(df))
+            return self._intent("count", query, match["condition"], df, "number")
+
+        group = self._resolve_column(match["group"], df)
+        if group is None:
+            return None
+
+        query = (
+            select(self._column(group), count)
+            .from_(self._table(df))
+            .group_by(self._column(group))
+            .order_by(self._column(group))
+        )
+        return self._intent("count_by_group", query, match["condition"], df)
+
+    def _match_distinct(self, text: str, df: "DataFrame") -> Optional[Intent]:
+        match = re.fullmatch(
+            r"(?:distinct|unique|different)\s+(?:values\s+(?:of|in|for)\s+)?"
+            r"(?:the\s+)?(?P<column>.+?)(?:\s+values)?"
+            rf"(?:\s+{_WHERE}\s+(?P<condition>.+))?",
+            text,
+            re.IGNORECASE,
+        )
+        if not match:
+            return None
+
+        column = self._resolve_column(match["column"], df)
+        if column is None:
+            return None
+
+        query = (
+            select(self._column(column))
+            .distinct()
+            .from_(self._table(df))
+            .order_by(self._column(column))
+        )
+        return self._intent("distinct", query, match["condition"], df)
+
+    def _match_top_n(self, text: str, df: "DataFrame") -> Optional[Intent]:
+        match = re.fullmatch(
+            r"(?P<direction>top|bottom)\s+(?P<limit>\d+)"
+            rf"(?:\s+(?:{_ROWS}|\w+))?\s+(?:by|sorted\s+by|ordered\s+by)\s+"
+            rf"(?P<column>.+?)(?:\s+{_WHERE}\s+(?P<condition>.+))?",
+            text,
+            re.IGNORECASE,
+        )
+        if not match:
+            return None
+
+        column = self._resolve_column(match["column"], df)
+        if column is None:
+            return None
+
+        query = (
+            select("*")
+            .from_(self._table(df))
+            .order_by(
+                exp.Ordered(
+                    this=self._column(column),
+                    desc=match["direction"].lower() == "top",
+                )
+            )
+            .limit(int(match["limit"]))
+        )
+        return self._intent("top_n", query, match["condition"], df)
+
+    def _match_aggregation(self, text: str, df: "DataFrame") -> Optional[Intent]:
+        match = re.fullmatch(
+            rf"(?P<function>{'|'.join(_AGGREGATIONS)})\s+(?:of\s+)?(?:the\s+)?"
+            rf"(?P<column>.+?)(?:\s+{_GROUP}\s+(?P<group>.+?))?"
+            rf"(?:\s+(?:{_WHERE}|for|when)\s+(?P<condition>.+))?",
+            text,
+            re.IGNORECASE,
+        )
+        if not match:
+            return None
+
+        column = self._resolve_column(match["column"], df)
+        if column is None or column.type not in _NUMERIC_TYPES:
+            return None
+
+        function = match["function"].lower()
+        alias = function + "_" + re.sub(r"[\W_]+", "_", column.name.lower())
+        aggregation = _AGGREGATIONS[function](this=self._column(column)).as_(alias)
+        if match["group"] is None:
+            query = select(aggregation).from_(self._table(df))
+            return self._intent("aggregation", query, match["condition"], df, "number")
+
+        group = self._resolve_column(match["group"], df)
+        if group is None:
+            return None
+
+        query = (
+            select(self._column(group), aggregation)
+            .from_(self._table(df))
+            .group_by(self._column(group))
+            .order_by(self._column(group))
+        )
+        return self._intent("aggregation_by_group", query, match["condition"], df)
+
+    def _match_filter(self, text: str, df: "DataFrame") -> Optional[Intent]:
+        match = re.fullmatch(
+            rf"(?:{_ROWS}\s+)?(?:{_WHERE}\s+)?(?P<condition>.+)",
+            text,
+            re.IGNORECASE,
+        )
+        if not match:
+            return None
+
+        query = select("*").from_(self._table(df))
+        return self._intent("filter", query, match["condition"], df)
+
+    def _intent(
+        self,
+        name: str,
+        query: exp.Select,
+        condition: Optional[str],
+        df: "DataFrame",
+        output_type: str = "dataframe",
+    ) -> Optional[Intent]:
+        if condition is not None:
+            where = self._parse_condition(condition, df)
+            if where is None:
+                return None
+            query = query.where(where)
+        return Intent(name=name, sql=query.sql(), output_type=output_type)
+
+    def _parse_condition(self, text: str, df: "DataFrame") -> Optional[exp.Expression]:
+        match = _CONDITION.fullmatch(text.strip())
+        if not match:
+            return None
+
+        column = self._resolve_column(match["column"], df)
+        if column is None:
+            return None
+
+        operator = _OPERATORS[" ".join(match["op"].lower().split())]
+        value = self._parse_value(match["value"].strip(), column)
+        if value is None:
+            return None
+        if not value.is_number and operator not in (exp.EQ, exp.NEQ):
+            return None
+
+        return operator(this=self._column(column), expression=value)
+
+    @staticmethod
+    def _parse_value(text: str, column: Column) -> Optional[exp.Literal]:
+        quoted = re.fullmatch(r"""(['"`])(?P<value>.*)\1""", text)
+        if quoted:
+            text = quoted["value"]
+        elif _COMPOUND_VALUE.search(text):
+            return None
+
+        if column.type in _NUMERIC_TYPES:
+            try:
+                float(text.replace(",", ""))
+            except ValueError:
+                return None
+            return exp.Literal.number(text.replace(",", ""))
+
+        if column.type not in (None, "string"):
+            return None
+        return exp.Literal.string(text)
+
+    @staticmethod
+    def _normalize(name: str) -> str:
+        """Lowercase the words of a name, dropping a trailing plural `s`."""
+        words = re.split(r"[\W_]+", name.lower())
+        return " ".join(
+            word[:-1] if len(word) > 3 and word.endswith("s") else word
+            for word in words
+            if word
+        )
+
+    def _resolve_column(self, text: str, df: "DataFrame") -> Optional[Column]:
+        """The only column of the schema named by the text, if any."""
+        text = re.sub(r"^(?:the|a|an)\s+", "", text.strip(), flags=re.IGNORECASE)
+        text = self._normalize(text)
+        if not text:
+            return None
+
+        columns = [
+            column
+            for column in df.schema.columns
+            if text
+            in (self._normalize(column.name), self._normalize(column.alias or ""))
+        ]
+        return columns[0] if len(columns) == 1 else None
+
+    @staticmethod
+    def _column(column: Column) -> exp.Column:
+        return exp.column(column.name, quoted=True)
+
+    @staticmethod
+    def _table(df: "DataFrame") -> exp.Table:
+        return exp.table_(df.schema.name, quoted=True)
@@ -0,0 +1,213 @@
+import sys
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import List, Optional, Union
+
+from pandasai.core.code_generation.code_cache import CodeCache
+from pandasai.core.prompts import GeneratePythonCodeWithSQLPrompt
+from pandasai.dataframe.base import DataFrame
+from pandasai.dataframe.virtual_dataframe import VirtualDataFrame
+from pandasai.sandbox import Sandbox
+from pandasai.vectorstores.vectorstore import VectorStore
+
+from ..config import Config
+from .base import Agent
+from .intent_router import IntentRouter
+from .schema_retriever import SchemaRetriever
+
+
+class AgentManager:
+    """
+    Serve many independent conversations on the same datasets.
+
+    The datasets, the config, the logger, the vector store, the caches and the
+    serialized <tables> block of the prompt are set up once and shared by all
+    the sessions, so that creating a session does not depend on the size of the
+    datasets. Every session is an `Agent` with its own memory.
+
+    The shared datasets are treated as immutable: create a new manager when
+    they change.
+
+    With a `memory_store` in the config, the conversations are persisted in it:
+    any process serving the same datasets can resume a session, and evicting
+    a session only frees its memory in this process.
+
+    Example:
+        ```python
+        manager = AgentManager([orders, customers], max_sessions=500)
+
+        agent = manager.get_session(request.session_id)
+        response = agent.chat("What is the total revenue?")
+        ```
+    """
+
+    def __init__(
+        self,
+        dfs: Union[
+            Union[DataFrame, VirtualDataFrame], List[Union[DataFrame, VirtualDataFrame]]
+        ],
+        config: Optional[Union[Config, dict]] = None,
+        memory_size: Optional[int] = 10,
+        vectorstore: Optional[VectorStore] = None,
+        description: str = None,
+        sandbox: Sandbox = None,
+        code_cache: Optional[CodeCache] = None,
+        intent_router: Optional[IntentRouter] = None,
+        schema_retriever: Optional[SchemaRetriever] = None,
+        max_sessions: Optional[int] = 1000,
+        idle_timeout: Optional[float] = 1800,
+    ):
+        """
+        Args:
+            dfs (Union[Union[DataFrame, VirtualDataFrame], List[Union[DataFrame, VirtualDataFrame]]]): The dataframe(s) shared by the sessions.
+            config (Optional[Union[Config, dict]]): The configuration of the agents.
+            memory_size (Optional[int]): The size of the memory of each session.
+            vectorstore (Optional[VectorStore]): The vectorstore shared by the sessions.
+            description (str): The description of the agents.
+            sandbox (Sandbox): The sandbox executing the code of all the sessions.
+            code_cache (Optional[CodeCache]): The cache of the generated code.
+            intent_router (Optional[IntentRouter]): The router answering simple
+                questions without the LLM.
+            schema_retriever (Optional[SchemaRetriever]): Selects the datasets
+                and columns described in the prompt of each question.
+            max_sessions (Optional[int]): Maximum number of open sessions, the least
+                recently used one is closed to make room for a new one.
+            idle_timeout (Optional[float]): Number of seconds after which an unused
+                session is closed.
+        """
+        if max_sessions is not None and max_sessions < 1:
+            raise ValueError("max_sessions must be a positive integer.")
+
+        self.max_sessions = max_sessions
+        self.idle_timeout = idle_timeout
+        self.evicted_sessions = 0
+
+        agent = Agent(
+            dfs,
+            config,
+            memory_size,
+            vectorstore,
+            description,
+            sandbox,
+            code_cache,
+            intent_router,
+            schema_retriever,
+        )
+        self._sandbox = sandbox
+        self._description = description
+        self._state = agent._state.fork()
+        if self._state.schema_retriever is None:
+            self._state.add(
+                "serialized_dataframes",
+                GeneratePythonCodeWithSQLPrompt.serialize_dataframes(self._state.dfs),
+            )
+        self._datasets_size = sum(
+            int(df.memory_usage(index=True, deep=True).sum())
+            for df in self._state.dfs
+            if not hasattr(df, "query_builder")
+        )
+
+        # session id -> (agent, last used time), from least to most recently used
+        self._sessions: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def create_session(self) -> str:
+        """Open a new session and return its id."""
+        session_id = uuid.uuid4().hex
+        self.get_session(session_id)
+        return session_id
+
+    def get_session(self, session_id: str) -> Agent:
+        """
+        Get the agent of a session, opening the session if it does not exist.
+        Idle sessions are closed, and the least recently used one too if the
+        maximum number of sessions is reached.
+        """
+        now = time.monotonic()
+        with self._lock:
+            self._evict_idle(now)
+
+            if session_id in self._sessions:
+                agent, _ = self._sessions.pop(session_id)
+            else:
+                if (
+                    self.max_sessions is not None
+                    and len(self._sessions) >= self.max_sessions
+                ):
+                    self._evict(next(iter(self._sessions)))
+                agent = Agent._from_state(
+                    self._state.fork(), self._sandbox, self._description
+                )
+                if self._state.config.memory_store is not None:
+                    # Resume the conversation, maybe started by another process
+                    agent._state.load_session(session_id)
+
+            self._sessions[session_id] = (agent, now)
+            return agent
+
+    def close_session(self, session_id: str) -> None:
+        """
+        Close a session, discarding its conversation, from the memory store of
+        the config too.
+        """
+        with self._lock:
+            self._sessions.pop(session_id, None)
+        if self._state.config.memory_store is not None:
+            self._state.config.memory_store.delete(session_id)
+
+    def evict_idle(self) -> int:
+        """Close the sessions unused for more than `idle_timeout` seconds."""
+        with self._lock:
+            return self._evict_idle(time.monotonic())
+
+    def _evict_idle(self, now: float) -> int:
+        if self.idle_timeout is None:
+            return 0
+
+        idle = []
+        for session_id, (_, last_used) in self._sessions.items():
+            if now - last_used <= self.idle_timeout:
+                # Sessions are ordered by last use, the next ones are more recent
+                break
+            idle.append(session_id)
+
+        for session_id in idle:
+            self._evict(session_id)
+        return len(idle)
+
+    def _evict(self, session_id: str) -> None:
+        self._sessions.pop(session_id)
+        self.evicted_sessions += 1
+
+    def memory_usage(self) -> dict:
+        """
+        Approximate memory, in bytes, of the shared in-memory datasets and of
+        the conversations of the sessions.
+        """
+        with self._lock:
+            agents = [agent for agent, _ in self._sessions.values()]
+
+        sessions_size = sum(
+            sys.getsizeof(message["message"])
+            for agent in agents
+            for message in agent._state.memory.all()
+        )
+        return {"datasets": self._datasets_size, "sessions": sessions_size}
+
+    def stats(self) -> dict:
+        """Number of open and evicted sessions, and memory usage."""
+        with self._lock:
+            sessions = len(self._sessions)
+        return {
+            "sessions": sessions,
+            "evicted_sessions": self.evicted_sessions,
+            "memory_usage": self.memory_usage(),
+        }
+
+    def __contains__(self, session_id: str) -> bool:
+        return session_id in self._sessions
+
+    def __len__(self) -> int:
+        return len(self._sessions)
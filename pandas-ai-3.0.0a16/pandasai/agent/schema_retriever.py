@@ -0,0 +1,378 @@
+import hashlib
+import math
+import re
+from collections import Counter
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional, Set, Tuple
+
+from pandasai.helpers.cache import LRUCache
+from pandasai.helpers.memory import Memory, count_tokens
+from pandasai.vectorstores.vectorstore import VectorStore
+
+if TYPE_CHECKING:
+    from pandasai.dataframe import DataFrame
+
+
+@dataclass
+class TableSelection:
+    """A dataset selected for a question, with the columns to show of it."""
+
+    df: "DataFrame"
+    # Columns to show, None to show all of them
+    columns: Optional[List[str]]
+    score: float
+
+
+_WORD = re.compile(r"[a-z0-9]+")
+_CAMEL_CASE = re.compile(r"([a-z0-9])([A-Z])")
+
+
+def _stem(word: str) -> str:
+    """Reduce the plural forms to their singular, for the common cases."""
+    if len(word) > 4 and word.endswith("ies"):
+        return word[:-3] + "y"
+    if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+        return word[:-1]
+    return word
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    """Split a text, or a snake_case or camelCase name, into stemmed words."""
+    if not text:
+        return []
+    text = _CAMEL_CASE.sub(r"\1 \2", text)
+    return [_stem(word) for word in _WORD.findall(text.lower())]
+
+
+def _get_column_names(df: "DataFrame") -> List[str]:
+    if df.schema.columns:
+        return [column.name for column in df.schema.columns]
+    return [str(column) for column in df.columns]
+
+
+class _SchemaIndex:
+    """Keyword index of the datasets and their columns, scored with BM25."""
+
+    K1 = 1.2
+    B = 0.75
+
+    def __init__(self, dfs: List["DataFrame"]):
+        self.tables: List[Counter] = []
+        # Tokens of each column of each dataset, by column name
+        self.columns: List[Dict[str, Counter]] = []
+
+        for df in dfs:
+            columns = {}
+            for column in df.schema.columns or []:
+                columns[column.name] = Counter(
+                    tokenize(column.name)
+                    + tokenize(column.alias)
+                    + tokenize(column.description)
+                )
+            for name in _get_column_names(df):
+                columns.setdefault(name, Counter(tokenize(name)))
+
+            # The name of the dataset weighs more than the rest of its text
+            table = Counter(tokenize(df.schema.name) * 2)
+            table.update(tokenize(df.schema.description))
+            for tokens in columns.values():
+                table.update(tokens)
+
+            self.tables.append(table)
+            self.columns.append(columns)
+
+        self.average_length = sum(
+            sum(table.values()) for table in self.tables
+        ) / max(len(self.tables), 1)
+        self.table_idf = self._get_idf(self.tables)
+        self.column_idf = self._get_idf(
+            [tokens for columns in self.columns for tokens in columns.values()]
+        )
+
+    @staticmethod
+    def _get_idf(docs: List[Counter]) -> Dict[str, float]:
+        frequencies = Counter(token for doc in docs for token in doc)
+        return {
+            token: math.log(1 + (len(docs) - frequency + 0.5) / (frequency + 0.5))
+            for token, frequency in frequencies.items()
+        }
+
+    def score_tables(self, tokens: List[str]) -> List[float]:
+        scores = []
+        for table in self.tables:
+            length = sum(table.values())
+            score = 0.0
+            for token in set(tokens):
+                frequency = table.get(token, 0)
+                if frequency:
+                    score += (
+                        self.table_idf[token]
+                        * frequency
+                        * (self.K1 + 1)
+                        / (
+                            frequency
+                            + self.K1
+                            * (1 - self.B + self.B * length / self.average_length)
+                        )
+                    )
+            scores.append(score)
+        return scores
+
+    def score_columns(self, index: int, tokens: List[str]) -> Dict[str, float]:
+        tokens = set(tokens)
+        return {
+            name: sum(self.column_idf[token] for token in tokens & column.keys())
+            for name, column in self.columns[index].items()
+        }
+
+
+class SchemaRetriever:
+    """
+    Selects the datasets, and their columns, relevant to a question, so that
+    the prompt of an agent with many datasets only describes those.
+
+    The datasets are ranked by the words their name, description and columns
+    share with the question, with BM25. The `top_k_tables` best ones are kept,
+    along with the datasets they are joined to by the `relations` of their
+    schemas. Only the `top_k_columns` best columns of a wider dataset are
+    shown, the columns it is joined by included. When no dataset matches the
+    question, they are all kept.
+
+    With a vector store, the descriptions of the datasets and their columns
+    are also matched to the question by meaning. The vector store should be
+    dedicated to the retriever, as the descriptions are added to it.
+
+    Retries after an error always get the full schema, in case the code failed
+    because of a dataset or a column left out.
+
+    Args:
+        top_k_tables (int): Maximum number of datasets matched to the question.
+        top_k_columns (int, optional): Maximum number of columns shown of a
+            dataset, all of them if None.
+        max_tokens (int, optional): Token budget of the <tables> block of the
+            prompt, the least relevant datasets are left out to fit it. The
+            most relevant dataset is always kept.
+        history (int): Number of the last questions of the conversation matched,
+            so that follow-up questions keep the datasets of the previous ones.
+        vectorstore (VectorStore, optional): Vector store matching the question
+            to the descriptions by meaning.
+        tokenizer (Callable[[str], int], optional): Counts the tokens of a text.
+    """
+
+    def __init__(
+        self,
+        top_k_tables: int = 5,
+        top_k_columns: Optional[int] = 20,
+        max_tokens: Optional[int] = None,
+        history: int = 3,
+        vectorstore: Optional[VectorStore] = None,
+        tokenizer: Optional[Callable[[str], int]] = None,
+    ):
+        if top_k_tables < 1:
+            raise ValueError("top_k_tables must be a positive integer.")
+        if top_k_columns is not None and top_k_columns < 1:
+            raise ValueError("top_k_columns must be a positive integer.")
+
+        self.top_k_tables = top_k_tables
+        self.top_k_columns = top_k_columns
+        self.max_tokens = max_tokens
+        self.history = history
+        self.tokenizer = tokenizer or count_tokens
+        self._vectorstore = vectorstore
+        # Indexes of the sets of datasets, by their fingerprint
+        self._indexes = LRUCache(max_entries=32)
+
+    @staticmethod
+    def get_fingerprint(dfs: List["DataFrame"]) -> str:
+        """Hash the schemas of the datasets, the index changing with them."""
+        schemas = "\n".join(df.schema.model_dump_json() for df in dfs)
+        return hashlib.sha256(schemas.encode()).hexdigest()
+
+    def get_question(self, memory: Memory) -> str:
+        """The last questions of the conversation, the most recent last."""
+        questions = [
+            str(message["message"])
+            for message in memory.all()
+            if message["is_user"]
+        ]
+        return "\n".join(questions[-self.history :])
+
+    def _get_index(self, dfs: List["DataFrame"]) -> Tuple[str, _SchemaIndex]:
+        fingerprint = self.get_fingerprint(dfs)
+        index = self._indexes.get(fingerprint)
+        if index is None:
+            index = _SchemaIndex(dfs)
+            self._indexes.set(fingerprint, index)
+            if self._vectorstore is not None:
+                self._add_docs(fingerprint, dfs)
+        return fingerprint, index
+
+    def _add_docs(self, fingerprint: str, dfs: List["DataFrame"]) -> None:
+        docs, ids, metadatas = [], [], []
+        for df in dfs:
+            schema = df.schema
+            docs.append(" ".join(filter(None, [schema.name, schema.description])))
+            ids.append(f"{fingerprint}:{schema.name}")
+            metadatas.append(
+                {"fingerprint": fingerprint, "table": schema.name, "column": ""}
+            )
+            for column in schema.columns or []:
+                docs.append(
+                    " ".join(
+                        filter(None, [schema.name, column.name, column.description])
+                    )
+                )
+                ids.append(f"{fingerprint}:{schema.name}:{column.name}")
+                metadatas.append(
+                    {
+                        "fingerprint": fingerprint,
+                        "table": schema.name,
+                        "column": column.name,
+                    }
+                )
+        self._vectorstore.add_docs(docs, ids=ids, metadatas=metadatas)
+
+    def _get_similarities(
+        self, fingerprint: str, question: str
+    ) -> Tuple[Dict[str, float], Dict[Tuple[str, str], float]]:
+        """Similarity, between 0 and 1, of the closest descriptions to the question."""
+        tables, columns = {}, {}
+        if self._vectorstore is None:
+            return tables, columns
+
+        relevant = self._vectorstore.get_relevant_docs(
+            question, k=self.top_k_tables * (self.top_k_columns or 10)
+        )
+        metadatas = (relevant.get("metadatas") or [[]])[0]
+        distances = (relevant.get("distances") or [[]])[0] or [None] * len(metadatas)
+        for metadata, distance in zip(metadatas, distances):
+            if not metadata or metadata.get("fingerprint") != fingerprint:
+                continue
+            similarity = 1 / (1 + distance) if distance is not None else 0.5
+            table = metadata["table"]
+            tables[table] = max(tables.get(table, 0.0), similarity)
+            if metadata.get("column"):
+                columns[(table, metadata["column"])] = similarity
+        return tables, columns
+
+    @staticmethod
+    def _get_relations(dfs: List["DataFrame"]) -> List[Tuple[str, str, str, str]]:
+        """The (table, column, table, column) joins of the relations of the schemas."""
+        relations = []
+        for df in dfs:
+            for relation in df.schema.relations or []:
+                source, _, source_column = relation.from_.partition(".")
+                target, _, target_column = relation.to.partition(".")
+                relations.append((source, source_column, target, target_column))
+        return relations
+
+    def retrieve(self, question: str, dfs: List["DataFrame"]) -> List[TableSelection]:
+        """
+        Select the datasets relevant to the question, the most relevant first.
+
+        Args:
+            question (str): The question, or the last questions of a conversation.
+            dfs (List[DataFrame]): The datasets of the agent.
+
+        Returns:
+            List[TableSelection]: The selected datasets with their columns.
+        """
+        fingerprint, index = self._get_index(dfs)
+        tokens = tokenize(question)
+
+        scores = index.score_tables(tokens)
+        # Keyword and vector scores are brought to the same scale
+        best = max(scores, default=0.0) or 1.0
+        scores = [score / best for score in scores]
+        table_similarities, column_similarities = self._get_similarities(
+            fingerprint, question
+        )
+        for i, df in enumerate(dfs):
+            scores[i] += table_similarities.get(df.schema.name, 0.0)
+
+        if not any(scores):
+            # Nothing to tell the relevant datasets apart, show them all
+            return [TableSelection(df, None, 0.0) for df in dfs]
+
+        ranking = sorted(range(len(dfs)), key=lambda i: -scores[i])
+        selected = ranking[: self.top_k_tables]
+        names = {df.schema.name: i for i, df in enumerate(dfs)}
+        join_columns: Dict[int, Set[str]] = {}
+        for source, source_column, target, target_column in self._get_relations(dfs):
+            if source not in names or target not in names:
+                continue
+            source_index, target_index = names[source], names[target]
+            # Only the datasets matching the question bring their join partners
+            if any(
+                i in selected and scores[i] > 0 for i in (source_index, target_index)
+            ):
+                for partner in (source_index, target_index):
+                    if partner not in selected:
+                        selected.append(partner)
+                join_columns.setdefault(source_index, set()).add(source_column)
+                join_columns.setdefault(target_index, set()).add(target_column)
+
+        selections = []
+        for i in selected:
+            df = dfs[i]
+            column_scores = index.score_columns(i, tokens)
+            for (table, column), similarity in column_similarities.items():
+                if table == df.schema.name and column in column_scores:
+                    column_scores[column] += similarity
+            selections.append(
+                TableSelection(
+                    df,
+                    self._select_columns(df, column_scores, join_columns.get(i, set())),
+                    scores[i],
+                )
+            )
+        return selections
+
+    def _select_columns(
+        self, df: "DataFrame", scores: Dict[str, float], join_columns: Set[str]
+    ) -> Optional[List[str]]:
+        """Keep the best columns of a wide dataset, in their original order."""
+        names = _get_column_names(df)
+        if self.top_k_columns is None or len(names) <= self.top_k_columns:
+            return None
+
+        kept = {name for name in names if name in join_columns}
+        for name in sorted(
+            (name for name in names if scores.get(name, 0) > 0),
+            key=lambda name: -scores[name],
+        ):
+            if len(kept) >= self.top_k_columns:
+                break
+            kept.add(name)
+        # Fill up with the first columns, usually the keys of the dataset
+        for name in names:
+            if len(kept) >= self.top_k_columns:
+                break
+            kept.add(name)
+
+        return [name for name in names if name in kept]
+
+    def serialize_dataframes(self, question: str, dfs: List["DataFrame"]) -> str:
+        """
+        Serialize the content of the <tables> block of the prompt with the
+        datasets relevant to the question, within the token budget.
+        """
+        from pandasai.core.prompts.generate_python_code_with_sql import (
+            GeneratePythonCodeWithSQLPrompt,
+        )
+
+        blocks, tokens = [], 0
+        for selection in self.retrieve(question, dfs):
+            block = GeneratePythonCodeWithSQLPrompt.serialize_dataframes(
+                [selection.df], columns=selection.columns
+            )
+            block_tokens = self.tokenizer(block)
+            if (
+                blocks
+                and self.max_tokens is not None
+                and tokens + block_tokens > self.max_tokens
+            ):
+                continue
+            blocks.append(block)
+            tokens += block_tokens
+        return "".join(blocks)
@@ -1,21 +1,33 @@
 from __future__ import annotations
 
 import os
+import threading
+import time
 import uuid
 from dataclasses import dataclass, field
-from typing import TYPE_CHECKING, Any, Dict, List, Optional, Union
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Union
 
+from pandasai.agent.events import AgentEvent
 from pandasai.config import Config, ConfigManager
 from pandasai.constants import DEFAULT_CHART_DIRECTORY
 from pandasai.data_loader.semantic_layer_schema import is_schema_source_same
-from pandasai.exceptions import InvalidConfigError
+from pandasai.exceptions import (
+    InvalidConfigError,
+    QueryAbortedError,
+    QueryTimeoutError,
+)
+from pandasai.helpers.cache import LRUCache
 from pandasai.helpers.folder import Folder
 from pandasai.helpers.logger import Logger
 from pandasai.helpers.memory import Memory
+from pandasai.helpers.metrics import QueryStats
 from pandasai.llm.bamboo_llm import BambooLLM
 from pandasai.vectorstores.vectorstore import VectorStore
 
 if TYPE_CHECKING:
+    from pandasai.agent.intent_router import IntentRouter
+    from pandasai.agent.schema_retriever import SchemaRetriever
+    from pandasai.core.code_generation.code_cache import CodeCache
     from pandasai.dataframe import DataFrame, VirtualDataFrame
     from pandasai.llm.base import LLM
 
@@ -39,6 +51,21 @@ class AgentState:
     last_prompt_id: str = None
     last_prompt_used: str = None
     output_type: Optional[str] = None
+    code_cache: Optional[CodeCache] = None
+    intent_router: Optional[IntentRouter] = None
+    schema_retriever: Optional[SchemaRetriever] = None
+    # Scopes the cached SQL results of the in-memory datasets to this state
+    cache_scope: str = field(default_factory=lambda: uuid.uuid4().hex)
+    listeners: List[Callable[[AgentEvent], None]] = field(default_factory=list)
+    abort_requested: threading.Event = field(default_factory=threading.Event)
+    # time.monotonic() time by which the query being processed must be answered
+    deadline: Optional[float] = None
+    # SQL queries rewritten for the datasets, by original query
+    sql_rewrites: LRUCache = field(default_factory=lambda: LRUCache(max_entries=256))
+    # Latency and resource breakdown of the query being processed
+    stats: QueryStats = field(default_factory=QueryStats)
+    # Priority of the calls to the LLM in its rate limiter, the lowest first
+    priority: int = 0
 
 #若傳入 config 是字典格式，轉成 Config 實體
 
@@ -63,13 +90,84 @@ class AgentState:
         self.config = self._get_config(config)
         if config:
             self.config.llm = self._get_llm(self.config.llm)
-        self.memory = Memory(memory_size, agent_description=description)
+        self.memory = Memory(
+            memory_size,
+            agent_description=description,
+            max_tokens=self.config.memory_max_tokens,
+            tokenizer=self.config.memory_tokenizer,
+            store=self.config.memory_store,
+        )
         self.logger = Logger(
             save_logs=self.config.save_logs, verbose=self.config.verbose
         )
         self.vectorstore = vectorstore
         self._configure()
 
+#建立共享資料表與資源、但擁有獨立記憶的新狀態。
+
+    def fork(self) -> AgentState:
+        """
+        Create a state for an independent conversation that shares the datasets,
+        config, vectorstore, code cache, intent router, schema retriever and
+        logger of this state but has its own memory.
+        """
+        return AgentState(
+            dfs=self.dfs,
+            _config=self._config,
+            memory=Memory(
+                self.memory.size,
+                agent_description=self.memory.agent_description,
+                max_tokens=self.memory.max_tokens,
+                tokenizer=self.memory.tokenizer,
+                summarizer=self.memory.summarizer,
+                store=self.memory.store,
+            ),
+            vectorstore=self.vectorstore,
+            intermediate_values=dict(self.intermediate_values),
+            logger=self.logger,
+            code_cache=self.code_cache,
+            intent_router=self.intent_router,
+            schema_retriever=self.schema_retriever,
+            sql_rewrites=self.sql_rewrites,
+            cache_scope=self.cache_scope,
+            priority=self.priority,
+        )
+
+#將對話綁定到記憶儲存中的 session，讓任何 worker 都能接續。
+
+    def bind_session(self, session_id: str) -> None:
+        """
+        Persist the conversation in a session of the memory store of the config,
+        without loading it.
+
+        Raises:
+            InvalidConfigError: If no memory store is configured.
+        """
+        store = self.memory.store or self.config.memory_store
+        if store is None:
+            raise InvalidConfigError(
+                "A memory_store must be configured to persist the sessions."
+            )
+        self.memory.store = store
+        self.memory.session_id = session_id
+
+    def load_session(self, session_id: Optional[str] = None) -> None:
+        """
+        Load the conversation of the session, by default the one the memory is
+        bound to, as another worker may have continued it.
+        """
+        if session_id is not None:
+            self.bind_session(session_id)
+        if not self.memory.is_bound:
+            return
+
+        state = self.memory.load()
+        self.last_code_generated = state.get("last_code_generated")
+
+    def save_session(self) -> None:
+        """Write the new messages of the conversation to the memory store."""
+        self.memory.flush({"last_code_generated": self.last_code_generated})
+
 #	確保預設圖表儲存資料夾存在。
 
     def _configure(self):
@@ -105,6 +203,48 @@ class AgentState:
         if self.logger:
             self.logger.log(f"Prompt ID: {self.last_prompt_id}")
 
+#記錄訊息並通知監聽者目前的處理階段。
+
+    def emit(self, event_type: str, message: Optional[str] = None, **data: Any):
+        """
+        Log the message and notify the listeners of the event.
+
+        Raises:
+            QueryAbortedError: If the processing of the query has been aborted or
+                timed out.
+        """
+        if message is not None and self.logger:
+            self.logger.log(message)
+
+        self.check_aborted()
+
+        if self.listeners:
+            event = AgentEvent(type=event_type, message=message, data=data)
+            for listener in list(self.listeners):
+                listener(event)
+
+#檢查查詢是否已被中止或超過期限。
+
+    def check_aborted(self):
+        """
+        Stop the processing of the query if it has been aborted or timed out.
+
+        Raises:
+            QueryAbortedError: If the processing of the query has been aborted.
+            QueryTimeoutError: If the deadline of the query has passed.
+        """
+        if self.abort_requested.is_set():
+            raise QueryAbortedError("The processing of the query has been aborted.")
+
+        if self.deadline is not None and time.monotonic() >= self.deadline:
+            raise QueryTimeoutError("The processing of the query timed out.")
+
+    def time_left(self) -> Optional[float]:
+        """Seconds left before the deadline of the query, None without deadline."""
+        if self.deadline is None:
+            return None
+        return max(self.deadline - time.monotonic(), 0.0)
+
 #2.  記憶與中間資料儲存（intermediate_values）
 
 #清除所有中間資料。
@@ -1,3 +1,4 @@
+import json
 import os
 import re
 
@@ -158,5 +159,78 @@ def push(dataset_path):
         click.echo(f"❌ Error pushing dataset: {str(e)}")
 
 
+@cli.command()
+@click.argument("workload", type=click.Path(exists=True, dir_okay=False))
+@click.option(
+    "--dataset",
+    "datasets",
+    multiple=True,
+    required=True,
+    help="Local dataset path (organization/dataset), repeat for several.",
+)
+@click.option(
+    "--recordings",
+    required=True,
+    type=click.Path(exists=True, dir_okay=False),
+    help="Completions recorded by a ReplayLLM.",
+)
+@click.option(
+    "--concurrency",
+    multiple=True,
+    type=click.IntRange(min=1),
+    default=[1],
+    show_default=True,
+    help="Number of concurrent agents, repeat to compare several.",
+)
+@click.option("--repeat", default=1, show_default=True, type=click.IntRange(min=1))
+@click.option("--field", default="query", show_default=True, help="Query field.")
+@click.option(
+    "--latency",
+    default=None,
+    help='Replayed LLM latency: seconds, or "recorded".',
+)
+@click.option("--trace-memory", is_flag=True, help="Trace the peak Python memory.")
+@click.option("--as-json", is_flag=True, help="Print the reports as JSON.")
+def benchmark(
+    workload,
+    datasets,
+    recordings,
+    concurrency,
+    repeat,
+    field,
+    latency,
+    trace_memory,
+    as_json,
+):
+    """⏱️ Benchmark the agents on a workload with recorded completions"""
+    from pandasai import load
+    from pandasai.agent import Agent
+    from pandasai.helpers.benchmark import load_workload, run_benchmark
+    from pandasai.llm import ReplayLLM
+
+    if latency is not None and latency != "recorded":
+        latency = float(latency)
+
+    queries = load_workload(workload, field)
+    dfs = [load(path) for path in datasets]
+    llm = ReplayLLM(recordings, latency=latency)
+
+    reports = [
+        run_benchmark(
+            lambda: Agent(dfs, config={"llm": llm}),
+            queries,
+            concurrency=n,
+            repeat=repeat,
+            trace_memory=trace_memory,
+        )
+        for n in concurrency
+    ]
+
+    if as_json:
+        click.echo(json.dumps([report.to_dict() for report in reports], indent=2))
+    else:
+        click.echo("\n\n".join(str(report) for report in reports))
+
+
 if __name__ == "__main__":
     cli()
@@ -1,10 +1,11 @@
 import os
 from importlib.util import find_spec
-from typing import Any, Dict, Optional
+from typing import Any, Callable, Dict, Optional
 
 from pydantic import BaseModel, ConfigDict
 
 from pandasai.helpers.filemanager import DefaultFileManager, FileManager
+from pandasai.helpers.memory_store import MemoryStore
 from pandasai.llm.base import LLM
 
 
@@ -12,6 +13,20 @@ class Config(BaseModel):
     save_logs: bool = True
     verbose: bool = False
     max_retries: int = 3
+    speculative_candidates: int = 1
+    enable_cache: bool = False
+    enable_sql_cache: bool = False
+    sql_cache_ttl: Optional[float] = 300
+    table_stats_ttl: Optional[float] = 300
+    enable_intent_router: bool = False
+    enable_schema_pruning: bool = False
+    enable_profiling: bool = False
+    enable_code_repair: bool = True
+    enable_lazy_results: bool = False
+    query_timeout: Optional[float] = None
+    memory_max_tokens: Optional[int] = None
+    memory_tokenizer: Optional[Callable[[str], int]] = None
+    memory_store: Optional[MemoryStore] = None
     llm: Optional[LLM] = None
     file_manager: FileManager = DefaultFileManager()
 
@@ -12,6 +12,15 @@ DEFAULT_CHART_DIRECTORY = os.path.join("exports", "charts")
 # Default permissions for files and directories
 DEFAULT_FILE_PERMISSIONS = 0o755
 
+# Maximum memory used by the cached SQL query results, in bytes
+DEFAULT_QUERY_CACHE_MAX_SIZE = 256 * 1024 * 1024
+
+# Maximum number of serialized <table> blocks of the prompts kept in memory
+DEFAULT_SERIALIZED_TABLES_CACHE_SIZE = 1024
+
+# Maximum number of column profiles of the datasets kept in memory
+DEFAULT_PROFILES_CACHE_SIZE = 256
+
 PANDABI_SETUP_MESSAGE = (
     "The api_key client option must be set either by passing api_key to the client "
     "or by setting the PANDABI_API_KEY environment variable. To get the key follow below steps:\n"
@@ -1,8 +1,15 @@
-from typing import Any
+import ctypes
+import threading
+from typing import Any, Optional
 
 from pandasai.config import Config
 from pandasai.core.code_execution.environment import get_environment
-from pandasai.exceptions import CodeExecutionError, NoResultFoundError
+from pandasai.exceptions import (
+    CodeExecutionError,
+    NoResultFoundError,
+    QueryAbortedError,
+    QueryTimeoutError,
+)
 
 
 class CodeExecutor:
@@ -12,8 +19,14 @@ class CodeExecutor:
 
     _environment: dict
 
-    def __init__(self, config: Config) -> None:
+    def __init__(self, config: Config, timeout: Optional[float] = None) -> None:
+        """
+        Args:
+            config (Config): The configuration of the agent.
+            timeout (Optional[float]): Maximum number of seconds the code may run.
+        """
         self._environment = get_environment()
+        self._timeout = timeout
 
     def add_to_env(self, key: str, value: Any) -> None:
         """
@@ -25,12 +38,57 @@ class CodeExecutor:
         self._environment[key] = value
 
     def execute(self, code: str) -> dict:
+        """
+        Executes the code in the environment.
+
+        Raises:
+            QueryTimeoutError: If the code runs for more than the timeout.
+        """
         try:
-            exec(code, self._environment)
+            if self._timeout is None:
+                exec(code, self._environment)
+            else:
+                self._execute_with_timeout(code, self._timeout)
+        except QueryAbortedError:
+            raise
         except Exception as e:
             raise CodeExecutionError("Code execution failed") from e
         return self._environment
 
+    def _execute_with_timeout(self, code: str, timeout: float) -> None:
+        """
+        Run the code in a worker thread, watched by the caller. Python code cannot
+        be killed: once the timeout is exceeded, a QueryTimeoutError is raised in
+        the worker at its next Python instruction and the caller returns at once.
+
+        A worker blocked in a C call, like a long pandas operation, only stops
+        once the call returns. Until then it keeps running in the background with
+        its environment; its SQL queries are interrupted by their own deadline.
+        """
+        outcome = {}
+
+        def run():
+            try:
+                exec(code, self._environment)
+            except BaseException as e:
+                outcome["error"] = e
+
+        worker = threading.Thread(target=run, daemon=True)
+        worker.start()
+        worker.join(timeout)
+
+        if worker.is_alive():
+            ctypes.pythonapi.PyThreadState_SetAsyncExc(
+                ctypes.c_ulong(worker.ident), ctypes.py_object(QueryTimeoutError)
+            )
+            raise QueryTimeoutError(
+                f"The execution of the code timed out after {timeout:.1f} seconds, "
+                "it is stopped at its next Python instruction."
+            )
+
+        if "error" in outcome:
+            raise outcome["error"]
+
     def execute_and_return_result(self, code: str) -> Any:
         """
         Executes the return updated environment
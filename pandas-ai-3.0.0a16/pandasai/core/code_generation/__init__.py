@@ -1,9 +1,13 @@
 from .base import CodeGenerator
+from .code_cache import CodeCache
 from .code_cleaning import CodeCleaner
+from .code_repair import CodeRepairer
 from .code_validation import CodeRequirementValidator
 
 __all__ = [
+    "CodeCache",
     "CodeCleaner",
     "CodeGenerator",
+    "CodeRepairer",
     "CodeRequirementValidator",
 ]
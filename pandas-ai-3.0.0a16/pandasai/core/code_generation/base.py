@@ -1,7 +1,9 @@
 import traceback
 
+from pandasai.agent.events import EventType
 from pandasai.agent.state import AgentState
 from pandasai.core.prompts.base import BasePrompt
+from pandasai.helpers.metrics import Stage
 
 from .code_cleaning import CodeCleaner
 from .code_validation import CodeRequirementValidator
@@ -28,12 +30,21 @@ class CodeGenerator:
             Exception: If any step fails during the process.
         """
         try:
-            self._context.logger.log(f"Using Prompt: {prompt}")
+            prompt_string = self.render_prompt(prompt)
+            self._context.emit(
+                EventType.PROMPT_BUILT,
+                f"Using Prompt: {prompt_string}",
+                prompt=prompt_string,
+            )
 
             # Generate the code
-            code = self._context.config.llm.generate_code(prompt, self._context)
+            with self._context.stats.measure(Stage.LLM_CALL):
+                code = self._context.config.llm.generate_code(prompt, self._context)
+            self._context.stats.add_llm_call()
             self._context.last_code_generated = code
-            self._context.logger.log(f"Code Generated:\n{code}")
+            self._context.emit(
+                EventType.CODE_GENERATED, f"Code Generated:\n{code}", code=code
+            )
 
             return self.validate_and_clean_code(code)
 
@@ -46,12 +57,61 @@ class CodeGenerator:
 
             raise e
 
+    async def agenerate_code(self, prompt: BasePrompt) -> str:
+        """
+        Async counterpart of `generate_code`, awaiting the LLM instead of blocking on it.
+
+        Args:
+            prompt (BasePrompt): The prompt to guide code generation.
+
+        Returns:
+            str: The final cleaned and validated code.
+        """
+        try:
+            prompt_string = self.render_prompt(prompt)
+            self._context.emit(
+                EventType.PROMPT_BUILT,
+                f"Using Prompt: {prompt_string}",
+                prompt=prompt_string,
+            )
+
+            # Generate the code
+            with self._context.stats.measure(Stage.LLM_CALL):
+                code = await self._context.config.llm.agenerate_code(prompt, self._context)
+            self._context.stats.add_llm_call()
+            self._context.last_code_generated = code
+            self._context.emit(
+                EventType.CODE_GENERATED, f"Code Generated:\n{code}", code=code
+            )
+
+            return self.validate_and_clean_code(code)
+
+        except Exception as e:
+            error_message = f"An error occurred during code generation: {e}"
+            stack_trace = traceback.format_exc()
+
+            self._context.logger.log(error_message)
+            self._context.logger.log(f"Stack Trace:\n{stack_trace}")
+
+            raise e
+
+    def render_prompt(self, prompt: BasePrompt) -> str:
+        """Render the prompt, timing the first rendering of it."""
+        with self._context.stats.measure(Stage.PROMPT_RENDER):
+            return prompt.to_string()
+
     def validate_and_clean_code(self, code: str) -> str:
+        with self._context.stats.measure(Stage.CODE_VALIDATION):
+            return self._validate_and_clean_code(code)
+
+    def _validate_and_clean_code(self, code: str) -> str:
         # Validate code requirements
         self._context.logger.log("Validating code requirements...")
         if not self._code_validator.validate(code):
             raise ValueError("Code validation failed due to unmet requirements.")
-        self._context.logger.log("Code validation successful.")
+        self._context.emit(
+            EventType.CODE_VALIDATED, "Code validation successful.", code=code
+        )
 
         # Clean the code
         self._context.logger.log("Cleaning the generated code...")
@@ -0,0 +1,168 @@
+import hashlib
+import re
+from typing import TYPE_CHECKING, List, Optional
+
+from pandasai.helpers.cache import Cache
+from pandasai.vectorstores.vectorstore import VectorStore
+
+if TYPE_CHECKING:
+    from pandasai.dataframe.base import DataFrame
+
+
+class CodeCache:
+    """
+    Cache of the code generated for a query on a given set of datasets.
+
+    Queries are normalized before lookup, so that questions only differing in
+    casing, punctuation or spacing share the same code. Every entry is bound to
+    the fingerprint of the schemas it was generated for: when the schemas of a
+    set of datasets change, the code generated for the previous schemas is
+    dropped.
+
+    Args:
+        cache (Cache, optional): Store of the generated code, defaults to a disk
+            cache in the `cache` folder of the project root.
+        vectorstore (VectorStore, optional): Vector store used to also match
+            queries that are similar, but not equal, to a cached one. It should
+            be dedicated to the cache, as the cached queries are added to it.
+        similarity_threshold (float, optional): Maximum distance, as returned
+            by the vector store, between a query and a cached query to reuse the
+            code of the cached one. Keep it low: the code of a query that is
+            only somewhat similar runs without error but answers another
+            question.
+    """
+
+    def __init__(
+        self,
+        cache: Optional[Cache] = None,
+        vectorstore: Optional[VectorStore] = None,
+        similarity_threshold: float = 0.15,
+    ):
+        self._cache = cache if cache is not None else Cache("code_cache")
+        self._vectorstore = vectorstore
+        self.similarity_threshold = similarity_threshold
+
+    @staticmethod
+    def normalize_query(query: str) -> str:
+        """Lowercase the query and strip punctuation and redundant whitespace."""
+        query = re.sub(r"[^\w\s]", " ", query.lower())
+        return " ".join(query.split())
+
+    @staticmethod
+    def get_datasets_tag(dfs: List["DataFrame"]) -> str:
+        """Identify a set of datasets by their names."""
+        return ",".join(sorted(df.schema.name for df in dfs))
+
+    @staticmethod
+    def get_schema_fingerprint(dfs: List["DataFrame"]) -> str:
+        """Hash the names, columns and column types of the datasets."""
+        parts = []
+        for df in sorted(dfs, key=lambda df: df.schema.name):
+            columns = ",".join(
+                f"{column.name}:{column.type}" for column in df.schema.columns or []
+            )
+            parts.append(f"{df.schema.name}|{df.column_hash}|{columns}")
+        return hashlib.sha256("\n".join(parts).encode()).hexdigest()
+
+    def get_key(
+        self, query: str, dfs: List["DataFrame"], output_type: Optional[str] = None
+    ) -> str:
+        key = "|".join(
+            [
+                self.normalize_query(query),
+                output_type or "",
+                self.get_schema_fingerprint(dfs),
+            ]
+        )
+        return hashlib.sha256(key.encode()).hexdigest()
+
+    def get(
+        self, query: str, dfs: List["DataFrame"], output_type: Optional[str] = None
+    ) -> Optional[str]:
+        """
+        Get the code cached for the query on the datasets.
+
+        Returns:
+            Optional[str]: The cached code, None if there is no match.
+        """
+        code = self._cache.get(self.get_key(query, dfs, output_type))
+        if code is not None or self._vectorstore is None:
+            return code
+
+        return self._get_similar(query, dfs, output_type)
+
+    def set(
+        self,
+        query: str,
+        dfs: List["DataFrame"],
+        code: str,
+        output_type: Optional[str] = None,
+    ) -> None:
+        """Cache the code generated for the query on the datasets."""
+        tag = self.get_datasets_tag(dfs)
+        fingerprint = self.get_schema_fingerprint(dfs)
+
+        # Code generated for a previous version of the schemas is not valid anymore
+        schema_key = f"schema:{tag}"
+        if self._cache.get(schema_key) != fingerprint:
+            self.invalidate(dfs)
+            self._cache.set(schema_key, fingerprint)
+
+        key = self.get_key(query, dfs, output_type)
+        is_new = self._cache.get(key) is None
+        self._cache.set(key, code, tag=tag)
+
+        if self._vectorstore is not None and is_new:
+            self._vectorstore.add_question_answer(
+                [self.normalize_query(query)],
+                [code],
+                metadatas=[
+                    {
+                        "cache_key": key,
+                        "fingerprint": fingerprint,
+                        "output_type": output_type or "",
+                    }
+                ],
+            )
+
+    def invalidate(self, dfs: Optional[List["DataFrame"]] = None) -> None:
+        """
+        Drop the code cached for a set of datasets, or all of it if no datasets
+        are given. Call it when the data changes in a way the schema does not
+        reflect.
+        """
+        if dfs is None:
+            self._cache.clear()
+            return
+
+        tag = self.get_datasets_tag(dfs)
+        self._cache.delete_tag(tag)
+        self._cache.delete(f"schema:{tag}")
+
+    def _get_similar(
+        self, query: str, dfs: List["DataFrame"], output_type: Optional[str] = None
+    ) -> Optional[str]:
+        """
+        Get the code of the closest cached query on the same schemas, if it is
+        within the similarity threshold. Matches without a distance are ignored.
+        """
+        fingerprint = self.get_schema_fingerprint(dfs)
+        relevant = self._vectorstore.get_relevant_question_answers(
+            self.normalize_query(query)
+        )
+
+        metadatas = (relevant.get("metadatas") or [[]])[0]
+        distances = (relevant.get("distances") or [[]])[0]
+        for metadata, distance in zip(metadatas, distances):
+            if (
+                metadata
+                and distance is not None
+                and distance <= self.similarity_threshold
+                and metadata.get("fingerprint") == fingerprint
+                and metadata.get("output_type") == (output_type or "")
+            ):
+                code = self._cache.get(metadata["cache_key"])
+                if code is not None:
+                    return code
+
+        return None
@@ -154,6 +154,89 @@ class CodeCleaner:
         new_tree = ast.Module(body=new_body)
         return astor.to_source(new_tree, pretty_source=lambda x: "".join(x)).strip()
 
+    @staticmethod
+    def _is_sql_query_call(node: ast.AST) -> bool:
+        return (
+            isinstance(node, ast.Call)
+            and isinstance(node.func, ast.Name)
+            and node.func.id == "execute_sql_query"
+        )
+
+    def _get_dataframe_result_value(self, node: ast.AST):
+        """
+        The value of `result = {"type": "dataframe", "value": ...}`, None if the
+        node is not such an assignment.
+        """
+        if not (
+            isinstance(node, ast.Assign)
+            and len(node.targets) == 1
+            and isinstance(node.targets[0], ast.Name)
+            and node.targets[0].id == "result"
+            and isinstance(node.value, ast.Dict)
+        ):
+            return None
+
+        items = {
+            key.value: value
+            for key, value in zip(node.value.keys, node.value.values)
+            if isinstance(key, ast.Constant)
+        }
+        result_type = items.get("type")
+        if (
+            isinstance(result_type, ast.Constant)
+            and result_type.value == "dataframe"
+            and "value" in items
+        ):
+            return items["value"]
+        return None
+
+    def make_sql_results_lazy(self, code: str) -> str:
+        """
+        Have the SQL queries whose result is returned as is, without being used
+        by the code, fetch it lazily through `execute_sql_query_lazy`.
+
+        Args:
+            code (str): The code to execute.
+
+        Returns:
+            str: The code with the lazy SQL queries, unchanged if there are none.
+        """
+        tree = ast.parse(code)
+        loads, stores = {}, {}
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Name):
+                names = loads if isinstance(node.ctx, ast.Load) else stores
+                names[node.id] = names.get(node.id, 0) + 1
+
+        sql_query_assignments = {
+            node.targets[0].id: node.value
+            for node in tree.body
+            if isinstance(node, ast.Assign)
+            and len(node.targets) == 1
+            and isinstance(node.targets[0], ast.Name)
+            and self._is_sql_query_call(node.value)
+        }
+
+        lazy_calls = []
+        for node in tree.body:
+            value = self._get_dataframe_result_value(node)
+            if self._is_sql_query_call(value):
+                lazy_calls.append(value)
+            elif (
+                isinstance(value, ast.Name)
+                and value.id in sql_query_assignments
+                and loads.get(value.id) == 1
+                and stores.get(value.id) == 1
+            ):
+                lazy_calls.append(sql_query_assignments[value.id])
+
+        if not lazy_calls:
+            return code
+
+        for call in lazy_calls:
+            call.func.id = "execute_sql_query_lazy"
+        return astor.to_source(tree, pretty_source=lambda x: "".join(x)).strip()
+
     def _replace_output_filenames_with_temp_chart(self, code: str) -> str:
         """
         Replace output file names with "temp_chart.png".
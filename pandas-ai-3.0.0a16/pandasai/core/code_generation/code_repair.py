@@ -0,0 +1,242 @@
+import ast
+import difflib
+import re
+from typing import Callable, Iterator, List, Optional
+
+import astor
+import sqlglot
+from sqlglot.errors import ErrorLevel, SqlglotError
+
+from pandasai.agent.state import AgentState
+from pandasai.exceptions import InvalidOutputValueMismatch, NoResultFoundError
+
+# Dialects whose functions the LLM commonly uses in place of DuckDB ones,
+# tried in order to transpile a query using a function DuckDB does not know
+SOURCE_DIALECTS = ["mysql", "postgres", "tsql", "snowflake", "bigquery", "sqlite"]
+
+_MISSING_TABLE_PATTERNS = [
+    re.compile(r"Table with name (\w+) does not exist"),
+    re.compile(r'relation "(?:\w+\.)?(\w+)" does not exist'),
+    re.compile(r"Table '(?:\w+\.)?(\w+)' doesn't exist"),
+    re.compile(r"no such table: (?:\w+\.)?(\w+)"),
+]
+_MISSING_COLUMN_PATTERNS = [
+    re.compile(r'Referenced column "(\w+)" not found'),
+    re.compile(r'does not have a column named "(\w+)"'),
+    re.compile(r'column "?(?:\w+\.)?(\w+)"? does not exist'),
+    re.compile(r"Unknown column '(?:\w+\.)?(\w+)'"),
+    re.compile(r"no such column: (?:\w+\.)?(\w+)"),
+]
+_MISSING_FUNCTION_PATTERNS = [
+    re.compile(r"Scalar Function with name (\w+) does not exist"),
+    re.compile(r"function (\w+)\(.*\) does not exist"),
+]
+
+# Appended to code assigning a bare value to `result`
+_WRAP_RESULT = """
+if isinstance(result, (pd.DataFrame, pd.Series)):
+    result = {"type": "dataframe", "value": result}
+elif isinstance(result, np.number):
+    result = {"type": "number", "value": result.item()}
+elif isinstance(result, (int, float)) and not isinstance(result, bool):
+    result = {"type": "number", "value": result}
+else:
+    result = {"type": "string", "value": str(result)}
+"""
+
+
+class CodeRepairer:
+    """
+    Repair the generated code after mechanical errors, without the LLM: a
+    misspelled table or column name, a function of another SQL dialect or a
+    result not wrapped in a `{"type": ..., "value": ...}` dictionary.
+    """
+
+    # Maximum number of repairs in a row, before the LLM corrects the code
+    max_repairs = 3
+
+    def __init__(self, context: AgentState):
+        """
+        Initialize the CodeRepairer with the provided context.
+
+        Args:
+            context (AgentState): The agent state holding the datasets.
+        """
+        self.context = context
+
+    def repair(self, code: str, error: Exception) -> Optional[str]:
+        """
+        Repair the code after the error raised executing it.
+
+        Args:
+            code (str): The code that failed.
+            error (Exception): The error raised executing the code or parsing
+                its result.
+
+        Returns:
+            Optional[str]: The repaired code, None if the error cannot be repaired
+                locally and the LLM has to correct the code.
+        """
+        message = "\n".join(str(e) for e in self._error_chain(error))
+        repairs: List[Callable[[], Optional[str]]] = [
+            lambda: self._repair_result(code, error),
+            lambda: self._repair_table_name(code, message),
+            lambda: self._repair_column_name(code, error, message),
+            lambda: self._repair_sql_dialect(code, message),
+        ]
+        for repair in repairs:
+            try:
+                repaired = repair()
+            except (SyntaxError, SqlglotError):
+                repaired = None
+            if repaired is not None and repaired != code:
+                return repaired
+        return None
+
+    @staticmethod
+    def _error_chain(error: Exception) -> Iterator[BaseException]:
+        """The error and the errors it was raised from."""
+        seen = set()
+        while error is not None and id(error) not in seen:
+            seen.add(id(error))
+            yield error
+            error = error.__cause__ or error.__context__
+
+    def _repair_result(self, code: str, error: Exception) -> Optional[str]:
+        """Wrap a bare result, assigning the last value of the code if needed."""
+        if isinstance(error, NoResultFoundError):
+            tree = ast.parse(code)
+            if not tree.body:
+                return None
+            last = tree.body[-1]
+            if isinstance(last, ast.Expr):
+                tree.body[-1] = ast.Assign(
+                    targets=[ast.Name(id="result", ctx=ast.Store())],
+                    value=last.value,
+                    lineno=last.lineno,
+                )
+            elif (
+                isinstance(last, ast.Assign)
+                and len(last.targets) == 1
+                and isinstance(last.targets[0], ast.Name)
+            ):
+                tree.body.append(ast.parse(f"result = {last.targets[0].id}").body[0])
+            else:
+                return None
+            code = astor.to_source(tree).strip()
+        elif not (
+            isinstance(error, InvalidOutputValueMismatch)
+            and "must be in the format" in str(error)
+        ):
+            return None
+
+        return code + "\n" + _WRAP_RESULT.strip()
+
+    def _repair_table_name(self, code: str, message: str) -> Optional[str]:
+        """Replace a misspelled table name by the closest dataset name."""
+        name = self._find(_MISSING_TABLE_PATTERNS, message)
+        if name is None:
+            return None
+
+        table_names = [df.schema.name for df in self.context.dfs]
+        return self._replace_identifier(code, name, self._closest(name, table_names))
+
+    def _repair_column_name(
+        self, code: str, error: Exception, message: str
+    ) -> Optional[str]:
+        """Replace a misspelled column name by the closest column of the datasets."""
+        name = self._find(_MISSING_COLUMN_PATTERNS, message)
+        if name is None:
+            key_error = next(
+                (e for e in self._error_chain(error) if isinstance(e, KeyError)), None
+            )
+            if key_error is None or not key_error.args:
+                return None
+            name = key_error.args[0]
+            if not isinstance(name, str):
+                return None
+
+        column_names = [
+            column for df in self.context.dfs for column in self._get_columns(df)
+        ]
+        return self._replace_identifier(code, name, self._closest(name, column_names))
+
+    def _repair_sql_dialect(self, code: str, message: str) -> Optional[str]:
+        """Transpile the queries using a function DuckDB does not know."""
+        function = self._find(_MISSING_FUNCTION_PATTERNS, message)
+        if function is None:
+            return None
+
+        function_call = re.compile(rf"\b{re.escape(function)}\s*\(", re.IGNORECASE)
+        tree = ast.parse(code)
+        repaired = False
+        for node in ast.walk(tree):
+            if (
+                isinstance(node, ast.Constant)
+                and isinstance(node.value, str)
+                and function_call.search(node.value)
+            ):
+                query = self._transpile(node.value, function_call)
+                if query is None:
+                    return None
+                node.value = query
+                repaired = True
+
+        if not repaired:
+            return None
+        return astor.to_source(tree).strip()
+
+    @staticmethod
+    def _transpile(query: str, function_call: re.Pattern) -> Optional[str]:
+        """Transpile the query to DuckDB from the first dialect knowing the function."""
+        for dialect in SOURCE_DIALECTS:
+            try:
+                transpiled = sqlglot.transpile(
+                    query,
+                    read=dialect,
+                    write="duckdb",
+                    unsupported_level=ErrorLevel.RAISE,
+                )[0]
+            except SqlglotError:
+                continue
+            if not function_call.search(transpiled):
+                return transpiled
+        return None
+
+    @staticmethod
+    def _get_columns(df) -> List[str]:
+        if df.schema.columns:
+            return [column.name for column in df.schema.columns]
+        return [str(column) for column in df.columns]
+
+    @staticmethod
+    def _find(patterns: List[re.Pattern], message: str) -> Optional[str]:
+        for pattern in patterns:
+            match = pattern.search(message)
+            if match:
+                return match.group(1)
+        return None
+
+    @staticmethod
+    def _closest(name: str, candidates: List[str]) -> Optional[str]:
+        """The candidate matching the name, ignoring case and separators, or else
+        the most similar one."""
+
+        def normalize(value: str) -> str:
+            return re.sub(r"[\s_-]", "", value.lower())
+
+        matches = [c for c in candidates if normalize(c) == normalize(name)]
+        if len(set(matches)) == 1:
+            return matches[0]
+
+        by_lower = {candidate.lower(): candidate for candidate in candidates}
+        close = difflib.get_close_matches(name.lower(), by_lower, n=1, cutoff=0.8)
+        return by_lower[close[0]] if close else None
+
+    @staticmethod
+    def _replace_identifier(
+        code: str, name: str, replacement: Optional[str]
+    ) -> Optional[str]:
+        if replacement is None or replacement == name:
+            return None
+        return re.sub(rf"(?<!\w){re.escape(name)}(?!\w)", replacement, code)
@@ -17,10 +17,20 @@ if TYPE_CHECKING:
 
 
 def get_chat_prompt_for_sql(context: AgentState) -> BasePrompt:
+    serialized_dataframes = context.get("serialized_dataframes", None)
+    if serialized_dataframes is None and context.schema_retriever is not None:
+        # Only the datasets relevant to the question, the error prompts of the
+        # retries describe them all
+        retriever = context.schema_retriever
+        serialized_dataframes = retriever.serialize_dataframes(
+            retriever.get_question(context.memory), context.dfs
+        )
+
     return GeneratePythonCodeWithSQLPrompt(
         context=context,
         last_code_generated=context.get("last_code_generated"),
         output_type=context.output_type,
+        serialized_dataframes=serialized_dataframes,
     )
 
 
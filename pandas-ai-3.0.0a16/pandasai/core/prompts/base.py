@@ -6,7 +6,7 @@ import os
 import re
 from abc import ABC, abstractmethod
 from pathlib import Path
-from typing import Optional
+from typing import Optional, Tuple
 
 from jinja2 import Environment, FileSystemLoader
 
@@ -15,10 +15,15 @@ class BasePrompt:
     """Base class to implement a new Prompt.
 
     Inheritors have to override `template` property.
+
+    A prompt starting with the same text for every question on the same
+    datasets, like their schema, renders it with `prefix_template_path`, so
+    that the LLMs can send it apart and benefit from prompt caching.
     """
 
     template: Optional[str] = None
     template_path: Optional[str] = None
+    prefix_template_path: Optional[str] = None
 
     def __init__(self, **kwargs):
         """Initialize the prompt."""
@@ -35,6 +40,7 @@ class BasePrompt:
             self.prompt = env.get_template(self.template_path)
 
         self._resolved_prompt = None
+        self._resolved_prefix = None
 
     def render(self):
         """Render the prompt."""
@@ -52,6 +58,35 @@ class BasePrompt:
 
         return self._resolved_prompt
 
+    def get_prefix(self) -> str:
+        """
+        Render the stable prefix of the prompt, identical for all the
+        questions on the same datasets, or an empty string without it.
+        """
+        if self.prefix_template_path is None:
+            return ""
+
+        if self._resolved_prefix is None:
+            template = self.prompt.environment.get_template(self.prefix_template_path)
+            self._resolved_prefix = template.render(**self.props)
+
+        return self._resolved_prefix
+
+    def to_segments(self) -> Tuple[str, str]:
+        """
+        Split the prompt into its stable prefix, to be sent as the system
+        message, and the rest of it, specific to the question.
+
+        Returns:
+            Tuple[str, str]: The prefix and the suffix of the prompt, joined
+                they are the whole prompt.
+        """
+        prompt = self.to_string()
+        prefix = self.get_prefix()
+        if not prefix or not prompt.startswith(prefix):
+            return "", prompt
+        return prefix, prompt[len(prefix) :]
+
     def __str__(self):
         return self.to_string()
 
@@ -1,3 +1,5 @@
+from typing import List, Optional
+
 from .base import BasePrompt
 
 
@@ -5,6 +7,17 @@ class GeneratePythonCodeWithSQLPrompt(BasePrompt):
     """Prompt to generate Python code with SQL from a dataframe."""
 
     template_path = "generate_python_code_with_sql.tmpl"
+    # The datasets and the instructions, before the conversation and the question
+    prefix_template_path = "generate_python_code_with_sql_prefix.tmpl"
+
+    @staticmethod
+    def serialize_dataframes(dfs: List, columns: Optional[List[str]] = None) -> str:
+        """
+        Serialize the content of the <tables> block, so that it can be computed
+        once and shared by several prompts on the same datasets, or only the
+        `columns` of a single dataset.
+        """
+        return "".join(f"\n{df.serialize_dataframe(columns)}\n" for df in dfs)
 
     def to_json(self):
         context = self.props["context"]
@@ -1,7 +1,8 @@
 import json
-from typing import Any
+from typing import Any, Optional
 
 from pandasai.helpers.json_encoder import CustomJsonEncoder
+from pandasai.helpers.metrics import QueryStats
 
 
 class BaseResponse:
@@ -32,6 +33,8 @@ class BaseResponse:
         self.type = type
         self.last_code_executed = last_code_executed
         self.error = error
+        # Set by the agent once the query has been processed
+        self.stats: Optional[QueryStats] = None
 
     def __str__(self) -> str:
         """Return the string representation of the response."""
@@ -43,7 +46,10 @@ class BaseResponse:
 
     def to_dict(self) -> dict:
         """Return a dictionary representation."""
-        return self.__dict__
+        return {
+            **self.__dict__,
+            "stats": self.stats.to_dict() if self.stats is not None else None,
+        }
 
     def to_json(self) -> str:
         """Return a JSON representation."""
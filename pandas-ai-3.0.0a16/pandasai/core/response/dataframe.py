@@ -1,14 +1,119 @@
-from typing import Any
+from typing import Any, Iterator, Optional
 
 import pandas as pd
+import pyarrow as pa
+
+from pandasai.data_loader.query_result import QueryResult
 
 from .base import BaseResponse
 
 
 class DataFrameResponse(BaseResponse):
+    """
+    Response holding a DataFrame, or the result of an SQL query fetched lazily:
+    its first rows, number of rows, batches and exports are then computed by
+    the database, `value` materializes the whole result on first access.
+    """
+
+    # Number of rows of a lazy result serialized by `to_dict`
+    preview_rows = 1000
+
     def __init__(self, value: Any = None, last_code_executed: str = None):
-        value = self.format_value(value)
         super().__init__(value, "dataframe", last_code_executed)
 
     def format_value(self, value):
         return pd.DataFrame(value) if isinstance(value, dict) else value
+
+    @property
+    def value(self) -> Any:
+        if self._value is None:
+            self._value = self._query_result.to_pandas()
+        return self._value
+
+    @value.setter
+    def value(self, value: Any) -> None:
+        if isinstance(value, QueryResult):
+            self._query_result, self._value = value, None
+        else:
+            self._query_result, self._value = None, self.format_value(value)
+
+    @property
+    def is_lazy(self) -> bool:
+        """Whether the result has not been materialized in pandas."""
+        return self._value is None
+
+    @property
+    def query_result(self) -> Optional[QueryResult]:
+        """The lazy result of the SQL query, if the response holds one."""
+        return self._query_result
+
+    def _get_df(self) -> pd.DataFrame:
+        value = self.value
+        return value.to_frame() if isinstance(value, pd.Series) else value
+
+    @property
+    def row_count(self) -> int:
+        """Number of rows, counted by the database for a lazy result."""
+        if self.is_lazy:
+            return self._query_result.row_count
+        return len(self._value)
+
+    def head(self, n: int = 5) -> pd.DataFrame:
+        """The first `n` rows, the only ones fetched for a lazy result."""
+        if self.is_lazy:
+            return self._query_result.head(n)
+        return self._value.head(n)
+
+    def iter_batches(self, size: int = 10000) -> Iterator[pd.DataFrame]:
+        """Iterate over the rows, `size` rows at a time."""
+        if self.is_lazy:
+            yield from self._query_result.iter_batches(size)
+            return
+
+        df = self._get_df()
+        for start in range(0, len(df), size):
+            yield df.iloc[start : start + size]
+
+    def to_arrow(self) -> pa.Table:
+        """The rows as an Arrow table."""
+        if self.is_lazy:
+            return self._query_result.to_arrow()
+        return pa.Table.from_pandas(self._get_df())
+
+    def to_parquet(self, path: str) -> None:
+        """Write the rows to a Parquet file, streamed from a lazy result."""
+        if self.is_lazy:
+            self._query_result.to_parquet(path)
+        else:
+            self._get_df().to_parquet(path)
+
+    def __str__(self) -> str:
+        if self.is_lazy:
+            return (
+                f"{self.head()}\n\n"
+                f"[{self.row_count} rows x {len(self._query_result.columns)} columns]"
+            )
+        return super().__str__()
+
+    def __repr__(self) -> str:
+        if self.is_lazy:
+            return (
+                f"{self.__class__.__name__}(type={self.type!r}, "
+                f"query_result={self._query_result!r})"
+            )
+        return super().__repr__()
+
+    def to_dict(self) -> dict:
+        """
+        Return a dictionary representation. Only the first `preview_rows` rows of
+        a lazy result are serialized, with the total number of rows.
+        """
+        data = super().to_dict()
+        del data["_value"], data["_query_result"]
+        if self.is_lazy:
+            return {
+                "value": self.head(self.preview_rows),
+                "row_count": self.row_count,
+                **data,
+            }
+        return {"value": self._value, **data}
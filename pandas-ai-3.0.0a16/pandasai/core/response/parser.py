@@ -3,6 +3,7 @@ import re
 import numpy as np
 import pandas as pd
 
+from pandasai.data_loader.query_result import QueryResult
 from pandasai.exceptions import InvalidOutputValueMismatch
 
 from .base import BaseResponse
@@ -49,7 +50,9 @@ class ResponseParser:
                     "Invalid output: Expected a string value for result type 'string', but received a non-string value."
                 )
         elif result["type"] == "dataframe":
-            if not isinstance(result["value"], (pd.DataFrame, pd.Series, dict)):
+            if not isinstance(
+                result["value"], (pd.DataFrame, pd.Series, dict, QueryResult)
+            ):
                 raise InvalidOutputValueMismatch(
                     "Invalid output: Expected a Pandas DataFrame or Series, but received an incompatible type."
                 )
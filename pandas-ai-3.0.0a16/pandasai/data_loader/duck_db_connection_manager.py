@@ -1,8 +1,12 @@
+import threading
 import weakref
-from typing import Optional
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Iterator, Optional, Tuple
 
 import duckdb
 
+from pandasai.exceptions import QueryTimeoutError
 from pandasai.query_builders.sql_parser import SQLParser
 
 
@@ -19,24 +23,178 @@ class DuckDBConnectionManager:
     def _init_connection(self):
         """Initialize a DuckDB connection."""
         self.connection = duckdb.connect()
-        self._registered_tables = set()
+        # table name -> (weak reference to the registered frame, its version)
+        self._registered_tables = {}
+        # table name -> {id of an owner: finalizer releasing the table}
+        self._table_owners = {}
+        # Tables whose owner was collected, released at the next registration
+        # or query: the collection may happen in the middle of a DuckDB call,
+        # which the connection cannot be reentered from
+        self._pending_releases = deque()
+        # A single DuckDB connection is not safe to share between threads, so
+        # every caller materializing results must hold this lock.
+        self.lock = threading.RLock()
 
     @classmethod
     def _close_connection(cls):
         """Closes the DuckDB connection when the instance is deleted."""
         if cls._instance and hasattr(cls._instance, "connection"):
             cls._instance.connection.close()
+            cls._instance._registered_tables.clear()
+            for owners in cls._instance._table_owners.values():
+                for finalizer in owners.values():
+                    finalizer.detach()
+            cls._instance._table_owners.clear()
+            cls._instance._pending_releases.clear()
             cls._instance = None
 
-    def register(self, name: str, df):
-        """Registers a DataFrame as a DuckDB table."""
-        self.connection.register(name, df)
-        self._registered_tables.add(name)
+    @staticmethod
+    def _get_version(df) -> Optional[Tuple[Any, ...]]:
+        """
+        Identify the data of a DataFrame as seen by a DuckDB registration, or
+        None if it cannot be identified.
+
+        DuckDB scans the arrays of the DataFrame at registration: values updated
+        in place are visible to the queries, but added, removed or reassigned
+        columns are not.
+        """
+        try:
+            arrays = df._mgr.arrays
+        except AttributeError:
+            return None
+        return tuple(df.columns), df.shape, tuple(id(array) for array in arrays)
+
+    def register(self, name: str, df, owner: Any = None) -> None:
+        """
+        Registers a DataFrame as a DuckDB table, unless this DataFrame is already
+        registered under the name and its columns have not changed since.
+
+        Args:
+            name (str): Name of the table.
+            df (pd.DataFrame): The DataFrame to register.
+            owner (Any, optional): Object using the table. The table is
+                unregistered once all its owners are garbage collected.
+        """
+        version = self._get_version(df)
+        with self.lock:
+            self._release_pending()
+            registered = self._registered_tables.get(name)
+            if not (
+                registered is not None
+                and version is not None
+                and registered[0]() is df
+                and registered[1] == version
+            ):
+                self.connection.register(name, df)
+                self._registered_tables[name] = (weakref.ref(df), version)
+                # The owners of the replaced DataFrame do not own this one
+                for finalizer in self._table_owners.pop(name, {}).values():
+                    finalizer.detach()
+
+            if owner is not None:
+                self._add_owner(name, owner)
+
+    def _add_owner(self, name: str, owner: Any) -> None:
+        """Release the table when the owner is garbage collected."""
+        owners = self._table_owners.setdefault(name, {})
+        finalizer = owners.get(id(owner))
+        if finalizer is not None and finalizer.alive:
+            return
+
+        finalizer = weakref.finalize(
+            owner,
+            self._release,
+            name,
+            id(owner),
+            self._registered_tables[name][0],
+        )
+        finalizer.atexit = False
+        owners[id(owner)] = finalizer
+
+    def _release(self, name: str, owner_id: int, df_ref: weakref.ref) -> None:
+        """Schedule the release of the table by a collected owner."""
+        self._pending_releases.append((name, owner_id, df_ref))
+
+    def _release_pending(self) -> None:
+        """
+        Unregister the tables whose last owner has been garbage collected. The
+        caller must hold `lock`.
+        """
+        while self._pending_releases:
+            name, owner_id, df_ref = self._pending_releases.popleft()
+            owners = self._table_owners.get(name, {})
+            owners.pop(owner_id, None)
+            if owners:
+                continue
+            self._table_owners.pop(name, None)
+            self.unregister(name, df_ref)
+
+    def unregister(self, name: str, df_ref: Optional[weakref.ref] = None) -> None:
+        """
+        Unregisters a DuckDB table, only if it is still the referenced DataFrame
+        when a reference is given.
+        """
+        with self.lock:
+            registered = self._registered_tables.get(name)
+            if registered is None:
+                return
+            if df_ref is not None and registered[0]() is not df_ref():
+                return
+
+            self.connection.unregister(name)
+            del self._registered_tables[name]
+            for finalizer in self._table_owners.pop(name, {}).values():
+                finalizer.detach()
+
+    def is_registered(self, name: str) -> bool:
+        with self.lock:
+            self._release_pending()
+            return name in self._registered_tables
 
     def sql(self, query: str, params: Optional[list] = None):
         """Executes an SQL query and returns the result as a Pandas DataFrame."""
         query = SQLParser.transpile_sql_dialect(query, to_dialect="duckdb")
-        return self.connection.sql(query, params=params)
+        with self.lock:
+            self._release_pending()
+            return self.connection.sql(query, params=params)
+
+    @contextmanager
+    def interrupt_after(self, timeout: Optional[float]) -> Iterator[None]:
+        """
+        Interrupt the query running on the connection in the block if it takes
+        more than `timeout` seconds. The caller must hold `lock`, the watchdog
+        never interrupts the connection once the block is left.
+
+        Raises:
+            QueryTimeoutError: If the query has been interrupted.
+        """
+        if timeout is None:
+            yield
+            return
+
+        finished = threading.Event()
+        # Once released, the connection may run the query of another caller:
+        # the check and the interruption must not interleave with leaving the block
+        guard = threading.Lock()
+
+        def interrupt():
+            with guard:
+                if not finished.is_set():
+                    self.connection.interrupt()
+
+        watchdog = threading.Timer(timeout, interrupt)
+        watchdog.daemon = True
+        watchdog.start()
+        try:
+            yield
+        except duckdb.InterruptException as e:
+            raise QueryTimeoutError(
+                f"The SQL query timed out after {timeout:.1f} seconds."
+            ) from e
+        finally:
+            with guard:
+                finished.set()
+            watchdog.cancel()
 
     def close(self):
         """Manually close the connection if needed."""
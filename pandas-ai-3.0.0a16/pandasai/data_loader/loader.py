@@ -2,6 +2,7 @@ import os
 from abc import ABC, abstractmethod
 from typing import Optional
 
+import pandas as pd
 import yaml
 
 from pandasai.dataframe.base import DataFrame
@@ -12,10 +13,13 @@ from pandasai.helpers.path import (
 )
 
 from .. import ConfigManager
+from ..config import Config
 from ..constants import (
     LOCAL_SOURCE_TYPES,
 )
 from ..query_builders.base_query_builder import BaseQueryBuilder
+from .query_cache import QueryCache
+from .query_result import LoaderQueryResult, QueryResult
 from .semantic_layer_schema import SemanticLayerSchema
 
 
@@ -31,10 +35,74 @@ class DatasetLoader(ABC):
         """Abstract property that must be implemented by subclasses."""
         pass
 
+    def execute_query(
+        self,
+        query: str,
+        params: Optional[list] = None,
+        timeout: Optional[float] = None,
+        config: Optional[Config] = None,
+    ) -> pd.DataFrame:
+        """
+        Execute the query on the dataset. When the SQL cache is enabled, the result
+        of a previous identical query on the same version of the data is reused.
+
+        Args:
+            query (str): The SQL query.
+            params (Optional[list]): The parameters of the query.
+            timeout (Optional[float]): Number of seconds after which the query is
+                cancelled, when the source supports it.
+            config (Optional[Config]): The config of the agent running the query,
+                enabling the SQL cache. Defaults to the global config.
+        """
+        config = config or ConfigManager.get()
+        version = self.get_version() if config.enable_sql_cache else None
+        if version is None:
+            return self._execute_query(query, params, timeout)
+
+        cache_key = QueryCache.get_key(query, version, params)
+        result = QueryCache.get(cache_key)
+        if result is None:
+            result = self._execute_query(query, params, timeout)
+            QueryCache.set(cache_key, result, ttl=self.get_cache_ttl(config))
+        return result
+
     @abstractmethod
-    def execute_query(self, query: str, params: Optional[list] = None):
+    def _execute_query(
+        self,
+        query: str,
+        params: Optional[list] = None,
+        timeout: Optional[float] = None,
+    ):
         pass
 
+    def get_query_result(
+        self,
+        query: str,
+        params: Optional[list] = None,
+        config: Optional[Config] = None,
+    ) -> QueryResult:
+        """
+        Result of the query on the dataset, fetched only when and as much as it
+        is needed.
+
+        Args:
+            query (str): The SQL query.
+            params (Optional[list]): The parameters of the query.
+            config (Optional[Config]): The config of the agent running the query.
+        """
+        return LoaderQueryResult(self, query, params, config=config)
+
+    def get_version(self) -> Optional[str]:
+        """
+        Token identifying the current version of the data of the dataset,
+        None if it cannot be known and results must not be cached.
+        """
+        return None
+
+    def get_cache_ttl(self, config: Config) -> Optional[float]:
+        """Number of seconds the cached results of the dataset stay valid."""
+        return None
+
     @classmethod
     def create_loader_from_schema(
         cls, schema: SemanticLayerSchema, dataset_path: str
@@ -1,16 +1,20 @@
+import os
 import re
 from typing import Optional
 
 import duckdb
 import pandas as pd
 
+from pandasai.config import Config
 from pandasai.dataframe.base import DataFrame
 from pandasai.exceptions import MaliciousQueryError
 from pandasai.query_builders import LocalQueryBuilder
 
+from .. import ConfigManager
 from ..helpers.sql_sanitizer import is_sql_query_safe
 from .duck_db_connection_manager import DuckDBConnectionManager
 from .loader import DatasetLoader
+from .query_result import DuckDBQueryResult
 from .semantic_layer_schema import SemanticLayerSchema
 
 
@@ -50,18 +54,48 @@ class LocalDatasetLoader(DatasetLoader):
 
         return sql_query
 
-    def execute_query(self, query: str, params: Optional[list] = None) -> pd.DataFrame:
+    def get_version(self) -> Optional[str]:
+        """The data changes whenever the source file is rewritten."""
+        filemanager = ConfigManager.get().file_manager
+        filepath = filemanager.abs_path(
+            os.path.join(self.dataset_path, self.schema.source.path)
+        )
         try:
-            db_manager = DuckDBConnectionManager()
+            stat = os.stat(filepath)
+        except OSError:
+            return None
+        return f"{filepath}:{stat.st_mtime_ns}:{stat.st_size}"
+
+    def _validate_query(self, query: str) -> None:
+        # Replace READ_PARQUET blocks with a dummy table for validation
+        validation_query = self._replace_readparquet_block_with_table(query)
 
-            # Replace READ_PARQUET blocks with a dummy table for validation
-            validation_query = self._replace_readparquet_block_with_table(query)
+        if not is_sql_query_safe(validation_query, dialect="duckdb"):
+            raise MaliciousQueryError(
+                "The SQL query is deemed unsafe and will not be executed."
+            )
 
-            if not is_sql_query_safe(validation_query, dialect="duckdb"):
-                raise MaliciousQueryError(
-                    "The SQL query is deemed unsafe and will not be executed."
-                )
+    def get_query_result(
+        self,
+        query: str,
+        params: Optional[list] = None,
+        config: Optional[Config] = None,
+    ) -> DuckDBQueryResult:
+        """The result streams from the local files, see `DuckDBQueryResult`."""
+        self._validate_query(query)
+        return DuckDBQueryResult(query, params=params)
+
+    def _execute_query(
+        self,
+        query: str,
+        params: Optional[list] = None,
+        timeout: Optional[float] = None,
+    ) -> pd.DataFrame:
+        try:
+            db_manager = DuckDBConnectionManager()
+            self._validate_query(query)
 
-            return db_manager.sql(query, params=params).df()
+            with db_manager.lock, db_manager.interrupt_after(timeout):
+                return db_manager.sql(query, params=params).df()
         except duckdb.Error as e:
             raise RuntimeError(f"SQL execution failed: {e}") from e
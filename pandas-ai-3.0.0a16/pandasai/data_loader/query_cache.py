@@ -0,0 +1,62 @@
+import hashlib
+from typing import Optional
+
+import pandas as pd
+
+from pandasai.constants import DEFAULT_QUERY_CACHE_MAX_SIZE
+from pandasai.helpers.cache import LRUCache
+from pandasai.query_builders.sql_parser import SQLParser
+
+
+def _dataframe_size(df: pd.DataFrame) -> int:
+    return int(df.memory_usage(deep=True).sum())
+
+
+class QueryCache:
+    """
+    Process wide cache of SQL query results.
+
+    Results are keyed by the normalized query, its parameters and a version token
+    of the datasets it reads, so that a result is never served once the data
+    it was computed from changes. Cached results are copied on the way in and
+    out, callers can freely modify them.
+    """
+
+    _cache: LRUCache = LRUCache(
+        max_size=DEFAULT_QUERY_CACHE_MAX_SIZE, sizeof=_dataframe_size
+    )
+
+    @staticmethod
+    def get_key(
+        query: str,
+        version: str,
+        params: Optional[list] = None,
+        dialect: Optional[str] = None,
+    ) -> str:
+        key = "|".join(
+            [
+                SQLParser.normalize_query(query, dialect),
+                repr(params or []),
+                version,
+            ]
+        )
+        return hashlib.sha256(key.encode()).hexdigest()
+
+    @classmethod
+    def get(cls, key: str) -> Optional[pd.DataFrame]:
+        result = cls._cache.get(key)
+        return result.copy() if result is not None else None
+
+    @classmethod
+    def set(cls, key: str, result: pd.DataFrame, ttl: Optional[float] = None):
+        cls._cache.set(key, result.copy(), ttl=ttl)
+
+    @classmethod
+    def clear(cls) -> None:
+        """Remove all the cached results and reset the hit/miss counters."""
+        cls._cache.clear()
+
+    @classmethod
+    def stats(cls) -> dict:
+        """Hits, misses, number of cached results and memory they use."""
+        return cls._cache.stats()
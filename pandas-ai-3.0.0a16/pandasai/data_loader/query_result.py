@@ -0,0 +1,160 @@
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Iterator, List, Optional
+
+import duckdb
+import pandas as pd
+import pyarrow as pa
+
+from pandasai.query_builders.sql_parser import SQLParser
+
+
+class QueryResult(ABC):
+    """
+    Result of an SQL query, fetched only when and as much as it is needed: the
+    first rows, the number of rows or batches of rows, instead of materializing
+    the whole result in pandas.
+    """
+
+    def __init__(self, query: str, params: Optional[list] = None):
+        self.query = query
+        self.params = params
+        self._columns: Optional[List[str]] = None
+        self._row_count: Optional[int] = None
+
+    @property
+    def columns(self) -> List[str]:
+        """Names of the columns of the result, running the query without rows."""
+        if self._columns is None:
+            self._columns = list(self.head(0).columns)
+        return self._columns
+
+    @property
+    def row_count(self) -> int:
+        """Number of rows of the result, counted by the database."""
+        if self._row_count is None:
+            count = self._execute(f"SELECT COUNT(*) AS count FROM ({self.query}) AS t")
+            self._row_count = int(count.iloc[0, 0])
+        return self._row_count
+
+    def head(self, n: int = 5) -> pd.DataFrame:
+        """The first `n` rows of the result."""
+        return self._execute(f"SELECT * FROM ({self.query}) AS t LIMIT {int(n)}")
+
+    def to_pandas(self) -> pd.DataFrame:
+        """Materialize the whole result."""
+        return self._execute(self.query)
+
+    @abstractmethod
+    def _execute(self, query: str) -> pd.DataFrame:
+        """Run a query on the source of the result, with its parameters."""
+        pass
+
+    @abstractmethod
+    def iter_batches(self, size: int = 10000) -> Iterator[pd.DataFrame]:
+        """Iterate over the rows of the result, `size` rows at a time."""
+        pass
+
+    @abstractmethod
+    def to_arrow(self) -> pa.Table:
+        """The whole result as an Arrow table."""
+        pass
+
+    @abstractmethod
+    def to_parquet(self, path: str) -> None:
+        """Write the whole result to a Parquet file."""
+        pass
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(query={self.query!r})"
+
+
+class DuckDBQueryResult(QueryResult):
+    """
+    Result of a query on in-memory datasets or local files, run by DuckDB.
+
+    Every access opens its own DuckDB connection on which the tables are
+    registered again, without copying them. The result streams from it without
+    holding the connection shared by the agents.
+    """
+
+    def __init__(
+        self,
+        query: str,
+        tables: Optional[Dict[str, pd.DataFrame]] = None,
+        params: Optional[list] = None,
+    ):
+        query = SQLParser.transpile_sql_dialect(query, to_dialect="duckdb")
+        super().__init__(query, params)
+        self.tables = dict(tables or {})
+
+    def _connect(self) -> duckdb.DuckDBPyConnection:
+        connection = duckdb.connect()
+        for name, df in self.tables.items():
+            connection.register(name, df)
+        return connection
+
+    def _relation(self, connection: duckdb.DuckDBPyConnection, query: str) -> Any:
+        return connection.sql(query, params=self.params)
+
+    @property
+    def columns(self) -> List[str]:
+        if self._columns is None:
+            # Binding the query gives its columns without running it
+            with self._connect() as connection:
+                self._columns = list(self._relation(connection, self.query).columns)
+        return self._columns
+
+    def _execute(self, query: str) -> pd.DataFrame:
+        with self._connect() as connection:
+            return self._relation(connection, query).df()
+
+    def iter_batches(self, size: int = 10000) -> Iterator[pd.DataFrame]:
+        with self._connect() as connection:
+            relation = self._relation(connection, self.query)
+            # to_arrow_reader replaces fetch_arrow_reader in recent versions
+            get_reader = getattr(relation, "to_arrow_reader", None)
+            reader = (get_reader or relation.fetch_arrow_reader)(size)
+            for batch in reader:
+                yield batch.to_pandas()
+
+    def to_arrow(self) -> pa.Table:
+        with self._connect() as connection:
+            return self._relation(connection, self.query).to_arrow_table()
+
+    def to_parquet(self, path: str) -> None:
+        with self._connect() as connection:
+            self._relation(connection, self.query).write_parquet(path)
+
+
+class LoaderQueryResult(QueryResult):
+    """
+    Result of a query on a remote dataset, run through its loader.
+
+    The number of rows and the first rows are computed by the database. The
+    connectors return whole results, so batches and exports fetch it once.
+    """
+
+    def __init__(
+        self,
+        loader: Any,
+        query: str,
+        params: Optional[list] = None,
+        config: Optional[Any] = None,
+    ):
+        super().__init__(query, params)
+        self.loader = loader
+        self.config = config
+
+    def _execute(self, query: str) -> pd.DataFrame:
+        return self.loader.execute_query(query, self.params, config=self.config)
+
+    def iter_batches(self, size: int = 10000) -> Iterator[pd.DataFrame]:
+        df = self.to_pandas()
+        for start in range(0, len(df), size):
+            yield df.iloc[start : start + size]
+
+    def to_arrow(self) -> pa.Table:
+        return pa.Table.from_pandas(self.to_pandas(), preserve_index=False)
+
+    def to_parquet(self, path: str) -> None:
+        self.to_pandas().to_parquet(path, index=False)
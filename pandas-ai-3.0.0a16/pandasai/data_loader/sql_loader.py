@@ -1,8 +1,10 @@
 import importlib
+import inspect
 from typing import Optional
 
 import pandas as pd
 
+from pandasai.config import Config
 from pandasai.dataframe.virtual_dataframe import VirtualDataFrame
 from pandasai.exceptions import InvalidDataSourceType, MaliciousQueryError
 from pandasai.helpers.sql_sanitizer import is_sql_query_safe
@@ -36,7 +38,22 @@ class SQLDatasetLoader(DatasetLoader):
             path=self.dataset_path,
         )
 
-    def execute_query(self, query: str, params: Optional[list] = None) -> pd.DataFrame:
+    def get_version(self) -> Optional[str]:
+        """
+        Changes to a remote database cannot be detected, cached results are
+        bound to the dataset and expire after `sql_cache_ttl` seconds.
+        """
+        return self.dataset_path
+
+    def get_cache_ttl(self, config: Config) -> Optional[float]:
+        return config.sql_cache_ttl
+
+    def _execute_query(
+        self,
+        query: str,
+        params: Optional[list] = None,
+        timeout: Optional[float] = None,
+    ) -> pd.DataFrame:
         source_type = self.schema.source.type
         connection_info = self.schema.source.connection
 
@@ -50,7 +67,9 @@ class SQLDatasetLoader(DatasetLoader):
         try:
             if params:
                 query = query.replace(" % ", " %% ")
-            return load_function(connection_info, query, params)
+            return self._call_load_function(
+                load_function, connection_info, query, params, timeout
+            )
 
         except ModuleNotFoundError as e:
             raise ImportError(
@@ -62,6 +81,20 @@ class SQLDatasetLoader(DatasetLoader):
                 f"Failed to execute query for '{source_type}' with: {query}"
             ) from e
 
+    @staticmethod
+    def _call_load_function(
+        load_function, connection_info, query: str, params, timeout: Optional[float]
+    ) -> pd.DataFrame:
+        """
+        Run the query with the connector, passing the timeout to the connectors
+        accepting one, which have the database cancel the query once exceeded.
+        """
+        if timeout is not None and "timeout" in inspect.signature(
+            load_function
+        ).parameters:
+            return load_function(connection_info, query, params, timeout=timeout)
+        return load_function(connection_info, query, params)
+
     @staticmethod
     def _get_loader_function(source_type: str):
         try:
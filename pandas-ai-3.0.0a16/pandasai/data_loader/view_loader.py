@@ -7,6 +7,7 @@ from pandasai.dataframe.virtual_dataframe import VirtualDataFrame
 from pandasai.query_builders import ViewQueryBuilder
 
 from .. import LOCAL_SOURCE_TYPES
+from ..config import Config
 from ..exceptions import MaliciousQueryError
 from ..helpers.sql_sanitizer import is_sql_query_safe
 from ..query_builders.base_query_builder import BaseQueryBuilder
@@ -78,20 +79,46 @@ class ViewDatasetLoader(SQLDatasetLoader):
         )
 
     def execute_local_query(
-        self, query: str, params: Optional[List[Any]] = None
+        self,
+        query: str,
+        params: Optional[List[Any]] = None,
+        timeout: Optional[float] = None,
     ) -> pd.DataFrame:
         try:
             db_manager = DuckDBConnectionManager()
-            return db_manager.sql(query, params).df()
+            with db_manager.lock, db_manager.interrupt_after(timeout):
+                return db_manager.sql(query, params).df()
         except duckdb.Error as e:
             raise RuntimeError(f"SQL execution failed: {e}") from e
 
-    def execute_query(self, query: str, params: Optional[list] = None) -> pd.DataFrame:
+    def get_version(self) -> Optional[str]:
+        """Views on local files change with the files of the datasets they join."""
+        if self.source.type not in LOCAL_SOURCE_TYPES:
+            return super().get_version()
+
+        versions = [
+            loader.get_version() for loader in self.schema_dependencies_dict.values()
+        ]
+        if None in versions:
+            return None
+        return "|".join([self.dataset_path, *versions])
+
+    def get_cache_ttl(self, config: Config) -> Optional[float]:
+        if self.source.type in LOCAL_SOURCE_TYPES:
+            return None
+        return config.sql_cache_ttl
+
+    def _execute_query(
+        self,
+        query: str,
+        params: Optional[list] = None,
+        timeout: Optional[float] = None,
+    ) -> pd.DataFrame:
         source_type = self.source.type
         connection_info = self.source.connection
 
         if source_type in LOCAL_SOURCE_TYPES:
-            return self.execute_local_query(query, params)
+            return self.execute_local_query(query, params, timeout)
         load_function = self._get_loader_function(source_type)
         query = SQLParser.transpile_sql_dialect(query, to_dialect=source_type)
 
@@ -102,7 +129,9 @@ class ViewDatasetLoader(SQLDatasetLoader):
         try:
             if params:
                 query = query.replace(" % ", " %% ")
-            return load_function(connection_info, query, params)
+            return self._call_load_function(
+                load_function, connection_info, query, params, timeout
+            )
 
         except ModuleNotFoundError as e:
             raise ImportError(
@@ -3,7 +3,7 @@ from __future__ import annotations
 import hashlib
 import os
 from io import BytesIO
-from typing import TYPE_CHECKING, Optional, Union
+from typing import TYPE_CHECKING, List, Optional, Union
 from zipfile import ZipFile
 
 import pandas as pd
@@ -20,6 +20,7 @@ from pandasai.data_loader.semantic_layer_schema import (
     Source,
 )
 from pandasai.exceptions import DatasetNotFound, PandaAIApiKeyError
+from pandasai.helpers.dataframe_profiler import DataframeProfiler, DatasetProfile
 from pandasai.helpers.dataframe_serializer import DataframeSerializer
 from pandasai.helpers.session import get_pandaai_session
 from pandasai.sandbox.sandbox import Sandbox
@@ -132,9 +133,48 @@ class DataFrame(pd.DataFrame):
     def columns_count(self) -> int:
         return len(self.columns)
 
-    def serialize_dataframe(self) -> str:
+    def get_fingerprint(self) -> str:
         """
-        Serialize DataFrame to string representation.
+        Token changing with the data shown to the LLM: the dimensions, the
+        columns and the first rows of the DataFrame.
+        """
+        return self._get_fingerprint(pd.DataFrame(self).head())
+
+    def _get_fingerprint(self, head: pd.DataFrame) -> str:
+        data = repr(
+            (
+                self.rows_count,
+                self.columns_count,
+                list(head.columns),
+                head.values.tolist(),
+            )
+        )
+        return hashlib.md5(data.encode()).hexdigest()
+
+    def get_profile(self, wait: bool = False) -> Optional[DatasetProfile]:
+        """
+        Statistics of the columns of the DataFrame: type, null percentage,
+        approximate distinct values, min, max and most frequent values.
+
+        Args:
+            wait (bool): Whether to wait for the profile to be computed. By
+                default, if it is not ready, it is computed in the background
+                and None is returned.
+
+        Returns:
+            Optional[DatasetProfile]: The profile of the current data.
+        """
+        if wait:
+            return DataframeProfiler.profile(self)
+        return DataframeProfiler.get_profile(self)
+
+    def serialize_dataframe(self, columns: Optional[List[str]] = None) -> str:
+        """
+        Serialize DataFrame to string representation, with the statistics of its
+        columns instead of its first rows once profiled if profiling is enabled.
+
+        Args:
+            columns (List[str], optional): Columns to serialize, all if None.
 
         Returns:
             str: Serialized string representation of the DataFrame
@@ -146,7 +186,8 @@ class DataFrame(pd.DataFrame):
         else:
             dialect = "postgres"
 
-        return DataframeSerializer.serialize(self, dialect)
+        profile = self.get_profile() if ConfigManager.get().enable_profiling else None
+        return DataframeSerializer.serialize(self, dialect, columns, profile)
 
     def get_head(self):
         return self.head()
@@ -1,13 +1,17 @@
 from __future__ import annotations
 
+import time
 from typing import TYPE_CHECKING, Optional
 
 import pandas as pd
 
+from pandasai.config import ConfigManager
 from pandasai.dataframe.base import DataFrame
 from pandasai.exceptions import VirtualizationError
 
 if TYPE_CHECKING:
+    from pandasai.config import Config
+    from pandasai.data_loader.query_result import QueryResult
     from pandasai.data_loader.sql_loader import SQLDatasetLoader
 
 
@@ -16,7 +20,10 @@ class VirtualDataFrame(DataFrame):
         "_agent",
         "_column_hash",
         "_head",
+        "_head_loaded_at",
         "_loader",
+        "_rows_count",
+        "_rows_count_loaded_at",
         "config",
         "head",
         "path",
@@ -28,24 +35,59 @@ class VirtualDataFrame(DataFrame):
         if not self._loader:
             raise VirtualizationError("Data loader is required for virtualization!")
         self._head = None
+        self._head_loaded_at: Optional[float] = None
+        self._rows_count: Optional[int] = None
+        self._rows_count_loaded_at: Optional[float] = None
 
         super().__init__(
             *args,
             **kwargs,
         )
 
+    @staticmethod
+    def _is_fresh(loaded_at: Optional[float]) -> bool:
+        """
+        Whether a value queried at `loaded_at` is still valid, the queried
+        values being reused for `table_stats_ttl` seconds.
+        """
+        if loaded_at is None:
+            return False
+        ttl = ConfigManager.get().table_stats_ttl
+        return ttl is None or time.monotonic() - loaded_at < ttl
+
     def head(self):
-        if self._head is None:
+        if self._head is None or not self._is_fresh(self._head_loaded_at):
             self._head = self._loader.load_head()
+            self._head_loaded_at = time.monotonic()
         return self._head
 
     @property
     def rows_count(self) -> int:
-        return self._loader.get_row_count()
+        if self._rows_count is None or not self._is_fresh(self._rows_count_loaded_at):
+            self._rows_count = self._loader.get_row_count()
+            self._rows_count_loaded_at = time.monotonic()
+        return self._rows_count
+
+    def get_fingerprint(self) -> str:
+        return self._get_fingerprint(pd.DataFrame(self.head()))
+
+    def get_profile(self, wait: bool = False) -> None:
+        # The data stays in the remote database, only its first rows are shown
+        return None
 
     @property
     def query_builder(self):
         return self._loader.query_builder
 
-    def execute_sql_query(self, query: str) -> pd.DataFrame:
-        return self._loader.execute_query(query)
+    def execute_sql_query(
+        self,
+        query: str,
+        timeout: Optional[float] = None,
+        config: Optional[Config] = None,
+    ) -> pd.DataFrame:
+        return self._loader.execute_query(query, timeout=timeout, config=config)
+
+    def get_sql_query_result(
+        self, query: str, config: Optional[Config] = None
+    ) -> QueryResult:
+        return self._loader.get_query_result(query, config=config)
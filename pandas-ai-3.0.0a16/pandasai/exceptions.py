@@ -280,6 +280,30 @@ class CodeExecutionError(Exception):
     """
 
 
+class QueryAbortedError(Exception):
+    """
+    Raise error if the processing of the query has been aborted
+    Args:
+        Exception (Exception): QueryAbortedError
+    """
+
+
+class QueryTimeoutError(QueryAbortedError):
+    """
+    Raise error if the processing of the query exceeded its timeout
+    Args:
+        Exception (Exception): QueryTimeoutError
+    """
+
+
+class ReplayMissError(Exception):
+    """
+    Raise error if a ReplayLLM has no recorded completion for a prompt
+    Args:
+        Exception (Exception): ReplayMissError
+    """
+
+
 class VirtualizationError(Exception):
     """Raised when there is an error with DataFrame virtualization."""
 
@@ -0,0 +1,231 @@
+"""Offline benchmark of the processing of the queries by the agents"""
+
+from __future__ import annotations
+
+import json
+import math
+import sys
+import threading
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional
+
+from pandasai.core.response.error import ErrorResponse
+
+if TYPE_CHECKING:
+    from pandasai.agent import Agent
+
+
+def load_workload(path: str, field: str = "query") -> List[str]:
+    """
+    Load the queries of a workload file, one query per line: a JSON object with
+    the query in `field`, or the query itself.
+
+    Args:
+        path (str): Path of the workload file, like a JSON Lines file.
+        field (str): Field of the JSON objects holding the query.
+
+    Returns:
+        List[str]: The queries.
+    """
+    queries = []
+    with open(path, encoding="utf-8") as file:
+        for line in file:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                record = line
+            queries.append(str(record[field] if isinstance(record, dict) else record))
+    return queries
+
+
+def percentile(values: List[float], quantile: float) -> float:
+    """Nearest-rank percentile of the values, 0 if there are none."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[max(math.ceil(quantile * len(ordered)) - 1, 0)]
+
+
+def _get_max_rss() -> Optional[int]:
+    """Peak resident memory of the process in bytes, None if unknown."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Reported in kilobytes on Linux, in bytes on macOS
+    return max_rss if sys.platform == "darwin" else max_rss * 1024
+
+
+class BenchmarkReport:
+    """
+    Latency percentiles of each stage of the processing of the queries, with
+    the throughput and the memory of a benchmark run.
+    """
+
+    def __init__(
+        self,
+        concurrency: int,
+        duration: float,
+        timings: Dict[str, List[float]],
+        statuses: Dict[str, int],
+        tokens: int,
+        peak_memory: Optional[int] = None,
+        max_rss: Optional[int] = None,
+    ):
+        self.concurrency = concurrency
+        self.duration = duration
+        self.timings = timings
+        self.statuses = statuses
+        self.tokens = tokens
+        self.peak_memory = peak_memory
+        self.max_rss = max_rss
+
+    @property
+    def queries(self) -> int:
+        return sum(self.statuses.values())
+
+    @property
+    def throughput(self) -> float:
+        """Queries processed per second."""
+        return self.queries / self.duration if self.duration else 0.0
+
+    def get_stages(self) -> Dict[str, Dict[str, float]]:
+        """Number of queries, mean and p50/p95/p99 latency of each stage."""
+        return {
+            stage: {
+                "count": len(values),
+                "mean": sum(values) / len(values),
+                "p50": percentile(values, 0.5),
+                "p95": percentile(values, 0.95),
+                "p99": percentile(values, 0.99),
+            }
+            for stage, values in self.timings.items()
+            if values
+        }
+
+    def to_dict(self) -> dict:
+        return {
+            "concurrency": self.concurrency,
+            "queries": self.queries,
+            "statuses": dict(self.statuses),
+            "duration": self.duration,
+            "throughput": self.throughput,
+            "tokens": self.tokens,
+            "peak_memory": self.peak_memory,
+            "max_rss": self.max_rss,
+            "stages": self.get_stages(),
+        }
+
+    def __str__(self) -> str:
+        lines = [
+            f"{self.queries} queries with {self.concurrency} concurrent agents "
+            f"in {self.duration:.2f}s ({self.throughput:.2f} queries/s), "
+            + ", ".join(f"{n} {status}" for status, n in sorted(self.statuses.items()))
+        ]
+        if self.peak_memory is not None:
+            lines.append(f"Peak traced memory: {self.peak_memory / 2**20:.1f} MiB")
+        if self.max_rss is not None:
+            lines.append(f"Peak resident memory: {self.max_rss / 2**20:.1f} MiB")
+
+        lines.append(
+            f"{'stage':<18}{'count':>7}{'mean':>10}{'p50':>10}{'p95':>10}{'p99':>10}"
+        )
+        for stage, values in self.get_stages().items():
+            lines.append(
+                f"{stage:<18}{values['count']:>7}"
+                + "".join(
+                    f"{values[name] * 1000:>8.1f}ms"
+                    for name in ("mean", "p50", "p95", "p99")
+                )
+            )
+        return "\n".join(lines)
+
+
+def run_benchmark(
+    create_agent: Callable[[], Agent],
+    queries: List[str],
+    concurrency: int = 1,
+    repeat: int = 1,
+    timeout: Optional[float] = None,
+    trace_memory: bool = False,
+) -> BenchmarkReport:
+    """
+    Process the queries with `concurrency` agents answering them at the same
+    time, each query in a new conversation, and report the latency of each
+    stage of their processing.
+
+    Use an agent with a `ReplayLLM` to benchmark the whole pipeline but the
+    model itself.
+
+    Args:
+        create_agent (Callable[[], Agent]): Creates one of the agents.
+        queries (List[str]): The queries of the workload.
+        concurrency (int): Number of agents processing the queries at once.
+        repeat (int): Number of times the workload is processed.
+        timeout (float, optional): Number of seconds each query may take.
+        trace_memory (bool): Whether to trace the peak memory allocated by
+            Python during the run, which slows the processing down.
+
+    Returns:
+        BenchmarkReport: The report of the run.
+    """
+    if concurrency < 1:
+        raise ValueError("concurrency must be a positive integer.")
+
+    local = threading.local()
+    lock = threading.Lock()
+    timings: Dict[str, List[float]] = {}
+    statuses: Dict[str, int] = {}
+    tokens = 0
+
+    def process(query: str) -> None:
+        nonlocal tokens
+        if not hasattr(local, "agent"):
+            local.agent = create_agent()
+        agent = local.agent
+
+        try:
+            response = agent.chat(query, timeout=timeout)
+            status = "error" if isinstance(response, ErrorResponse) else "success"
+        except Exception as e:
+            status = type(e).__name__
+        stats = agent._state.stats.to_dict()
+
+        with lock:
+            statuses[status] = statuses.get(status, 0) + 1
+            tokens += stats["token_usage"]["total_tokens"]
+            for stage, seconds in stats["timings"].items():
+                timings.setdefault(stage, []).append(seconds)
+
+    was_tracing = tracemalloc.is_tracing()
+    if trace_memory:
+        if was_tracing and hasattr(tracemalloc, "reset_peak"):
+            tracemalloc.reset_peak()
+        elif not was_tracing:
+            tracemalloc.start()
+
+    start = time.perf_counter()
+    try:
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            list(executor.map(process, queries * repeat))
+        duration = time.perf_counter() - start
+        peak_memory = tracemalloc.get_traced_memory()[1] if trace_memory else None
+    finally:
+        if trace_memory and not was_tracing:
+            tracemalloc.stop()
+
+    return BenchmarkReport(
+        concurrency,
+        duration,
+        timings,
+        statuses,
+        tokens,
+        peak_memory=peak_memory,
+        max_rss=_get_max_rss(),
+    )
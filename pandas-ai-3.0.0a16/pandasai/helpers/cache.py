@@ -0,0 +1,228 @@
+import os
+import sqlite3
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Optional
+
+from pandasai.constants import DEFAULT_FILE_PERMISSIONS
+
+from .path import find_project_root
+
+
+class Cache:
+    """
+    Persistent key/value cache stored in a SQLite database.
+
+    Entries can be grouped under a tag so that all of them can be invalidated at
+    once, the least recently used entries are evicted when `max_entries` is
+    reached and entries older than `ttl` seconds are treated as missing.
+
+    Args:
+        filename (str): Name of the cache file, without extension.
+        abs_path (str, optional): Directory of the cache file, defaults to the
+            `cache` folder of the project root.
+        max_entries (int, optional): Maximum number of entries to keep.
+        ttl (float, optional): Number of seconds after which an entry expires.
+    """
+
+    def __init__(
+        self,
+        filename: str = "cache_db",
+        abs_path: Optional[str] = None,
+        max_entries: Optional[int] = 1000,
+        ttl: Optional[float] = None,
+    ):
+        cache_dir = abs_path or os.path.join(find_project_root(), "cache")
+        os.makedirs(cache_dir, mode=DEFAULT_FILE_PERMISSIONS, exist_ok=True)
+
+        self.filepath = os.path.join(cache_dir, f"{filename}.db")
+        self.max_entries = max_entries
+        self.ttl = ttl
+
+        # The connection is shared between threads, statements are serialized
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(self.filepath, check_same_thread=False)
+        with self._lock, self._connection:
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS cache ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, tag TEXT, "
+                "created_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+            )
+            self._connection.execute(
+                "CREATE INDEX IF NOT EXISTS cache_tag ON cache (tag)"
+            )
+
+    def get(self, key: str) -> Optional[str]:
+        """Get the value of a key, or None if it is missing or expired."""
+        now = time.time()
+        with self._lock, self._connection:
+            row = self._connection.execute(
+                "SELECT value, created_at FROM cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+
+            value, created_at = row
+            if self.ttl is not None and now - created_at > self.ttl:
+                self._connection.execute("DELETE FROM cache WHERE key = ?", (key,))
+                return None
+
+            self._connection.execute(
+                "UPDATE cache SET accessed_at = ? WHERE key = ?", (now, key)
+            )
+            return value
+
+    def set(self, key: str, value: str, tag: Optional[str] = None) -> None:
+        """Set the value of a key, evicting the least recently used entries."""
+        now = time.time()
+        with self._lock, self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO cache (key, value, tag, created_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, value, tag, now, now),
+            )
+            if self.ttl is not None:
+                self._connection.execute(
+                    "DELETE FROM cache WHERE created_at < ?", (now - self.ttl,)
+                )
+            if self.max_entries is not None:
+                self._connection.execute(
+                    "DELETE FROM cache WHERE key IN (SELECT key FROM cache "
+                    "ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+                    (self.max_entries,),
+                )
+
+    def delete(self, key: str) -> None:
+        """Delete a key from the cache."""
+        with self._lock, self._connection:
+            self._connection.execute("DELETE FROM cache WHERE key = ?", (key,))
+
+    def delete_tag(self, tag: str) -> None:
+        """Delete all the entries stored under a tag."""
+        with self._lock, self._connection:
+            self._connection.execute("DELETE FROM cache WHERE tag = ?", (tag,))
+
+    def clear(self) -> None:
+        """Clean the cache."""
+        with self._lock, self._connection:
+            self._connection.execute("DELETE FROM cache")
+
+    def destroy(self) -> None:
+        """Destroy the cache."""
+        with self._lock:
+            self._connection.close()
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(self.filepath + suffix):
+                os.remove(self.filepath + suffix)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._connection.execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+
+
+class LRUCache:
+    """
+    Thread-safe in-memory cache evicting the least recently used entries once
+    `max_entries` entries or `max_size` bytes are exceeded.
+
+    Args:
+        max_entries (int, optional): Maximum number of entries to keep.
+        max_size (int, optional): Maximum total size of the values, in bytes.
+        sizeof (Callable[[Any], int], optional): Function measuring the size of
+            a value, defaults to `sys.getsizeof`.
+        ttl (float, optional): Default number of seconds after which an entry
+            expires.
+    """
+
+    def __init__(
+        self,
+        max_entries: Optional[int] = None,
+        max_size: Optional[int] = None,
+        sizeof: Callable[[Any], int] = sys.getsizeof,
+        ttl: Optional[float] = None,
+    ):
+        self.max_entries = max_entries
+        self.max_size = max_size
+        self.sizeof = sizeof
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._size = 0
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        """Get the value of a key, or None if it is missing or expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[2] is not None and entry[2] < time.time():
+                self._pop(key)
+                entry = None
+
+            if entry is None:
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        """Set the value of a key, evicting the least recently used entries."""
+        size = self.sizeof(value)
+        ttl = ttl if ttl is not None else self.ttl
+        expires_at = time.time() + ttl if ttl is not None else None
+
+        with self._lock:
+            if key in self._entries:
+                self._pop(key)
+
+            if self.max_size is not None and size > self.max_size:
+                return
+
+            self._entries[key] = (value, size, expires_at)
+            self._size += size
+
+            while (
+                self.max_entries is not None and len(self._entries) > self.max_entries
+            ) or (self.max_size is not None and self._size > self.max_size):
+                self._pop(next(iter(self._entries)))
+
+    def delete(self, key: str) -> None:
+        """Delete a key from the cache."""
+        with self._lock:
+            if key in self._entries:
+                self._pop(key)
+
+    def clear(self) -> None:
+        """Remove all the entries and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+            self.hits = 0
+            self.misses = 0
+
+    @property
+    def size(self) -> int:
+        """Total size of the cached values, in bytes."""
+        return self._size
+
+    def stats(self) -> dict:
+        """Hits, misses, number of entries and size of the cache."""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "entries": len(self._entries),
+                "size": self._size,
+            }
+
+    def _pop(self, key: str) -> None:
+        _, size, _ = self._entries.pop(key)
+        self._size -= size
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -0,0 +1,464 @@
+import hashlib
+import json
+import logging
+import math
+import os
+import threading
+import typing
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+import duckdb
+import pandas as pd
+
+from pandasai.constants import DEFAULT_PROFILES_CACHE_SIZE, LOCAL_SOURCE_TYPES
+from pandasai.helpers.cache import LRUCache
+
+if typing.TYPE_CHECKING:
+    from ..dataframe.base import DataFrame
+
+logger = logging.getLogger(__name__)
+
+
+def _to_json_value(value: Any) -> Any:
+    """Convert a value returned by DuckDB to a JSON serializable one."""
+    if value is None or isinstance(value, (bool, int, str)):
+        return value
+    if isinstance(value, float):
+        return value if math.isfinite(value) else None
+    if isinstance(value, (dict, list, tuple)):
+        return json.dumps(value, ensure_ascii=False, default=str)
+    return str(value)
+
+
+def _quote(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+
+@dataclass
+class ColumnProfile:
+    """Statistics of a column, the distinct values being approximated."""
+
+    name: str
+    type: str
+    count: int
+    approx_distinct: int
+    min: Any = None
+    max: Any = None
+    top_values: List[Any] = field(default_factory=list)
+
+
+@dataclass
+class DatasetProfile:
+    """
+    Statistics of the columns of a version of a dataset.
+
+    `profiled_rows` is the number of rows of the last full profiling, the next
+    profilings only reading the rows appended since then.
+    """
+
+    version: str
+    rows: int
+    head: str
+    columns: List[ColumnProfile]
+    profiled_rows: int
+
+    MAX_VALUE_LENGTH: typing.ClassVar[int] = 40
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "DatasetProfile":
+        return cls(
+            version=data["version"],
+            rows=data["rows"],
+            head=data["head"],
+            columns=[ColumnProfile(**column) for column in data["columns"]],
+            profiled_rows=data["profiled_rows"],
+        )
+
+    @classmethod
+    def _shorten(cls, value: Any) -> str:
+        value = "" if value is None else str(value)
+        if len(value) > cls.MAX_VALUE_LENGTH:
+            return value[: cls.MAX_VALUE_LENGTH] + "…"
+        return value
+
+    def to_dataframe(self) -> pd.DataFrame:
+        """One row per column, with its type, null %, distinct values and range."""
+        return pd.DataFrame(
+            [
+                {
+                    "column": column.name,
+                    "type": column.type,
+                    "null_percentage": (
+                        round(100 * (self.rows - column.count) / self.rows, 1)
+                        if self.rows
+                        else 0.0
+                    ),
+                    "approx_distinct": column.approx_distinct,
+                    "min": self._shorten(column.min),
+                    "max": self._shorten(column.max),
+                    "top_values": " | ".join(
+                        self._shorten(value) for value in column.top_values
+                    ),
+                }
+                for column in self.columns
+            ],
+            columns=[
+                "column",
+                "type",
+                "null_percentage",
+                "approx_distinct",
+                "min",
+                "max",
+                "top_values",
+            ],
+        )
+
+
+class DataframeProfiler:
+    """
+    Computes the column profiles of the datasets with DuckDB, in a background
+    thread so that the prompts never wait for them.
+
+    Local datasets are profiled by running their query on their source file,
+    without loading it in memory, and their profile is stored in a
+    `profile.json` file next to their `schema.yaml`. When rows were only
+    appended to the data since the last profiling, only those rows are read
+    and their statistics are merged with the previous ones.
+    """
+
+    PROFILE_FILE = "profile.json"
+    TOP_K = 3
+    HEAD_ROWS = 5
+
+    # Last profile of each dataset
+    _profiles: LRUCache = LRUCache(max_entries=DEFAULT_PROFILES_CACHE_SIZE)
+    # Versions whose profiling failed, not profiled again
+    _failed: LRUCache = LRUCache(max_entries=DEFAULT_PROFILES_CACHE_SIZE)
+    _futures: Dict[str, Future] = {}
+    _executor: Optional[ThreadPoolExecutor] = None
+    _lock = threading.RLock()
+
+    @staticmethod
+    def _get_file_path(df: "DataFrame") -> Optional[str]:
+        """Absolute path of the source file of a local dataset, if it exists."""
+        from pandasai.config import ConfigManager
+
+        source = df.schema.source
+        if not df.path or source is None or source.type not in LOCAL_SOURCE_TYPES:
+            return None
+        file_manager = ConfigManager.get().file_manager
+        filepath = file_manager.abs_path(os.path.join(df.path, source.path))
+        return filepath if os.path.exists(filepath) else None
+
+    @staticmethod
+    def get_key(df: "DataFrame") -> str:
+        """Identifier of the dataset, shared by all of its versions."""
+        return df.path or f"{df.schema.name}:{df.column_hash}"
+
+    @classmethod
+    def get_version(cls, df: "DataFrame") -> str:
+        """Token changing with the schema and the data of the dataset."""
+        version = hashlib.md5(df.schema.model_dump_json().encode()).hexdigest()
+        filepath = cls._get_file_path(df)
+        if filepath is not None:
+            try:
+                stat = os.stat(filepath)
+                return (
+                    f"{version}:{filepath}:{stat.st_mtime_ns}:{stat.st_size}:{len(df)}"
+                )
+            except OSError:
+                pass
+        return f"{version}:{df.get_fingerprint()}"
+
+    @classmethod
+    def _get_current(cls, df: "DataFrame", version: str) -> Optional[DatasetProfile]:
+        key = cls.get_key(df)
+        profile = cls._profiles.get(key)
+        if profile is None or profile.version != version:
+            # Another process may have stored the profile of this version
+            profile = cls._load(df)
+            if profile is None or profile.version != version:
+                return None
+            cls._profiles.set(key, profile)
+        return profile
+
+    @classmethod
+    def get_profile(cls, df: "DataFrame") -> Optional[DatasetProfile]:
+        """
+        Profile of the current version of df, without waiting for it.
+
+        If it has not been computed yet, its computation is started in the
+        background and None is returned.
+        """
+        version = cls.get_version(df)
+        profile = cls._get_current(df, version)
+        if profile is None and cls._failed.get(version) is None:
+            cls.submit(df, version)
+        return profile
+
+    @classmethod
+    def profile(cls, df: "DataFrame") -> DatasetProfile:
+        """Profile of the current version of df, waiting for its computation."""
+        version = cls.get_version(df)
+        profile = cls._get_current(df, version)
+        if profile is not None:
+            return profile
+        return cls.submit(df, version).result()
+
+    @classmethod
+    def submit(cls, df: "DataFrame", version: Optional[str] = None) -> Future:
+        """Start the profiling of df in the background, unless already running."""
+        version = version or cls.get_version(df)
+        with cls._lock:
+            future = cls._futures.get(version)
+            if future is None:
+                if cls._executor is None:
+                    cls._executor = ThreadPoolExecutor(
+                        max_workers=1, thread_name_prefix="pandasai-profiler"
+                    )
+                future = cls._executor.submit(cls._run, df, version)
+                cls._futures[version] = future
+                future.add_done_callback(lambda _: cls._forget(version))
+        return future
+
+    @classmethod
+    def _forget(cls, version: str) -> None:
+        with cls._lock:
+            cls._futures.pop(version, None)
+
+    @classmethod
+    def _run(cls, df: "DataFrame", version: str) -> DatasetProfile:
+        try:
+            profile, stored = cls._profile(df, version)
+        except Exception as e:
+            cls._failed.set(version, True)
+            logger.warning(f"Failed to profile the dataset {df.schema.name}: {e}")
+            raise
+
+        cls._profiles.set(cls.get_key(df), profile)
+        if stored:
+            cls._save(df, profile)
+        return profile
+
+    @classmethod
+    def _get_query(
+        cls, df: "DataFrame", connection: duckdb.DuckDBPyConnection
+    ) -> Tuple[str, bool, bool]:
+        """
+        Query returning the data of df, whether rows appended to its source are
+        appended to its result, and whether it reads the source file.
+        """
+        if cls._get_file_path(df) is not None:
+            from pandasai.query_builders import LocalQueryBuilder
+
+            query_builder = LocalQueryBuilder(df.schema, df.path)
+            query = query_builder.build_query()
+            # Frames derived from the dataset, like filtered ones, keep its path
+            rows = connection.sql(f"SELECT count(*) FROM ({query})").fetchone()[0]
+            if rows == len(df):
+                schema = df.schema
+                appendable = not (
+                    schema.group_by
+                    or schema.order_by
+                    or schema.limit
+                    or query_builder._check_distinct()
+                )
+                return query, appendable, True
+
+        connection.register("dataset", pd.DataFrame(df))
+        return 'SELECT * FROM "dataset"', True, False
+
+    @classmethod
+    def _profile(cls, df: "DataFrame", version: str) -> Tuple[DatasetProfile, bool]:
+        """Profile of df, and whether it was computed from its source file."""
+        connection = duckdb.connect()
+        try:
+            query, appendable, stored = cls._get_query(df, connection)
+            previous = cls._profiles.get(cls.get_key(df))
+            if stored:
+                previous = cls._load(df) or previous
+            if previous is not None and previous.version == version:
+                return previous, stored
+
+            if (
+                appendable
+                and previous is not None
+                and previous.head
+                == cls._get_head(
+                    connection, query, min(cls.HEAD_ROWS, previous.profiled_rows)
+                )
+            ):
+                rows = connection.sql(f"SELECT count(*) FROM ({query})").fetchone()[0]
+                # The approximations of the merges grow with the appended rows,
+                # so the data is profiled again once it has doubled
+                if previous.rows < rows <= 2 * previous.profiled_rows:
+                    appended_rows, columns = cls._compute(
+                        connection, query, offset=previous.rows
+                    )
+                    profile = cls._merge(previous, appended_rows, columns)
+                    if profile is not None:
+                        profile.version = version
+                        return profile, stored
+
+            rows, columns = cls._compute(connection, query)
+            profile = DatasetProfile(
+                version=version,
+                rows=rows,
+                head=cls._get_head(connection, query, cls.HEAD_ROWS),
+                columns=columns,
+                profiled_rows=rows,
+            )
+            return profile, stored
+        finally:
+            connection.close()
+
+    @staticmethod
+    def _get_head(
+        connection: duckdb.DuckDBPyConnection, query: str, limit: int
+    ) -> str:
+        """Hash of the first rows, unchanged when rows are appended."""
+        rows = connection.sql(f"SELECT * FROM ({query}) LIMIT {limit}").fetchall()
+        return hashlib.md5(repr(rows).encode()).hexdigest()
+
+    @classmethod
+    def _compute(
+        cls, connection: duckdb.DuckDBPyConnection, query: str, offset: int = 0
+    ) -> Tuple[int, List[ColumnProfile]]:
+        """Profile the rows of the query after `offset`, in a single scan."""
+        if offset:
+            query = f"SELECT * FROM ({query}) OFFSET {offset}"
+        described = connection.sql(f"DESCRIBE {query}").fetchall()
+
+        aggregates = ["count(*)"]
+        for name, *_ in described:
+            column = _quote(name)
+            aggregates += [
+                f"count({column})",
+                f"approx_count_distinct({column})",
+                f"min({column})",
+                f"max({column})",
+                f"approx_top_k({column}, {cls.TOP_K})",
+            ]
+        values = connection.sql(
+            f"SELECT {', '.join(aggregates)} FROM ({query})"
+        ).fetchone()
+
+        columns = []
+        for index, (name, column_type, *_) in enumerate(described):
+            count, approx_distinct, min_value, max_value, top_values = values[
+                1 + 5 * index : 6 + 5 * index
+            ]
+            columns.append(
+                ColumnProfile(
+                    name=name,
+                    type=column_type,
+                    count=count,
+                    approx_distinct=min(approx_distinct, count),
+                    min=_to_json_value(min_value),
+                    max=_to_json_value(max_value),
+                    top_values=[_to_json_value(value) for value in top_values or []],
+                )
+            )
+        return values[0], columns
+
+    @classmethod
+    def _merge(
+        cls,
+        previous: DatasetProfile,
+        appended_rows: int,
+        appended_columns: List[ColumnProfile],
+    ) -> Optional[DatasetProfile]:
+        """
+        Merge the profile of the appended rows into the previous one, None if
+        the columns changed. The distinct values are bounded by the sum of
+        those of both parts.
+        """
+        if [(column.name, column.type) for column in previous.columns] != [
+            (column.name, column.type) for column in appended_columns
+        ]:
+            return None
+
+        columns = []
+        for old, new in zip(previous.columns, appended_columns):
+            count = old.count + new.count
+            columns.append(
+                ColumnProfile(
+                    name=old.name,
+                    type=old.type,
+                    count=count,
+                    approx_distinct=min(
+                        old.approx_distinct + new.approx_distinct, count
+                    ),
+                    min=cls._combine(min, old.min, new.min),
+                    max=cls._combine(max, old.max, new.max),
+                    top_values=(
+                        old.top_values
+                        + [
+                            value
+                            for value in new.top_values
+                            if value not in old.top_values
+                        ]
+                    )[: cls.TOP_K],
+                )
+            )
+        return DatasetProfile(
+            version=previous.version,
+            rows=previous.rows + appended_rows,
+            head=previous.head,
+            columns=columns,
+            profiled_rows=previous.profiled_rows,
+        )
+
+    @staticmethod
+    def _combine(function, old: Any, new: Any) -> Any:
+        if old is None or new is None:
+            return new if old is None else old
+        try:
+            return function(old, new)
+        except TypeError:
+            return old
+
+    @classmethod
+    def _get_profile_path(cls, df: "DataFrame") -> Optional[str]:
+        if cls._get_file_path(df) is None:
+            return None
+        return os.path.join(df.path, cls.PROFILE_FILE)
+
+    @classmethod
+    def _load(cls, df: "DataFrame") -> Optional[DatasetProfile]:
+        """Profile stored next to the schema of a local dataset, if any."""
+        from pandasai.config import ConfigManager
+
+        path = cls._get_profile_path(df)
+        file_manager = ConfigManager.get().file_manager
+        if path is None or not file_manager.exists(path):
+            return None
+        try:
+            return DatasetProfile.from_dict(json.loads(file_manager.load(path)))
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+    @classmethod
+    def _save(cls, df: "DataFrame", profile: DatasetProfile) -> None:
+        from pandasai.config import ConfigManager
+
+        path = cls._get_profile_path(df)
+        if path is None:
+            return
+        try:
+            ConfigManager.get().file_manager.write(
+                path, json.dumps(profile.to_dict(), ensure_ascii=False)
+            )
+        except OSError as e:
+            logger.warning(f"Failed to store the profile of {df.schema.name}: {e}")
+
+    @classmethod
+    def clear(cls) -> None:
+        """Forget the profiles kept in memory and the failed profilings."""
+        cls._profiles.clear()
+        cls._failed.clear()
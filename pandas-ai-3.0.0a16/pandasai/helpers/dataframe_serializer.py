@@ -1,26 +1,93 @@
+import hashlib
 import json
 import typing
+from typing import List, Optional
+
+import pandas as pd
+
+from pandasai.constants import DEFAULT_SERIALIZED_TABLES_CACHE_SIZE
+from pandasai.helpers.cache import LRUCache
 
 if typing.TYPE_CHECKING:
     from ..dataframe.base import DataFrame
+    from .dataframe_profiler import DatasetProfile
 
 
 class DataframeSerializer:
     MAX_COLUMN_TEXT_LENGTH = 200
 
+    # Serialized tables, keyed by the version of their dataset
+    _cache: LRUCache = LRUCache(max_entries=DEFAULT_SERIALIZED_TABLES_CACHE_SIZE)
+
+    @classmethod
+    def get_key(
+        cls,
+        df: "DataFrame",
+        dialect: str = "postgres",
+        columns: Optional[List[str]] = None,
+        profile: Optional["DatasetProfile"] = None,
+    ) -> str:
+        """
+        Key of the serialized df, changing with its schema and the data shown
+        in the <table> block.
+        """
+        schema_hash = hashlib.md5(df.schema.model_dump_json().encode()).hexdigest()
+        key = f"{dialect}|{schema_hash}|{df.get_fingerprint()}"
+        if columns is not None:
+            key += "|" + ",".join(columns)
+        if profile is not None:
+            key += f"|profile:{profile.version}"
+        return key
+
     @classmethod
-    def serialize(cls, df: "DataFrame", dialect: str = "postgres") -> str:
+    def serialize(
+        cls,
+        df: "DataFrame",
+        dialect: str = "postgres",
+        columns: Optional[List[str]] = None,
+        profile: Optional["DatasetProfile"] = None,
+    ) -> str:
         """
         Convert df to a CSV-like format wrapped inside <table> tags, truncating long text values, and serializing only a subset of rows using df.head().
+        With a profile, the statistics of the columns replace the rows.
+        The result is cached until the schema or the data of df change.
 
         Args:
             df (pd.DataFrame): Pandas DataFrame
             dialect (str): Database dialect (default is "postgres")
+            columns (List[str], optional): Columns to serialize, all of them
+                if None. The dimensions are still those of the whole df.
+            profile (DatasetProfile, optional): Profile of the columns of df.
 
         Returns:
             str: Serialized DataFrame string
         """
+        key = cls.get_key(df, dialect, columns, profile)
+        dataframe_info = cls._cache.get(key)
+        if dataframe_info is None:
+            dataframe_info = cls._serialize(df, dialect, columns, profile)
+            cls._cache.set(key, dataframe_info)
+
+        return dataframe_info
+
+    @staticmethod
+    def _get_names(columns: List[str]) -> set:
+        # The columns of views are named after their alias, or "table_column"
+        return set(columns) | {column.replace(".", "_") for column in columns}
+
+    @classmethod
+    def _select_columns(cls, head: pd.DataFrame, columns: List[str]) -> pd.DataFrame:
+        names = cls._get_names(columns)
+        return head[[column for column in head.columns if column in names]]
 
+    @classmethod
+    def _serialize(
+        cls,
+        df: "DataFrame",
+        dialect: str,
+        columns: Optional[List[str]] = None,
+        profile: Optional["DatasetProfile"] = None,
+    ) -> str:
         # Start building the table metadata
         dataframe_info = f'<table dialect="{dialect}" table_name="{df.schema.name}"'
 
@@ -28,10 +95,26 @@ class DataframeSerializer:
         if df.schema.description is not None:
             dataframe_info += f' description="{df.schema.description}"'
 
-        dataframe_info += f' dimensions="{df.rows_count}x{df.columns_count}">'
+        dataframe_info += f' dimensions="{df.rows_count}x{df.columns_count}"'
+
+        if profile is not None:
+            statistics = profile.to_dataframe()
+            if columns is not None:
+                statistics = statistics[
+                    statistics["column"].isin(cls._get_names(columns))
+                ]
+            dataframe_info += ' content="column statistics">'
+            dataframe_info += f"\n{statistics.to_csv(index=False)}</table>\n"
+            return dataframe_info
+
+        dataframe_info += ">"
+
+        head = pd.DataFrame(df.head())
+        if columns is not None:
+            head = cls._select_columns(head, columns)
 
         # Truncate long values
-        df_truncated = cls._truncate_dataframe(df.head())
+        df_truncated = cls._truncate_dataframe(head)
 
         # Convert to CSV format
         dataframe_info += f"\n{df_truncated.to_csv(index=False)}"
@@ -42,15 +125,56 @@ class DataframeSerializer:
         return dataframe_info
 
     @classmethod
-    def _truncate_dataframe(cls, df: "DataFrame") -> "DataFrame":
-        """Truncates string values exceeding MAX_COLUMN_TEXT_LENGTH, and converts JSON-like values to truncated strings."""
+    def clear(cls) -> None:
+        """Remove all the serialized tables and reset the hit/miss counters."""
+        cls._cache.clear()
 
-        def truncate_value(value):
-            if isinstance(value, (dict, list)):  # Convert JSON-like objects to strings
-                value = json.dumps(value, ensure_ascii=False)
-
-            if isinstance(value, str) and len(value) > cls.MAX_COLUMN_TEXT_LENGTH:
-                return f"{value[: cls.MAX_COLUMN_TEXT_LENGTH]}…"
-            return value
+    @classmethod
+    def stats(cls) -> dict:
+        """Hits, misses and number of serialized tables."""
+        return cls._cache.stats()
 
-        return df.applymap(truncate_value)
+    @classmethod
+    def _truncate_dataframe(cls, df: "DataFrame") -> "DataFrame":
+        """Truncates string values exceeding MAX_COLUMN_TEXT_LENGTH, and converts JSON-like values to truncated strings."""
+        df = pd.DataFrame(df)
+        truncated = {}
+
+        # Only text columns can hold long or JSON-like values
+        for index in range(df.shape[1]):
+            values = df.iloc[:, index]
+            if not (
+                pd.api.types.is_object_dtype(values)
+                or pd.api.types.is_string_dtype(values)
+            ):
+                continue
+
+            # Convert JSON-like objects to strings
+            is_json = values.map(lambda value: isinstance(value, (dict, list)))
+            if is_json.any():
+                values = values.where(
+                    ~is_json,
+                    values[is_json].map(
+                        lambda value: json.dumps(value, ensure_ascii=False)
+                    ),
+                )
+
+            try:
+                is_long = values.str.len().gt(cls.MAX_COLUMN_TEXT_LENGTH)
+            except AttributeError:
+                # No text values in the column
+                continue
+            if is_long.any():
+                values = values.where(
+                    ~is_long, values.str.slice(0, cls.MAX_COLUMN_TEXT_LENGTH) + "…"
+                )
+            if is_long.any() or is_json.any():
+                truncated[index] = values
+
+        if not truncated:
+            return df
+
+        df = df.copy()
+        for index, values in truncated.items():
+            df.isetitem(index, values)
+        return df
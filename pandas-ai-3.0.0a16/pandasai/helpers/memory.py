@@ -1,26 +1,209 @@
 """ Memory class to store the conversations """
-from typing import Union
+from typing import Callable, List, Optional, Union
+
+from .memory_store import MemoryStore
+
+
+def count_tokens(text: str) -> int:
+    """
+    Approximate number of tokens of a text, about 4 characters per token for
+    English text with the common tokenizers.
+    """
+    return (len(text) + 3) // 4
+
+
+def summarize_messages(summary: str, messages: List[dict]) -> str:
+    """
+    Extend the summary of the conversation with messages leaving the window,
+    keeping the questions of the user.
+
+    Args:
+        summary (str): The current summary, empty if there is none.
+        messages (List[dict]): The messages to add to the summary.
+
+    Returns:
+        str: The summary, one line per question.
+    """
+    lines = [summary] if summary else []
+    for message in messages:
+        if message["is_user"]:
+            lines.append(f"- {Memory._truncate(message['message'])}")
+    return "\n".join(lines)
 
 
 class Memory:
-    """Memory class to store the conversations"""
+    """
+    Memory class to store the conversations
+
+    With a token budget, the last messages are kept as they are as long as they
+    fit in the budget, older messages are compressed into a summary of the
+    conversation. The summary is only extended when messages leave the window,
+    not for every prompt.
+
+    Bound to a session of a `MemoryStore`, the memory only holds the window of
+    the conversation: it is loaded from the store, and the new messages and the
+    summary are written to it at once by `flush`.
+    """
 
     _messages: list
     _memory_size: int
     agent_description: str
 
     def __init__(
-        self, memory_size: int = 1, agent_description: Union[str, None] = None
+        self,
+        memory_size: int = 1,
+        agent_description: Union[str, None] = None,
+        max_tokens: Optional[int] = None,
+        tokenizer: Optional[Callable[[str], int]] = None,
+        summarizer: Optional[Callable[[str, List[dict]], str]] = None,
+        store: Optional[MemoryStore] = None,
+        session_id: Optional[str] = None,
     ):
-        self._messages = []
+        """
+        Args:
+            memory_size (int): Number of last messages in the conversation of
+                the prompts.
+            agent_description (str, optional): Description of the agent.
+            max_tokens (int, optional): Token budget of the conversation of the
+                prompts, including its summary. Unbounded by default.
+            tokenizer (Callable[[str], int], optional): Counts the tokens of a
+                text, `count_tokens` by default.
+            summarizer (Callable[[str, List[dict]], str], optional): Extends the
+                summary with the messages leaving the window,
+                `summarize_messages` by default.
+            store (MemoryStore, optional): Store persisting the conversation.
+            session_id (str, optional): Session of the conversation in the
+                store, its window is loaded from it.
+        """
         self._memory_size = memory_size
         self.agent_description = agent_description
+        self.max_tokens = max_tokens
+        self.tokenizer = tokenizer or count_tokens
+        self.summarizer = summarizer or summarize_messages
+        self.store = store
+        self.session_id = session_id
+        self._reset()
+        if store is not None and session_id is not None:
+            self.load()
 
     def add(self, message: str, is_user: bool):
+        self._append(message, is_user)
+        if self.is_bound:
+            self._pending.append(self._messages[-1])
+
+        if self.max_tokens is not None:
+            self._fit_budget()
+
+    def _append(self, message: str, is_user: bool) -> None:
         self._messages.append({"message": message, "is_user": is_user})
+        formatted = self._format(message, is_user)
+        self._formatted.append(formatted)
+        self._openai_messages.append(
+            {"role": "user" if is_user else "assistant", "content": message}
+        )
+        tokens = self.tokenizer(formatted)
+        self._tokens.append(tokens)
+        self._window_tokens += tokens
+        self._cache.clear()
+
+    def _fit_budget(self) -> None:
+        """
+        Move the oldest messages of the window to the summary while the window
+        has more than `memory_size` messages or does not fit in the token
+        budget with the summary. The last message is always kept.
+        """
+        while True:
+            start = self._window_start
+            budget = self.max_tokens - self._summary_tokens
+            while len(self._messages) - start > 1 and (
+                len(self._messages) - start > self._memory_size
+                or self._window_tokens > budget
+            ):
+                self._window_tokens -= self._tokens[start]
+                start += 1
+
+            if start == self._window_start:
+                return
+
+            evicted = self._messages[self._window_start : start]
+            self._window_start = start
+            self._set_summary(self.summarizer(self._summary, evicted))
+
+    def _set_summary(self, summary: str) -> None:
+        """Keep the summary within a quarter of the token budget."""
+        lines = summary.split("\n") if summary else []
+        max_summary_tokens = self.max_tokens // 4
+        tokens = self.tokenizer(summary) if summary else 0
+        while lines and tokens > max_summary_tokens:
+            lines.pop(0)
+            summary = "\n".join(lines)
+            tokens = self.tokenizer(summary) if summary else 0
+
+        self._summary = summary
+        self._summary_tokens = tokens
+
+    @property
+    def is_bound(self) -> bool:
+        """Whether the conversation is persisted in a store."""
+        return self.store is not None and self.session_id is not None
+
+    def bind(self, store: MemoryStore, session_id: str) -> None:
+        """
+        Persist the conversation in a session of a store, replacing the
+        conversation in memory by the one of the session.
+        """
+        self.store = store
+        self.session_id = session_id
+        self.load()
+
+    def load(self) -> dict:
+        """
+        Load the window and the summary of the conversation from the store,
+        writing the pending messages first.
+
+        Returns:
+            dict: The state stored with the conversation.
+        """
+        self.flush()
+        state = self.store.get_state(self.session_id)
+        messages, offset = self.store.get_messages(
+            self.session_id,
+            start=state.get("window_start", 0),
+            limit=self._memory_size,
+        )
+
+        self._reset()
+        self._offset = offset
+        for message in messages:
+            self._append(message["message"], message["is_user"])
+        if self.max_tokens is not None:
+            self._set_summary(state.get("summary", ""))
+            self._fit_budget()
+        return state
+
+    def flush(self, state: Optional[dict] = None) -> None:
+        """
+        Write the new messages and the summary to the store in one batch.
+
+        Args:
+            state (dict, optional): Additional state to store with them.
+        """
+        if not self.is_bound:
+            return
+
+        self.store.append(
+            self.session_id,
+            self._pending,
+            {
+                **(state or {}),
+                "summary": self._summary,
+                "window_start": self._offset + self._window_start,
+            },
+        )
+        self._pending = []
 
     def count(self) -> int:
-        return len(self._messages)
+        return self._offset + len(self._messages)
 
     def all(self) -> list:
         return self._messages
@@ -28,7 +211,13 @@ class Memory:
     def last(self) -> dict:
         return self._messages[-1]
 
-    def _truncate(self, message: Union[str, int], max_length: int = 100) -> str:
+    @property
+    def summary(self) -> str:
+        """Summary of the messages which left the window."""
+        return self._summary
+
+    @staticmethod
+    def _truncate(message: Union[str, int], max_length: int = 100) -> str:
         """
         Truncates the message if it is longer than max_length
         """
@@ -36,38 +225,57 @@ class Memory:
             f"{message[:max_length]} ..." if len(str(message)) > max_length else message
         )
 
+    def _format(self, message: str, is_user: bool) -> str:
+        return (
+            f"### QUERY\n {message}"
+            if is_user
+            else f"### ANSWER\n {self._truncate(message)}"
+        )
+
+    def _get_summary_message(self) -> list:
+        if not self._summary:
+            return []
+        return [f"### SUMMARY OF EARLIER QUESTIONS\n{self._summary}"]
+
     def get_messages(self, limit: int = None) -> list:
         """
         Returns the conversation messages based on limit parameter
-        or default memory size
+        or default memory size, in the window of the token budget
         """
         limit = self._memory_size if limit is None else limit
-
-        return [
-            f"{'### QUERY' if message['is_user'] else '### ANSWER'}\n {message['message'] if message['is_user'] else self._truncate(message['message'])}"
-            for message in self._messages[-limit:]
-        ]
+        if limit <= 0:
+            return []
+        start = max(self._window_start, len(self._formatted) - limit)
+        return self._formatted[start:]
 
     def get_conversation(self, limit: int = None) -> str:
         """
         Returns the conversation messages based on limit parameter
-        or default memory size
+        or default memory size, after the summary of the earlier questions
         """
-        return "\n".join(self.get_messages(limit))
+        key = ("conversation", limit)
+        if key not in self._cache:
+            self._cache[key] = "\n".join(
+                self._get_summary_message() + self.get_messages(limit)
+            )
+        return self._cache[key]
 
     def get_previous_conversation(self) -> str:
         """
         Returns the previous conversation but the last message
         """
-        messages = self.get_messages(self._memory_size)
-        return "" if len(messages) <= 1 else "\n".join(messages[:-1])
+        if "previous" not in self._cache:
+            messages = self.get_messages(self._memory_size)[:-1]
+            self._cache["previous"] = "\n".join(
+                self._get_summary_message() + messages
+            )
+        return self._cache["previous"]
 
     def get_last_message(self) -> str:
         """
         Returns the last message in the conversation
         """
-        messages = self.get_messages(self._memory_size)
-        return "" if len(messages) == 0 else messages[-1]
+        return self._formatted[-1] if self._formatted else ""
 
     def to_json(self):
         messages = []
@@ -80,25 +288,39 @@ class Memory:
 
     def to_openai_messages(self):
         """
-        Returns the conversation messages in the format expected by the OpenAI API
+        Returns the conversation messages in the format expected by the OpenAI API,
+        the messages of the window after the description and the summary
         """
-        messages = []
-        if self.agent_description:
-            messages.append(
-                {
-                    "role": "system",
-                    "content": self.agent_description,
-                }
-            )
-        for message in self.all():
-            if message["is_user"]:
-                messages.append({"role": "user", "content": message["message"]})
-            else:
-                messages.append({"role": "assistant", "content": message["message"]})
-        return messages
+        system_prompt = "\n\n".join(
+            content
+            for content in (self.agent_description, *self._get_summary_message())
+            if content
+        )
+        messages = [{"role": "system", "content": system_prompt}] if system_prompt else []
+        return messages + self._openai_messages[self._window_start :]
 
     def clear(self):
+        """Clear the conversation, deleting it from the store too."""
+        if self.is_bound:
+            self.store.delete(self.session_id)
+        self._reset()
+
+    def _reset(self) -> None:
         self._messages = []
+        # Messages not written to the store yet
+        self._pending = []
+        # Number of earlier messages of the session left in the store
+        self._offset = 0
+        # Rendered messages and their number of tokens, computed once per message
+        self._formatted = []
+        self._openai_messages = []
+        self._tokens = []
+        # Index of the first message kept as it is, older ones are summarized
+        self._window_start = 0
+        self._window_tokens = 0
+        self._summary = ""
+        self._summary_tokens = 0
+        self._cache = {}
 
     @property
     def size(self):
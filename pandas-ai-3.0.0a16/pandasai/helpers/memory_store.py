@@ -0,0 +1,222 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import List, Optional, Tuple
+
+from pandasai.constants import DEFAULT_FILE_PERMISSIONS
+
+from .path import find_project_root
+
+
+class MemoryStore(ABC):
+    """
+    Store of the conversations of the agents, shared by the processes serving
+    them so that any of them can resume a session.
+
+    A session is an ordered list of messages, `{"message": str, "is_user": bool}`,
+    and a JSON serializable state, like the summary of its earlier messages.
+    """
+
+    @abstractmethod
+    def append(
+        self, session_id: str, messages: List[dict], state: Optional[dict] = None
+    ) -> None:
+        """
+        Append messages to a session and replace its state, if given, at once.
+        """
+        pass
+
+    @abstractmethod
+    def get_messages(
+        self, session_id: str, start: int = 0, limit: Optional[int] = None
+    ) -> Tuple[List[dict], int]:
+        """
+        The messages of a session from the `start`-th one, at most the last
+        `limit` ones, with the position of the first message returned.
+        """
+        pass
+
+    @abstractmethod
+    def get_state(self, session_id: str) -> dict:
+        """The state of a session, empty if it does not exist."""
+        pass
+
+    @abstractmethod
+    def delete(self, session_id: str) -> None:
+        """Delete a session."""
+        pass
+
+    @abstractmethod
+    def cleanup(self) -> int:
+        """Delete the expired sessions and return their number."""
+        pass
+
+
+class SQLiteMemoryStore(MemoryStore):
+    """
+    Memory store in a SQLite database, in WAL mode so that the workers of a
+    server reading the conversations do not block the one writing to it.
+
+    The messages are indexed by session and position, so that resuming a
+    session only reads its last messages. Sessions not updated for `ttl` seconds
+    expire, they are deleted on read and at most every `cleanup_interval`
+    seconds on write.
+
+    Args:
+        filename (str): Name of the database file, without extension.
+        abs_path (str, optional): Directory of the database file, defaults to
+            the `cache` folder of the project root.
+        ttl (float, optional): Number of seconds after which an unused session
+            expires.
+        cleanup_interval (float): Minimum number of seconds between two
+            deletions of the expired sessions on write.
+    """
+
+    def __init__(
+        self,
+        filename: str = "memory_db",
+        abs_path: Optional[str] = None,
+        ttl: Optional[float] = None,
+        cleanup_interval: float = 60,
+    ):
+        store_dir = abs_path or os.path.join(find_project_root(), "cache")
+        os.makedirs(store_dir, mode=DEFAULT_FILE_PERMISSIONS, exist_ok=True)
+
+        self.filepath = os.path.join(store_dir, f"{filename}.db")
+        self.ttl = ttl
+        self.cleanup_interval = cleanup_interval
+        self._last_cleanup = 0.0
+
+        # The connection is shared between threads, statements are serialized
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(
+            self.filepath, timeout=30, check_same_thread=False
+        )
+        with self._lock, self._connection:
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS messages ("
+                "session_id TEXT NOT NULL, seq INTEGER NOT NULL, "
+                "message TEXT NOT NULL, is_user INTEGER NOT NULL, "
+                "created_at REAL NOT NULL, PRIMARY KEY (session_id, seq))"
+            )
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS sessions ("
+                "session_id TEXT PRIMARY KEY, state TEXT, updated_at REAL NOT NULL)"
+            )
+            self._connection.execute(
+                "CREATE INDEX IF NOT EXISTS sessions_updated_at "
+                "ON sessions (updated_at)"
+            )
+
+    def append(
+        self, session_id: str, messages: List[dict], state: Optional[dict] = None
+    ) -> None:
+        now = time.time()
+        with self._lock, self._connection:
+            # The position is computed by the insert itself, so that workers
+            # appending to the same session never write the same one
+            self._connection.executemany(
+                "INSERT INTO messages (session_id, seq, message, is_user, created_at) "
+                "SELECT ?, COALESCE(MAX(seq), -1) + 1, ?, ?, ? FROM messages "
+                "WHERE session_id = ?",
+                [
+                    (session_id, m["message"], int(m["is_user"]), now, session_id)
+                    for m in messages
+                ],
+            )
+            self._connection.execute(
+                "INSERT INTO sessions (session_id, state, updated_at) "
+                "VALUES (?, ?, ?) ON CONFLICT (session_id) DO UPDATE SET "
+                "state = COALESCE(excluded.state, state), "
+                "updated_at = excluded.updated_at",
+                (session_id, None if state is None else json.dumps(state), now),
+            )
+            if self.ttl is not None and now - self._last_cleanup >= (
+                self.cleanup_interval
+            ):
+                self._last_cleanup = now
+                self._delete_expired(now)
+
+    def get_messages(
+        self, session_id: str, start: int = 0, limit: Optional[int] = None
+    ) -> Tuple[List[dict], int]:
+        with self._lock, self._connection:
+            if self._get_session(session_id) is None:
+                return [], 0
+
+            (count,) = self._connection.execute(
+                "SELECT COALESCE(MAX(seq), -1) + 1 FROM messages WHERE session_id = ?",
+                (session_id,),
+            ).fetchone()
+            first = max(start, count - limit) if limit is not None else start
+            rows = self._connection.execute(
+                "SELECT message, is_user FROM messages "
+                "WHERE session_id = ? AND seq >= ? ORDER BY seq",
+                (session_id, first),
+            ).fetchall()
+        return [{"message": m, "is_user": bool(u)} for m, u in rows], first
+
+    def get_state(self, session_id: str) -> dict:
+        with self._lock, self._connection:
+            row = self._get_session(session_id)
+        return json.loads(row[0]) if row is not None and row[0] else {}
+
+    def _get_session(self, session_id: str) -> Optional[tuple]:
+        """The state and update time of a session, deleting it if expired."""
+        row = self._connection.execute(
+            "SELECT state, updated_at FROM sessions WHERE session_id = ?",
+            (session_id,),
+        ).fetchone()
+        if row is not None and self.ttl is not None:
+            if time.time() - row[1] > self.ttl:
+                self._delete(session_id)
+                return None
+        return row
+
+    def delete(self, session_id: str) -> None:
+        with self._lock, self._connection:
+            self._delete(session_id)
+
+    def _delete(self, session_id: str) -> None:
+        self._connection.execute(
+            "DELETE FROM messages WHERE session_id = ?", (session_id,)
+        )
+        self._connection.execute(
+            "DELETE FROM sessions WHERE session_id = ?", (session_id,)
+        )
+
+    def cleanup(self) -> int:
+        if self.ttl is None:
+            return 0
+
+        now = time.time()
+        with self._lock, self._connection:
+            self._last_cleanup = now
+            return self._delete_expired(now)
+
+    def _delete_expired(self, now: float) -> int:
+        expired = self._connection.execute(
+            "SELECT session_id FROM sessions WHERE updated_at < ?",
+            (now - self.ttl,),
+        ).fetchall()
+        for (session_id,) in expired:
+            self._delete(session_id)
+        return len(expired)
+
+    def destroy(self) -> None:
+        """Destroy the store."""
+        with self._lock:
+            self._connection.close()
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(self.filepath + suffix):
+                os.remove(self.filepath + suffix)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._connection.execute(
+                "SELECT COUNT(*) FROM sessions"
+            ).fetchone()[0]
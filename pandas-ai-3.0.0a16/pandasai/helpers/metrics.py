@@ -0,0 +1,395 @@
+"""
+Metrics of the processing of the queries.
+
+Every response of an agent carries a `QueryStats` breaking down the time spent
+in each stage of its processing, the SQL queries it ran, its retries, the
+errors repaired without the LLM, the calls answered by a cache of the LLM and
+the tokens used by the LLM. The stats of
+all the queries are also aggregated in the global `metrics` registry, which can
+be scraped in the Prometheus text format.
+
+Example:
+    ```python
+    from pandasai.helpers.metrics import prometheus_metrics
+
+    response = agent.chat("What is the total revenue?")
+    response.stats.timings
+    # {"prompt_render": 0.01, "llm_call": 1.52, ...}
+
+    prometheus_metrics()
+    # "# HELP pandasai_queries_total Number of processed queries..."
+    ```
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+
+class Stage:
+    """Stages of the processing of a query."""
+
+    PROMPT_RENDER = "prompt_render"
+    LLM_QUEUE = "llm_queue"
+    LLM_CALL = "llm_call"
+    CODE_VALIDATION = "code_validation"
+    SQL_QUERY = "sql_query"
+    CODE_EXECUTION = "code_execution"
+    RESPONSE_PARSE = "response_parse"
+    TOTAL = "total"
+
+
+class QueryStats:
+    """
+    Latency and resource breakdown of the processing of a query.
+
+    Timings are in seconds and accumulate over the retries. The time spent in
+    the SQL queries is also part of the code execution time.
+    """
+
+    def __init__(self):
+        self.timings: Dict[str, float] = {}
+        self.sql_queries: List[Dict[str, Any]] = []
+        self.retries = 0
+        # Errors repaired locally, each one saving a call to the LLM
+        self.repairs = 0
+        self.llm_calls = 0
+        # Calls to the LLM answered from a cache of its completions
+        self.llm_cache_hits = 0
+        self.token_usage = {"prompt_tokens": 0, "completion_tokens": 0}
+        # Speculative candidates update the stats from several threads
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def measure(self, stage: str) -> Iterator[None]:
+        """Add the time spent in the block to the timing of the stage."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_timing(stage, time.perf_counter() - start)
+
+    def add_timing(self, stage: str, seconds: float) -> None:
+        with self._lock:
+            self.timings[stage] = self.timings.get(stage, 0.0) + seconds
+
+    def add_sql_query(self, query: str, seconds: float, rows: int, size: int) -> None:
+        """Record a SQL query, its duration, number of rows and size in bytes."""
+        with self._lock:
+            self.sql_queries.append(
+                {"query": query, "time": seconds, "rows": rows, "bytes": size}
+            )
+            self.timings[Stage.SQL_QUERY] = (
+                self.timings.get(Stage.SQL_QUERY, 0.0) + seconds
+            )
+
+    def add_retry(self) -> None:
+        with self._lock:
+            self.retries += 1
+
+    def add_repair(self, count: int = 1) -> None:
+        with self._lock:
+            self.repairs += count
+
+    def add_llm_call(self) -> None:
+        with self._lock:
+            self.llm_calls += 1
+
+    def add_llm_cache_hit(self) -> None:
+        with self._lock:
+            self.llm_cache_hits += 1
+
+    def add_token_usage(self, prompt_tokens: int, completion_tokens: int) -> None:
+        with self._lock:
+            self.token_usage["prompt_tokens"] += prompt_tokens
+            self.token_usage["completion_tokens"] += completion_tokens
+
+    def merge(self, other: "QueryStats") -> None:
+        """Add the stats of a part of the processing, like a candidate code."""
+        data = other.to_dict()
+        with self._lock:
+            for stage, seconds in data["timings"].items():
+                self.timings[stage] = self.timings.get(stage, 0.0) + seconds
+            self.sql_queries.extend(data["sql_queries"])
+            self.retries += data["retries"]
+            self.repairs += data["repairs"]
+            self.llm_calls += data["llm_calls"]
+            self.llm_cache_hits += data["llm_cache_hits"]
+            self.token_usage["prompt_tokens"] += data["token_usage"]["prompt_tokens"]
+            self.token_usage["completion_tokens"] += data["token_usage"][
+                "completion_tokens"
+            ]
+
+    @property
+    def total_tokens(self) -> int:
+        return self.token_usage["prompt_tokens"] + self.token_usage["completion_tokens"]
+
+    def to_dict(self) -> dict:
+        with self._lock:
+            return {
+                "timings": dict(self.timings),
+                "sql_queries": [dict(query) for query in self.sql_queries],
+                "retries": self.retries,
+                "repairs": self.repairs,
+                "llm_calls": self.llm_calls,
+                "llm_cache_hits": self.llm_cache_hits,
+                "token_usage": {
+                    **self.token_usage,
+                    "total_tokens": self.total_tokens,
+                },
+            }
+
+    def __repr__(self) -> str:
+        return f"QueryStats({self.to_dict()!r})"
+
+
+def _format_labels(labels: Tuple[Tuple[str, str], ...]) -> str:
+    if not labels:
+        return ""
+    values = ",".join(f'{name}="{_escape(value)}"' for name, value in labels)
+    return "{" + values + "}"
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_value(value: float) -> str:
+    return repr(float(value)) if value != float("inf") else "+Inf"
+
+
+class Counter:
+    """Monotonic counter, one value per set of labels."""
+
+    type = "counter"
+
+    def __init__(self, name: str, description: str):
+        self.name = name
+        self.description = description
+        self._values: Dict[Tuple[Tuple[str, str], ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, value: float = 1, **labels: str) -> None:
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + value
+
+    def get(self, **labels: str) -> float:
+        return self._values.get(tuple(sorted(labels.items())), 0)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._values.clear()
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            return [
+                f"{self.name}{_format_labels(labels)} {_format_value(value)}"
+                for labels, value in self._values.items()
+            ]
+
+
+class Gauge(Counter):
+    """Value going up and down, one value per set of labels."""
+
+    type = "gauge"
+
+    def set(self, value: float, **labels: str) -> None:
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            self._values[key] = value
+
+    def dec(self, value: float = 1, **labels: str) -> None:
+        self.inc(-value, **labels)
+
+
+class Histogram:
+    """Distribution of observed values in cumulative buckets, per set of labels."""
+
+    type = "histogram"
+
+    DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+    def __init__(
+        self, name: str, description: str, buckets: Optional[Tuple[float, ...]] = None
+    ):
+        self.name = name
+        self.description = description
+        self.buckets = tuple(sorted(buckets or self.DEFAULT_BUCKETS)) + (float("inf"),)
+        # labels -> (bucket counts, sum, count)
+        self._values: Dict[Tuple[Tuple[str, str], ...], List[Any]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            counts, total, count = self._values.get(
+                key, [[0] * len(self.buckets), 0.0, 0]
+            )
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+            self._values[key] = [counts, total + value, count + 1]
+
+    def get_count(self, **labels: str) -> int:
+        value = self._values.get(tuple(sorted(labels.items())))
+        return value[2] if value else 0
+
+    def get_sum(self, **labels: str) -> float:
+        value = self._values.get(tuple(sorted(labels.items())))
+        return value[1] if value else 0.0
+
+    def reset(self) -> None:
+        with self._lock:
+            self._values.clear()
+
+    def samples(self) -> List[str]:
+        lines = []
+        with self._lock:
+            for labels, (counts, total, count) in self._values.items():
+                for bound, bucket_count in zip(self.buckets, counts):
+                    le = (("le", _format_value(bound)),)
+                    bucket_labels = _format_labels(labels + le)
+                    lines.append(f"{self.name}_bucket{bucket_labels} {bucket_count}")
+                lines.append(
+                    f"{self.name}_sum{_format_labels(labels)} {_format_value(total)}"
+                )
+                lines.append(f"{self.name}_count{_format_labels(labels)} {count}")
+        return lines
+
+
+class MetricsRegistry:
+    """
+    Aggregated metrics of all the processed queries, exposed in the Prometheus
+    text format by `to_prometheus`.
+    """
+
+    def __init__(self):
+        self._metrics: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+        self.queries = self.counter(
+            "pandasai_queries_total", "Number of processed queries, by status."
+        )
+        self.query_duration = self.histogram(
+            "pandasai_query_duration_seconds", "Time spent processing a query."
+        )
+        self.stage_duration = self.histogram(
+            "pandasai_stage_duration_seconds",
+            "Time spent in each stage of the processing of a query.",
+        )
+        self.retries = self.counter(
+            "pandasai_retries_total", "Number of code generation and execution retries."
+        )
+        self.llm_retries_saved = self.counter(
+            "pandasai_llm_retries_saved_total",
+            "Number of errors repaired without calling the LLM again.",
+        )
+        self.llm_calls = self.counter(
+            "pandasai_llm_calls_total", "Number of calls to the LLM."
+        )
+        self.llm_cache_hits = self.counter(
+            "pandasai_llm_cache_hits_total",
+            "Number of calls to the LLM answered from the cache.",
+        )
+        self.llm_tokens = self.counter(
+            "pandasai_llm_tokens_total", "Number of tokens used by the LLM, by type."
+        )
+        self.llm_queue_depth = self.gauge(
+            "pandasai_llm_queue_depth",
+            "Number of calls waiting for the rate limiter of an LLM backend.",
+        )
+        self.llm_in_flight = self.gauge(
+            "pandasai_llm_in_flight",
+            "Number of calls in flight through the rate limiter of an LLM backend.",
+        )
+        self.llm_queue_wait = self.histogram(
+            "pandasai_llm_queue_wait_seconds",
+            "Time spent by a call waiting for the rate limiter of an LLM backend.",
+        )
+        self.llm_failovers = self.counter(
+            "pandasai_llm_failovers_total",
+            "Number of failed calls to a backend of a router, sent to the next one.",
+        )
+        self.llm_hedges = self.counter(
+            "pandasai_llm_hedges_total",
+            "Number of slow calls of a router hedged on another backend.",
+        )
+        self.sql_queries = self.counter(
+            "pandasai_sql_queries_total", "Number of executed SQL queries."
+        )
+        self.sql_rows = self.counter(
+            "pandasai_sql_rows_total", "Number of rows returned by the SQL queries."
+        )
+        self.sql_bytes = self.counter(
+            "pandasai_sql_bytes_total", "Size of the results of the SQL queries."
+        )
+
+    def counter(self, name: str, description: str) -> Counter:
+        """Get the counter with the given name, registering it if needed."""
+        return self._register(name, lambda: Counter(name, description))
+
+    def gauge(self, name: str, description: str) -> Gauge:
+        """Get the gauge with the given name, registering it if needed."""
+        return self._register(name, lambda: Gauge(name, description))
+
+    def histogram(
+        self, name: str, description: str, buckets: Optional[Tuple[float, ...]] = None
+    ) -> Histogram:
+        """Get the histogram with the given name, registering it if needed."""
+        return self._register(name, lambda: Histogram(name, description, buckets))
+
+    def _register(self, name: str, factory):
+        with self._lock:
+            if name not in self._metrics:
+                self._metrics[name] = factory()
+            return self._metrics[name]
+
+    def record_query(self, stats: QueryStats, status: str) -> None:
+        """Aggregate the stats of a processed query."""
+        data = stats.to_dict()
+        self.queries.inc(status=status)
+        for stage, seconds in data["timings"].items():
+            if stage == Stage.TOTAL:
+                self.query_duration.observe(seconds)
+            else:
+                self.stage_duration.observe(seconds, stage=stage)
+        self.retries.inc(data["retries"])
+        self.llm_retries_saved.inc(data["repairs"])
+        self.llm_calls.inc(data["llm_calls"])
+        self.llm_cache_hits.inc(data["llm_cache_hits"])
+        self.llm_tokens.inc(data["token_usage"]["prompt_tokens"], type="prompt")
+        self.llm_tokens.inc(
+            data["token_usage"]["completion_tokens"], type="completion"
+        )
+        for query in data["sql_queries"]:
+            self.sql_queries.inc()
+            self.sql_rows.inc(query["rows"])
+            self.sql_bytes.inc(query["bytes"])
+
+    def reset(self) -> None:
+        """Reset the values of all the metrics."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        for metric in metrics:
+            metric.reset()
+
+    def to_prometheus(self) -> str:
+        """Render the metrics in the Prometheus text exposition format."""
+        lines = []
+        with self._lock:
+            metrics = list(self._metrics.values())
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {metric.description}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+
+metrics = MetricsRegistry()
+
+
+def prometheus_metrics() -> str:
+    """Metrics of all the processed queries in the Prometheus text format."""
+    return metrics.to_prometheus()
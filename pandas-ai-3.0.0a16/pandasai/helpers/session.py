@@ -1,12 +1,19 @@
 """Request helper module."""
 
+import asyncio
+import importlib
 import logging
 import os
+import random
+import threading
+import time
 import traceback
-from typing import Optional
+from http.cookiejar import DefaultCookiePolicy
+from typing import Dict, Optional
 from urllib.parse import urljoin
 
 import requests
+import urllib3
 
 from pandasai.constants import DEFAULT_API_URL
 from pandasai.exceptions import PandaAIApiCallError, PandaAIApiKeyError
@@ -15,8 +22,64 @@ from pandasai.helpers.logger import Logger
 
 load_dotenv()
 
+# Methods whose requests can be sent again without side effects
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+# Transient statuses, retried for idempotent requests
+RETRY_STATUSES = frozenset({429, 502, 503, 504})
+# Statuses telling that the request was not processed, retried for any request
+NOT_PROCESSED_STATUSES = frozenset({429, 503})
+
+_pools: Dict[tuple, requests.Session] = {}
+_pools_lock = threading.Lock()
+
+
+def _get_pool(pool_size: int, keep_alive: bool) -> requests.Session:
+    """
+    Connection pool shared by the sessions with the same settings, so that the
+    requests of the LLM and of the datasets reuse their connections instead of
+    doing a new TCP and TLS handshake every time.
+    """
+    key = (pool_size, keep_alive)
+    with _pools_lock:
+        if key not in _pools:
+            pool = requests.Session()
+            adapter = requests.adapters.HTTPAdapter(
+                pool_connections=pool_size, pool_maxsize=pool_size
+            )
+            pool.mount("http://", adapter)
+            pool.mount("https://", adapter)
+            # The pool is shared by all the API keys, it must not keep cookies
+            pool.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+            if not keep_alive:
+                pool.headers["Connection"] = "close"
+            _pools[key] = pool
+        return _pools[key]
+
 
 class Session:
+    """
+    Client of the PandaAI API.
+
+    The requests go through a pool of keep-alive connections. Failed requests
+    are retried with a jittered exponential backoff: requests which did not
+    reach the server or were not processed by it (429, 503) always, other
+    transient failures only for idempotent requests. Retries stop before the
+    `timeout` of the request is exceeded.
+
+    Args:
+        endpoint_url (str, optional): URL of the API.
+        api_key (str, optional): API key, defaults to `PANDABI_API_KEY`.
+        logger (Logger, optional): Logger of the failed requests.
+        pool_size (int): Maximum number of connections kept open per host.
+        keep_alive (bool): Whether to reuse the connections between requests.
+        max_retries (int): Maximum number of times a request is sent again.
+        backoff_factor (float): Maximum delay before the first retry, in
+            seconds, doubled for every following retry.
+        max_backoff (float): Maximum delay before a retry, in seconds.
+        http2 (bool): Whether to use HTTP/2 for the async requests, which
+            requires the `h2` package.
+    """
+
     _api_key: str
     _endpoint_url: str
     _logger: Logger
@@ -26,6 +89,12 @@ class Session:
         endpoint_url: Optional[str] = None,
         api_key: Optional[str] = None,
         logger: Optional[Logger] = None,
+        pool_size: int = 10,
+        keep_alive: bool = True,
+        max_retries: int = 3,
+        backoff_factor: float = 0.5,
+        max_backoff: float = 30,
+        http2: bool = False,
     ) -> None:
         if api_key is None:
             api_key = os.environ.get("PANDABI_API_KEY") or None
@@ -40,6 +109,17 @@ class Session:
         self._version_path = "/api"
         self._logger = logger or Logger()
 
+        self._pool_size = pool_size
+        self._keep_alive = keep_alive
+        self._max_retries = max_retries
+        self._backoff_factor = backoff_factor
+        self._max_backoff = max_backoff
+        self._http2 = http2
+        self._http = _get_pool(pool_size, keep_alive)
+        # httpx clients are bound to the event loop they are used in
+        self._async_client = None
+        self._async_client_loop = None
+
     def get(self, path=None, **kwargs):
         return self.make_request("GET", path, **kwargs)
 
@@ -55,6 +135,101 @@ class Session:
     def delete(self, path=None, **kwargs):
         return self.make_request("DELETE", path, **kwargs)
 
+    async def apost(self, path=None, **kwargs):
+        return await self.amake_request("POST", path, **kwargs)
+
+    def _get_url(self, path):
+        return urljoin(self._endpoint_url, self._version_path + path)
+
+    def _get_headers(self):
+        return {
+            "x-authorization": f"Bearer {self._api_key}",
+            "Content-Type": "application/json",  # or any other headers you need
+        }
+
+    @staticmethod
+    def _parse_response(response):
+        try:
+            data = response.json()
+        except ValueError:
+            if response.status_code == 200:
+                return response
+            data = {}
+
+        if response.status_code not in [200, 201]:
+            if "message" in data:
+                raise PandaAIApiCallError(data["message"])
+            elif "detail" in data:
+                raise PandaAIApiCallError(data["detail"])
+
+        return data
+
+    def _should_retry(
+        self,
+        method: str,
+        idempotent: Optional[bool],
+        status: Optional[int] = None,
+        connect_failed: bool = False,
+        failed: bool = False,
+    ) -> bool:
+        """
+        Whether a request can be sent again after a failed connection, a
+        transient failure or a transient status.
+        """
+        if connect_failed or status in NOT_PROCESSED_STATUSES:
+            return True
+
+        if idempotent is None:
+            idempotent = method.upper() in IDEMPOTENT_METHODS
+        return idempotent and (failed or status in RETRY_STATUSES)
+
+    def _get_retry_delay(
+        self,
+        attempt: int,
+        deadline: Optional[float],
+        headers: Optional[dict] = None,
+    ) -> Optional[float]:
+        """
+        Seconds to wait before the next attempt, at least the `Retry-After` of
+        the response, or None when there is no retry or time left.
+        """
+        if attempt >= self._max_retries:
+            return None
+
+        delay = random.uniform(
+            0, min(self._max_backoff, self._backoff_factor * 2**attempt)
+        )
+        retry_after = (headers or {}).get("Retry-After")
+        if retry_after is not None and str(retry_after).isdigit():
+            delay = max(delay, min(float(retry_after), self._max_backoff))
+
+        if deadline is not None and time.monotonic() + delay >= deadline:
+            return None
+        return delay
+
+    @staticmethod
+    def _get_attempt_timeout(
+        timeout: Optional[float], deadline: Optional[float], attempt: int
+    ) -> Optional[float]:
+        """The retries share the timeout of the request."""
+        if deadline is None or attempt == 0:
+            return timeout
+        return max(deadline - time.monotonic(), 0.0)
+
+    @staticmethod
+    def _connect_failed(error: requests.exceptions.RequestException) -> bool:
+        """Whether the request failed before reaching the server."""
+        if isinstance(error, requests.exceptions.ConnectTimeout):
+            return True
+        reason = getattr(error.args[0], "reason", None) if error.args else None
+        return isinstance(reason, urllib3.exceptions.NewConnectionError)
+
+    def _log_failure(self, error: Exception) -> None:
+        formatted = "".join(
+            traceback.format_exception(type(error), error, error.__traceback__)
+        )
+        self._logger.log(f"Request failed: {formatted}", logging.ERROR)
+
     def make_request(
         self,
         method,
@@ -64,44 +239,176 @@ class Session:
         data=None,
         json=None,
         timeout=300,
+        idempotent=None,
         **kwargs,
     ):
-        try:
-            url = urljoin(self._endpoint_url, self._version_path + path)
-            if headers is None:
-                headers = {
-                    "x-authorization": f"Bearer {self._api_key}",
-                    "Content-Type": "application/json",  # or any other headers you need
-                }
-
-            response = requests.request(
-                method,
-                url,
-                headers=headers,
-                params=params,
-                data=data,
-                json=json,
-                timeout=timeout,
-                **kwargs,
+        """
+        Send a request to the API, retrying the transient failures.
+
+        Args:
+            idempotent (bool, optional): Whether the request can be retried
+                after any transient failure, by default for the idempotent
+                methods only.
+        """
+        url = self._get_url(path)
+        if headers is None:
+            headers = self._get_headers()
+        deadline = time.monotonic() + timeout if timeout is not None else None
+
+        attempt = 0
+        while True:
+            try:
+                response = self._http.request(
+                    method,
+                    url,
+                    headers=headers,
+                    params=params,
+                    data=data,
+                    json=json,
+                    timeout=self._get_attempt_timeout(timeout, deadline, attempt),
+                    **kwargs,
+                )
+                error = None
+                retry = self._should_retry(
+                    method, idempotent, status=response.status_code
+                )
+            except requests.exceptions.RequestException as e:
+                response, error = None, e
+                retry = self._should_retry(
+                    method,
+                    idempotent,
+                    connect_failed=self._connect_failed(e),
+                    failed=isinstance(
+                        e,
+                        (
+                            requests.exceptions.ConnectionError,
+                            requests.exceptions.Timeout,
+                        ),
+                    ),
+                )
+
+            delay = (
+                self._get_retry_delay(
+                    attempt,
+                    deadline,
+                    response.headers if response is not None else None,
+                )
+                if retry
+                else None
             )
+            if delay is None:
+                break
+
+            self._logger.log(f"Retrying {method} {path} in {delay:.2f} seconds...")
+            time.sleep(delay)
+            attempt += 1
+
+        if error is not None:
+            self._log_failure(error)
+            raise PandaAIApiCallError(f"Request failed: {error}") from error
+
+        return self._parse_response(response)
 
+    def _get_async_client(self, httpx):
+        loop = asyncio.get_running_loop()
+        if self._async_client is None or self._async_client_loop is not loop:
+            keepalive_size = self._pool_size if self._keep_alive else 0
+            self._async_client = httpx.AsyncClient(
+                http2=self._http2,
+                limits=httpx.Limits(
+                    max_connections=self._pool_size,
+                    max_keepalive_connections=keepalive_size,
+                ),
+            )
+            self._async_client_loop = loop
+        return self._async_client
+
+    async def amake_request(
+        self,
+        method,
+        path,
+        headers=None,
+        params=None,
+        data=None,
+        json=None,
+        timeout=300,
+        idempotent=None,
+        **kwargs,
+    ):
+        """
+        Async counterpart of `make_request`, sending the request with httpx so
+        that the event loop is not blocked while waiting for the API.
+        """
+        try:
+            httpx = importlib.import_module("httpx")
+        except ImportError as e:
+            raise ImportError(
+                "httpx not found. Please install it to call the PandaAI API "
+                "asynchronously."
+            ) from e
+
+        client = self._get_async_client(httpx)
+        url = self._get_url(path)
+        if headers is None:
+            headers = self._get_headers()
+        deadline = time.monotonic() + timeout if timeout is not None else None
+
+        attempt = 0
+        while True:
             try:
-                data = response.json()
-            except ValueError:
-                if response.status_code == 200:
-                    return response
-
-            if response.status_code not in [200, 201]:
-                if "message" in data:
-                    raise PandaAIApiCallError(data["message"])
-                elif "detail" in data:
-                    raise PandaAIApiCallError(data["detail"])
-
-            return data
-
-        except requests.exceptions.RequestException as e:
-            self._logger.log(f"Request failed: {traceback.format_exc()}", logging.ERROR)
-            raise PandaAIApiCallError(f"Request failed: {e}") from e
+                response = await client.request(
+                    method,
+                    url,
+                    headers=headers,
+                    params=params,
+                    data=data,
+                    json=json,
+                    timeout=self._get_attempt_timeout(timeout, deadline, attempt),
+                    **kwargs,
+                )
+                error = None
+                retry = self._should_retry(
+                    method, idempotent, status=response.status_code
+                )
+            except httpx.HTTPError as e:
+                response, error = None, e
+                retry = self._should_retry(
+                    method,
+                    idempotent,
+                    connect_failed=isinstance(
+                        e, (httpx.ConnectError, httpx.ConnectTimeout)
+                    ),
+                    failed=isinstance(e, httpx.TransportError),
+                )
+
+            delay = (
+                self._get_retry_delay(
+                    attempt,
+                    deadline,
+                    response.headers if response is not None else None,
+                )
+                if retry
+                else None
+            )
+            if delay is None:
+                break
+
+            self._logger.log(f"Retrying {method} {path} in {delay:.2f} seconds...")
+            await asyncio.sleep(delay)
+            attempt += 1
+
+        if error is not None:
+            self._log_failure(error)
+            raise PandaAIApiCallError(f"Request failed: {error}") from error
+
+        return self._parse_response(response)
+
+    async def aclose(self) -> None:
+        """Close the connections of the async requests."""
+        if self._async_client is not None:
+            await self._async_client.aclose()
+            self._async_client = None
+            self._async_client_loop = None
 
 
 def get_pandaai_session() -> Session:
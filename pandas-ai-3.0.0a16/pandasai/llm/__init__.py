@@ -1,7 +1,14 @@
 from .bamboo_llm import BambooLLM
-from .base import LLM
+from .base import LLM, RateLimiter
+from .cached_llm import CachedLLM
+from .replay_llm import ReplayLLM
+from .router_llm import RouterLLM
 
 __all__ = [
     "LLM",
     "BambooLLM",
+    "CachedLLM",
+    "RateLimiter",
+    "ReplayLLM",
+    "RouterLLM",
 ]
@@ -17,9 +17,27 @@ class BambooLLM(LLM):
     ):
         self._session = Session(endpoint_url=endpoint_url, api_key=api_key)
 
-    def call(self, instruction: BasePrompt, _context=None) -> str:
+    def _get_request_kwargs(self, context=None) -> dict:
+        # Generating code has no side effect, the query can be sent again
+        kwargs = {"idempotent": True}
+        timeout = self._get_request_timeout(context)
+        if timeout is not None:
+            kwargs["timeout"] = timeout
+        return kwargs
+
+    def call(self, instruction: BasePrompt, context=None) -> str:
         response = self._session.post(
-            "/query", json={"prompt": instruction.to_string()}
+            "/query",
+            json={"prompt": instruction.to_string()},
+            **self._get_request_kwargs(context),
+        )
+        return response["answer"]
+
+    async def acall(self, instruction: BasePrompt, context=None) -> str:
+        response = await self._session.apost(
+            "/query",
+            json={"prompt": instruction.to_string()},
+            **self._get_request_kwargs(context),
         )
         return response["answer"]
 
@@ -1,28 +1,348 @@
 from __future__ import annotations
 
 import ast
+import asyncio
+import heapq
+import inspect
+import itertools
 import re
+import threading
+import time
 from abc import abstractmethod
-from typing import TYPE_CHECKING, Any, Optional
+from typing import TYPE_CHECKING, Any, AsyncIterable, Iterable, List, Optional, Tuple
 
 from pandasai.core.prompts.base import BasePrompt
 from pandasai.core.prompts.generate_system_message import GenerateSystemMessagePrompt
-from pandasai.helpers.memory import Memory
+from pandasai.helpers.memory import Memory, count_tokens
+from pandasai.helpers.metrics import Stage, metrics
 
 from ..exceptions import (
     APIKeyNotFoundError,
     MethodNotImplementedError,
     NoCodeFoundError,
+    QueryTimeoutError,
 )
 
 if TYPE_CHECKING:
     from pandasai.agent.state import AgentState
 
 
+class _TokenBucket:
+    """Bucket of `per_minute` units, refilled continuously."""
+
+    def __init__(self, per_minute: float):
+        self.capacity = per_minute
+        self.rate = per_minute / 60
+        self.level = float(per_minute)
+        self.updated = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def get_delay(self, amount: float) -> float:
+        """Seconds before `amount` units, at most the capacity, are available."""
+        self._refill()
+        missing = min(amount, self.capacity) - self.level
+        return missing / self.rate if missing > 0 else 0.0
+
+    def consume(self, amount: float) -> None:
+        """Take units from the bucket, which may go into debt."""
+        self._refill()
+        self.level -= amount
+
+
+class RateLimiter:
+    """
+    Limit of the calls to an LLM backend: maximum number of calls in flight,
+    and of requests and tokens per minute. Share one limiter between all the
+    LLMs calling the same backend.
+
+    Waiting calls are served by priority, then in arrival order. The number of
+    waiting calls and of calls in flight, and the time spent waiting, are
+    exposed in the metrics registry under the name of the limiter.
+
+    The tokens of a call are estimated from its prompt before sending it, and
+    corrected with the usage reported by the LLM, or the size of the
+    completion, once it returns.
+
+    Example:
+        ```python
+        limiter = RateLimiter(max_concurrency=8, requests_per_minute=500)
+        llm = OpenAI(model="gpt-4o")
+        llm.rate_limiter = limiter
+        ```
+
+    Args:
+        max_concurrency (int, optional): Maximum number of calls in flight.
+        requests_per_minute (float, optional): Maximum number of calls per minute.
+        tokens_per_minute (float, optional): Maximum number of tokens per minute.
+        name (str): Name of the backend in the metrics.
+    """
+
+    # Priorities of the calls, the lowest one is served first
+    INTERACTIVE = 0
+    BATCH = 10
+
+    # Seconds between two checks of an async call waiting for its turn
+    _poll_interval = 0.05
+
+    def __init__(
+        self,
+        max_concurrency: Optional[int] = None,
+        requests_per_minute: Optional[float] = None,
+        tokens_per_minute: Optional[float] = None,
+        name: str = "llm",
+    ):
+        if max_concurrency is not None and max_concurrency < 1:
+            raise ValueError("max_concurrency must be a positive integer.")
+
+        self.max_concurrency = max_concurrency
+        self.name = name
+        self._requests = (
+            _TokenBucket(requests_per_minute) if requests_per_minute else None
+        )
+        self._tokens = _TokenBucket(tokens_per_minute) if tokens_per_minute else None
+        self._in_flight = 0
+        # Waiting calls, (priority, arrival order)
+        self._queue: List[Tuple[int, int]] = []
+        self._arrivals = itertools.count()
+        self._condition = threading.Condition()
+
+    @property
+    def queue_depth(self) -> int:
+        """Number of calls waiting for their turn."""
+        return len(self._queue)
+
+    @property
+    def in_flight(self) -> int:
+        """Number of calls in flight."""
+        return self._in_flight
+
+    def _enqueue(self, priority: int) -> Tuple[int, int]:
+        ticket = (priority, next(self._arrivals))
+        heapq.heappush(self._queue, ticket)
+        metrics.llm_queue_depth.set(len(self._queue), backend=self.name)
+        return ticket
+
+    def _dequeue(self, ticket: Tuple[int, int]) -> None:
+        self._queue.remove(ticket)
+        heapq.heapify(self._queue)
+        metrics.llm_queue_depth.set(len(self._queue), backend=self.name)
+        self._condition.notify_all()
+
+    def _try_acquire(self, ticket: Tuple[int, int], tokens: int) -> Optional[float]:
+        """
+        Take the turn of the call if it is the first one and the limits allow
+        it. The caller must hold `_condition`.
+
+        Returns:
+            Optional[float]: 0 if the turn has been taken, otherwise the seconds
+                before the limits may allow it, None to wait for another call.
+        """
+        if self._queue[0] != ticket:
+            return None
+        if self.max_concurrency is not None and self._in_flight >= self.max_concurrency:
+            return None
+
+        delay = max(
+            self._requests.get_delay(1) if self._requests else 0.0,
+            self._tokens.get_delay(tokens) if self._tokens else 0.0,
+        )
+        if delay > 0:
+            return delay
+
+        heapq.heappop(self._queue)
+        if self._requests:
+            self._requests.consume(1)
+        if self._tokens:
+            self._tokens.consume(tokens)
+        self._in_flight += 1
+        metrics.llm_queue_depth.set(len(self._queue), backend=self.name)
+        metrics.llm_in_flight.set(self._in_flight, backend=self.name)
+        # The next call in the queue may go now
+        self._condition.notify_all()
+        return 0.0
+
+    @staticmethod
+    def _get_wait(delay: Optional[float], deadline: Optional[float]) -> Optional[float]:
+        """
+        Seconds to wait for the next attempt to take the turn, bounded by the
+        deadline.
+
+        Raises:
+            QueryTimeoutError: If the deadline has passed.
+        """
+        if deadline is None:
+            return delay
+
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise QueryTimeoutError(
+                "The processing of the query timed out waiting for the LLM."
+            )
+        return remaining if delay is None else min(delay, remaining)
+
+    def _observe_wait(self, start: float) -> float:
+        waited = time.monotonic() - start
+        metrics.llm_queue_wait.observe(waited, backend=self.name)
+        return waited
+
+    def acquire(
+        self,
+        tokens: int = 0,
+        priority: int = INTERACTIVE,
+        timeout: Optional[float] = None,
+    ) -> float:
+        """
+        Wait for the turn of a call.
+
+        Args:
+            tokens (int): Estimated number of tokens of the call.
+            priority (int): Priority of the call, `INTERACTIVE` or `BATCH`.
+            timeout (float, optional): Maximum number of seconds to wait.
+
+        Returns:
+            float: The seconds spent waiting.
+
+        Raises:
+            QueryTimeoutError: If the turn of the call did not come in time.
+        """
+        start = time.monotonic()
+        deadline = start + timeout if timeout is not None else None
+        with self._condition:
+            ticket = self._enqueue(priority)
+            try:
+                while True:
+                    delay = self._try_acquire(ticket, tokens)
+                    if delay == 0:
+                        break
+                    self._condition.wait(self._get_wait(delay, deadline))
+            except BaseException:
+                self._dequeue(ticket)
+                raise
+        return self._observe_wait(start)
+
+    async def aacquire(
+        self,
+        tokens: int = 0,
+        priority: int = INTERACTIVE,
+        timeout: Optional[float] = None,
+    ) -> float:
+        """Async counterpart of `acquire`, not blocking the event loop."""
+        start = time.monotonic()
+        deadline = start + timeout if timeout is not None else None
+        with self._condition:
+            ticket = self._enqueue(priority)
+        try:
+            while True:
+                with self._condition:
+                    delay = self._try_acquire(ticket, tokens)
+                if delay == 0:
+                    break
+                wait = self._get_wait(delay, deadline)
+                await asyncio.sleep(
+                    min(wait, self._poll_interval)
+                    if wait is not None
+                    else self._poll_interval
+                )
+        except BaseException:
+            with self._condition:
+                self._dequeue(ticket)
+            raise
+        return self._observe_wait(start)
+
+    def release(self, extra_tokens: int = 0) -> None:
+        """
+        End a call, with the number of tokens it used beyond its estimate, or
+        below it if negative.
+        """
+        with self._condition:
+            self._in_flight -= 1
+            if self._tokens and extra_tokens:
+                self._tokens.consume(extra_tokens)
+            metrics.llm_in_flight.set(self._in_flight, backend=self.name)
+            self._condition.notify_all()
+
+    def stats(self) -> dict:
+        """Number of waiting calls and of calls in flight."""
+        with self._condition:
+            return {"queue_depth": len(self._queue), "in_flight": self._in_flight}
+
+
+class CodeStreamExtractor:
+    """
+    Incremental extraction of the code of a streamed completion: the completion
+    is complete as soon as its first fenced block is closed and holds valid
+    Python code, the explanation usually following it is not needed.
+
+    Args:
+        llm (LLM): The LLM streaming the completion, polishing the code.
+        separator (str): The fence of the code blocks.
+    """
+
+    def __init__(self, llm: LLM, separator: str = "```"):
+        self.llm = llm
+        self.separator = separator
+        self.is_complete = False
+        self._chunks: List[str] = []
+        # End of the opening fence, and position the closing one is searched from
+        self._code_start: Optional[int] = None
+        self._scan_start = 0
+        # Only the first block is extracted, the next ones are not looked for
+        self._first_block_closed = False
+
+    @property
+    def text(self) -> str:
+        """The completion received so far, up to the closing fence if complete."""
+        if len(self._chunks) != 1:
+            self._chunks = ["".join(self._chunks)]
+        return self._chunks[0]
+
+    def feed(self, chunk: str) -> bool:
+        """
+        Add a chunk of the completion.
+
+        Returns:
+            bool: Whether the code is complete, the rest of the stream can be
+                dropped.
+        """
+        if self.is_complete or not chunk:
+            return self.is_complete
+
+        self._chunks.append(chunk)
+        if self._first_block_closed or self.separator[0] not in chunk:
+            return False
+
+        # A fence may be split between chunks
+        text = self.text
+        start = max(self._scan_start - len(self.separator) + 1, 0)
+        self._scan_start = len(text)
+        if self._code_start is None:
+            position = text.find(self.separator, start)
+            if position == -1:
+                return False
+            self._code_start = position + len(self.separator)
+
+        end = text.find(self.separator, max(start, self._code_start))
+        if end == -1:
+            return False
+
+        self._first_block_closed = True
+        code = self.llm._polish_code(text[self._code_start : end])
+        if self.llm._is_python_code(code):
+            self.is_complete = True
+            self._chunks = [text[: end + len(self.separator)]]
+        return self.is_complete
+
+
 class LLM:
     """Base class to implement a new LLM."""
 
     last_prompt: Optional[str] = None
+    # Limit of the calls to the backend, shared with the other LLMs calling it
+    rate_limiter: Optional[RateLimiter] = None
 
     def __init__(self, api_key: Optional[str] = None, **kwargs: Any) -> None:
         """Initialize LLM.
@@ -143,6 +463,167 @@ class LLM:
         """
         return memory.get_previous_conversation()
 
+    @staticmethod
+    def get_chat_messages(
+        value: str, memory: Optional[Memory] = None, prefix: str = ""
+    ) -> List[dict]:
+        """
+        Return the messages of a chat completion, in the OpenAI format, the
+        stable prefix of the prompt first, so that the providers caching the
+        prompts can reuse it across the questions and the follow-ups.
+
+        Args:
+            value (str): The prompt, or its suffix when `prefix` is given.
+            memory (Memory, optional): The conversation, sent after the prefix.
+            prefix (str): The stable prefix of the prompt, sent as the start
+                of the system message.
+        """
+        messages = memory.to_openai_messages() if memory else []
+        if prefix:
+            if messages and messages[0]["role"] == "system":
+                system = messages.pop(0)["content"]
+                prefix = f"{prefix}\n\n{system}"
+            messages.insert(0, {"role": "system", "content": prefix})
+            value = value.lstrip("\n")
+
+        # adding current prompt as latest query message
+        messages.append({"role": "user", "content": value})
+        return messages
+
+    @staticmethod
+    def _record_token_usage(context: Optional[AgentState], usage: Any) -> None:
+        """
+        Add the token usage reported by the LLM API to the stats of the query.
+
+        Args:
+            context (AgentState, optional): AgentState of the query.
+            usage (Any): OpenAI compatible usage, with `prompt_tokens` and
+                `completion_tokens` attributes.
+        """
+        if context is None or usage is None:
+            return
+
+        context.stats.add_token_usage(
+            getattr(usage, "prompt_tokens", 0) or 0,
+            getattr(usage, "completion_tokens", 0) or 0,
+        )
+
+    @staticmethod
+    def _get_chunk_text(chunk: Any) -> str:
+        """Text of an OpenAI compatible chunk of a streamed completion."""
+        choices = getattr(chunk, "choices", None)
+        if not choices:
+            return ""
+        delta = getattr(choices[0], "delta", None)
+        if delta is not None:
+            return getattr(delta, "content", None) or ""
+        return getattr(choices[0], "text", None) or ""
+
+    def _feed_chunk(
+        self,
+        extractor: CodeStreamExtractor,
+        chunk: Any,
+        context: Optional[AgentState],
+    ) -> bool:
+        text = self._get_chunk_text(chunk)
+        if text and context is not None:
+            # Imported here, the agent package imports the LLMs
+            from pandasai.agent.events import EventType
+
+            context.emit(EventType.LLM_TOKEN, token=text)
+        return extractor.feed(text)
+
+    def _record_stream_usage(
+        self,
+        context: Optional[AgentState],
+        usage: Any,
+        prompt: str,
+        completion: str,
+    ) -> None:
+        """
+        Record the usage reported at the end of a stream, estimated from the
+        prompt and the completion when the stream has been stopped before.
+        """
+        if usage is None and context is not None:
+            context.stats.add_token_usage(
+                count_tokens(prompt), count_tokens(completion)
+            )
+        self._record_token_usage(context, usage)
+
+    def _read_stream(
+        self, stream: Iterable[Any], prompt: str, context: AgentState = None
+    ) -> str:
+        """
+        Read a streamed completion of OpenAI compatible chunks, emitting each
+        chunk as an `llm_token` event, until the code of the completion is
+        complete.
+
+        Args:
+            stream (Iterable[Any]): The chunks of the completion.
+            prompt (str): The prompt, to estimate its tokens if the usage is not
+                reported.
+            context (AgentState, optional): The state of the query.
+
+        Returns:
+            str: The completion, up to the end of its code block.
+        """
+        extractor = CodeStreamExtractor(self)
+        usage = None
+        try:
+            for chunk in stream:
+                usage = getattr(chunk, "usage", None) or usage
+                if self._feed_chunk(extractor, chunk, context):
+                    break
+        finally:
+            close = getattr(stream, "close", None)
+            if callable(close):
+                close()
+
+        self._record_stream_usage(context, usage, prompt, extractor.text)
+        return extractor.text
+
+    async def _aread_stream(
+        self, stream: AsyncIterable[Any], prompt: str, context: AgentState = None
+    ) -> str:
+        """Async counterpart of `_read_stream`."""
+        extractor = CodeStreamExtractor(self)
+        usage = None
+        try:
+            async for chunk in stream:
+                usage = getattr(chunk, "usage", None) or usage
+                if self._feed_chunk(extractor, chunk, context):
+                    break
+        finally:
+            close = getattr(stream, "aclose", None) or getattr(stream, "close", None)
+            if callable(close):
+                result = close()
+                if inspect.isawaitable(result):
+                    await result
+
+        self._record_stream_usage(context, usage, prompt, extractor.text)
+        return extractor.text
+
+    @staticmethod
+    def _get_request_timeout(
+        context: Optional[AgentState], default: Any = None
+    ) -> Optional[float]:
+        """
+        Timeout of a request to the LLM API, so that it does not outlive the
+        deadline of the query.
+
+        Args:
+            context (AgentState, optional): AgentState of the query.
+            default (Any): The timeout configured for the LLM, if any.
+
+        Returns:
+            Optional[float]: The seconds left to answer the query, bounded by the
+                default timeout, None if the query has no deadline.
+        """
+        time_left = context.time_left() if context is not None else None
+        if time_left is None or not isinstance(default, (int, float)):
+            return time_left
+        return min(time_left, default)
+
     @abstractmethod
     def call(self, instruction: BasePrompt, context: AgentState = None) -> str:
         """
@@ -158,6 +639,95 @@ class LLM:
         """
         raise MethodNotImplementedError("Call method has not been implemented")
 
+    async def acall(self, instruction: BasePrompt, context: AgentState = None) -> str:
+        """
+        Execute the LLM with given prompt without blocking the event loop.
+
+        LLMs with a native async client should override this method, by default
+        the blocking `call` runs in a worker thread.
+
+        Args:
+            instruction (BasePrompt): A prompt object with instruction for LLM.
+            context (AgentState, optional): AgentState. Defaults to None.
+
+        Returns:
+            str: LLM response.
+        """
+        return await asyncio.to_thread(self.call, instruction, context)
+
+    def _get_call_limits(
+        self, instruction: BasePrompt, context: Optional[AgentState]
+    ) -> Tuple[int, int, Optional[float], int]:
+        """
+        Estimated tokens, priority and timeout of a call for the rate limiter,
+        with the tokens already used by the query.
+        """
+        tokens = count_tokens(instruction.to_string())
+        if context is None:
+            return tokens, RateLimiter.INTERACTIVE, None, 0
+        return (
+            tokens,
+            context.priority,
+            context.time_left(),
+            context.stats.total_tokens,
+        )
+
+    @staticmethod
+    def _get_extra_tokens(
+        context: Optional[AgentState], used_before: int, tokens: int, response: Any
+    ) -> int:
+        """Tokens used by a call beyond the estimate of its prompt."""
+        used = context.stats.total_tokens - used_before if context is not None else 0
+        if used:
+            return used - tokens
+        return count_tokens(response) if isinstance(response, str) else 0
+
+    def call_with_limits(
+        self, instruction: BasePrompt, context: AgentState = None
+    ) -> str:
+        """Call the LLM once the rate limiter, if any, allows it."""
+        if self.rate_limiter is None:
+            return self.call(instruction, context)
+
+        tokens, priority, timeout, used_before = self._get_call_limits(
+            instruction, context
+        )
+        waited = self.rate_limiter.acquire(tokens, priority, timeout)
+        if context is not None:
+            context.stats.add_timing(Stage.LLM_QUEUE, waited)
+
+        response = None
+        try:
+            response = self.call(instruction, context)
+            return response
+        finally:
+            self.rate_limiter.release(
+                self._get_extra_tokens(context, used_before, tokens, response)
+            )
+
+    async def acall_with_limits(
+        self, instruction: BasePrompt, context: AgentState = None
+    ) -> str:
+        """Async counterpart of `call_with_limits`."""
+        if self.rate_limiter is None:
+            return await self.acall(instruction, context)
+
+        tokens, priority, timeout, used_before = self._get_call_limits(
+            instruction, context
+        )
+        waited = await self.rate_limiter.aacquire(tokens, priority, timeout)
+        if context is not None:
+            context.stats.add_timing(Stage.LLM_QUEUE, waited)
+
+        response = None
+        try:
+            response = await self.acall(instruction, context)
+            return response
+        finally:
+            self.rate_limiter.release(
+                self._get_extra_tokens(context, used_before, tokens, response)
+            )
+
     def generate_code(self, instruction: BasePrompt, context: AgentState) -> str:
         """
         Generate the code based on the instruction and the given prompt.
@@ -169,5 +739,19 @@ class LLM:
             str: A string of Python code.
 
         """
-        response = self.call(instruction, context)
+        response = self.call_with_limits(instruction, context)
+        return self._extract_code(response)
+
+    async def agenerate_code(self, instruction: BasePrompt, context: AgentState) -> str:
+        """
+        Async counterpart of `generate_code`.
+
+        Args:
+            instruction (BasePrompt): Prompt with instruction for LLM.
+
+        Returns:
+            str: A string of Python code.
+
+        """
+        response = await self.acall_with_limits(instruction, context)
         return self._extract_code(response)
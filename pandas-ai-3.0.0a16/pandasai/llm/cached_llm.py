@@ -0,0 +1,240 @@
+from __future__ import annotations
+
+import copy
+import hashlib
+import json
+import re
+import threading
+from typing import TYPE_CHECKING, Any, Optional
+
+from pandasai.core.prompts.base import BasePrompt
+from pandasai.exceptions import NoCodeFoundError
+from pandasai.helpers.cache import Cache, LRUCache
+
+from .base import LLM
+
+if TYPE_CHECKING:
+    from pandasai.agent.state import AgentState
+
+# Attributes of the wrapped LLM never used in the cache key: secrets, and the
+# state updated by the calls, like `called` of FakeLLM
+_SECRET_PARAM = re.compile(r"key|secret|password|token$", re.IGNORECASE)
+_STATE_PARAMS = frozenset({"last_prompt", "called"})
+
+
+def _is_plain(value: Any) -> bool:
+    if isinstance(value, (str, int, float, bool, type(None))):
+        return True
+    if isinstance(value, (list, tuple)):
+        return all(_is_plain(item) for item in value)
+    if isinstance(value, dict):
+        return all(isinstance(k, str) and _is_plain(v) for k, v in value.items())
+    return False
+
+
+def _get_plain_params(params: dict) -> dict:
+    """The parameters of an LLM that are plain values and not secrets."""
+    return {
+        name: _get_plain_params(value) if isinstance(value, dict) else value
+        for name, value in params.items()
+        if not name.startswith("_")
+        and name not in _STATE_PARAMS
+        and not _SECRET_PARAM.search(name)
+        and _is_plain(value)
+    }
+
+
+class CachedLLM(LLM):
+    """
+    Wrapper of an LLM answering a prompt it has already answered, with the same
+    conversation and model parameters, with the stored completion.
+
+    Completions are kept in an in-memory LRU cache and, optionally, in a
+    persistent `Cache` shared by the processes. The key hashes the rendered
+    prompt, the conversation of the memory and the parameters of the wrapped
+    LLM, like its model and temperature. Completions without code are not
+    kept, so that a failed generation is not replayed.
+
+    Example:
+        ```python
+        from pandasai.helpers.cache import Cache
+        from pandasai.llm import CachedLLM
+
+        llm = CachedLLM(OpenAI(), store=Cache("llm_cache", ttl=86400))
+        ```
+
+    Args:
+        llm (LLM): The LLM to cache the completions of.
+        store (Cache, optional): Persistent store of the completions.
+        max_entries (int, optional): Maximum number of completions kept in memory.
+        max_size (int, optional): Maximum size of the completions kept in
+            memory, in bytes.
+        ttl (float, optional): Number of seconds a completion is kept in memory.
+        params (dict, optional): Parameters identifying the model in the key,
+            by default the plain attributes of the wrapped LLM, without secrets.
+    """
+
+    _own_attributes = frozenset(
+        {"llm", "store", "memory_cache", "params", "_counts", "_lock"}
+    )
+
+    def __init__(
+        self,
+        llm: LLM,
+        store: Optional[Cache] = None,
+        max_entries: Optional[int] = 1000,
+        max_size: Optional[int] = None,
+        ttl: Optional[float] = None,
+        params: Optional[dict] = None,
+    ):
+        self.llm = llm
+        self.store = store
+        self.memory_cache = LRUCache(
+            max_entries=max_entries, max_size=max_size, ttl=ttl
+        )
+        self.params = params
+        # Shared by the copies of the wrapper
+        self._counts = {"hits": 0, "misses": 0}
+        self._lock = threading.Lock()
+
+    def __getattr__(self, name: str) -> Any:
+        if name == "llm":
+            raise AttributeError(name)
+        return getattr(self.llm, name)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        # Parameters like the temperature are set on the wrapped LLM
+        if name in self._own_attributes:
+            object.__setattr__(self, name, value)
+        else:
+            setattr(self.llm, name, value)
+
+    def __copy__(self) -> "CachedLLM":
+        """
+        Copies share the caches, but not the wrapped LLM, so that changing the
+        parameters of a copy does not change the original.
+        """
+        clone = object.__new__(type(self))
+        clone.__dict__.update(self.__dict__)
+        clone.__dict__["llm"] = copy.copy(self.llm)
+        return clone
+
+    @property
+    def type(self) -> str:
+        return self.llm.type
+
+    @property
+    def last_prompt(self) -> Optional[str]:
+        return self.llm.last_prompt
+
+    def is_pandasai_llm(self) -> bool:
+        return self.llm.is_pandasai_llm()
+
+    def _get_params(self) -> dict:
+        if self.params is not None:
+            return self.params
+
+        params = dict(vars(self.llm))
+        default_params = getattr(self.llm, "_default_params", None)
+        if isinstance(default_params, dict):
+            params.update(default_params)
+        return _get_plain_params(params)
+
+    def get_key(self, instruction: BasePrompt, context: AgentState = None) -> str:
+        """Hash the prompt with the conversation and the model parameters."""
+        memory = getattr(context, "memory", None)
+        key = json.dumps(
+            {
+                "type": self.llm.type,
+                "params": self._get_params(),
+                "prompt": instruction.to_string(),
+                "conversation": memory.to_openai_messages() if memory else [],
+            },
+            sort_keys=True,
+            default=str,
+        )
+        return hashlib.sha256(key.encode()).hexdigest()
+
+    def _get(self, key: str, context: AgentState = None) -> Optional[str]:
+        response = self.memory_cache.get(key)
+        if response is None and self.store is not None:
+            response = self.store.get(key)
+            if response is not None:
+                self.memory_cache.set(key, response)
+
+        with self._lock:
+            self._counts["hits" if response is not None else "misses"] += 1
+        if response is not None and context is not None:
+            context.stats.add_llm_cache_hit()
+        return response
+
+    def _set(self, key: str, response: str) -> None:
+        if not isinstance(response, str):
+            return
+        self.memory_cache.set(key, response)
+        if self.store is not None:
+            self.store.set(key, response)
+
+    def _delete(self, key: str) -> None:
+        self.memory_cache.delete(key)
+        if self.store is not None:
+            self.store.delete(key)
+
+    def _call(self, key: str, instruction: BasePrompt, context: AgentState) -> str:
+        response = self._get(key, context)
+        if response is None:
+            response = self.llm.call_with_limits(instruction, context)
+            self._set(key, response)
+        return response
+
+    async def _acall(
+        self, key: str, instruction: BasePrompt, context: AgentState
+    ) -> str:
+        response = self._get(key, context)
+        if response is None:
+            response = await self.llm.acall_with_limits(instruction, context)
+            self._set(key, response)
+        return response
+
+    def call(self, instruction: BasePrompt, context: AgentState = None) -> str:
+        return self._call(self.get_key(instruction, context), instruction, context)
+
+    async def acall(self, instruction: BasePrompt, context: AgentState = None) -> str:
+        key = self.get_key(instruction, context)
+        return await self._acall(key, instruction, context)
+
+    def _extract_cached_code(self, key: str, response: str) -> str:
+        try:
+            return self.llm._extract_code(response)
+        except NoCodeFoundError:
+            self._delete(key)
+            raise
+
+    def generate_code(self, instruction: BasePrompt, context: AgentState) -> str:
+        key = self.get_key(instruction, context)
+        return self._extract_cached_code(
+            key, self._call(key, instruction, context)
+        )
+
+    async def agenerate_code(self, instruction: BasePrompt, context: AgentState) -> str:
+        key = self.get_key(instruction, context)
+        return self._extract_cached_code(
+            key, await self._acall(key, instruction, context)
+        )
+
+    def clear(self) -> None:
+        """Remove the cached completions, from the store too."""
+        self.memory_cache.clear()
+        if self.store is not None:
+            self.store.clear()
+
+    def stats(self) -> dict:
+        """Hits, misses and hit rate of the cache."""
+        with self._lock:
+            hits, misses = self._counts["hits"], self._counts["misses"]
+        return {
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": hits / (hits + misses) if hits + misses else 0.0,
+            "entries": len(self.memory_cache),
+        }
@@ -0,0 +1,206 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional, Union
+
+from pandasai.core.prompts.base import BasePrompt
+from pandasai.exceptions import ReplayMissError
+
+from .base import LLM
+
+if TYPE_CHECKING:
+    from pandasai.agent.state import AgentState
+
+
+class ReplayLLM(LLM):
+    """
+    LLM answering the prompts with the completions recorded for them, to run
+    the whole pipeline without calling a model, for tests and benchmarks.
+
+    The recordings are stored in a JSON Lines file, one line per completion with
+    the hash of its prompt, the prompt, the completion, its latency and its
+    token usage. Wrapping a real LLM records the completions of the prompts not
+    recorded yet. Without it, such prompts raise a `ReplayMissError`. A prompt
+    recorded several times gets its completions in turn.
+
+    Example:
+        ```python
+        # Record the completions of a real session
+        llm = ReplayLLM("recordings.jsonl", llm=OpenAI())
+
+        # Replay them, with the latency of the model
+        llm = ReplayLLM("recordings.jsonl", latency="recorded")
+        ```
+
+    Args:
+        path (str): Path of the recordings file.
+        llm (LLM, optional): The LLM recording the missing completions.
+        latency (Union[float, str, Callable[[], float]], optional): Delay of a
+            replayed completion in seconds: a fixed delay, a function drawing
+            it, like `lambda: random.lognormvariate(0, 0.5)`, or "recorded" for
+            the latency of the recorded call. No delay by default.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        llm: Optional[LLM] = None,
+        latency: Union[float, str, Callable[[], float], None] = None,
+    ):
+        if isinstance(latency, str) and latency != "recorded":
+            raise ValueError('latency must be a number, a function or "recorded".')
+
+        self.path = path
+        self.llm = llm
+        self.latency = latency
+        self.last_prompt = None
+        self._recordings: Dict[str, List[dict]] = {}
+        # Next completion replayed for each prompt
+        self._positions: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._load()
+
+    @property
+    def type(self) -> str:
+        return "replay"
+
+    @staticmethod
+    def get_key(prompt: str) -> str:
+        """Hash of a prompt in the recordings."""
+        return hashlib.sha256(prompt.encode()).hexdigest()
+
+    def _load(self) -> None:
+        if not os.path.exists(self.path):
+            return
+
+        with open(self.path, encoding="utf-8") as file:
+            for line in file:
+                if line.strip():
+                    record = json.loads(line)
+                    self._recordings.setdefault(record["key"], []).append(record)
+
+    def count(self) -> int:
+        """Number of recorded completions."""
+        with self._lock:
+            return sum(len(records) for records in self._recordings.values())
+
+    def _next(self, key: str) -> Optional[dict]:
+        with self._lock:
+            records = self._recordings.get(key)
+            if not records:
+                return None
+            position = self._positions.get(key, 0)
+            self._positions[key] = position + 1
+            return records[position % len(records)]
+
+    def _record(
+        self,
+        key: str,
+        prompt: str,
+        completion: str,
+        latency: float,
+        usage: Dict[str, int],
+    ) -> None:
+        record = {
+            "key": key,
+            "prompt": prompt,
+            "completion": completion,
+            "latency": latency,
+            "usage": usage,
+        }
+        with self._lock:
+            self._recordings.setdefault(key, []).append(record)
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as file:
+                file.write(json.dumps(record) + "\n")
+
+    def _get_latency(self, record: dict) -> float:
+        if self.latency is None:
+            return 0.0
+        if self.latency == "recorded":
+            return record.get("latency", 0.0)
+        if callable(self.latency):
+            return max(self.latency(), 0.0)
+        return self.latency
+
+    @staticmethod
+    def _replay_usage(context: Optional[AgentState], record: dict) -> None:
+        usage = record.get("usage")
+        if context is not None and usage:
+            context.stats.add_token_usage(
+                usage.get("prompt_tokens", 0), usage.get("completion_tokens", 0)
+            )
+
+    @staticmethod
+    def _get_usage(context: Optional[AgentState]) -> Dict[str, int]:
+        if context is None:
+            return {"prompt_tokens": 0, "completion_tokens": 0}
+        return dict(context.stats.token_usage)
+
+    def _get_missing_error(self, key: str) -> ReplayMissError:
+        return ReplayMissError(
+            f"No completion recorded in {self.path} for the prompt {key}."
+        )
+
+    def _record_call(
+        self,
+        key: str,
+        prompt: str,
+        completion: str,
+        start: float,
+        usage_before: Dict[str, int],
+        context: Optional[AgentState],
+    ) -> None:
+        usage = self._get_usage(context)
+        self._record(
+            key,
+            prompt,
+            completion,
+            time.perf_counter() - start,
+            {name: usage[name] - usage_before[name] for name in usage},
+        )
+
+    def call(self, instruction: BasePrompt, context: AgentState = None) -> str:
+        prompt = instruction.to_string()
+        self.last_prompt = prompt
+        key = self.get_key(prompt)
+
+        record = self._next(key)
+        if record is not None:
+            time.sleep(self._get_latency(record))
+            self._replay_usage(context, record)
+            return record["completion"]
+
+        if self.llm is None:
+            raise self._get_missing_error(key)
+
+        start, usage_before = time.perf_counter(), self._get_usage(context)
+        completion = self.llm.call_with_limits(instruction, context)
+        self._record_call(key, prompt, completion, start, usage_before, context)
+        return completion
+
+    async def acall(self, instruction: BasePrompt, context: AgentState = None) -> str:
+        prompt = instruction.to_string()
+        self.last_prompt = prompt
+        key = self.get_key(prompt)
+
+        record = self._next(key)
+        if record is not None:
+            await asyncio.sleep(self._get_latency(record))
+            self._replay_usage(context, record)
+            return record["completion"]
+
+        if self.llm is None:
+            raise self._get_missing_error(key)
+
+        start, usage_before = time.perf_counter(), self._get_usage(context)
+        completion = await self.llm.acall_with_limits(instruction, context)
+        self._record_call(key, prompt, completion, start, usage_before, context)
+        return completion
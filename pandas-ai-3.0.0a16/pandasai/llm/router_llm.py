@@ -0,0 +1,307 @@
+from __future__ import annotations
+
+import asyncio
+import math
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import TYPE_CHECKING, Dict, List, Optional
+
+from pandasai.core.prompts.base import BasePrompt
+from pandasai.exceptions import QueryAbortedError
+from pandasai.helpers.metrics import metrics
+
+from .base import LLM
+
+if TYPE_CHECKING:
+    from pandasai.agent.state import AgentState
+
+
+class _BackendStats:
+    """Rolling latency and error rate of the last calls to a backend."""
+
+    def __init__(self, window: int):
+        # Latencies of the successful calls, and outcomes of all the calls
+        self.latencies: deque = deque(maxlen=window)
+        self.outcomes: deque = deque(maxlen=window)
+        self.last_failure: Optional[float] = None
+        self.calls = 0
+        self.errors = 0
+
+    def record(self, latency: float, ok: bool) -> None:
+        self.calls += 1
+        self.outcomes.append(ok)
+        if ok:
+            self.latencies.append(latency)
+        else:
+            self.errors += 1
+            self.last_failure = time.monotonic()
+
+    @property
+    def error_rate(self) -> float:
+        if not self.outcomes:
+            return 0.0
+        return self.outcomes.count(False) / len(self.outcomes)
+
+    def get_quantile(self, quantile: float) -> Optional[float]:
+        if not self.latencies:
+            return None
+        latencies = sorted(self.latencies)
+        return latencies[max(math.ceil(quantile * len(latencies)) - 1, 0)]
+
+
+class RouterLLM(LLM):
+    """
+    LLM routing each call to the fastest healthy one of several backends, like a
+    local model and a hosted deployment.
+
+    The latency and the error rate of the last `window` calls of each backend
+    are tracked. Backends are tried by increasing median latency, a backend
+    without latency yet being tried first. A backend failing at least
+    `max_error_rate` of its last calls is unhealthy: it is only tried after the
+    healthy ones, until `cooldown` seconds have passed since its last failure.
+    A call failing, or timing out, on a backend is sent to the next one.
+
+    With `hedge`, a call still running after the `hedge_quantile` latency of its
+    backend is also sent to the next backend, and the first completion is used.
+    A hedged call costs the tokens of both backends.
+
+    Example:
+        ```python
+        llm = RouterLLM([LocalLLM(api_base="http://localhost:1234/v1"), OpenAI()])
+        agent = Agent(df, config={"llm": llm})
+        ```
+
+    Args:
+        llms (List[LLM]): The backends.
+        window (int): Number of last calls of a backend its stats are based on.
+        max_error_rate (float): Error rate from which a backend is unhealthy.
+        min_calls (int): Minimum number of calls to tell the health of a
+            backend or to hedge its calls.
+        cooldown (float): Seconds after which an unhealthy backend is tried again.
+        hedge (bool): Whether to hedge the slow calls on a second backend.
+        hedge_quantile (float): Latency quantile after which a call is hedged.
+    """
+
+    def __init__(
+        self,
+        llms: List[LLM],
+        window: int = 50,
+        max_error_rate: float = 0.5,
+        min_calls: int = 5,
+        cooldown: float = 30,
+        hedge: bool = False,
+        hedge_quantile: float = 0.9,
+    ):
+        if not llms:
+            raise ValueError("RouterLLM needs at least one LLM.")
+
+        self.llms = llms
+        self.max_error_rate = max_error_rate
+        self.min_calls = min_calls
+        self.cooldown = cooldown
+        self.hedge = hedge
+        self.hedge_quantile = hedge_quantile
+        self.last_prompt = None
+        self._stats = [_BackendStats(window) for _ in llms]
+        self._lock = threading.Lock()
+
+    @property
+    def type(self) -> str:
+        return "router"
+
+    def _is_healthy(self, index: int) -> bool:
+        stats = self._stats[index]
+        if len(stats.outcomes) < self.min_calls:
+            return True
+        if stats.error_rate < self.max_error_rate:
+            return True
+        return time.monotonic() - stats.last_failure >= self.cooldown
+
+    def get_order(self) -> List[int]:
+        """Indexes of the backends in the order they are tried."""
+        with self._lock:
+
+            def rank(index: int):
+                median = self._stats[index].get_quantile(0.5)
+                return (
+                    not self._is_healthy(index),
+                    median if median is not None else 0.0,
+                    index,
+                )
+
+            return sorted(range(len(self.llms)), key=rank)
+
+    def _get_hedge_delay(self, index: int) -> Optional[float]:
+        if not self.hedge:
+            return None
+        with self._lock:
+            stats = self._stats[index]
+            if len(stats.latencies) < self.min_calls:
+                return None
+            return stats.get_quantile(self.hedge_quantile)
+
+    def _record(self, index: int, latency: float, ok: bool) -> None:
+        with self._lock:
+            self._stats[index].record(latency, ok)
+        if not ok:
+            metrics.llm_failovers.inc(backend=self.llms[index].type)
+
+    @staticmethod
+    def _check_deadline(context: Optional[AgentState]) -> None:
+        if context is not None:
+            context.check_aborted()
+
+    def _call_backend(
+        self, index: int, instruction: BasePrompt, context: Optional[AgentState]
+    ) -> str:
+        start = time.monotonic()
+        try:
+            response = self.llms[index].call_with_limits(instruction, context)
+        except QueryAbortedError:
+            raise
+        except Exception:
+            self._record(index, time.monotonic() - start, False)
+            raise
+        self._record(index, time.monotonic() - start, True)
+        self.last_prompt = self.llms[index].last_prompt
+        return response
+
+    async def _acall_backend(
+        self, index: int, instruction: BasePrompt, context: Optional[AgentState]
+    ) -> str:
+        start = time.monotonic()
+        try:
+            response = await self.llms[index].acall_with_limits(instruction, context)
+        except QueryAbortedError:
+            raise
+        except Exception:
+            self._record(index, time.monotonic() - start, False)
+            raise
+        self._record(index, time.monotonic() - start, True)
+        self.last_prompt = self.llms[index].last_prompt
+        return response
+
+    def call(self, instruction: BasePrompt, context: AgentState = None) -> str:
+        order = self.get_order()
+        if len(order) > 1 and self._get_hedge_delay(order[0]) is not None:
+            return self._call_hedged(order, instruction, context)
+
+        error = None
+        for index in order:
+            self._check_deadline(context)
+            try:
+                return self._call_backend(index, instruction, context)
+            except QueryAbortedError:
+                raise
+            except Exception as e:
+                error = e
+        raise error
+
+    def _call_hedged(
+        self, order: List[int], instruction: BasePrompt, context: Optional[AgentState]
+    ) -> str:
+        """
+        Call the backends in order, starting the next one when the running ones
+        have failed or the last one started is slower than its hedge delay.
+        """
+        # One thread per backend called, the slower calls are left to finish
+        executor = ThreadPoolExecutor(
+            max_workers=len(order), thread_name_prefix="router_llm"
+        )
+        running: Dict[Future, int] = {}
+        pending = list(order)
+        error = None
+        try:
+            while pending or running:
+                if pending and not running:
+                    self._check_deadline(context)
+                    index = pending.pop(0)
+                    future = executor.submit(
+                        self._call_backend, index, instruction, context
+                    )
+                    running[future] = index
+
+                delay = self._get_hedge_delay(index) if pending else None
+                done, _ = wait(running, timeout=delay, return_when=FIRST_COMPLETED)
+                if not done:
+                    # The call is slow, hedge it on the next backend
+                    self._check_deadline(context)
+                    index = pending.pop(0)
+                    metrics.llm_hedges.inc(backend=self.llms[index].type)
+                    future = executor.submit(
+                        self._call_backend, index, instruction, context
+                    )
+                    running[future] = index
+                    continue
+
+                for future in done:
+                    del running[future]
+                    try:
+                        return future.result()
+                    except QueryAbortedError:
+                        raise
+                    except Exception as e:
+                        error = e
+            raise error
+        finally:
+            executor.shutdown(wait=False)
+
+    async def acall(self, instruction: BasePrompt, context: AgentState = None) -> str:
+        running: Dict[asyncio.Future, int] = {}
+        pending = self.get_order()
+        error = None
+        try:
+            while pending or running:
+                if pending and not running:
+                    self._check_deadline(context)
+                    index = pending.pop(0)
+                    task = asyncio.ensure_future(
+                        self._acall_backend(index, instruction, context)
+                    )
+                    running[task] = index
+
+                delay = self._get_hedge_delay(index) if pending else None
+                done, _ = await asyncio.wait(
+                    running, timeout=delay, return_when=asyncio.FIRST_COMPLETED
+                )
+                if not done:
+                    self._check_deadline(context)
+                    index = pending.pop(0)
+                    metrics.llm_hedges.inc(backend=self.llms[index].type)
+                    task = asyncio.ensure_future(
+                        self._acall_backend(index, instruction, context)
+                    )
+                    running[task] = index
+                    continue
+
+                for task in done:
+                    del running[task]
+                    try:
+                        return task.result()
+                    except QueryAbortedError:
+                        raise
+                    except Exception as e:
+                        error = e
+            raise error
+        finally:
+            # The slower calls of a hedged call are not needed anymore
+            for task in running:
+                task.cancel()
+
+    def stats(self) -> List[dict]:
+        """Calls, errors, health and latency quantiles of each backend."""
+        with self._lock:
+            return [
+                {
+                    "type": llm.type,
+                    "calls": stats.calls,
+                    "errors": stats.errors,
+                    "error_rate": stats.error_rate,
+                    "healthy": self._is_healthy(index),
+                    "latency_p50": stats.get_quantile(0.5),
+                    "latency_p90": stats.get_quantile(0.9),
+                }
+                for index, (llm, stats) in enumerate(zip(self.llms, self._stats))
+            ]
@@ -91,3 +91,14 @@ class SQLParser:
                     table_names.append(node.name)
 
         return table_names
+
+    @staticmethod
+    def normalize_query(query: str, dialect: Optional[str] = None) -> str:
+        """
+        Rewrite the query in a canonical form, so that queries only differing in
+        formatting, keyword casing or a trailing semicolon are equal.
+        """
+        try:
+            return parse_one(query, read=dialect).sql(dialect=dialect)
+        except ParseError:
+            return " ".join(query.split())
@@ -1,4 +1,5 @@
 import ast
+import asyncio
 
 
 class Sandbox:
@@ -18,6 +19,13 @@ class Sandbox:
 
         return self._exec_code(code, environment)
 
+    async def aexecute(self, code: str, environment: dict) -> dict:
+        """
+        Async counterpart of `execute`. Sandboxes talking to a remote runtime can
+        override it; by default the blocking execution runs in a worker thread.
+        """
+        return await asyncio.to_thread(self.execute, code, environment)
+
     def _exec_code(self, code: str, environment: dict) -> dict:
         raise NotImplementedError("Subclasses must implement the _exec_code method.")
 
@@ -20,7 +20,7 @@ root_dir = find_project_root()
 @pytest.fixture
 def mock_pandasai_push():
     """Fixture to mock the HTTP POST request in pandasai.helpers.session."""
-    with patch("pandasai.helpers.session.requests.request") as mock_request:
+    with patch("pandasai.helpers.session.requests.Session.request") as mock_request:
         # Mock response
         mock_response = MagicMock()
         mock_response.status_code = 200
@@ -1,18 +1,35 @@
+import asyncio
 import os
+import threading
+import time
 from typing import Optional
-from unittest.mock import ANY, MagicMock, Mock, mock_open, patch
+from unittest.mock import ANY, AsyncMock, MagicMock, Mock, mock_open, patch
 
 import pandas as pd
 import pytest
 
 from pandasai import DatasetLoader, VirtualDataFrame
 from pandasai.agent.base import Agent
+from pandasai.agent.intent_router import Intent, IntentRouter
 from pandasai.config import Config, ConfigManager
+from pandasai.core.code_generation.code_cache import CodeCache
+from pandasai.core.response import DataFrameResponse, NumberResponse
 from pandasai.core.response.error import ErrorResponse
+from pandasai.data_loader.duck_db_connection_manager import DuckDBConnectionManager
+from pandasai.data_loader.query_cache import QueryCache
 from pandasai.data_loader.semantic_layer_schema import SemanticLayerSchema
 from pandasai.dataframe.base import DataFrame
-from pandasai.exceptions import CodeExecutionError, InvalidLLMOutputType
+from pandasai.exceptions import (
+    CodeExecutionError,
+    InvalidConfigError,
+    InvalidLLMOutputType,
+    QueryTimeoutError,
+)
+from pandasai.helpers.cache import Cache
+from pandasai.helpers.memory_store import SQLiteMemoryStore
+from pandasai.helpers.metrics import Stage, metrics
 from pandasai.llm.fake import FakeLLM
+from pandasai.query_builders.sql_parser import SQLParser
 
 
 class TestAgent:
@@ -322,6 +339,150 @@ class TestAgent:
         assert agent.execute_code.call_count == 6
         assert agent._regenerate_code_after_error.call_count == 5
 
+    def test_execute_with_retries_repairs_without_llm(self, agent: Agent):
+        table = agent._state.dfs[0].schema.name
+        agent._regenerate_code_after_error = Mock()
+        events = []
+        agent._state.listeners.append(events.append)
+
+        response = agent.execute_with_retries(
+            f'df = execute_sql_query("SELECT SUM(a_) AS total FROM {table}")\n'
+            'result = {"type": "number", "value": int(df["total"][0])}'
+        )
+
+        assert response.value == 6
+        assert "SUM(A)" in response.last_code_executed
+        agent._regenerate_code_after_error.assert_not_called()
+        assert agent._state.stats.repairs == 1
+        assert agent._state.stats.retries == 0
+        assert "code_repaired" in [event.type for event in events]
+
+    def test_execute_with_retries_wraps_bare_result(self, agent: Agent):
+        table = agent._state.dfs[0].schema.name
+        agent._regenerate_code_after_error = Mock()
+
+        response = agent.execute_with_retries(
+            f'df = execute_sql_query("SELECT * FROM {table}")\ndf["A"].sum()'
+        )
+
+        assert isinstance(response, NumberResponse)
+        assert response.value == 6
+        agent._regenerate_code_after_error.assert_not_called()
+        assert agent._state.stats.repairs == 1
+
+    def test_execute_with_retries_falls_back_to_llm(self, agent: Agent):
+        table = agent._state.dfs[0].schema.name
+        agent._regenerate_code_after_error = Mock(
+            return_value=(
+                f'df = execute_sql_query("SELECT SUM(A) AS total FROM {table}")\n'
+                'result = {"type": "number", "value": int(df["total"][0])}'
+            )
+        )
+
+        response = agent.execute_with_retries(
+            f'df = execute_sql_query("SELECT SUM(unknown) AS total FROM {table}")\n'
+            'result = {"type": "number", "value": int(df["total"][0])}'
+        )
+
+        assert response.value == 6
+        agent._regenerate_code_after_error.assert_called_once()
+        assert agent._state.stats.repairs == 0
+        assert agent._state.stats.retries == 1
+
+    def test_execute_with_retries_repair_disabled(self, agent: Agent):
+        agent._state.config.enable_code_repair = False
+        agent._regenerate_code_after_error = Mock(
+            return_value='result = {"type": "number", "value": 6}'
+        )
+        table = agent._state.dfs[0].schema.name
+
+        response = agent.execute_with_retries(
+            f'df = execute_sql_query("SELECT SUM(a_) AS total FROM {table}")\n'
+            'result = {"type": "number", "value": int(df["total"][0])}'
+        )
+
+        assert response.value == 6
+        agent._regenerate_code_after_error.assert_called_once()
+        assert agent._state.stats.repairs == 0
+
+    def test_execute_with_retries_returns_lazy_results(self, agent: Agent):
+        agent._state.config.enable_lazy_results = True
+        table = agent._state.dfs[0].schema.name
+
+        response = agent.execute_with_retries(
+            f'df = execute_sql_query("SELECT * FROM {table}")\n'
+            'result = {"type": "dataframe", "value": df}'
+        )
+
+        assert response.is_lazy
+        assert response.row_count == len(agent._state.dfs[0])
+        assert agent._state.stats.sql_queries[0]["rows"] == 0
+        assert 'execute_sql_query("' in response.last_code_executed
+
+    def test_execute_with_retries_lazy_results_disabled(self, agent: Agent):
+        table = agent._state.dfs[0].schema.name
+
+        response = agent.execute_with_retries(
+            f'df = execute_sql_query("SELECT * FROM {table}")\n'
+            'result = {"type": "dataframe", "value": df}'
+        )
+
+        assert not response.is_lazy
+
+    def test_lazy_results_errors_are_repaired(self, agent: Agent):
+        agent._state.config.enable_lazy_results = True
+        table = agent._state.dfs[0].schema.name
+        column = agent._state.dfs[0].columns[0]
+
+        response = agent.execute_with_retries(
+            f'df = execute_sql_query("SELECT {column.upper()}_ FROM {table}")\n'
+            'result = {"type": "dataframe", "value": df}'
+        )
+
+        assert response.is_lazy
+        assert response.head().columns.tolist() == [column]
+
+    def test_memory_token_budget_from_config(self, sample_df, config):
+        config["memory_max_tokens"] = 500
+        config["memory_tokenizer"] = len
+        agent = Agent(sample_df, config, memory_size=4)
+
+        memory = agent._state.memory
+        assert memory.max_tokens == 500
+        assert memory.tokenizer is len
+        assert agent._state.fork().memory.max_tokens == 500
+
+    def test_follow_up_resumes_session_of_another_agent(self, sample_df, tmp_path):
+        code = (
+            f'df = execute_sql_query("SELECT SUM(A) AS total FROM {sample_df.schema.name}")\n'
+            'result = {"type": "number", "value": int(df["total"][0])}'
+        )
+        config = {
+            "llm": FakeLLM(output=code),
+            "memory_store": SQLiteMemoryStore(abs_path=str(tmp_path)),
+        }
+        first = Agent(sample_df, config)
+        second = Agent(sample_df, config)
+
+        first.chat("What is the sum of A?", session_id="session")
+        response = second.follow_up("And the sum of A again?", session_id="session")
+
+        assert response.value == sum(sample_df["A"])
+        assert second._state.memory.count() == 2
+        assert second.last_generated_code == code
+
+        first.follow_up("And once more?")
+
+        assert [m["message"] for m in first._state.memory.all()] == [
+            "What is the sum of A?",
+            "And the sum of A again?",
+            "And once more?",
+        ]
+
+    def test_bind_session_without_memory_store(self, agent: Agent):
+        with pytest.raises(InvalidConfigError):
+            agent.follow_up("What is the sum of A?", session_id="session")
+
     def test_load_llm_with_pandasai_llm(self, agent: Agent, llm):
         assert agent._state._get_llm(llm) == llm
 
@@ -440,6 +601,8 @@ class TestAgent:
 
             # Verify execute_query was called appropriately
             assert mock_query.call_count == 2  # Once for head(), once for the SQL query
+            # The loader caches the results according to the config of the agent
+            assert mock_query.call_args.kwargs["config"] is agent._state.config
 
     def test_execute_sql_query_error_no_dataframe(self, agent):
         query = "SELECT count(*) as total from countries;"
@@ -548,3 +711,488 @@ class TestAgent:
         # Verify the error was logged
         mock_logger.log.assert_called_once()
         assert "Processing failed with error" in mock_logger.log.call_args[0][0]
+
+    def test_chat_many_returns_responses_in_order(self, sample_df, config):
+        agent = Agent(sample_df, config)
+
+        def answer(query, output_type=None, timeout=None):
+            return NumberResponse(int(query.split()[-1]))
+
+        with patch.object(Agent, "_process_query", side_effect=answer):
+            responses = agent.chat_many([f"question {i}" for i in range(6)])
+
+        assert [response.value for response in responses] == list(range(6))
+
+    def test_chat_many_reports_errors_per_query(self, sample_df, config):
+        agent = Agent(sample_df, config)
+
+        def answer(query, output_type=None, timeout=None):
+            if query == "bad":
+                raise ValueError("Boom")
+            return NumberResponse(1)
+
+        with patch.object(Agent, "_process_query", side_effect=answer):
+            responses = agent.chat_many(["good", "bad", "good"])
+
+        assert isinstance(responses[0], NumberResponse)
+        assert isinstance(responses[1], ErrorResponse)
+        assert "Boom" in responses[1].error
+        assert isinstance(responses[2], NumberResponse)
+
+    def test_chat_many_runs_queries_concurrently(self, sample_df):
+        code = (
+            f'df = execute_sql_query("SELECT SUM(A) AS total FROM {sample_df.schema.name}")\n'
+            'result = {"type": "number", "value": int(df["total"][0])}'
+        )
+
+        class SlowLLM(FakeLLM):
+            def call(self, instruction, context=None):
+                time.sleep(0.3)
+                return super().call(instruction, context)
+
+        agent = Agent(sample_df, {"llm": SlowLLM(output=code)})
+
+        start = time.time()
+        responses = agent.chat_many(["What is the sum?"] * 6, max_concurrency=6)
+
+        assert [response.value for response in responses] == [6] * 6
+        assert time.time() - start < 1.5
+
+    def test_chat_many_serializes_dataframes_once(self, agent: Agent, sample_df):
+        with patch.object(
+            DataFrame, "serialize_dataframe", return_value="<table></table>"
+        ) as mock_serialize, patch.object(
+            Agent,
+            "_process_query",
+            side_effect=lambda q, o=None, timeout=None: NumberResponse(1),
+        ):
+            responses = agent.chat_many(["q1", "q2", "q3"])
+
+        assert all(isinstance(response, NumberResponse) for response in responses)
+        assert mock_serialize.call_count == 1
+
+    def test_chat_many_keeps_agent_conversation(self, agent: Agent):
+        agent._state.memory.add("previous question", True)
+
+        with patch.object(
+            Agent,
+            "_process_query",
+            side_effect=lambda q, o=None, timeout=None: NumberResponse(1),
+        ):
+            responses = agent.chat_many(["q1", "q2"])
+
+        assert all(isinstance(response, NumberResponse) for response in responses)
+        assert agent._state.memory.count() == 1
+
+    def test_chat_many_invalid_concurrency(self, agent: Agent):
+        with pytest.raises(ValueError):
+            agent.chat_many(["q1"], max_concurrency=0)
+
+    @pytest.fixture
+    def code_cache(self, tmp_path) -> CodeCache:
+        return CodeCache(Cache("code_cache", abs_path=str(tmp_path)))
+
+    @pytest.fixture
+    def sum_code(self, sample_df) -> str:
+        return (
+            f'df = execute_sql_query("SELECT SUM(A) AS total FROM {sample_df.schema.name}")\n'
+            'result = {"type": "number", "value": int(df["total"][0])}'
+        )
+
+    def test_chat_uses_cached_code(self, sample_df, code_cache, sum_code):
+        llm = FakeLLM(output=sum_code)
+        agent = Agent(sample_df, {"llm": llm}, code_cache=code_cache)
+
+        with patch.object(FakeLLM, "call", wraps=llm.call) as mock_call:
+            first = agent.chat("What is the sum of A?")
+            second = agent.chat("what is the sum of a")
+
+        assert first.value == second.value == 6
+        assert mock_call.call_count == 1
+
+    def test_follow_up_is_not_cached(self, sample_df, code_cache, sum_code):
+        llm = FakeLLM(output=sum_code)
+        agent = Agent(sample_df, {"llm": llm}, code_cache=code_cache)
+
+        with patch.object(FakeLLM, "call", wraps=llm.call) as mock_call:
+            agent.chat("What is the sum of A?")
+            agent.follow_up("What is the sum of A?")
+
+        assert mock_call.call_count == 2
+
+    def test_invalid_cached_code_is_regenerated(
+        self, sample_df, code_cache, sum_code
+    ):
+        code_cache.set("What is the sum of A?", [sample_df], "result = 1")
+        agent = Agent(
+            sample_df, {"llm": FakeLLM(output=sum_code)}, code_cache=code_cache
+        )
+
+        response = agent.chat("What is the sum of A?")
+
+        assert response.value == 6
+        assert code_cache.get("What is the sum of A?", [sample_df]) == sum_code
+
+    def test_enable_cache_config(self, sample_df):
+        with patch("pandasai.agent.base.CodeCache") as mock_code_cache:
+            agent = Agent(sample_df, {"llm": FakeLLM(), "enable_cache": True})
+
+        assert agent._state.code_cache is mock_code_cache.return_value
+
+    def test_cache_disabled_by_default(self, agent: Agent):
+        assert agent._state.code_cache is None
+
+    def test_execute_sql_query_cached(self, sample_df):
+        agent = Agent(sample_df, {"llm": FakeLLM(), "enable_sql_cache": True})
+        query = f'SELECT SUM(A) AS total FROM "{sample_df.schema.name}"'
+        QueryCache.clear()
+
+        first = agent._execute_sql_query(query)
+        with patch("pandasai.agent.base.DuckDBConnectionManager") as mock_db_manager:
+            second = agent._execute_sql_query(query + ";")
+
+        mock_db_manager.assert_not_called()
+        pd.testing.assert_frame_equal(first, second)
+        assert QueryCache.stats()["hits"] == 1
+        QueryCache.clear()
+
+    def test_execute_sql_query_cache_is_scoped_to_agent(self, sample_df):
+        query = f'SELECT SUM(A) AS total FROM "{sample_df.schema.name}"'
+        config = {"llm": FakeLLM(), "enable_sql_cache": True}
+        QueryCache.clear()
+
+        Agent(sample_df, config)._execute_sql_query(query)
+        Agent(sample_df, config)._execute_sql_query(query)
+
+        assert QueryCache.stats()["hits"] == 0
+        QueryCache.clear()
+
+    def test_execute_sql_query_not_cached_by_default(self, agent: Agent):
+        assert agent._get_query_cache_key("SELECT 1") is None
+
+    def test_speculative_candidates_first_valid_wins(self, sample_df, sum_code):
+        class CandidatesLLM(FakeLLM):
+            def __init__(self, outputs):
+                super().__init__()
+                self._outputs = iter(outputs)
+                self._lock = threading.Lock()
+
+            def call(self, instruction, context=None):
+                with self._lock:
+                    output, delay = next(self._outputs)
+                time.sleep(delay)
+                return output
+
+        llm = CandidatesLLM([("result = 1", 0), (sum_code, 0.05), ("result = 2", 0)])
+        agent = Agent(sample_df, {"llm": llm, "speculative_candidates": 3})
+
+        response = agent.chat("What is the sum of A?")
+
+        assert response.value == 6
+        assert agent.last_generated_code == sum_code
+        assert agent._state.memory.count() == 1
+
+    def test_speculative_candidates_do_not_wait_for_losers(
+        self, sample_df, sum_code
+    ):
+        class CandidatesLLM(FakeLLM):
+            def __init__(self):
+                super().__init__(output=sum_code)
+                self._calls = 0
+                self._lock = threading.Lock()
+
+            def call(self, instruction, context=None):
+                with self._lock:
+                    self._calls += 1
+                    slow = self._calls > 1
+                if slow:
+                    time.sleep(0.5)
+                    # Like the streaming LLMs, stop once the candidate is cancelled
+                    context.check_aborted()
+                return super().call(instruction, context)
+
+        llm = CandidatesLLM()
+        agent = Agent(sample_df, {"llm": llm, "speculative_candidates": 3})
+
+        start = time.time()
+        response = agent.chat("What is the sum of A?")
+
+        assert response.value == 6
+        assert time.time() - start < 0.4
+        assert response.stats.llm_calls == 1
+
+        # The cancelled candidates neither complete nor update the next query
+        llm._calls = 3
+        follow_up = agent.follow_up("And again?")
+        time.sleep(0.6)
+        assert follow_up.value == 6
+        assert follow_up.stats.llm_calls == 1
+        assert len(follow_up.stats.sql_queries) == 1
+
+    def test_speculative_candidates_use_different_temperatures(self, agent: Agent):
+        agent._state.config.llm.temperature = 0
+        agent._state.config.llm.seed = 42
+
+        first = agent._get_candidate_llm(0)
+        second = agent._get_candidate_llm(1)
+        third = agent._get_candidate_llm(2)
+
+        assert first is agent._state.config.llm
+        assert (first.temperature, second.temperature, third.temperature) == (
+            0,
+            0.3,
+            0.6,
+        )
+        assert (second.seed, third.seed) == (43, 44)
+
+    def test_speculative_candidates_all_failing_are_corrected(
+        self, sample_df, sum_code
+    ):
+        agent = Agent(
+            sample_df,
+            {"llm": FakeLLM(output="result = 1"), "speculative_candidates": 2},
+        )
+        agent._regenerate_code_after_error = Mock(return_value=sum_code)
+
+        response = agent.chat("What is the sum of A?")
+
+        assert response.value == 6
+        agent._regenerate_code_after_error.assert_called_once()
+        code, error = agent._regenerate_code_after_error.call_args[0]
+        assert code == "result = 1"
+        assert isinstance(error, Exception)
+
+    def test_speculative_candidates_async(self, sample_df, sum_code):
+        agent = Agent(
+            sample_df,
+            {"llm": FakeLLM(output=sum_code), "speculative_candidates": 3},
+        )
+
+        with patch.object(
+            FakeLLM, "acall", new_callable=AsyncMock, return_value=sum_code
+        ) as mock_acall:
+            response = asyncio.run(agent.achat("What is the sum of A?"))
+
+        assert response.value == 6
+        assert mock_acall.await_count == 3
+
+    def test_error_prompt_includes_traceback_of_error(self, agent: Agent):
+        try:
+            raise ValueError("Boom")
+        except ValueError as e:
+            error = e
+
+        prompt = agent._get_error_prompt("result = 1", error)
+
+        assert "ValueError: Boom" in prompt.to_string()
+
+    def test_response_carries_stats(self, sample_df, sum_code):
+        agent = Agent(sample_df, {"llm": FakeLLM(output=sum_code)})
+
+        response = agent.chat("What is the sum of A?")
+
+        stats = response.stats
+        for stage in (
+            Stage.PROMPT_RENDER,
+            Stage.LLM_CALL,
+            Stage.CODE_VALIDATION,
+            Stage.SQL_QUERY,
+            Stage.CODE_EXECUTION,
+            Stage.RESPONSE_PARSE,
+            Stage.TOTAL,
+        ):
+            assert stats.timings[stage] >= 0
+        assert stats.timings[Stage.TOTAL] >= stats.timings[Stage.CODE_EXECUTION]
+        assert stats.llm_calls == 1
+        assert stats.retries == 0
+        assert len(stats.sql_queries) == 1
+        assert stats.sql_queries[0]["rows"] == 1
+        assert stats.sql_queries[0]["bytes"] > 0
+        assert response.to_dict()["stats"]["llm_calls"] == 1
+        assert '"stats"' in response.to_json()
+
+    def test_each_query_has_its_own_stats(self, sample_df, sum_code):
+        agent = Agent(sample_df, {"llm": FakeLLM(output=sum_code)})
+
+        first = agent.chat("What is the sum of A?")
+        second = agent.follow_up("And again?")
+
+        assert first.stats is not second.stats
+        assert second.stats.llm_calls == 1
+
+    def test_stats_count_retries(self, agent: Agent):
+        agent.generate_code = Mock(return_value="invalid_code")
+        agent.execute_code = Mock(
+            side_effect=[
+                CodeExecutionError("Execution failed"),
+                {"type": "number", "value": 1},
+            ]
+        )
+        agent._regenerate_code_after_error = Mock(return_value="fixed_code")
+
+        response = agent.chat("What is the sum of A?")
+
+        assert response.value == 1
+        assert response.stats.retries == 1
+
+    def test_stats_are_aggregated_in_metrics(self, sample_df, sum_code):
+        agent = Agent(sample_df, {"llm": FakeLLM(output=sum_code)})
+        successes = metrics.queries.get(status="success")
+        sql_queries = metrics.sql_queries.get()
+
+        agent.chat("What is the sum of A?")
+
+        assert metrics.queries.get(status="success") == successes + 1
+        assert metrics.sql_queries.get() == sql_queries + 1
+
+    def test_error_response_carries_stats(self, agent: Agent):
+        agent.generate_code = Mock(return_value="invalid_code")
+        agent.execute_with_retries = Mock(
+            side_effect=CodeExecutionError("Execution failed")
+        )
+        errors = metrics.queries.get(status="error")
+
+        response = agent.chat("What is the sum of A?")
+
+        assert isinstance(response, ErrorResponse)
+        assert response.stats.timings[Stage.TOTAL] >= 0
+        assert metrics.queries.get(status="error") == errors + 1
+
+    def test_intent_router_answers_without_llm(self, sample_df):
+        agent = Agent(sample_df, {"llm": FakeLLM()}, intent_router=IntentRouter())
+
+        with patch.object(FakeLLM, "call") as mock_call:
+            count = agent.chat("How many rows have A > 1?")
+            rows = agent.chat("Show the rows where B <= 5")
+
+        mock_call.assert_not_called()
+        assert isinstance(count, NumberResponse)
+        assert count.value == 2
+        assert isinstance(rows, DataFrameResponse)
+        assert rows.value["B"].tolist() == [4, 5]
+        assert "execute_sql_query" in agent.last_generated_code
+
+    def test_intent_router_falls_back_to_llm(self, sample_df, sum_code):
+        llm = FakeLLM(output=sum_code)
+        agent = Agent(sample_df, {"llm": llm}, intent_router=IntentRouter())
+
+        with patch.object(FakeLLM, "call", wraps=llm.call) as mock_call:
+            response = agent.chat("What is the sum of A for the best quarters?")
+
+        assert response.value == 6
+        assert mock_call.call_count == 1
+
+    def test_failing_routed_query_falls_back_to_llm(self, sample_df, sum_code):
+        router = MagicMock()
+        router.route.return_value = Intent(
+            name="filter", sql="SELECT * FROM missing", output_type="dataframe"
+        )
+        agent = Agent(sample_df, {"llm": FakeLLM(output=sum_code)}, intent_router=router)
+
+        response = agent.chat("What is the sum of A?")
+
+        assert response.value == 6
+        assert agent._state.memory.count() == 1
+
+    def test_intent_router_async(self, sample_df):
+        agent = Agent(sample_df, {"llm": FakeLLM()}, intent_router=IntentRouter())
+
+        response = asyncio.run(agent.achat("What is the total of A?"))
+
+        assert response.value == 6
+
+    def test_enable_intent_router_config(self, sample_df):
+        agent = Agent(sample_df, {"llm": FakeLLM(), "enable_intent_router": True})
+
+        assert isinstance(agent._state.intent_router, IntentRouter)
+        assert agent._fork()._state.intent_router is agent._state.intent_router
+
+    def test_intent_router_disabled_by_default(self, agent: Agent):
+        assert agent._state.intent_router is None
+
+    def test_execute_sql_query_registers_dataframes_once(self, agent, sample_df):
+        query = f'SELECT SUM(A) AS total FROM "{sample_df.schema.name}"'
+        db_manager = DuckDBConnectionManager()
+        db_manager.unregister(sample_df.schema.name)
+
+        with patch.object(
+            db_manager, "connection", wraps=db_manager.connection
+        ) as mock_connection:
+            agent._execute_sql_query(query)
+            agent._execute_sql_query(query)
+
+        mock_connection.register.assert_called_once()
+        assert db_manager.is_registered(sample_df.schema.name)
+
+    def test_execute_sql_query_caches_rewritten_queries(self, agent, sample_df):
+        query = f"SELECT SUM(A) AS total FROM {sample_df.schema.name}"
+
+        with patch(
+            "pandasai.agent.base.SQLParser.replace_table_and_column_names",
+            wraps=SQLParser.replace_table_and_column_names,
+        ) as mock_rewrite:
+            first = agent._execute_sql_query(query)
+            second = agent._execute_sql_query(query)
+
+        assert mock_rewrite.call_count == 1
+        pd.testing.assert_frame_equal(first, second)
+
+    def test_chat_times_out_on_long_running_code(self, sample_df):
+        code = (
+            f'df = execute_sql_query("SELECT * FROM {sample_df.schema.name}")\n'
+            "while True:\n"
+            "    pass"
+        )
+        agent = Agent(sample_df, {"llm": FakeLLM(output=code)})
+        timeouts = metrics.queries.get(status="timeout")
+
+        start = time.perf_counter()
+        with pytest.raises(QueryTimeoutError):
+            agent.chat("What is the sum of A?", timeout=0.3)
+
+        assert time.perf_counter() - start < 2
+        assert agent._state.deadline is None
+        assert metrics.queries.get(status="timeout") == timeouts + 1
+
+    def test_chat_times_out_on_long_running_sql_query(self, sample_df):
+        # Cross join of the dataset with itself, 3^24 rows to aggregate
+        tables = ", ".join(f"{sample_df.schema.name} t{i}" for i in range(24))
+        code = (
+            f'df = execute_sql_query("SELECT SUM(t0.A) AS total FROM {tables}")\n'
+            'result = {"type": "number", "value": df["total"][0]}'
+        )
+        agent = Agent(sample_df, {"llm": FakeLLM(output=code)})
+
+        start = time.perf_counter()
+        with pytest.raises(QueryTimeoutError):
+            agent.chat("How many rows?", timeout=0.3)
+
+        assert time.perf_counter() - start < 2
+        # The interrupted query does not affect the next ones
+        result = agent._execute_sql_query(
+            f"SELECT SUM(A) AS total FROM {sample_df.schema.name}"
+        )
+        assert result["total"][0] == sample_df["A"].sum()
+
+    def test_query_timeout_config(self, sample_df):
+        code = (
+            f'df = execute_sql_query("SELECT * FROM {sample_df.schema.name}")\n'
+            "while True:\n"
+            "    pass"
+        )
+        agent = Agent(sample_df, {"llm": FakeLLM(output=code), "query_timeout": 0.3})
+
+        with pytest.raises(QueryTimeoutError):
+            agent.chat("What is the sum of A?")
+
+    def test_chat_within_timeout(self, sample_df, sum_code):
+        agent = Agent(sample_df, {"llm": FakeLLM(output=sum_code)})
+
+        response = agent.chat("What is the sum of A?", timeout=30)
+
+        assert response.value == sample_df["A"].sum()
+        assert agent._state.deadline is None
+
+    def test_invalid_timeout(self, agent: Agent):
+        with pytest.raises(ValueError):
+            agent.chat("What is the sum of A?", timeout=0)
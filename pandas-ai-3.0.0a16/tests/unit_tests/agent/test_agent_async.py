@@ -0,0 +1,105 @@
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from pandasai.agent.base import Agent
+from pandasai.core.response import NumberResponse
+from pandasai.core.response.error import ErrorResponse
+from pandasai.dataframe.base import DataFrame
+from pandasai.exceptions import CodeExecutionError, QueryTimeoutError
+from pandasai.llm.fake import FakeLLM
+
+
+class TestAgentAsync:
+    "Unit tests for the async Agent API"
+
+    @pytest.fixture
+    def code(self, sample_df: DataFrame) -> str:
+        return (
+            f'df = execute_sql_query("SELECT SUM(A) AS total FROM {sample_df.schema.name}")\n'
+            'result = {"type": "number", "value": int(df["total"][0])}'
+        )
+
+    @pytest.fixture
+    def agent(self, sample_df: DataFrame, code: str) -> Agent:
+        return Agent(sample_df, {"llm": FakeLLM(output=code)})
+
+    def test_achat(self, agent: Agent):
+        response = asyncio.run(agent.achat("What is the sum of A?"))
+
+        assert isinstance(response, NumberResponse)
+        assert response.value == 6
+        assert agent._state.memory.count() == 1
+
+    def test_afollow_up_keeps_conversation(self, agent: Agent):
+        async def conversation():
+            await agent.achat("What is the sum of A?")
+            return await agent.afollow_up("And again?")
+
+        response = asyncio.run(conversation())
+
+        assert response.value == 6
+        assert agent._state.memory.count() == 2
+
+    def test_achat_runs_concurrently(self, sample_df: DataFrame, code: str):
+        agents = [Agent(sample_df, {"llm": FakeLLM(output=code)}) for _ in range(5)]
+
+        async def run_all():
+            return await asyncio.gather(
+                *(agent.achat("What is the sum of A?") for agent in agents)
+            )
+
+        responses = asyncio.run(run_all())
+
+        assert [response.value for response in responses] == [6] * 5
+
+    def test_achat_uses_acall(self, agent: Agent, code: str):
+        with patch.object(
+            FakeLLM, "acall", new_callable=AsyncMock, return_value=code
+        ) as mock_acall:
+            asyncio.run(agent.achat("What is the sum of A?"))
+
+        mock_acall.assert_awaited_once()
+
+    def test_aexecute_with_retries_regenerates_code(self, agent: Agent, code: str):
+        agent.aexecute_code = AsyncMock(
+            side_effect=[CodeExecutionError("failed"), {"type": "number", "value": 1}]
+        )
+        agent._aregenerate_code_after_error = AsyncMock(return_value=code)
+
+        response = asyncio.run(agent.aexecute_with_retries("bad code"))
+
+        assert response.value == 1
+        agent._aregenerate_code_after_error.assert_awaited_once()
+
+    def test_achat_returns_error_response(self, agent: Agent):
+        agent._state.config.max_retries = 0
+        agent.aexecute_code = AsyncMock(side_effect=CodeExecutionError("failed"))
+
+        response = asyncio.run(agent.achat("What is the sum of A?"))
+
+        assert isinstance(response, ErrorResponse)
+
+    def test_aexecute_code_uses_sandbox(self, sample_df: DataFrame):
+        sandbox = MagicMock()
+        sandbox.aexecute = AsyncMock(return_value={"type": "number", "value": 1})
+        agent = Agent(sample_df, {"llm": FakeLLM()}, sandbox=sandbox)
+
+        result = asyncio.run(agent.aexecute_code("result = 1"))
+
+        assert result == {"type": "number", "value": 1}
+        sandbox.aexecute.assert_awaited_once()
+
+    def test_achat_times_out(self, sample_df: DataFrame):
+        code = (
+            f'df = execute_sql_query("SELECT * FROM {sample_df.schema.name}")\n'
+            "while True:\n"
+            "    pass"
+        )
+        agent = Agent(sample_df, {"llm": FakeLLM(output=code)})
+
+        with pytest.raises(QueryTimeoutError):
+            asyncio.run(agent.achat("What is the sum of A?", timeout=0.3))
+
+        assert agent._state.deadline is None
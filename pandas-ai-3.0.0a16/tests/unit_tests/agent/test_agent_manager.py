@@ -0,0 +1,149 @@
+import gc
+import time
+from unittest.mock import patch
+
+import pytest
+
+from pandasai.agent.base import Agent
+from pandasai.agent.manager import AgentManager
+from pandasai.data_loader.duck_db_connection_manager import DuckDBConnectionManager
+from pandasai.dataframe.base import DataFrame
+from pandasai.helpers.memory_store import SQLiteMemoryStore
+from pandasai.llm.fake import FakeLLM
+
+
+class TestAgentManager:
+    "Unit tests for the AgentManager class"
+
+    @pytest.fixture
+    def code(self, sample_df: DataFrame) -> str:
+        return (
+            f'df = execute_sql_query("SELECT SUM(A) AS total FROM {sample_df.schema.name}")\n'
+            'result = {"type": "number", "value": int(df["total"][0])}'
+        )
+
+    @pytest.fixture
+    def manager(self, sample_df: DataFrame, code: str) -> AgentManager:
+        return AgentManager(sample_df, {"llm": FakeLLM(output=code)})
+
+    def test_get_session_returns_same_agent(self, manager: AgentManager):
+        agent = manager.get_session("session")
+
+        assert isinstance(agent, Agent)
+        assert manager.get_session("session") is agent
+        assert manager.get_session("other") is not agent
+        assert len(manager) == 2
+
+    def test_create_session(self, manager: AgentManager):
+        session_id = manager.create_session()
+
+        assert session_id in manager
+
+    def test_sessions_share_resources(self, manager: AgentManager, sample_df):
+        first = manager.get_session("first")
+        second = manager.get_session("second")
+
+        assert first._state.dfs is second._state.dfs
+        assert first._state.config is second._state.config
+        assert first._state.logger is second._state.logger
+        assert first._state.cache_scope == second._state.cache_scope
+        assert first._state.memory is not second._state.memory
+        assert "serialized_dataframes" in first._state.intermediate_values
+
+    def test_creating_session_does_not_serialize_datasets(
+        self, manager: AgentManager, sample_df
+    ):
+        with patch.object(
+            DataFrame, "serialize_dataframe", side_effect=AssertionError
+        ):
+            manager.get_session("session")
+
+    def test_sessions_have_independent_conversations(self, manager: AgentManager):
+        first = manager.get_session("first")
+        second = manager.get_session("second")
+
+        response = first.chat("What is the sum of A?")
+
+        assert response.value == 6
+        assert first._state.memory.count() == 1
+        assert second._state.memory.count() == 0
+
+    def test_sessions_resumed_from_memory_store(
+        self, sample_df: DataFrame, code: str, tmp_path
+    ):
+        config = {
+            "llm": FakeLLM(output=code),
+            "memory_store": SQLiteMemoryStore(abs_path=str(tmp_path)),
+        }
+        worker = AgentManager(sample_df, config)
+        other_worker = AgentManager(sample_df, config)
+
+        worker.get_session("session").chat("What is the sum of A?")
+        agent = other_worker.get_session("session")
+
+        assert agent._state.memory.count() == 1
+
+        other_worker.close_session("session")
+
+        assert config["memory_store"].get_messages("session") == ([], 0)
+
+    def test_closed_session_keeps_dataset_registered(
+        self, manager: AgentManager, sample_df
+    ):
+        db_manager = DuckDBConnectionManager()
+        manager.get_session("first").chat("What is the sum of A?")
+        manager.get_session("second").chat("What is the sum of A?")
+
+        manager.close_session("first")
+        gc.collect()
+
+        assert db_manager.is_registered(sample_df.schema.name)
+        with patch.object(
+            db_manager, "connection", wraps=db_manager.connection
+        ) as mock_connection:
+            manager.get_session("second").chat("What is the sum of A?")
+        mock_connection.register.assert_not_called()
+
+    def test_close_session(self, manager: AgentManager):
+        manager.get_session("session")
+
+        manager.close_session("session")
+        manager.close_session("missing")
+
+        assert "session" not in manager
+
+    def test_max_sessions_evicts_least_recently_used(self, sample_df):
+        manager = AgentManager(sample_df, {"llm": FakeLLM()}, max_sessions=2)
+        manager.get_session("a")
+        manager.get_session("b")
+        manager.get_session("a")
+
+        manager.get_session("c")
+
+        assert "a" in manager
+        assert "b" not in manager
+        assert "c" in manager
+        assert manager.stats()["evicted_sessions"] == 1
+
+    def test_idle_sessions_are_evicted(self, sample_df):
+        manager = AgentManager(sample_df, {"llm": FakeLLM()}, idle_timeout=0.05)
+        manager.get_session("idle")
+        time.sleep(0.1)
+        manager.get_session("active")
+
+        assert "idle" not in manager
+        assert "active" in manager
+        assert manager.evict_idle() == 0
+
+    def test_memory_usage(self, manager: AgentManager):
+        manager.get_session("session").add_message("What is the sum of A?", True)
+
+        usage = manager.memory_usage()
+
+        assert usage["datasets"] > 0
+        assert usage["sessions"] > 0
+        assert manager.stats()["sessions"] == 1
+
+    def test_invalid_max_sessions(self, sample_df):
+        with pytest.raises(ValueError):
+            AgentManager(sample_df, {"llm": FakeLLM()}, max_sessions=0)
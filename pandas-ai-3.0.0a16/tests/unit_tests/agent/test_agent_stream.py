@@ -0,0 +1,127 @@
+import asyncio
+import time
+from unittest.mock import MagicMock
+
+import pytest
+
+from pandasai.agent.base import Agent
+from pandasai.agent.events import AgentEvent, EventType
+from pandasai.agent.state import AgentState
+from pandasai.core.response import NumberResponse
+from pandasai.dataframe.base import DataFrame
+from pandasai.exceptions import QueryAbortedError
+from pandasai.llm.fake import FakeLLM
+
+
+class SlowLLM(FakeLLM):
+    def call(self, instruction, context=None):
+        time.sleep(0.2)
+        return super().call(instruction, context)
+
+
+class TestAgentStream:
+    "Unit tests for the streaming of the Agent events"
+
+    @pytest.fixture
+    def code(self, sample_df: DataFrame) -> str:
+        return (
+            f'df = execute_sql_query("SELECT SUM(A) AS total FROM {sample_df.schema.name}")\n'
+            'result = {"type": "number", "value": int(df["total"][0])}'
+        )
+
+    @pytest.fixture
+    def agent(self, sample_df: DataFrame, code: str) -> Agent:
+        return Agent(sample_df, {"llm": FakeLLM(output=code)})
+
+    def test_stream_events(self, agent: Agent, code: str):
+        events = list(agent.stream("What is the sum of A?"))
+
+        assert [event.type for event in events] == [
+            EventType.PROMPT_BUILT,
+            EventType.CODE_GENERATED,
+            EventType.CODE_VALIDATED,
+            EventType.SQL_QUERY_STARTED,
+            EventType.SQL_QUERY_FINISHED,
+            EventType.CODE_EXECUTED,
+            EventType.RESPONSE_PARSED,
+            EventType.RESPONSE,
+        ]
+        assert events[1].data["code"] == code
+        assert events[4].data["rows"] == 1
+        assert events[4].data["result"]["total"][0] == 6
+        assert isinstance(events[-1].data["response"], NumberResponse)
+        assert events[-1].data["response"].value == 6
+        assert agent._state.listeners == []
+
+    def test_stream_follow_up(self, agent: Agent):
+        agent.chat("What is the sum of A?")
+
+        events = list(agent.stream("And again?", follow_up=True))
+
+        assert events[-1].data["response"].value == 6
+        assert agent._state.memory.count() == 2
+
+    def test_stream_raises_errors(self, agent: Agent):
+        agent._state.config.max_retries = 0
+        agent._state.config.llm.call = MagicMock(side_effect=RuntimeError("Boom"))
+
+        with pytest.raises(RuntimeError, match="Boom"):
+            list(agent.stream("What is the sum of A?"))
+
+    def test_closing_stream_aborts_query(self, sample_df: DataFrame, code: str):
+        agent = Agent(sample_df, {"llm": SlowLLM(output=code)})
+        agent.execute_code = MagicMock()
+
+        events = agent.stream("What is the sum of A?")
+        assert next(events).type == EventType.PROMPT_BUILT
+        events.close()
+
+        agent.execute_code.assert_not_called()
+        assert not agent._state.abort_requested.is_set()
+        assert agent._state.listeners == []
+
+    def test_astream_events(self, agent: Agent):
+        async def collect():
+            return [event async for event in agent.astream("What is the sum of A?")]
+
+        events = asyncio.run(collect())
+
+        assert events[0].type == EventType.PROMPT_BUILT
+        assert EventType.SQL_QUERY_FINISHED in [event.type for event in events]
+        assert events[-1].type == EventType.RESPONSE
+        assert events[-1].data["response"].value == 6
+
+    def test_closing_astream_aborts_query(self, sample_df: DataFrame, code: str):
+        agent = Agent(sample_df, {"llm": SlowLLM(output=code)})
+        agent.aexecute_code = MagicMock()
+
+        async def consume():
+            events = agent.astream("What is the sum of A?")
+            first = await events.__anext__()
+            await events.aclose()
+            return first
+
+        first = asyncio.run(consume())
+
+        assert first.type == EventType.PROMPT_BUILT
+        agent.aexecute_code.assert_not_called()
+        assert not agent._state.abort_requested.is_set()
+
+    def test_emit_notifies_listeners(self):
+        state = AgentState()
+        listener = MagicMock()
+        state.listeners.append(listener)
+
+        state.emit(EventType.CODE_GENERATED, code="result = 1")
+
+        event = listener.call_args[0][0]
+        assert isinstance(event, AgentEvent)
+        assert event.type == EventType.CODE_GENERATED
+        assert event.data == {"code": "result = 1"}
+
+    def test_emit_raises_when_aborted(self):
+        state = AgentState()
+        state.abort_requested.set()
+
+        with pytest.raises(QueryAbortedError):
+            state.emit(EventType.CODE_GENERATED)
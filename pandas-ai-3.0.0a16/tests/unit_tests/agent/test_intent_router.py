@@ -0,0 +1,146 @@
+import pytest
+
+from pandasai.agent.intent_router import Intent, IntentRouter
+from pandasai.dataframe.base import DataFrame
+
+
+class TestIntentRouter:
+    "Unit tests for the IntentRouter class"
+
+    @pytest.fixture
+    def df(self) -> DataFrame:
+        return DataFrame(
+            {
+                "Item": ["Bolt", "Drum", "Tank"],
+                "Storage Days": [120, 250, 310],
+                "hazardcategory": ["Non DG", "DG", "Non DG"],
+                "price": [1.5, 20.0, 300.0],
+            },
+            _table_name="inventory",
+        )
+
+    @pytest.fixture
+    def router(self) -> IntentRouter:
+        return IntentRouter()
+
+    @pytest.mark.parametrize(
+        "query,name,sql,output_type",
+        [
+            (
+                "storage day > 200",
+                "filter",
+                'SELECT * FROM "inventory" WHERE "Storage Days" > 200',
+                "dataframe",
+            ),
+            (
+                "hazardcategory == Non DG",
+                "filter",
+                "SELECT * FROM \"inventory\" WHERE \"hazardcategory\" = 'Non DG'",
+                "dataframe",
+            ),
+            (
+                "Show me the items where price is at least 20",
+                "filter",
+                'SELECT * FROM "inventory" WHERE "price" >= 20',
+                "dataframe",
+            ),
+            (
+                "How many rows are there?",
+                "count",
+                'SELECT COUNT(*) AS count FROM "inventory"',
+                "number",
+            ),
+            (
+                "How many items have storage days over 200?",
+                "count",
+                'SELECT COUNT(*) AS count FROM "inventory" WHERE "Storage Days" > 200',
+                "number",
+            ),
+            (
+                "Count of rows by hazardcategory",
+                "count_by_group",
+                'SELECT "hazardcategory", COUNT(*) AS count FROM "inventory" '
+                'GROUP BY "hazardcategory" ORDER BY "hazardcategory"',
+                "dataframe",
+            ),
+            (
+                "What is the total price?",
+                "aggregation",
+                'SELECT SUM("price") AS total_price FROM "inventory"',
+                "number",
+            ),
+            (
+                "Average price per hazardcategory",
+                "aggregation_by_group",
+                'SELECT "hazardcategory", AVG("price") AS average_price '
+                'FROM "inventory" GROUP BY "hazardcategory" ORDER BY "hazardcategory"',
+                "dataframe",
+            ),
+            (
+                "max storage days where hazardcategory = 'DG'",
+                "aggregation",
+                'SELECT MAX("Storage Days") AS max_storage_days FROM "inventory" '
+                "WHERE \"hazardcategory\" = 'DG'",
+                "number",
+            ),
+            (
+                "Top 2 items by price",
+                "top_n",
+                'SELECT * FROM "inventory" ORDER BY "price" DESC LIMIT 2',
+                "dataframe",
+            ),
+            (
+                "List the distinct hazardcategory values",
+                "distinct",
+                'SELECT DISTINCT "hazardcategory" FROM "inventory" '
+                'ORDER BY "hazardcategory"',
+                "dataframe",
+            ),
+            (
+                "How many unique hazardcategory are there?",
+                "count_distinct",
+                'SELECT COUNT(DISTINCT "hazardcategory") AS count FROM "inventory"',
+                "number",
+            ),
+        ],
+    )
+    def test_route(self, router, df, query, name, sql, output_type):
+        assert router.route(query, [df]) == Intent(
+            name=name, sql=sql, output_type=output_type
+        )
+
+    @pytest.mark.parametrize(
+        "query",
+        [
+            "Plot the price of the items",
+            "What is the trend of price?",
+            "Show sales by region",
+            "price > 20 and storage days < 300",
+            "price > expensive",
+            "hazardcategory > DG",
+            "total hazardcategory",
+            "Which item has the highest price?",
+        ],
+    )
+    def test_unsure_queries_are_not_routed(self, router, df, query):
+        assert router.route(query, [df]) is None
+
+    def test_ambiguous_column_is_not_routed(self, router):
+        df = DataFrame({"price": [1], "Price": [2]})
+
+        assert router.route("price > 1", [df]) is None
+
+    def test_several_datasets_are_not_routed(self, router, df):
+        assert router.route("price > 1", [df, df]) is None
+
+    def test_output_type_mismatch_is_not_routed(self, router, df):
+        assert router.route("What is the total price?", [df], "dataframe") is None
+        assert router.route("What is the total price?", [df], "number") is not None
+
+    def test_intent_code(self):
+        intent = Intent(name="count", sql="SELECT COUNT(*) FROM t", output_type="number")
+
+        assert intent.code == (
+            "df = execute_sql_query('SELECT COUNT(*) FROM t')\n"
+            'result = {"type": "number", "value": df.iloc[0, 0].item() if len(df) else 0}'
+        )
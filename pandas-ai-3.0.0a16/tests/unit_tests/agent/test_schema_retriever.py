@@ -0,0 +1,160 @@
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from pandasai.agent import Agent
+from pandasai.agent.schema_retriever import SchemaRetriever, tokenize
+from pandasai.data_loader.semantic_layer_schema import Relation
+from pandasai.dataframe.base import DataFrame
+from pandasai.exceptions import ExecuteSQLQueryNotUsed
+from pandasai.helpers.memory import Memory
+from pandasai.llm.fake import FakeLLM
+
+
+def make_df(name: str, columns: list, relations: list = None) -> DataFrame:
+    df = DataFrame({column: [1, 2] for column in columns}, _table_name=name)
+    if relations:
+        schema = df.schema.model_copy(
+            update={
+                "relations": [
+                    Relation(**{"from": source, "to": target})
+                    for source, target in relations
+                ]
+            }
+        )
+        df = DataFrame({column: [1, 2] for column in columns}, schema=schema)
+    return df
+
+
+class TestSchemaRetriever:
+    "Unit tests for the SchemaRetriever class"
+
+    @pytest.fixture(autouse=True)
+    def mock_bamboo_llm(self):
+        with patch("pandasai.llm.bamboo_llm.BambooLLM") as mock:
+            mock.return_value = MagicMock(type="bamboo")
+            yield mock
+
+    @pytest.fixture
+    def dfs(self) -> list:
+        return [
+            make_df(
+                "orders",
+                ["order_id", "customer_id", "amount", "ordered_at"],
+                relations=[("orders.customer_id", "customers.customer_id")],
+            ),
+            make_df("customers", ["customer_id", "name", "country"]),
+            make_df("products", ["product_id", "title", "price"]),
+            make_df("employees", ["employee_id", "salary", "department"]),
+            make_df("warehouses", ["warehouse_id", "city", "capacity"]),
+            make_df("shipments", ["shipment_id", "carrier", "shipped_at"]),
+        ]
+
+    def test_tokenize(self):
+        assert tokenize("customerCountries total_amount") == [
+            "customer",
+            "country",
+            "total",
+            "amount",
+        ]
+
+    def test_retrieves_relevant_tables(self, dfs):
+        retriever = SchemaRetriever(top_k_tables=2)
+
+        selections = retriever.retrieve("Average salary per department", dfs)
+
+        assert selections[0].df.schema.name == "employees"
+        assert len(selections) == 2
+
+    def test_adds_join_partners(self, dfs):
+        retriever = SchemaRetriever(top_k_tables=1)
+
+        selections = retriever.retrieve("Total amount of the orders", dfs)
+
+        assert [selection.df.schema.name for selection in selections] == [
+            "orders",
+            "customers",
+        ]
+
+    def test_prunes_columns_of_wide_tables(self):
+        columns = [f"metric_{i}" for i in range(30)] + ["salary", "customer_id"]
+        df = make_df(
+            "payroll",
+            columns,
+            relations=[("payroll.customer_id", "customers.customer_id")],
+        )
+        customers = make_df("customers", ["customer_id", "name"])
+        retriever = SchemaRetriever(top_k_tables=1, top_k_columns=5)
+
+        selection = retriever.retrieve("Highest salary", [df, customers])[0]
+
+        assert len(selection.columns) == 5
+        assert "salary" in selection.columns
+        assert "customer_id" in selection.columns
+        serialized = df.serialize_dataframe(selection.columns)
+        assert "salary" in serialized
+        assert "metric_29" not in serialized
+
+    def test_keeps_all_tables_without_match(self, dfs):
+        retriever = SchemaRetriever(top_k_tables=1)
+
+        selections = retriever.retrieve("Hello there", dfs)
+
+        assert len(selections) == len(dfs)
+
+    def test_respects_token_budget(self, dfs):
+        retriever = SchemaRetriever(top_k_tables=3, max_tokens=1)
+
+        serialized = retriever.serialize_dataframes("salary by department", dfs)
+
+        assert serialized.count("<table ") == 1
+        assert 'table_name="employees"' in serialized
+
+    def test_matches_by_meaning_with_vectorstore(self, dfs):
+        vectorstore = MagicMock()
+        retriever = SchemaRetriever(top_k_tables=1, vectorstore=vectorstore)
+        fingerprint = retriever.get_fingerprint(dfs)
+        vectorstore.get_relevant_docs.return_value = {
+            "metadatas": [
+                [{"fingerprint": fingerprint, "table": "warehouses", "column": ""}]
+            ],
+            "distances": [[0.1]],
+        }
+
+        selections = retriever.retrieve("Where is the stock stored?", dfs)
+
+        assert selections[0].df.schema.name == "warehouses"
+        assert vectorstore.add_docs.call_count == 1
+        retriever.retrieve("Where is the stock stored?", dfs)
+        assert vectorstore.add_docs.call_count == 1
+
+    def test_question_includes_previous_questions(self):
+        memory = Memory()
+        for question in ["first", "second", "third", "fourth"]:
+            memory.add(question, True)
+            memory.add("answer", False)
+
+        assert SchemaRetriever(history=2).get_question(memory) == "third\nfourth"
+
+    def test_agent_prompt_is_pruned_and_retries_get_full_schema(self, dfs):
+        prompts = []
+
+        class RecordingLLM(FakeLLM):
+            def call(self, instruction, context=None):
+                prompts.append(instruction.to_string())
+                return super().call(instruction, context)
+
+        # The code does not call execute_sql_query, so the agent retries
+        llm = RecordingLLM(output="result = {'type': 'number', 'value': 1}")
+        agent = Agent(
+            dfs,
+            config={"llm": llm, "max_retries": 1},
+            schema_retriever=SchemaRetriever(top_k_tables=1),
+        )
+
+        with pytest.raises(ExecuteSQLQueryNotUsed):
+            agent.chat("What is the average salary per department?")
+
+        assert 'table_name="employees"' in prompts[0]
+        assert 'table_name="orders"' not in prompts[0]
+        assert all(f'table_name="{df.schema.name}"' in prompts[1] for df in dfs)
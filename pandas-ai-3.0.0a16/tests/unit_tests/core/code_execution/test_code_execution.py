@@ -1,9 +1,14 @@
+import time
 import unittest
 from unittest.mock import MagicMock
 
 from pandasai.config import Config
 from pandasai.core.code_execution.code_executor import CodeExecutor
-from pandasai.exceptions import CodeExecutionError, NoResultFoundError
+from pandasai.exceptions import (
+    CodeExecutionError,
+    NoResultFoundError,
+    QueryTimeoutError,
+)
 
 
 class TestCodeExecutor(unittest.TestCase):
@@ -57,6 +62,39 @@ class TestCodeExecutor(unittest.TestCase):
         with self.assertRaises(CodeExecutionError):
             self.executor.execute(code)
 
+    def test_execute_with_timeout(self):
+        """Test executing code within its timeout."""
+        executor = CodeExecutor(self.config, timeout=5)
+        result = executor.execute_and_return_result("result = 5 + 5")
+        self.assertEqual(result, 10)
+
+    def test_execute_with_timeout_wraps_errors(self):
+        """Test errors of code executed with a timeout are still wrapped."""
+        executor = CodeExecutor(self.config, timeout=5)
+        with self.assertRaises(CodeExecutionError):
+            executor.execute("result = 1 / 0")
+
+    def test_execute_exceeding_timeout(self):
+        """Test long running code is stopped at its timeout."""
+        executor = CodeExecutor(self.config, timeout=0.2)
+        code = (
+            "stopped = False\n"
+            "try:\n"
+            "    while True:\n"
+            "        pass\n"
+            "finally:\n"
+            "    stopped = True"
+        )
+
+        start = time.perf_counter()
+        with self.assertRaises(QueryTimeoutError):
+            executor.execute(code)
+        self.assertLess(time.perf_counter() - start, 2)
+
+        # The worker running the code is stopped too
+        time.sleep(0.2)
+        self.assertTrue(executor.environment["stopped"])
+
 
 if __name__ == "__main__":
     unittest.main()
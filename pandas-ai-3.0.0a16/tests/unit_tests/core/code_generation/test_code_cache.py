@@ -0,0 +1,135 @@
+from unittest.mock import MagicMock
+
+import pytest
+
+from pandasai.core.code_generation.code_cache import CodeCache
+from pandasai.dataframe.base import DataFrame
+from pandasai.helpers.cache import Cache
+
+
+class TestCodeCache:
+    @pytest.fixture
+    def cache(self, tmp_path):
+        cache = Cache("code_cache", abs_path=str(tmp_path))
+        yield cache
+        cache.destroy()
+
+    @pytest.fixture
+    def code_cache(self, cache: Cache) -> CodeCache:
+        return CodeCache(cache)
+
+    @pytest.fixture
+    def dfs(self, sample_df: DataFrame):
+        return [sample_df]
+
+    def test_normalize_query(self):
+        assert (
+            CodeCache.normalize_query("  What is the SUM of A?? ")
+            == "what is the sum of a"
+        )
+
+    def test_get_missing(self, code_cache: CodeCache, dfs):
+        assert code_cache.get("What is the sum of A?", dfs) is None
+
+    def test_set_and_get_normalized_query(self, code_cache: CodeCache, dfs):
+        code_cache.set("What is the sum of A?", dfs, "result = 1")
+
+        assert code_cache.get("what is the  sum of a", dfs) == "result = 1"
+
+    def test_output_type_is_part_of_the_key(self, code_cache: CodeCache, dfs):
+        code_cache.set("What is the sum of A?", dfs, "result = 1", "number")
+
+        assert code_cache.get("What is the sum of A?", dfs, "number") == "result = 1"
+        assert code_cache.get("What is the sum of A?", dfs, "string") is None
+
+    def test_schema_change_invalidates(self, code_cache: CodeCache, sample_df):
+        code_cache.set("What is the sum of A?", [sample_df], "result = 1")
+
+        changed_df = DataFrame(
+            {"A": [1, 2, 3], "C": [4, 5, 6]}, _table_name=sample_df.schema.name
+        )
+        changed_df.schema.name = sample_df.schema.name
+
+        assert code_cache.get("What is the sum of A?", [changed_df]) is None
+
+        code_cache.set("What is the sum of A?", [changed_df], "result = 2")
+
+        # The code generated for the previous schema has been dropped
+        assert code_cache.get("What is the sum of A?", [sample_df]) is None
+        assert code_cache.get("What is the sum of A?", [changed_df]) == "result = 2"
+
+    def test_invalidate(self, code_cache: CodeCache, dfs):
+        code_cache.set("What is the sum of A?", dfs, "result = 1")
+
+        code_cache.invalidate(dfs)
+
+        assert code_cache.get("What is the sum of A?", dfs) is None
+
+    def test_invalidate_all(self, code_cache: CodeCache, dfs):
+        code_cache.set("What is the sum of A?", dfs, "result = 1")
+
+        code_cache.invalidate()
+
+        assert code_cache.get("What is the sum of A?", dfs) is None
+
+    def test_similar_query_from_vectorstore(self, cache: Cache, dfs):
+        vectorstore = MagicMock()
+        code_cache = CodeCache(cache, vectorstore=vectorstore)
+
+        code_cache.set("What is the sum of A?", dfs, "result = 1")
+
+        vectorstore.add_question_answer.assert_called_once()
+        metadata = vectorstore.add_question_answer.call_args.kwargs["metadatas"][0]
+        vectorstore.get_relevant_question_answers.return_value = {
+            "documents": [["Q: what is the sum of a\n A: result = 1"]],
+            "distances": [[0.1]],
+            "metadatas": [[metadata]],
+            "ids": [["1"]],
+        }
+
+        assert code_cache.get("Give me the total of A", dfs) == "result = 1"
+
+    def test_dissimilar_query_from_vectorstore(self, cache: Cache, dfs):
+        vectorstore = MagicMock()
+        code_cache = CodeCache(cache, vectorstore=vectorstore)
+        code_cache.set("What is the sum of A?", dfs, "result = 1")
+        metadata = vectorstore.add_question_answer.call_args.kwargs["metadatas"][0]
+        # The nearest neighbour is returned even when it is far from the query
+        vectorstore.get_relevant_question_answers.return_value = {
+            "documents": [["Q: what is the sum of a\n A: result = 1"]],
+            "distances": [[0.9]],
+            "metadatas": [[metadata]],
+            "ids": [["1"]],
+        }
+
+        assert code_cache.get("What is the average of B?", dfs) is None
+
+        code_cache.similarity_threshold = 1.0
+        assert code_cache.get("What is the average of B?", dfs) == "result = 1"
+
+    def test_similar_query_without_distance(self, cache: Cache, dfs):
+        vectorstore = MagicMock()
+        code_cache = CodeCache(cache, vectorstore=vectorstore)
+        code_cache.set("What is the sum of A?", dfs, "result = 1")
+        metadata = vectorstore.add_question_answer.call_args.kwargs["metadatas"][0]
+        vectorstore.get_relevant_question_answers.return_value = {
+            "documents": [["Q: what is the sum of a\n A: result = 1"]],
+            "metadatas": [[metadata]],
+            "ids": [["1"]],
+        }
+
+        assert code_cache.get("Give me the total of A", dfs) is None
+
+    def test_similar_query_with_another_schema(self, cache: Cache, dfs):
+        vectorstore = MagicMock()
+        vectorstore.get_relevant_question_answers.return_value = {
+            "documents": [["Q: what is the sum of a\n A: result = 1"]],
+            "distances": [[0.1]],
+            "metadatas": [
+                [{"cache_key": "key", "fingerprint": "other", "output_type": ""}]
+            ],
+            "ids": [["1"]],
+        }
+        code_cache = CodeCache(cache, vectorstore=vectorstore)
+
+        assert code_cache.get("Give me the total of A", dfs) is None
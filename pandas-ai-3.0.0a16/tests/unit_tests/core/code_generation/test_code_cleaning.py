@@ -168,6 +168,43 @@ class TestCodeCleaner(unittest.TestCase):
             result, expected_code, f"Expected '{expected_code}', but got '{result}'"
         )
 
+    def test_make_sql_results_lazy_returned_query(self):
+        code = (
+            'df = execute_sql_query("SELECT * FROM sales")\n'
+            'result = {"type": "dataframe", "value": df}'
+        )
+
+        result = self.cleaner.make_sql_results_lazy(code)
+
+        self.assertIn("df = execute_sql_query_lazy('SELECT * FROM sales')", result)
+
+    def test_make_sql_results_lazy_inline_query(self):
+        code = (
+            'result = {"type": "dataframe", '
+            '"value": execute_sql_query("SELECT * FROM sales")}'
+        )
+
+        result = self.cleaner.make_sql_results_lazy(code)
+
+        self.assertIn("execute_sql_query_lazy('SELECT * FROM sales')", result)
+
+    def test_make_sql_results_lazy_keeps_used_results(self):
+        code = (
+            'df = execute_sql_query("SELECT * FROM sales")\n'
+            'df = df[df["amount"] > 0]\n'
+            'result = {"type": "dataframe", "value": df}'
+        )
+
+        self.assertEqual(self.cleaner.make_sql_results_lazy(code), code)
+
+    def test_make_sql_results_lazy_keeps_other_result_types(self):
+        code = (
+            'df = execute_sql_query("SELECT COUNT(*) AS n FROM sales")\n'
+            'result = {"type": "number", "value": df}'
+        )
+
+        self.assertEqual(self.cleaner.make_sql_results_lazy(code), code)
+
 
 if __name__ == "__main__":
     unittest.main()
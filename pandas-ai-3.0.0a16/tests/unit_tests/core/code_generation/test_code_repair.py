@@ -0,0 +1,131 @@
+import unittest
+
+import duckdb
+import pandas as pd
+
+from pandasai.agent.state import AgentState
+from pandasai.core.code_execution.code_executor import CodeExecutor
+from pandasai.core.code_generation.code_repair import CodeRepairer
+from pandasai.dataframe.base import DataFrame
+from pandasai.exceptions import (
+    CodeExecutionError,
+    InvalidOutputValueMismatch,
+    NoResultFoundError,
+)
+
+
+class TestCodeRepairer(unittest.TestCase):
+    def setUp(self):
+        """Set up the test environment for CodeRepairer."""
+        self.df = DataFrame(
+            {"Revenue": [10, 20], "country_name": ["France", "Italy"]}
+        )
+        self.df.schema.name = "sales_data"
+        self.context = AgentState(dfs=[self.df])
+        self.repairer = CodeRepairer(self.context)
+
+    def _execution_error(self, query: str) -> CodeExecutionError:
+        connection = duckdb.connect()
+        connection.register("sales_data", pd.DataFrame(self.df))
+        try:
+            connection.sql(query)
+        except duckdb.Error as e:
+            try:
+                raise CodeExecutionError("Code execution failed") from e
+            except CodeExecutionError as error:
+                return error
+        self.fail("The query did not fail")
+
+    def test_repair_misspelled_table(self):
+        code = 'df = execute_sql_query("SELECT * FROM sales_dta")'
+        error = self._execution_error("SELECT * FROM sales_dta")
+
+        repaired = self.repairer.repair(code, error)
+
+        self.assertEqual(repaired, 'df = execute_sql_query("SELECT * FROM sales_data")')
+
+    def test_repair_misspelled_column(self):
+        code = 'df = execute_sql_query("SELECT SUM(revenu) FROM sales_data")'
+        error = self._execution_error("SELECT SUM(revenu) FROM sales_data")
+
+        repaired = self.repairer.repair(code, error)
+
+        self.assertEqual(
+            repaired, 'df = execute_sql_query("SELECT SUM(Revenue) FROM sales_data")'
+        )
+
+    def test_repair_column_ignoring_separators(self):
+        code = 'df = execute_sql_query("SELECT countryname FROM sales_data")'
+        error = self._execution_error("SELECT countryname FROM sales_data")
+
+        repaired = self.repairer.repair(code, error)
+
+        self.assertIn("SELECT country_name FROM sales_data", repaired)
+
+    def test_repair_pandas_key_error(self):
+        code = 'result = {"type": "number", "value": df["revenue"].sum()}'
+        try:
+            raise CodeExecutionError("Code execution failed") from KeyError("revenue")
+        except CodeExecutionError as error:
+            repaired = self.repairer.repair(code, error)
+
+        self.assertEqual(
+            repaired, 'result = {"type": "number", "value": df["Revenue"].sum()}'
+        )
+
+    def test_repair_sql_dialect(self):
+        query = "SELECT DATE_FORMAT(NOW(), '%Y') AS year FROM sales_data"
+        code = f'df = execute_sql_query("{query}")'
+        error = self._execution_error(query)
+
+        repaired = self.repairer.repair(code, error)
+
+        self.assertNotIn("DATE_FORMAT", repaired)
+        self.assertIn("STRFTIME", repaired)
+
+    def test_unknown_identifier_is_not_repaired(self):
+        code = 'df = execute_sql_query("SELECT SUM(profit) FROM sales_data")'
+        error = self._execution_error("SELECT SUM(profit) FROM sales_data")
+
+        self.assertIsNone(self.repairer.repair(code, error))
+
+    def test_unrelated_error_is_not_repaired(self):
+        error = CodeExecutionError("Code execution failed")
+        error.__cause__ = ZeroDivisionError("division by zero")
+
+        self.assertIsNone(self.repairer.repair("result = 1 / 0", error))
+
+    def test_repair_missing_result(self):
+        code = 'df = execute_sql_query("SELECT * FROM sales_data")\ndf["Revenue"].sum()'
+
+        repaired = self.repairer.repair(code, NoResultFoundError("No result returned"))
+
+        executor = CodeExecutor(self.context.config)
+        executor.add_to_env("execute_sql_query", lambda _: pd.DataFrame(self.df))
+        self.assertEqual(
+            executor.execute_and_return_result(repaired),
+            {"type": "number", "value": 30},
+        )
+
+    def test_wrap_bare_result(self):
+        code = 'result = execute_sql_query("SELECT * FROM sales_data")'
+        error = InvalidOutputValueMismatch(
+            "Result must be in the format of dictionary of type and value"
+        )
+
+        repaired = self.repairer.repair(code, error)
+
+        executor = CodeExecutor(self.context.config)
+        executor.add_to_env("execute_sql_query", lambda _: pd.DataFrame(self.df))
+        result = executor.execute_and_return_result(repaired)
+        self.assertEqual(result["type"], "dataframe")
+        self.assertEqual(len(result["value"]), 2)
+
+    def test_invalid_output_type_is_not_repaired(self):
+        error = InvalidOutputValueMismatch("Invalid output type: table")
+
+        self.assertIsNone(self.repairer.repair('result = {"type": "table"}', error))
+
+
+if __name__ == "__main__":
+    unittest.main()
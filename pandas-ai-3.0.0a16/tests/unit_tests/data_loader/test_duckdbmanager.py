@@ -1,6 +1,16 @@
+import gc
+import time
+from unittest.mock import patch
+
+import pandas as pd
 import pytest
 
 from pandasai.data_loader.duck_db_connection_manager import DuckDBConnectionManager
+from pandasai.exceptions import QueryTimeoutError
+
+
+class Owner:
+    pass
 
 
 class TestDuckDBConnectionManager:
@@ -8,5 +18,135 @@ class TestDuckDBConnectionManager:
     def duck_db_manager(self):
         return DuckDBConnectionManager()
 
+    @pytest.fixture
+    def df(self):
+        return pd.DataFrame({"a": [1, 2, 3]})
+
     def test_connection_correct_closing_doesnt_throw(self, duck_db_manager):
         duck_db_manager.close()
+
+    def test_register_once(self, duck_db_manager, df):
+        with patch.object(
+            duck_db_manager, "connection", wraps=duck_db_manager.connection
+        ) as mock_connection:
+            duck_db_manager.register("register_once", df)
+            duck_db_manager.register("register_once", df)
+
+        mock_connection.register.assert_called_once()
+        assert duck_db_manager.sql("SELECT SUM(a) FROM register_once").fetchall() == [
+            (6,)
+        ]
+        duck_db_manager.unregister("register_once")
+
+    def test_register_again_when_columns_change(self, duck_db_manager, df):
+        duck_db_manager.register("columns_change", df)
+        df["a"] = [10, 20, 30]
+        df["b"] = [1, 1, 1]
+
+        duck_db_manager.register("columns_change", df)
+
+        assert duck_db_manager.sql(
+            "SELECT SUM(a), SUM(b) FROM columns_change"
+        ).fetchall() == [(60, 3)]
+        duck_db_manager.unregister("columns_change")
+
+    def test_register_another_dataframe(self, duck_db_manager, df):
+        duck_db_manager.register("another_df", df)
+        duck_db_manager.register("another_df", pd.DataFrame({"a": [5]}))
+
+        assert duck_db_manager.sql("SELECT SUM(a) FROM another_df").fetchall() == [
+            (5,)
+        ]
+        duck_db_manager.unregister("another_df")
+
+    def test_unregister_when_owner_is_collected(self, duck_db_manager, df):
+        owner = Owner()
+        duck_db_manager.register("owned", df, owner=owner)
+        assert duck_db_manager.is_registered("owned")
+
+        del owner
+        gc.collect()
+
+        assert not duck_db_manager.is_registered("owned")
+
+    def test_owner_does_not_unregister_another_dataframe(self, duck_db_manager, df):
+        owner = Owner()
+        duck_db_manager.register("replaced", df, owner=owner)
+        duck_db_manager.register("replaced", pd.DataFrame({"a": [5]}))
+
+        del owner
+        gc.collect()
+
+        assert duck_db_manager.is_registered("replaced")
+        duck_db_manager.unregister("replaced")
+
+    def test_unregister_when_last_owner_is_collected(self, duck_db_manager, df):
+        first, second = Owner(), Owner()
+        duck_db_manager.register("shared", df, owner=first)
+        duck_db_manager.register("shared", df, owner=second)
+
+        del first
+        gc.collect()
+        assert duck_db_manager.is_registered("shared")
+
+        del second
+        gc.collect()
+        assert not duck_db_manager.is_registered("shared")
+
+    def test_collected_owner_does_not_reenter_connection(self, duck_db_manager, df):
+        owner = Owner()
+        duck_db_manager.register("deferred", df, owner=owner)
+
+        with patch.object(
+            duck_db_manager, "connection", wraps=duck_db_manager.connection
+        ) as connection:
+            # The owner may be collected in the middle of a DuckDB call
+            del owner
+            gc.collect()
+            connection.unregister.assert_not_called()
+
+            assert not duck_db_manager.is_registered("deferred")
+            connection.unregister.assert_called_once_with("deferred")
+
+    def test_interrupt_after_timeout(self, duck_db_manager):
+        query = "SELECT COUNT(*) FROM range(100000000) a, range(100000) b"
+
+        start = time.perf_counter()
+        with pytest.raises(QueryTimeoutError):
+            with duck_db_manager.lock, duck_db_manager.interrupt_after(0.2):
+                duck_db_manager.sql(query).df()
+
+        assert time.perf_counter() - start < 2
+        assert duck_db_manager.sql("SELECT 1").fetchall() == [(1,)]
+
+    def test_interrupt_after_does_not_interrupt_fast_queries(self, duck_db_manager):
+        with duck_db_manager.lock, duck_db_manager.interrupt_after(0.1):
+            result = duck_db_manager.sql("SELECT 1 AS a").df()
+        time.sleep(0.2)
+
+        assert result["a"][0] == 1
+        assert duck_db_manager.sql("SELECT 2").fetchall() == [(2,)]
+
+    def test_interrupt_after_does_not_interrupt_once_left(self, duck_db_manager):
+        timers = []
+
+        class Timer:
+            def __init__(self, interval, function):
+                self.function = function
+                timers.append(self)
+
+            def start(self):
+                pass
+
+            def cancel(self):
+                pass
+
+        with patch(
+            "pandasai.data_loader.duck_db_connection_manager.threading.Timer", Timer
+        ), patch.object(duck_db_manager, "connection") as mock_connection:
+            with duck_db_manager.lock, duck_db_manager.interrupt_after(0.1):
+                pass
+            # The watchdog fires late, after the block released the connection
+            timers[0].function()
+
+        mock_connection.interrupt.assert_not_called()
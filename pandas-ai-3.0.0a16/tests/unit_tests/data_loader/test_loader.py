@@ -108,6 +108,21 @@ class TestDatasetLoader:
         with pytest.raises(MaliciousQueryError):
             loader.execute_query("DROP TABLE")
 
+    def test_malicious_lazy_query(self, sample_schema):
+        loader = LocalDatasetLoader(sample_schema, "test/test")
+        with pytest.raises(MaliciousQueryError):
+            loader.get_query_result("DROP TABLE")
+
+    def test_lazy_query_result_from_local_file(self, sample_schema, tmp_path):
+        path = str(tmp_path / "data.parquet")
+        pd.DataFrame({"email": ["a@example.com", "b@example.com"]}).to_parquet(path)
+        loader = LocalDatasetLoader(sample_schema, "test/test")
+
+        result = loader.get_query_result(f"SELECT email FROM READ_PARQUET('{path}')")
+
+        assert result.row_count == 2
+        assert result.head(1)["email"].tolist() == ["a@example.com"]
+
     def test_runtime_error(self, sample_schema):
         loader = LocalDatasetLoader(sample_schema, "test/test")
         with pytest.raises(RuntimeError):
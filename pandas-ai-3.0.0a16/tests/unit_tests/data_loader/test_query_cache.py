@@ -0,0 +1,146 @@
+import os
+import time
+from unittest.mock import MagicMock, patch
+
+import pandas as pd
+import pytest
+
+from pandasai.config import Config, ConfigManager
+from pandasai.data_loader.local_loader import LocalDatasetLoader
+from pandasai.data_loader.query_cache import QueryCache
+from pandasai.data_loader.sql_loader import SQLDatasetLoader
+
+
+@pytest.fixture
+def enable_sql_cache():
+    config = ConfigManager.get()
+    enable_sql_cache, sql_cache_ttl = config.enable_sql_cache, config.sql_cache_ttl
+    config.enable_sql_cache = True
+    QueryCache.clear()
+    yield config
+    config.enable_sql_cache, config.sql_cache_ttl = enable_sql_cache, sql_cache_ttl
+    QueryCache.clear()
+
+
+class TestQueryCache:
+    def test_key_ignores_formatting(self):
+        assert QueryCache.get_key("SELECT a FROM t;", "v1") == QueryCache.get_key(
+            "select a\n  from   t", "v1"
+        )
+
+    def test_key_depends_on_version_and_params(self):
+        key = QueryCache.get_key("SELECT a FROM t WHERE a = ?", "v1", [1])
+
+        assert key != QueryCache.get_key("SELECT a FROM t WHERE a = ?", "v2", [1])
+        assert key != QueryCache.get_key("SELECT a FROM t WHERE a = ?", "v1", [2])
+
+    def test_results_are_copied(self, enable_sql_cache):
+        result = pd.DataFrame({"a": [1, 2]})
+        QueryCache.set("key", result)
+        result["a"] = 0
+
+        cached = QueryCache.get("key")
+        cached["a"] = 0
+
+        pd.testing.assert_frame_equal(
+            QueryCache.get("key"), pd.DataFrame({"a": [1, 2]})
+        )
+
+    def test_stats(self, enable_sql_cache):
+        QueryCache.set("key", pd.DataFrame({"a": [1, 2]}))
+        QueryCache.get("key")
+        QueryCache.get("missing")
+
+        stats = QueryCache.stats()
+
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+        assert stats["entries"] == 1
+        assert stats["size"] > 0
+
+
+class TestLoaderQueryCache:
+    @pytest.fixture
+    def load_function(self):
+        with patch.object(SQLDatasetLoader, "_get_loader_function") as mock:
+            mock.return_value = MagicMock(return_value=pd.DataFrame({"a": [1]}))
+            yield mock.return_value
+
+    def test_disabled_by_default(self, mysql_schema, load_function):
+        loader = SQLDatasetLoader(mysql_schema, "test/users")
+
+        loader.execute_query("SELECT * FROM users")
+        loader.execute_query("SELECT * FROM users")
+
+        assert load_function.call_count == 2
+
+    def test_remote_query_is_cached(
+        self, mysql_schema, load_function, enable_sql_cache
+    ):
+        loader = SQLDatasetLoader(mysql_schema, "test/users")
+
+        first = loader.execute_query("SELECT * FROM users")
+        second = loader.execute_query("select *   from users;")
+
+        assert load_function.call_count == 1
+        pd.testing.assert_frame_equal(first, second)
+        assert QueryCache.stats()["hits"] == 1
+
+    def test_remote_query_cached_with_agent_config(self, mysql_schema, load_function):
+        QueryCache.clear()
+        config = Config(enable_sql_cache=True, sql_cache_ttl=60)
+        loader = SQLDatasetLoader(mysql_schema, "test/users")
+
+        loader.execute_query("SELECT * FROM users", config=config)
+        loader.execute_query("SELECT * FROM users", config=config)
+
+        assert not ConfigManager.get().enable_sql_cache
+        assert load_function.call_count == 1
+        QueryCache.clear()
+
+    def test_remote_query_expires(self, mysql_schema, load_function, enable_sql_cache):
+        enable_sql_cache.sql_cache_ttl = 0.01
+        loader = SQLDatasetLoader(mysql_schema, "test/users")
+
+        loader.execute_query("SELECT * FROM users")
+        time.sleep(0.05)
+        loader.execute_query("SELECT * FROM users")
+
+        assert load_function.call_count == 2
+
+    def test_local_query_invalidated_when_file_changes(
+        self, sample_schema, enable_sql_cache, tmp_path
+    ):
+        parquet_path = tmp_path / "data.parquet"
+        pd.DataFrame({"email": ["a@example.com"]}).to_parquet(parquet_path)
+        sample_schema.transformations = None
+        sample_schema.source.path = str(parquet_path)
+        loader = LocalDatasetLoader(sample_schema, "test/test")
+        query = f"SELECT COUNT(*) AS total FROM read_parquet('{parquet_path}')"
+
+        assert loader.execute_query(query)["total"][0] == 1
+
+        pd.DataFrame({"email": ["a@example.com", "b@example.com"]}).to_parquet(
+            parquet_path
+        )
+        os.utime(parquet_path, ns=(0, 0))
+
+        assert loader.execute_query(query)["total"][0] == 2
+        assert QueryCache.stats()["hits"] == 0
+
+    def test_local_query_is_cached(self, sample_schema, enable_sql_cache, tmp_path):
+        parquet_path = tmp_path / "data.parquet"
+        pd.DataFrame({"email": ["a@example.com"]}).to_parquet(parquet_path)
+        sample_schema.transformations = None
+        sample_schema.source.path = str(parquet_path)
+        loader = LocalDatasetLoader(sample_schema, "test/test")
+        query = f"SELECT COUNT(*) AS total FROM read_parquet('{parquet_path}')"
+
+        with patch(
+            "pandasai.data_loader.local_loader.is_sql_query_safe", return_value=True
+        ) as mock_is_safe:
+            loader.execute_query(query)
+            loader.execute_query(query)
+
+        assert mock_is_safe.call_count == 1
+        assert QueryCache.stats()["hits"] == 1
@@ -0,0 +1,98 @@
+from unittest.mock import MagicMock
+
+import duckdb
+import pandas as pd
+import pytest
+
+from pandasai.data_loader.query_result import DuckDBQueryResult, LoaderQueryResult
+
+
+@pytest.fixture
+def df():
+    return pd.DataFrame({"id": range(10), "value": [i * 10 for i in range(10)]})
+
+
+class TestDuckDBQueryResult:
+    def test_row_count_and_head(self, df):
+        result = DuckDBQueryResult(
+            "SELECT * FROM items WHERE id >= 2", tables={"items": df}
+        )
+
+        assert result.columns == ["id", "value"]
+        assert result.row_count == 8
+        assert result.head(3)["id"].tolist() == [2, 3, 4]
+
+    def test_iter_batches(self, df):
+        result = DuckDBQueryResult("SELECT * FROM items", tables={"items": df})
+
+        batches = list(result.iter_batches(4))
+
+        assert [len(batch) for batch in batches] == [4, 4, 2]
+        pd.testing.assert_frame_equal(
+            pd.concat(batches, ignore_index=True), df, check_dtype=False
+        )
+
+    def test_to_arrow_and_parquet(self, df, tmp_path):
+        result = DuckDBQueryResult("SELECT * FROM items", tables={"items": df})
+        path = str(tmp_path / "items.parquet")
+
+        result.to_parquet(path)
+
+        assert result.to_arrow().num_rows == 10
+        pd.testing.assert_frame_equal(pd.read_parquet(path), df, check_dtype=False)
+
+    def test_params(self, df):
+        result = DuckDBQueryResult(
+            "SELECT * FROM items WHERE id < ?", tables={"items": df}, params=[3]
+        )
+
+        assert result.row_count == 3
+        assert len(result.to_pandas()) == 3
+
+    def test_invalid_query_fails_on_columns(self, df):
+        result = DuckDBQueryResult("SELECT missing FROM items", tables={"items": df})
+
+        with pytest.raises(duckdb.Error):
+            result.columns
+
+    def test_does_not_use_the_shared_connection(self, df):
+        from pandasai.data_loader.duck_db_connection_manager import (
+            DuckDBConnectionManager,
+        )
+
+        result = DuckDBQueryResult("SELECT * FROM items", tables={"items": df})
+        db_manager = DuckDBConnectionManager()
+
+        with db_manager.lock:
+            # Another thread holding the shared connection does not block it
+            assert result.row_count == 10
+        assert not db_manager.is_registered("items")
+
+
+class TestLoaderQueryResult:
+    def test_queries_are_pushed_down_to_the_loader(self, df):
+        loader = MagicMock()
+        loader.execute_query.side_effect = [
+            pd.DataFrame({"count": [10]}),
+            df.head(2),
+        ]
+        config = MagicMock()
+        result = LoaderQueryResult(loader, "SELECT * FROM items", config=config)
+
+        assert result.row_count == 10
+        assert len(result.head(2)) == 2
+
+        queries = [call.args[0] for call in loader.execute_query.call_args_list]
+        assert queries == [
+            "SELECT COUNT(*) AS count FROM (SELECT * FROM items) AS t",
+            "SELECT * FROM (SELECT * FROM items) AS t LIMIT 2",
+        ]
+        assert loader.execute_query.call_args.kwargs["config"] is config
+
+    def test_iter_batches(self, df):
+        loader = MagicMock()
+        loader.execute_query.return_value = df
+        result = LoaderQueryResult(loader, "SELECT * FROM items")
+
+        assert [len(batch) for batch in result.iter_batches(4)] == [4, 4, 2]
+        assert result.to_arrow().num_rows == 10
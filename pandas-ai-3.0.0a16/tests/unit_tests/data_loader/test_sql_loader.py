@@ -5,6 +5,7 @@ import pandas as pd
 import pytest
 
 from pandasai import VirtualDataFrame
+from pandasai.config import Config
 from pandasai.data_loader.sql_loader import SQLDatasetLoader
 from pandasai.dataframe.base import DataFrame
 from pandasai.exceptions import MaliciousQueryError
@@ -49,7 +50,9 @@ class TestSqlDatasetLoader:
             # Test executing a custom query
             custom_query = "SELECT email FROM users WHERE first_name = 'John'"
             result.execute_sql_query(custom_query)
-            mock_execute_query.assert_called_with(custom_query)
+            mock_execute_query.assert_called_with(
+                custom_query, timeout=None, config=None
+            )
 
     def test_mysql_malicious_query(self, mysql_schema):
         """Test loading data from a MySQL source creates a VirtualDataFrame and handles queries correctly."""
@@ -134,3 +137,52 @@ class TestSqlDatasetLoader:
             logging.debug("Loading schema from dataset path: %s", loader)
             with pytest.raises(ImportError):
                 loader.execute_query("select * from users")
+
+    def test_timeout_is_passed_to_supporting_connectors(self, mysql_schema):
+        calls = []
+
+        def load_with_timeout(connection_info, query, params=None, timeout=None):
+            calls.append(timeout)
+            return pd.DataFrame({"email": ["test@example.com"]})
+
+        def load_without_timeout(connection_info, query, params=None):
+            calls.append("no timeout")
+            return pd.DataFrame({"email": ["test@example.com"]})
+
+        loader = SQLDatasetLoader(mysql_schema, "test/users")
+        with patch.object(
+            SQLDatasetLoader, "_get_loader_function", return_value=load_with_timeout
+        ):
+            loader.execute_query("SELECT email FROM users", timeout=5)
+        with patch.object(
+            SQLDatasetLoader, "_get_loader_function", return_value=load_without_timeout
+        ):
+            loader.execute_query("SELECT email FROM users", timeout=5)
+
+        assert calls == [5, "no timeout"]
+
+    def test_virtual_dataframe_reuses_stats_until_ttl(self, mysql_schema):
+        """Test that the row count and head shown in the prompts are not queried for every prompt."""
+
+        def execute_query(query):
+            if "COUNT(*)" in query:
+                return pd.DataFrame({"count": [10]})
+            return DataFrame(pd.DataFrame({"email": ["test@example.com"]}))
+
+        with patch(
+            "pandasai.data_loader.sql_loader.SQLDatasetLoader.execute_query",
+            side_effect=execute_query,
+        ) as mock_execute_query:
+            df = SQLDatasetLoader(mysql_schema, "test/users").load()
+
+            serialized = df.serialize_dataframe()
+            assert df.serialize_dataframe() == serialized
+            assert 'dimensions="10x' in serialized
+            assert mock_execute_query.call_count == 2
+
+            with patch(
+                "pandasai.dataframe.virtual_dataframe.ConfigManager.get",
+                return_value=Config(table_stats_ttl=0),
+            ):
+                df.serialize_dataframe()
+            assert mock_execute_query.call_count == 4
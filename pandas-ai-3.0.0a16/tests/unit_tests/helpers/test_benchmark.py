@@ -0,0 +1,89 @@
+import json
+from unittest.mock import Mock, patch
+
+import pytest
+
+from pandasai.agent.base import Agent
+from pandasai.helpers.benchmark import (
+    BenchmarkReport,
+    load_workload,
+    percentile,
+    run_benchmark,
+)
+from pandasai.helpers.metrics import Stage
+from pandasai.llm import ReplayLLM
+from pandasai.llm.fake import FakeLLM
+
+
+class TestBenchmark:
+    @pytest.fixture(autouse=True)
+    def mock_bamboo_llm(self):
+        with patch("pandasai.llm.bamboo_llm.BambooLLM") as mock:
+            mock.return_value = Mock(type="bamboo")
+            yield mock
+
+    def test_load_workload(self, tmp_path):
+        path = tmp_path / "workload.jsonl"
+        path.write_text(
+            json.dumps({"query": "What is the sum?", "id": 1})
+            + "\n\n"
+            + "How many rows?\n"
+        )
+
+        assert load_workload(str(path)) == ["What is the sum?", "How many rows?"]
+        assert load_workload(str(path), field="id") == ["1", "How many rows?"]
+
+    def test_percentile(self):
+        values = list(range(1, 101))
+
+        assert percentile(values, 0.5) == 50
+        assert percentile(values, 0.95) == 95
+        assert percentile(values, 0.99) == 99
+        assert percentile([], 0.5) == 0.0
+
+    def test_run_benchmark(self, sample_df, tmp_path):
+        table = sample_df.schema.name
+        code = (
+            f'df = execute_sql_query("SELECT SUM(A) AS total FROM {table}")\n'
+            'result = {"type": "number", "value": int(df["total"][0])}'
+        )
+        path = str(tmp_path / "recordings.jsonl")
+        # Record the completion of the query once
+        recorder = ReplayLLM(path, llm=FakeLLM(output=code))
+        response = Agent(sample_df, {"llm": recorder}).chat("What is the sum?")
+        assert response.value == 6
+
+        llm = ReplayLLM(path, latency=0.01)
+        agents = []
+
+        def create_agent():
+            agent = Agent(sample_df, {"llm": llm})
+            agents.append(agent)
+            return agent
+
+        report = run_benchmark(
+            create_agent,
+            ["What is the sum?"],
+            concurrency=2,
+            repeat=4,
+            trace_memory=True,
+        )
+
+        assert report.statuses == {"success": 4}
+        assert report.throughput > 0
+        assert report.peak_memory > 0
+        assert len(agents) <= 2
+        stages = report.get_stages()
+        assert stages[Stage.TOTAL]["count"] == 4
+        assert stages[Stage.LLM_CALL]["p50"] >= 0.01
+        assert "queries/s" in str(report)
+        assert report.to_dict()["stages"] == stages
+
+    def test_report_counts_failures(self):
+        report = BenchmarkReport(
+            1, 2.0, {Stage.TOTAL: [0.5, 1.5]}, {"success": 1, "error": 1}, 0
+        )
+
+        assert report.queries == 2
+        assert report.throughput == 1.0
+        assert report.get_stages()[Stage.TOTAL]["mean"] == 1.0
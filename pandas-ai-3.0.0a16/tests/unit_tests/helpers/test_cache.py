@@ -0,0 +1,169 @@
+import os
+import threading
+import time
+
+import pytest
+
+from pandasai.helpers.cache import Cache, LRUCache
+
+
+class TestCache:
+    @pytest.fixture
+    def cache(self, tmp_path):
+        cache = Cache("test_cache", abs_path=str(tmp_path))
+        yield cache
+        cache.destroy()
+
+    def test_set_and_get(self, cache: Cache):
+        cache.set("key", "value")
+
+        assert cache.get("key") == "value"
+        assert cache.get("missing") is None
+
+    def test_set_overwrites(self, cache: Cache):
+        cache.set("key", "value")
+        cache.set("key", "new value")
+
+        assert cache.get("key") == "new value"
+        assert len(cache) == 1
+
+    def test_persists_across_instances(self, cache: Cache, tmp_path):
+        cache.set("key", "value")
+
+        other = Cache("test_cache", abs_path=str(tmp_path))
+
+        assert other.get("key") == "value"
+
+    def test_delete_and_clear(self, cache: Cache):
+        cache.set("a", "1")
+        cache.set("b", "2")
+
+        cache.delete("a")
+        assert cache.get("a") is None
+        assert cache.get("b") == "2"
+
+        cache.clear()
+        assert len(cache) == 0
+
+    def test_delete_tag(self, cache: Cache):
+        cache.set("a", "1", tag="orders")
+        cache.set("b", "2", tag="orders")
+        cache.set("c", "3", tag="customers")
+
+        cache.delete_tag("orders")
+
+        assert cache.get("a") is None
+        assert cache.get("b") is None
+        assert cache.get("c") == "3"
+
+    def test_evicts_least_recently_used(self, tmp_path):
+        cache = Cache("lru_cache", abs_path=str(tmp_path), max_entries=2)
+        cache.set("a", "1")
+        time.sleep(0.01)
+        cache.set("b", "2")
+        time.sleep(0.01)
+        cache.get("a")
+        time.sleep(0.01)
+        cache.set("c", "3")
+
+        assert cache.get("a") == "1"
+        assert cache.get("b") is None
+        assert cache.get("c") == "3"
+        cache.destroy()
+
+    def test_ttl(self, tmp_path):
+        cache = Cache("ttl_cache", abs_path=str(tmp_path), ttl=0.05)
+        cache.set("key", "value")
+
+        assert cache.get("key") == "value"
+        time.sleep(0.1)
+        assert cache.get("key") is None
+        cache.destroy()
+
+    def test_thread_safe(self, cache: Cache):
+        def worker(worker_id):
+            for i in range(50):
+                cache.set(f"{worker_id}-{i}", str(i))
+                assert cache.get(f"{worker_id}-{i}") == str(i)
+
+        threads = [threading.Thread(target=worker, args=(i,)) for i in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert len(cache) == 200
+
+    def test_destroy(self, tmp_path):
+        cache = Cache("destroyed_cache", abs_path=str(tmp_path))
+        cache.set("key", "value")
+
+        cache.destroy()
+
+        assert not os.path.exists(cache.filepath)
+
+
+class TestLRUCache:
+    def test_set_and_get(self):
+        cache = LRUCache()
+        cache.set("key", "value")
+
+        assert cache.get("key") == "value"
+        assert cache.get("missing") is None
+        assert cache.stats() == {
+            "hits": 1,
+            "misses": 1,
+            "entries": 1,
+            "size": cache.size,
+        }
+
+    def test_evicts_least_recently_used_entries(self):
+        cache = LRUCache(max_entries=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+
+        assert cache.get("a") == 1
+        assert cache.get("b") is None
+        assert cache.get("c") == 3
+
+    def test_evicts_by_size(self):
+        cache = LRUCache(max_size=10, sizeof=len)
+        cache.set("a", "aaaa")
+        cache.set("b", "bbbb")
+        cache.set("c", "cccc")
+
+        assert cache.get("a") is None
+        assert cache.size == 8
+        assert len(cache) == 2
+
+    def test_skips_values_larger_than_max_size(self):
+        cache = LRUCache(max_size=3, sizeof=len)
+        cache.set("a", "aaaa")
+
+        assert cache.get("a") is None
+        assert cache.size == 0
+
+    def test_ttl(self):
+        cache = LRUCache(ttl=0.05)
+        cache.set("a", 1)
+        cache.set("b", 2, ttl=10)
+
+        time.sleep(0.1)
+
+        assert cache.get("a") is None
+        assert cache.get("b") == 2
+
+    def test_delete_and_clear(self):
+        cache = LRUCache(sizeof=lambda value: 1)
+        cache.set("a", 1)
+        cache.set("b", 2)
+
+        cache.delete("a")
+        assert cache.get("a") is None
+        assert cache.size == 1
+
+        cache.clear()
+        assert len(cache) == 0
+        assert cache.stats()["misses"] == 0
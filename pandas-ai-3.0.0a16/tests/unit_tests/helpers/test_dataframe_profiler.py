@@ -0,0 +1,108 @@
+import json
+import os
+from unittest.mock import patch
+
+import pandas as pd
+import pytest
+
+from pandasai.config import Config, ConfigManager
+from pandasai.dataframe.base import DataFrame
+from pandasai.helpers.dataframe_profiler import DataframeProfiler
+from pandasai.helpers.filemanager import DefaultFileManager
+
+
+class TestDataframeProfiler:
+    @pytest.fixture(autouse=True)
+    def clear_profiles(self):
+        DataframeProfiler.clear()
+        yield
+        DataframeProfiler.clear()
+
+    @pytest.fixture
+    def config(self, tmp_path):
+        file_manager = DefaultFileManager()
+        file_manager.base_path = str(tmp_path)
+        config = Config(file_manager=file_manager, enable_profiling=True)
+        with patch.object(ConfigManager, "get", return_value=config):
+            yield config
+
+    @staticmethod
+    def write_dataset(tmp_path, data: dict) -> DataFrame:
+        os.makedirs(tmp_path / "org" / "sales", exist_ok=True)
+        pd.DataFrame(data).to_parquet(tmp_path / "org" / "sales" / "data.parquet")
+        return DataFrame(data, _table_name="sales", path="org/sales")
+
+    def test_profile(self):
+        df = DataFrame(
+            {"price": [1.5, 2.0, None, 4.0], "country": ["FR", "US", "FR", None]}
+        )
+
+        profile = df.get_profile(wait=True)
+
+        assert profile.rows == 4
+        price, country = profile.columns
+        assert (price.name, price.type, price.count) == ("price", "DOUBLE", 3)
+        assert (price.min, price.max) == (1.5, 4.0)
+        assert country.approx_distinct == 2
+        assert country.top_values[0] == "FR"
+        assert profile.to_dataframe()["null_percentage"].tolist() == [25.0, 25.0]
+
+    def test_get_profile_does_not_wait(self, sample_df):
+        assert sample_df.get_profile() is None
+
+        DataframeProfiler.submit(sample_df).result()
+
+        assert sample_df.get_profile().rows == len(sample_df)
+
+    def test_serialize_statistics_once_profiled(self, config, sample_df):
+        assert "content=" not in sample_df.serialize_dataframe()
+
+        sample_df.get_profile(wait=True)
+        serialized = sample_df.serialize_dataframe()
+
+        assert 'dimensions="3x2" content="column statistics">' in serialized
+        assert "column,type,null_percentage,approx_distinct,min,max,top_values" in (
+            serialized
+        )
+        assert "\nB,BIGINT,0.0,3,4,6," in serialized
+        assert "\nA," not in sample_df.serialize_dataframe(["B"])
+
+    def test_profile_stored_next_to_schema(self, config, tmp_path):
+        df = self.write_dataset(tmp_path, {"id": [1, 2, 3], "city": list("abc")})
+
+        profile = df.get_profile(wait=True)
+
+        stored = json.loads((tmp_path / "org" / "sales" / "profile.json").read_text())
+        assert stored == profile.to_dict()
+        DataframeProfiler.clear()
+        assert df.get_profile() == profile
+
+    def test_profile_appended_rows(self, config, tmp_path):
+        df = self.write_dataset(tmp_path, {"id": [1, 2, 3], "city": list("abc")})
+        df.get_profile(wait=True)
+
+        df = self.write_dataset(tmp_path, {"id": [1, 2, 3, 4], "city": list("abcd")})
+        with patch.object(
+            DataframeProfiler, "_compute", wraps=DataframeProfiler._compute
+        ) as compute:
+            profile = df.get_profile(wait=True)
+
+        assert compute.call_args.kwargs == {"offset": 3}
+        assert (profile.rows, profile.profiled_rows) == (4, 3)
+        identifier = profile.columns[0]
+        assert (identifier.count, identifier.max, identifier.approx_distinct) == (
+            4,
+            4,
+            4,
+        )
+
+    def test_frame_differing_from_its_file_is_profiled_in_memory(
+        self, config, tmp_path
+    ):
+        self.write_dataset(tmp_path, {"id": [1, 2, 3], "city": list("abc")})
+        df = DataFrame({"id": [2, 3], "city": list("bc")}, path="org/sales")
+
+        profile = df.get_profile(wait=True)
+
+        assert profile.rows == 2
+        assert not os.path.exists(tmp_path / "org" / "sales" / "profile.json")
@@ -1,5 +1,8 @@
+from unittest.mock import patch
+
 import pandas as pd
 
+from pandasai.dataframe.base import DataFrame
 from pandasai.helpers.dataframe_serializer import DataframeSerializer
 
 
@@ -54,3 +57,37 @@ A,B
 
         # Normalize line endings before asserting
         assert result.replace("\r\n", "\n") == expected.replace("\r\n", "\n")
+
+    def test_serialize_is_cached_until_data_changes(self, sample_df):
+        """Test that the serialized table is reused while its data is unchanged."""
+        DataframeSerializer.clear()
+        result = DataframeSerializer.serialize(sample_df)
+
+        with patch.object(
+            DataframeSerializer, "_serialize", side_effect=AssertionError
+        ):
+            assert DataframeSerializer.serialize(sample_df) == result
+        assert DataframeSerializer.stats()["hits"] == 1
+
+        sample_df.loc[1, "B"] = 7
+
+        assert "2,7" in DataframeSerializer.serialize(sample_df)
+        assert DataframeSerializer.serialize(sample_df, dialect="mysql") != result
+
+    def test_serialize_converts_json_values(self):
+        """Test that JSON-like values are serialized as truncated JSON strings."""
+        df = DataFrame(
+            {
+                "A": [{"key": "é" * 300}, None, "text"],
+                "B": [[1, 2], [3], [4]],
+                "C": [1.5, 2.5, 3.5],
+            }
+        )
+
+        truncated = DataframeSerializer._truncate_dataframe(df)
+
+        assert truncated["A"][0] == '{"key": "' + "é" * 191 + "…"
+        assert truncated["A"][1] is None
+        assert truncated["B"].tolist() == ["[1, 2]", "[3]", "[4]"]
+        assert truncated["C"].tolist() == [1.5, 2.5, 3.5]
+        assert isinstance(df["B"][0], list)
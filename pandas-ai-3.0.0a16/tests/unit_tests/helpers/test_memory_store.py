@@ -0,0 +1,115 @@
+import time
+from unittest.mock import patch
+
+import pytest
+
+from pandasai.helpers.memory import Memory
+from pandasai.helpers.memory_store import SQLiteMemoryStore
+
+
+class TestSQLiteMemoryStore:
+    @pytest.fixture
+    def store(self, tmp_path):
+        store = SQLiteMemoryStore("test_memory", abs_path=str(tmp_path))
+        yield store
+        store.destroy()
+
+    @staticmethod
+    def _messages(*texts):
+        return [{"message": text, "is_user": True} for text in texts]
+
+    def test_append_and_get_messages(self, store: SQLiteMemoryStore):
+        store.append("session", self._messages("a", "b"))
+        store.append("session", self._messages("c"), {"summary": "s"})
+
+        assert store.get_messages("session") == (self._messages("a", "b", "c"), 0)
+        assert store.get_state("session") == {"summary": "s"}
+        assert store.get_messages("other") == ([], 0)
+        assert store.get_state("other") == {}
+
+    def test_get_last_messages(self, store: SQLiteMemoryStore):
+        store.append("session", self._messages("a", "b", "c", "d"))
+
+        assert store.get_messages("session", limit=2) == (
+            self._messages("c", "d"),
+            2,
+        )
+        assert store.get_messages("session", start=3, limit=2) == (
+            self._messages("d"),
+            3,
+        )
+
+    def test_append_without_state_keeps_it(self, store: SQLiteMemoryStore):
+        store.append("session", self._messages("a"), {"summary": "s"})
+        store.append("session", self._messages("b"))
+
+        assert store.get_state("session") == {"summary": "s"}
+
+    def test_shared_across_instances(self, store: SQLiteMemoryStore, tmp_path):
+        other = SQLiteMemoryStore("test_memory", abs_path=str(tmp_path))
+
+        store.append("session", self._messages("a"))
+        other.append("session", self._messages("b"))
+
+        assert store.get_messages("session") == (self._messages("a", "b"), 0)
+
+    def test_delete(self, store: SQLiteMemoryStore):
+        store.append("session", self._messages("a"))
+        store.append("other", self._messages("b"))
+
+        store.delete("session")
+
+        assert store.get_messages("session") == ([], 0)
+        assert len(store) == 1
+
+    def test_expired_sessions(self, store: SQLiteMemoryStore):
+        store.ttl = 60
+        store.append("old", self._messages("a"))
+        store.append("new", self._messages("b"))
+
+        later = time.time() + 120
+        with patch("pandasai.helpers.memory_store.time.time", return_value=later):
+            assert store.get_messages("old") == ([], 0)
+            assert store.cleanup() == 1
+
+        assert len(store) == 0
+
+    def test_memory_bound_to_store(self, store: SQLiteMemoryStore):
+        memory = Memory(memory_size=2, store=store, session_id="session")
+        memory.add("first", True)
+        memory.add("second", True)
+
+        assert store.get_messages("session") == ([], 0)
+
+        memory.flush()
+        memory.add("third", True)
+        memory.flush()
+        resumed = Memory(memory_size=2, store=store, session_id="session")
+
+        assert resumed.count() == 3
+        assert resumed.all() == self._messages("second", "third")
+        assert resumed.get_last_message() == memory.get_last_message()
+
+    def test_memory_bound_to_store_keeps_summary(self, store: SQLiteMemoryStore):
+        memory = Memory(
+            memory_size=10, max_tokens=40, tokenizer=len, store=store, session_id="s"
+        )
+        for query in ("one", "two", "three"):
+            memory.add(query, True)
+        memory.flush()
+
+        resumed = Memory(
+            memory_size=10, max_tokens=40, tokenizer=len, store=store, session_id="s"
+        )
+
+        assert resumed.summary == memory.summary != ""
+        assert resumed.get_conversation() == memory.get_conversation()
+
+    def test_memory_clear_deletes_session(self, store: SQLiteMemoryStore):
+        memory = Memory(store=store, session_id="session")
+        memory.add("first", True)
+        memory.flush()
+
+        memory.clear()
+
+        assert len(store) == 0
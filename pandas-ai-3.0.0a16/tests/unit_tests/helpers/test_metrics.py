@@ -0,0 +1,172 @@
+import threading
+
+from pandasai.helpers.metrics import (
+    Counter,
+    Histogram,
+    MetricsRegistry,
+    QueryStats,
+    Stage,
+    metrics,
+    prometheus_metrics,
+)
+
+
+class TestQueryStats:
+    def test_measure_accumulates(self):
+        stats = QueryStats()
+
+        with stats.measure(Stage.LLM_CALL):
+            pass
+        stats.add_timing(Stage.LLM_CALL, 1.0)
+
+        assert stats.timings[Stage.LLM_CALL] >= 1.0
+
+    def test_measure_on_exception(self):
+        stats = QueryStats()
+
+        try:
+            with stats.measure(Stage.CODE_EXECUTION):
+                raise ValueError("Boom")
+        except ValueError:
+            pass
+
+        assert Stage.CODE_EXECUTION in stats.timings
+
+    def test_sql_queries(self):
+        stats = QueryStats()
+
+        stats.add_sql_query("SELECT 1", 0.5, rows=1, size=8)
+        stats.add_sql_query("SELECT 2", 0.25, rows=2, size=16)
+
+        assert stats.timings[Stage.SQL_QUERY] == 0.75
+        assert stats.sql_queries[1] == {
+            "query": "SELECT 2",
+            "time": 0.25,
+            "rows": 2,
+            "bytes": 16,
+        }
+
+    def test_to_dict(self):
+        stats = QueryStats()
+        stats.add_retry()
+        stats.add_repair()
+        stats.add_llm_call()
+        stats.add_llm_cache_hit()
+        stats.add_token_usage(10, 3)
+
+        assert stats.to_dict() == {
+            "timings": {},
+            "sql_queries": [],
+            "retries": 1,
+            "repairs": 1,
+            "llm_calls": 1,
+            "llm_cache_hits": 1,
+            "token_usage": {
+                "prompt_tokens": 10,
+                "completion_tokens": 3,
+                "total_tokens": 13,
+            },
+        }
+
+    def test_thread_safe(self):
+        stats = QueryStats()
+
+        def worker():
+            for _ in range(1000):
+                stats.add_llm_call()
+                stats.add_timing(Stage.LLM_CALL, 1)
+
+        threads = [threading.Thread(target=worker) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert stats.llm_calls == 4000
+        assert stats.timings[Stage.LLM_CALL] == 4000
+
+
+class TestMetrics:
+    def test_counter(self):
+        counter = Counter("requests_total", "Requests.")
+        counter.inc(status="ok")
+        counter.inc(2, status="ok")
+        counter.inc(status="failed")
+
+        assert counter.get(status="ok") == 3
+        assert counter.get(status="missing") == 0
+        assert 'requests_total{status="ok"} 3.0' in counter.samples()
+
+    def test_histogram(self):
+        histogram = Histogram("duration_seconds", "Duration.", buckets=(0.1, 1))
+        histogram.observe(0.05)
+        histogram.observe(0.5)
+        histogram.observe(5)
+
+        assert histogram.samples() == [
+            'duration_seconds_bucket{le="0.1"} 1',
+            'duration_seconds_bucket{le="1.0"} 2',
+            'duration_seconds_bucket{le="+Inf"} 3',
+            "duration_seconds_sum 5.55",
+            "duration_seconds_count 3",
+        ]
+        assert histogram.get_count() == 3
+
+    def test_label_values_are_escaped(self):
+        counter = Counter("queries_total", "Queries.")
+        counter.inc(query='say "hi"\n')
+
+        assert counter.samples() == ['queries_total{query="say \\"hi\\"\\n"} 1.0']
+
+    def test_registry_returns_registered_metric(self):
+        registry = MetricsRegistry()
+
+        assert registry.counter("custom_total", "Custom.") is registry.counter(
+            "custom_total", "Custom."
+        )
+
+    def test_record_query(self):
+        registry = MetricsRegistry()
+        stats = QueryStats()
+        stats.add_timing(Stage.TOTAL, 2)
+        stats.add_timing(Stage.LLM_CALL, 1.5)
+        stats.add_sql_query("SELECT 1", 0.1, rows=3, size=24)
+        stats.add_retry()
+        stats.add_repair()
+        stats.add_llm_call()
+        stats.add_token_usage(100, 20)
+
+        registry.record_query(stats, "success")
+
+        assert registry.queries.get(status="success") == 1
+        assert registry.query_duration.get_sum() == 2
+        assert registry.stage_duration.get_sum(stage=Stage.LLM_CALL) == 1.5
+        assert registry.retries.get() == 1
+        assert registry.llm_retries_saved.get() == 1
+        assert registry.llm_tokens.get(type="prompt") == 100
+        assert registry.llm_tokens.get(type="completion") == 20
+        assert registry.sql_rows.get() == 3
+        assert registry.sql_bytes.get() == 24
+
+    def test_to_prometheus(self):
+        registry = MetricsRegistry()
+        registry.queries.inc(status="success")
+
+        text = registry.to_prometheus()
+
+        assert "# HELP pandasai_queries_total Number of processed queries" in text
+        assert "# TYPE pandasai_queries_total counter" in text
+        assert 'pandasai_queries_total{status="success"} 1.0' in text
+        assert "# TYPE pandasai_stage_duration_seconds histogram" in text
+        assert text.endswith("\n")
+
+    def test_reset(self):
+        registry = MetricsRegistry()
+        registry.queries.inc(status="success")
+
+        registry.reset()
+
+        assert registry.queries.get(status="success") == 0
+
+    def test_prometheus_metrics(self):
+        assert prometheus_metrics() == metrics.to_prometheus()
@@ -1,8 +1,12 @@
+import asyncio
+import http.server
 import os
-from unittest.mock import patch
+import threading
+from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 import requests
+import urllib3
 
 from pandasai.constants import DEFAULT_API_URL
 from pandasai.exceptions import PandaAIApiCallError, PandaAIApiKeyError
@@ -112,7 +116,7 @@ def test_get_pandaai_session_with_env_api_url():
 
 
 @patch("pandasai.os.environ", {})
-@patch("requests.request")
+@patch("requests.Session.request")
 def test_make_request_success(mock_request):
     """Test successful API request"""
     # Mock successful response
@@ -139,7 +143,7 @@ def test_make_request_success(mock_request):
     assert result == {"data": "test_data"}
 
 
-@patch("requests.request")
+@patch("requests.Session.request")
 def test_make_request_error_response(mock_request):
     """Test API request with error response"""
     # Mock error response
@@ -154,7 +158,7 @@ def test_make_request_error_response(mock_request):
     assert str(exc_info.value) == "Bad request"
 
 
-@patch("requests.request")
+@patch("requests.Session.request")
 def test_make_request_network_error(mock_request):
     """Test API request with network error"""
     # Mock network error
@@ -167,7 +171,7 @@ def test_make_request_network_error(mock_request):
     assert "Request failed: Network error" in str(exc_info.value)
 
 
-@patch("requests.request")
+@patch("requests.Session.request")
 def test_make_request_custom_headers(mock_request):
     """Test API request with custom headers"""
     # Mock successful response
@@ -183,3 +187,213 @@ def test_make_request_custom_headers(mock_request):
     called_headers = mock_request.call_args[1]["headers"]
     assert called_headers["Custom-Header"] == "test-value"
     assert "x-authorization" not in called_headers
+
+
+class _HTTPError(Exception):
+    pass
+
+
+class _TransportError(_HTTPError):
+    pass
+
+
+class _ConnectError(_TransportError):
+    pass
+
+
+def _get_httpx_mock(response=None, error=None):
+    client = MagicMock()
+    client.request = AsyncMock(return_value=response, side_effect=error)
+    httpx = MagicMock(
+        HTTPError=_HTTPError,
+        TransportError=_TransportError,
+        ConnectError=_ConnectError,
+        ConnectTimeout=_ConnectError,
+    )
+    httpx.AsyncClient.return_value = client
+    return httpx, client
+
+
+@patch("pandasai.os.environ", {})
+def test_amake_request_success():
+    """Test successful async API request"""
+    response = MagicMock(status_code=200)
+    response.json.return_value = {"data": "test_data"}
+    httpx, client = _get_httpx_mock(response)
+
+    session = Session(api_key="test-key")
+    with patch("importlib.import_module", return_value=httpx):
+        result = asyncio.run(session.amake_request("POST", "/test", json={"a": 1}))
+
+    httpx.AsyncClient.assert_called_once_with(
+        http2=False, limits=httpx.Limits.return_value
+    )
+    client.request.assert_awaited_once_with(
+        "POST",
+        DEFAULT_API_URL + "/api/test",
+        headers={
+            "x-authorization": "Bearer test-key",
+            "Content-Type": "application/json",
+        },
+        params=None,
+        data=None,
+        json={"a": 1},
+        timeout=300,
+    )
+    assert result == {"data": "test_data"}
+
+
+def test_amake_request_error_response():
+    """Test async API request with error response"""
+    response = MagicMock(status_code=400)
+    response.json.return_value = {"detail": "Bad request"}
+    httpx, _ = _get_httpx_mock(response)
+
+    session = Session(api_key="test-key")
+    with patch("importlib.import_module", return_value=httpx):
+        with pytest.raises(PandaAIApiCallError, match="Bad request"):
+            asyncio.run(session.amake_request("POST", "/test"))
+
+
+def test_amake_request_network_error():
+    """Test async API request with network error"""
+    httpx, _ = _get_httpx_mock(error=_HTTPError("Network error"))
+
+    session = Session(api_key="test-key")
+    with patch("importlib.import_module", return_value=httpx):
+        with pytest.raises(PandaAIApiCallError, match="Request failed: Network error"):
+            asyncio.run(session.amake_request("GET", "/test"))
+
+
+def test_amake_request_without_httpx():
+    """Test that the async API request requires httpx"""
+    session = Session(api_key="test-key")
+    with patch("importlib.import_module", side_effect=ImportError):
+        with pytest.raises(ImportError, match="httpx not found"):
+            asyncio.run(session.amake_request("GET", "/test"))
+
+
+def test_amake_request_retries_connection_errors():
+    """Test that async requests which did not reach the server are retried"""
+    response = MagicMock(status_code=200, headers={})
+    response.json.return_value = {"data": "test_data"}
+    httpx, client = _get_httpx_mock()
+    client.request.side_effect = [_ConnectError("Connection refused"), response]
+
+    session = Session(api_key="test-key", backoff_factor=0)
+    with patch("importlib.import_module", return_value=httpx):
+        result = asyncio.run(session.amake_request("POST", "/test"))
+
+    assert result == {"data": "test_data"}
+    assert client.request.await_count == 2
+
+
+class _StubHandler(http.server.BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def _respond(self):
+        server = self.server
+        server.requests.append((self.command, self.client_address))
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        status, headers = server.statuses.pop(0) if server.statuses else (200, {})
+        body = b'{"data": "ok"}'
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    do_GET = do_POST = _respond
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def stub_server():
+    """Local HTTP server answering the queued statuses, then 200"""
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), _StubHandler)
+    server.requests = []
+    server.statuses = []
+    thread = threading.Thread(
+        target=server.serve_forever, kwargs={"poll_interval": 0.01}, daemon=True
+    )
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def _get_stub_session(server, **kwargs) -> Session:
+    host, port = server.server_address
+    return Session(
+        endpoint_url=f"http://{host}:{port}", api_key="test-key", **kwargs
+    )
+
+
+def test_make_request_reuses_connections(stub_server):
+    """Test that the requests of the sessions share keep-alive connections"""
+    for _ in range(3):
+        _get_stub_session(stub_server).get("/test")
+
+    assert len(stub_server.requests) == 3
+    assert len({address for _, address in stub_server.requests}) == 1
+
+
+def test_make_request_retries_transient_statuses(stub_server):
+    """Test that idempotent requests are retried on transient statuses"""
+    stub_server.statuses = [(502, {}), (503, {"Retry-After": "0"})]
+
+    result = _get_stub_session(stub_server, backoff_factor=0).get("/test")
+
+    assert result == {"data": "ok"}
+    assert len(stub_server.requests) == 3
+
+
+def test_make_request_does_not_retry_processed_post(stub_server):
+    """Test that a POST which may have been processed is not sent again"""
+    stub_server.statuses = [(502, {}), (503, {}), (502, {})]
+    session = _get_stub_session(stub_server, backoff_factor=0)
+
+    session.post("/test")
+    assert len(stub_server.requests) == 1
+
+    # 503 tells that the request was not processed, it is retried
+    session.post("/test")
+    assert len(stub_server.requests) == 3
+
+    session.post("/test", idempotent=True)
+    assert len(stub_server.requests) == 4
+
+
+def test_make_request_stops_retrying(stub_server):
+    """Test that the retries are bounded by max_retries and by the timeout"""
+    stub_server.statuses = [(503, {})] * 10
+    session = _get_stub_session(stub_server, max_retries=2, backoff_factor=0)
+
+    session.get("/test")
+    assert len(stub_server.requests) == 3
+
+    stub_server.requests.clear()
+    session = _get_stub_session(stub_server, backoff_factor=10, max_backoff=10)
+    with patch("pandasai.helpers.session.random.uniform", return_value=10):
+        session.get("/test", timeout=5)
+    assert len(stub_server.requests) == 1
+
+
+def test_make_request_retries_refused_connections():
+    """Test that requests which did not reach the server are retried"""
+    refused = requests.exceptions.ConnectionError(
+        urllib3.exceptions.MaxRetryError(
+            None, "/", urllib3.exceptions.NewConnectionError(None, "refused")
+        )
+    )
+    session = Session(api_key="test-key", max_retries=2, backoff_factor=0)
+
+    with patch.object(session._http, "request", side_effect=refused) as request:
+        with pytest.raises(PandaAIApiCallError, match="Request failed"):
+            session.post("/test")
+
+    assert request.call_count == 3
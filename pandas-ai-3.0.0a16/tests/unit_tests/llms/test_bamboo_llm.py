@@ -1,8 +1,11 @@
 """Test BambooLLM class."""
 
+import asyncio
+import time
 import unittest
-from unittest.mock import MagicMock, patch
+from unittest.mock import AsyncMock, patch
 
+from pandasai.agent.state import AgentState
 from pandasai.core.prompts.base import BasePrompt
 from pandasai.exceptions import PandaAIApiCallError
 from pandasai.llm.bamboo_llm import BambooLLM
@@ -23,7 +26,7 @@ class TestBambooLLM(unittest.TestCase):
         return MockBasePrompt()
 
     def get_context(self):
-        return MagicMock()
+        return AgentState()
 
     @patch("pandasai.helpers.session.Session.post")
     def test_call_method(self, mock_post):
@@ -35,8 +38,21 @@ class TestBambooLLM(unittest.TestCase):
         mock_post.assert_called_once_with(
             "/query",
             json={"prompt": "instruction"},
+            idempotent=True,
         )
 
+    @patch("pandasai.helpers.session.Session.post")
+    def test_call_method_times_out_with_the_query(self, mock_post):
+        prompt = self.get_prompt()
+        context = self.get_context()
+        context.deadline = time.monotonic() + 10
+        mock_post.return_value = {"answer": "Hello World"}
+        bllm = BambooLLM(api_key="dummy_key")
+        bllm.call(prompt, context)
+
+        timeout = mock_post.call_args.kwargs["timeout"]
+        assert 9 < timeout <= 10
+
     @patch("pandasai.helpers.session.Session.post")
     def test_status_code_200(self, mock_post):
         prompt = self.get_prompt()
@@ -53,3 +69,19 @@ class TestBambooLLM(unittest.TestCase):
         bllm = BambooLLM(api_key="dummy_key")
         with self.assertRaises(PandaAIApiCallError):
             bllm.call(prompt, context)
+
+    @patch("pandasai.helpers.session.Session.post")
+    @patch("pandasai.helpers.session.Session.apost", new_callable=AsyncMock)
+    def test_acall_method_uses_async_session(self, mock_apost, mock_post):
+        prompt = self.get_prompt()
+        context = self.get_context()
+        context.deadline = time.monotonic() + 10
+        mock_apost.return_value = {"answer": "Hello World"}
+        bllm = BambooLLM(api_key="dummy_key")
+
+        assert asyncio.run(bllm.acall(prompt, context)) == "Hello World"
+
+        mock_apost.assert_awaited_once()
+        assert mock_apost.call_args.kwargs["json"] == {"prompt": "instruction"}
+        assert 9 < mock_apost.call_args.kwargs["timeout"] <= 10
+        mock_post.assert_not_called()
@@ -1,10 +1,58 @@
 """Unit tests for the base LLM class"""
 
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
 import pytest
 
+from pandasai.agent.events import EventType
+from pandasai.agent.state import AgentState
+from pandasai.core.prompts.base import BasePrompt
 from pandasai.exceptions import APIKeyNotFoundError, NoCodeFoundError
 from pandasai.helpers.memory import Memory
 from pandasai.llm import LLM
+from pandasai.llm.base import CodeStreamExtractor
+
+STREAMED_RESPONSE = (
+    "Here is the code:\n"
+    "```python\nresult = {'type': 'number', 'value': 1}\n```\n"
+    "It returns the number of rows."
+)
+
+
+def make_chunks(text: str, size: int = 5, usage=None) -> list:
+    chunks = [
+        SimpleNamespace(
+            choices=[
+                SimpleNamespace(delta=SimpleNamespace(content=text[i : i + size]))
+            ],
+            usage=None,
+        )
+        for i in range(0, len(text), size)
+    ]
+    if usage is not None:
+        chunks.append(SimpleNamespace(choices=[], usage=usage))
+    return chunks
+
+
+class Stream:
+    def __init__(self, chunks: list):
+        self.chunks = chunks
+        self.read = 0
+        self.closed = False
+
+    def __iter__(self):
+        for chunk in self.chunks:
+            self.read += 1
+            yield chunk
+
+    async def __aiter__(self):
+        for chunk in self:
+            yield chunk
+
+    def close(self):
+        self.closed = True
 
 
 class TestBaseLLM:
@@ -136,3 +184,116 @@ print('Hello World')
 
     def test_prepend_system_prompt_with_memory_none(self):
         assert LLM().prepend_system_prompt("hello world", None) == "hello world"
+
+    def test_acall_runs_call_in_thread(self):
+        class SyncLLM(LLM):
+            def call(self, instruction, context=None):
+                return "```python\nresult = 1\n```"
+
+        prompt = BasePrompt()
+
+        assert asyncio.run(SyncLLM().acall(prompt)) == "```python\nresult = 1\n```"
+        assert asyncio.run(SyncLLM().agenerate_code(prompt, None)) == "result = 1"
+
+    def test_record_token_usage(self):
+        context = MagicMock()
+        usage = MagicMock(prompt_tokens=10, completion_tokens=3)
+
+        LLM._record_token_usage(context, usage)
+        LLM._record_token_usage(None, usage)
+        LLM._record_token_usage(context, None)
+
+        context.stats.add_token_usage.assert_called_once_with(10, 3)
+
+    def test_get_request_timeout(self):
+        context = MagicMock()
+        context.time_left.return_value = 5.0
+
+        assert LLM._get_request_timeout(context) == 5.0
+        assert LLM._get_request_timeout(context, 2) == 2
+        assert LLM._get_request_timeout(context, 60) == 5.0
+        assert LLM._get_request_timeout(None, 60) is None
+
+        context.time_left.return_value = None
+        assert LLM._get_request_timeout(context, 60) is None
+
+    @pytest.mark.parametrize("size", [1, 2, 3, 7, 100])
+    def test_code_stream_extractor(self, size):
+        extractor = CodeStreamExtractor(LLM())
+        end = STREAMED_RESPONSE.index("```\nIt") + 3
+
+        for start in range(0, len(STREAMED_RESPONSE), size):
+            if extractor.feed(STREAMED_RESPONSE[start : start + size]):
+                break
+
+        assert extractor.is_complete
+        assert start < end
+        assert extractor.text == STREAMED_RESPONSE[:end]
+        assert LLM()._extract_code(extractor.text) == LLM()._extract_code(
+            STREAMED_RESPONSE
+        )
+
+    def test_code_stream_extractor_waits_for_valid_code(self):
+        extractor = CodeStreamExtractor(LLM())
+
+        assert extractor.feed("```python\nresult = (\n```\n") is False
+        assert extractor.feed("```python\nresult = 1\n```") is False
+        assert extractor.text == (
+            "```python\nresult = (\n```\n```python\nresult = 1\n```"
+        )
+
+    def test_read_stream_stops_at_end_of_code(self):
+        stream = Stream(make_chunks(STREAMED_RESPONSE))
+        context = AgentState()
+        events = []
+        context.listeners.append(events.append)
+
+        response = LLM()._read_stream(stream, "prompt", context)
+
+        assert response.endswith("```")
+        assert stream.read < len(stream.chunks)
+        assert stream.closed
+        tokens = "".join(event.data["token"] for event in events)
+        assert tokens == STREAMED_RESPONSE[: 5 * stream.read]
+        assert tokens.startswith(response)
+        assert {e.type for e in events} == {EventType.LLM_TOKEN}
+        # The usage of a stopped stream is estimated
+        assert context.stats.token_usage["completion_tokens"] > 0
+
+    def test_read_stream_records_reported_usage(self):
+        usage = SimpleNamespace(prompt_tokens=12, completion_tokens=5)
+        stream = Stream(make_chunks("no code here", usage=usage))
+        context = AgentState()
+
+        assert LLM()._read_stream(stream, "prompt", context) == "no code here"
+        assert context.stats.token_usage == {
+            "prompt_tokens": 12,
+            "completion_tokens": 5,
+        }
+
+    def test_aread_stream(self):
+        stream = Stream(make_chunks(STREAMED_RESPONSE))
+
+        response = asyncio.run(LLM()._aread_stream(stream, "prompt"))
+
+        assert response == STREAMED_RESPONSE[: STREAMED_RESPONSE.index("```\nIt") + 3]
+        assert stream.closed
+
+    def test_get_chat_messages_sends_prefix_first(self):
+        mem = Memory(agent_description="xyz", memory_size=10)
+        mem.add("hello world", True)
+        mem.add('print("hello world)', False)
+
+        messages = LLM.get_chat_messages("\n\nquestion", mem, prefix="<tables>")
+
+        assert messages[0] == {"role": "system", "content": "<tables>\n\nxyz"}
+        assert [message["role"] for message in messages] == [
+            "system",
+            "user",
+            "assistant",
+            "user",
+        ]
+        assert messages[-1] == {"role": "user", "content": "question"}
+        assert LLM.get_chat_messages("question") == [
+            {"role": "user", "content": "question"}
+        ]
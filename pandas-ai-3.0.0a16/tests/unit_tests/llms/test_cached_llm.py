@@ -0,0 +1,126 @@
+"""Test CachedLLM class."""
+
+import asyncio
+import copy
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from pandasai.agent.state import AgentState
+from pandasai.core.prompts.base import BasePrompt
+from pandasai.exceptions import NoCodeFoundError
+from pandasai.helpers.cache import Cache
+from pandasai.llm import CachedLLM
+from pandasai.llm.fake import FakeLLM
+
+CODE = "result = {'type': 'number', 'value': 1}"
+
+
+class MockBasePrompt(BasePrompt):
+    template: str = "instruction {{ question }}"
+
+
+class TemperatureLLM(FakeLLM):
+    def __init__(self, output=None):
+        super().__init__(output)
+        self.temperature = 0
+        self.api_key = "secret"
+
+
+class TestCachedLLM:
+    @pytest.fixture
+    def llm(self) -> FakeLLM:
+        return FakeLLM(output=CODE)
+
+    @pytest.fixture
+    def context(self) -> AgentState:
+        return AgentState()
+
+    def test_returns_cached_completion(self, llm, context):
+        cached_llm = CachedLLM(llm)
+        prompt = MockBasePrompt(question="a")
+
+        with patch.object(FakeLLM, "call", wraps=llm.call) as call:
+            assert cached_llm.call(prompt, context) == CODE
+            assert cached_llm.call(MockBasePrompt(question="a"), context) == CODE
+
+        call.assert_called_once()
+        assert context.stats.llm_cache_hits == 1
+        assert cached_llm.stats() == {
+            "hits": 1,
+            "misses": 1,
+            "hit_rate": 0.5,
+            "entries": 1,
+        }
+
+    def test_key_depends_on_prompt_conversation_and_params(self, context):
+        cached_llm = CachedLLM(TemperatureLLM(CODE))
+        prompt = MockBasePrompt(question="a")
+        key = cached_llm.get_key(prompt, context)
+
+        assert cached_llm.get_key(MockBasePrompt(question="b"), context) != key
+
+        context.memory.add("What is the sum of A?", is_user=True)
+        assert cached_llm.get_key(prompt, context) != key
+        context.memory.clear()
+
+        cached_llm.temperature = 0.5
+        assert cached_llm.llm.temperature == 0.5
+        assert cached_llm.get_key(prompt, context) != key
+
+    def test_key_ignores_secrets(self, context):
+        llm = TemperatureLLM(CODE)
+        cached_llm = CachedLLM(llm)
+        key = cached_llm.get_key(MockBasePrompt(question="a"), context)
+
+        llm.api_key = "another secret"
+
+        assert cached_llm.get_key(MockBasePrompt(question="a"), context) == key
+
+    def test_copy_does_not_change_wrapped_llm(self, context):
+        cached_llm = CachedLLM(TemperatureLLM(CODE))
+
+        candidate_llm = copy.copy(cached_llm)
+        candidate_llm.temperature = 0.5
+
+        assert cached_llm.temperature == 0
+        assert candidate_llm.memory_cache is cached_llm.memory_cache
+
+    def test_persistent_store(self, llm, context, tmp_path):
+        store = Cache("llm_cache", abs_path=str(tmp_path))
+        prompt = MockBasePrompt(question="a")
+        CachedLLM(llm, store=store).call(prompt, context)
+
+        # Another process, with an empty in-memory cache
+        other = CachedLLM(FakeLLM(output=CODE), store=store)
+        with patch.object(FakeLLM, "call") as call:
+            assert other.call(prompt, context) == CODE
+
+        call.assert_not_called()
+        store.destroy()
+
+    def test_completion_without_code_is_not_cached(self, context):
+        cached_llm = CachedLLM(FakeLLM(output="Sorry, I cannot answer."))
+        prompt = MockBasePrompt(question="a")
+
+        with pytest.raises(NoCodeFoundError):
+            cached_llm.generate_code(prompt, context)
+
+        assert len(cached_llm.memory_cache) == 0
+
+    def test_acall_returns_cached_completion(self, llm, context):
+        cached_llm = CachedLLM(llm)
+        prompt = MockBasePrompt(question="a")
+
+        with patch.object(FakeLLM, "acall", new_callable=AsyncMock) as acall:
+            acall.return_value = CODE
+            assert asyncio.run(cached_llm.agenerate_code(prompt, context)) == CODE
+            assert asyncio.run(cached_llm.agenerate_code(prompt, context)) == CODE
+
+        acall.assert_awaited_once()
+
+    def test_delegates_to_wrapped_llm(self, llm):
+        cached_llm = CachedLLM(llm)
+
+        assert cached_llm.type == "fake"
+        assert cached_llm._output == CODE
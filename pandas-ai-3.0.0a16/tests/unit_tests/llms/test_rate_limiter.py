@@ -0,0 +1,128 @@
+"""Test RateLimiter class."""
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from pandasai.agent.state import AgentState
+from pandasai.core.prompts.base import BasePrompt
+from pandasai.exceptions import QueryTimeoutError
+from pandasai.helpers.metrics import Stage, metrics
+from pandasai.llm import RateLimiter
+from pandasai.llm.base import _TokenBucket
+from pandasai.llm.fake import FakeLLM
+
+CODE = "result = {'type': 'number', 'value': 1}"
+
+
+class MockBasePrompt(BasePrompt):
+    template: str = "instruction {{ question }}"
+
+
+def wait_for(condition, timeout: float = 5) -> None:
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline
+        time.sleep(0.001)
+
+
+class TestRateLimiter:
+    def test_limits_calls_in_flight(self):
+        limiter = RateLimiter(max_concurrency=2, name="test_concurrency")
+        limiter.acquire()
+        limiter.acquire()
+
+        with pytest.raises(QueryTimeoutError):
+            limiter.acquire(timeout=0.05)
+
+        assert limiter.stats() == {"queue_depth": 0, "in_flight": 2}
+        limiter.release()
+        limiter.acquire(timeout=0.05)
+        assert limiter.in_flight == 2
+
+    def test_serves_interactive_calls_first(self):
+        limiter = RateLimiter(max_concurrency=1)
+        limiter.acquire()
+        order = []
+
+        def call(name: str, priority: int) -> None:
+            limiter.acquire(priority=priority)
+            order.append(name)
+            limiter.release()
+
+        batch = threading.Thread(target=call, args=("batch", RateLimiter.BATCH))
+        batch.start()
+        wait_for(lambda: limiter.queue_depth == 1)
+        interactive = threading.Thread(
+            target=call, args=("interactive", RateLimiter.INTERACTIVE)
+        )
+        interactive.start()
+        wait_for(lambda: limiter.queue_depth == 2)
+
+        limiter.release()
+        batch.join(5)
+        interactive.join(5)
+
+        assert order == ["interactive", "batch"]
+
+    def test_token_bucket_refills_over_time(self):
+        bucket = _TokenBucket(60)
+        assert bucket.get_delay(60) == 0
+
+        bucket.consume(60)
+
+        assert bucket.get_delay(1) == pytest.approx(1, abs=0.05)
+        # A call larger than the bucket only waits for it to be full
+        assert bucket.get_delay(120) == pytest.approx(60, abs=0.05)
+
+    def test_limits_requests_per_minute(self):
+        limiter = RateLimiter(requests_per_minute=1)
+        limiter.acquire()
+        limiter.release()
+
+        with pytest.raises(QueryTimeoutError):
+            limiter.acquire(timeout=0.05)
+
+    def test_charges_the_actual_tokens(self):
+        limiter = RateLimiter(tokens_per_minute=100)
+        limiter.acquire(tokens=80)
+        limiter.release(extra_tokens=30)
+
+        with pytest.raises(QueryTimeoutError):
+            limiter.acquire(tokens=10, timeout=0.05)
+
+    def test_async_acquire_times_out(self):
+        limiter = RateLimiter(max_concurrency=1)
+
+        async def run():
+            await limiter.aacquire()
+            with pytest.raises(QueryTimeoutError):
+                await limiter.aacquire(timeout=0.05)
+
+        asyncio.run(run())
+        assert limiter.stats() == {"queue_depth": 0, "in_flight": 1}
+
+    def test_generate_code_waits_for_the_limiter(self):
+        metrics.reset()
+        llm = FakeLLM(output=CODE)
+        llm.rate_limiter = RateLimiter(max_concurrency=1, name="test_generate")
+        context = AgentState()
+
+        assert llm.generate_code(MockBasePrompt(question="a"), context) == CODE
+
+        assert Stage.LLM_QUEUE in context.stats.timings
+        assert llm.rate_limiter.in_flight == 0
+        assert metrics.llm_queue_wait.get_count(backend="test_generate") == 1
+        assert metrics.llm_in_flight.get(backend="test_generate") == 0
+
+    def test_generate_code_releases_on_error(self):
+        llm = FakeLLM(output=CODE)
+        llm.rate_limiter = RateLimiter(max_concurrency=1)
+        llm.call = lambda instruction, context=None: 1 / 0
+
+        with pytest.raises(ZeroDivisionError):
+            llm.generate_code(MockBasePrompt(question="a"), AgentState())
+
+        assert llm.rate_limiter.in_flight == 0
@@ -0,0 +1,96 @@
+"""Test ReplayLLM class."""
+
+import asyncio
+import json
+import time
+
+import pytest
+
+from pandasai.agent.state import AgentState
+from pandasai.core.prompts.base import BasePrompt
+from pandasai.exceptions import ReplayMissError
+from pandasai.llm import ReplayLLM
+from pandasai.llm.fake import FakeLLM
+
+CODE = "result = {'type': 'number', 'value': 1}"
+
+
+class MockBasePrompt(BasePrompt):
+    template: str = "instruction {{ question }}"
+
+
+class UsageLLM(FakeLLM):
+    def call(self, instruction, context=None):
+        if context is not None:
+            context.stats.add_token_usage(10, 4)
+        return super().call(instruction, context)
+
+
+class TestReplayLLM:
+    @pytest.fixture
+    def path(self, tmp_path) -> str:
+        return str(tmp_path / "recordings" / "session.jsonl")
+
+    def test_records_then_replays(self, path):
+        recorder = ReplayLLM(path, llm=UsageLLM(output=CODE))
+        prompt = MockBasePrompt(question="a")
+
+        assert recorder.generate_code(prompt, AgentState()) == CODE
+
+        with open(path) as file:
+            (record,) = [json.loads(line) for line in file]
+        assert record["prompt"] == prompt.to_string()
+        assert record["completion"] == CODE
+        assert record["usage"] == {"prompt_tokens": 10, "completion_tokens": 4}
+
+        replay = ReplayLLM(path)
+        context = AgentState()
+        assert replay.count() == 1
+        assert replay.generate_code(MockBasePrompt(question="a"), context) == CODE
+        assert context.stats.token_usage == {
+            "prompt_tokens": 10,
+            "completion_tokens": 4,
+        }
+        assert replay.last_prompt == prompt.to_string()
+
+    def test_missing_prompt_raises(self, path):
+        with pytest.raises(ReplayMissError):
+            ReplayLLM(path).call(MockBasePrompt(question="a"))
+
+    def test_replays_completions_of_a_prompt_in_turn(self, tmp_path):
+        prompt = MockBasePrompt(question="a")
+        key = ReplayLLM.get_key(prompt.to_string())
+        path = tmp_path / "session.jsonl"
+        path.write_text(
+            "".join(
+                json.dumps({"key": key, "completion": completion}) + "\n"
+                for completion in ("first", "second")
+            )
+        )
+
+        replay = ReplayLLM(str(path))
+
+        assert [replay.call(prompt) for _ in range(3)] == ["first", "second", "first"]
+
+    @pytest.mark.parametrize(
+        "latency, expected", [(0.05, 0.05), (lambda: 0.05, 0.05), ("recorded", 0.1)]
+    )
+    def test_injects_latency(self, path, latency, expected):
+        prompt = MockBasePrompt(question="a")
+        recorder = ReplayLLM(path, llm=FakeLLM(output=CODE))
+        recorder.call(prompt)
+        with open(path) as file:
+            record = json.loads(file.readline())
+        record["latency"] = 0.1
+        with open(path, "w") as file:
+            file.write(json.dumps(record) + "\n")
+
+        replay = ReplayLLM(path, latency=latency)
+        start = time.perf_counter()
+        asyncio.run(replay.acall(prompt))
+
+        assert time.perf_counter() - start >= expected
+
+    def test_invalid_latency(self, path):
+        with pytest.raises(ValueError):
+            ReplayLLM(path, latency="slow")
@@ -0,0 +1,128 @@
+"""Test RouterLLM class."""
+
+import asyncio
+import time
+
+import pytest
+
+from pandasai.agent.state import AgentState
+from pandasai.core.prompts.base import BasePrompt
+from pandasai.exceptions import QueryAbortedError
+from pandasai.helpers.metrics import metrics
+from pandasai.llm import RouterLLM
+from pandasai.llm.fake import FakeLLM
+
+CODE = "result = {'type': 'number', 'value': 1}"
+
+
+class MockBasePrompt(BasePrompt):
+    template: str = "instruction {{ question }}"
+
+
+class BackendLLM(FakeLLM):
+    def __init__(self, name: str, delay: float = 0, error: Exception = None):
+        super().__init__(output=f"```python\nresult = '{name}'\n```", type=name)
+        self.delay = delay
+        self.error = error
+        self.calls = 0
+
+    def call(self, instruction: BasePrompt, context: AgentState = None) -> str:
+        self.calls += 1
+        time.sleep(self.delay)
+        if self.error is not None:
+            raise self.error
+        return super().call(instruction, context)
+
+
+def record(router: RouterLLM, index: int, latency: float, ok=True, times=5):
+    for _ in range(times):
+        router._record(index, latency, ok)
+
+
+class TestRouterLLM:
+    @pytest.fixture
+    def prompt(self) -> BasePrompt:
+        return MockBasePrompt(question="a")
+
+    def test_routes_to_fastest_backend(self, prompt):
+        slow, fast = BackendLLM("slow"), BackendLLM("fast")
+        router = RouterLLM([slow, fast])
+        record(router, 0, 0.5)
+        record(router, 1, 0.1)
+
+        assert router.get_order() == [1, 0]
+        assert router.generate_code(prompt, AgentState()) == "result = 'fast'"
+        assert (slow.calls, fast.calls) == (0, 1)
+        assert router.last_prompt == fast.last_prompt
+
+    def test_fails_over_to_next_backend(self, prompt):
+        metrics.reset()
+        broken = BackendLLM("broken", error=ConnectionError("down"))
+        router = RouterLLM([broken, BackendLLM("backup")])
+
+        assert router.call(prompt) == BackendLLM("backup")._output
+
+        stats = router.stats()
+        assert (stats[0]["calls"], stats[0]["errors"]) == (1, 1)
+        assert (stats[1]["calls"], stats[1]["errors"]) == (1, 0)
+        assert metrics.llm_failovers.get(backend="broken") == 1
+
+    def test_raises_last_error_when_all_backends_fail(self, prompt):
+        router = RouterLLM(
+            [
+                BackendLLM("a", error=ConnectionError("a")),
+                BackendLLM("b", error=TimeoutError("b")),
+            ]
+        )
+
+        with pytest.raises(TimeoutError):
+            router.call(prompt)
+
+    def test_unhealthy_backend_is_tried_last_until_cooldown(self, prompt):
+        router = RouterLLM(
+            [BackendLLM("a"), BackendLLM("b")], min_calls=2, cooldown=60
+        )
+        record(router, 0, 0.1, ok=False, times=2)
+        record(router, 1, 1.0, times=2)
+
+        assert router.get_order() == [1, 0]
+        assert router.stats()[0]["healthy"] is False
+
+        router.cooldown = 0
+        assert router.get_order() == [0, 1]
+
+    def test_does_not_fail_over_aborted_query(self, prompt):
+        backend = BackendLLM("a")
+        router = RouterLLM([backend])
+        context = AgentState()
+        context.abort_requested.set()
+
+        with pytest.raises(QueryAbortedError):
+            router.call(prompt, context)
+        assert backend.calls == 0
+
+    def test_hedges_slow_call(self, prompt):
+        slow, fast = BackendLLM("slow", delay=1), BackendLLM("fast")
+        router = RouterLLM([slow, fast], hedge=True)
+        record(router, 0, 0.01)
+        record(router, 1, 0.02)
+
+        start = time.monotonic()
+        assert router.call(prompt) == fast._output
+        assert time.monotonic() - start < 0.5
+        assert metrics.llm_hedges.get(backend="fast") >= 1
+
+    def test_hedges_slow_async_call(self, prompt):
+        class AsyncBackendLLM(BackendLLM):
+            async def acall(self, instruction, context=None):
+                await asyncio.sleep(self.delay)
+                return FakeLLM.call(self, instruction, context)
+
+        slow, fast = AsyncBackendLLM("slow", delay=1), AsyncBackendLLM("fast")
+        router = RouterLLM([slow, fast], hedge=True)
+        record(router, 0, 0.01)
+        record(router, 1, 0.02)
+
+        start = time.monotonic()
+        assert asyncio.run(router.acall(prompt)) == fast._output
+        assert time.monotonic() - start < 0.5
@@ -101,3 +101,53 @@ Generate python code and return full updated code:
 
 ### Note: Use only relevant table for query and do aggregation, sorting, joins and grouby through sql query'''  # noqa: E501
         )
+
+    def test_serialized_dataframes_match_rendered_tables(self, sample_dataframes):
+        """Test that a pre-serialized <tables> block renders the same prompt"""
+        agent = Agent(sample_dataframes, config={"llm": FakeLLM()})
+
+        prompt = GeneratePythonCodeWithSQLPrompt(context=agent._state, output_type="")
+        shared_prompt = GeneratePythonCodeWithSQLPrompt(
+            context=agent._state,
+            output_type="",
+            serialized_dataframes=GeneratePythonCodeWithSQLPrompt.serialize_dataframes(
+                agent._state.dfs
+            ),
+        )
+
+        assert shared_prompt.to_string() == prompt.to_string()
+
+    def test_segments_join_into_prompt(self, sample_dataframes):
+        """Test that the prompt starts with its stable prefix"""
+        agent = Agent(sample_dataframes, config={"llm": FakeLLM()})
+        prompt = GeneratePythonCodeWithSQLPrompt(context=agent._state, output_type="")
+
+        prefix, suffix = prompt.to_segments()
+
+        assert prefix.startswith("<tables>")
+        assert prefix.endswith("</function>")
+        assert prefix + suffix == prompt.to_string()
+
+    def test_prefix_is_identical_across_follow_ups(self, sample_dataframes):
+        """Test that the prefix does not change with the conversation"""
+        prefixes = []
+
+        class RecordingLLM(FakeLLM):
+            def call(self, instruction, context=None):
+                prefixes.append(instruction.to_segments()[0])
+                return super().call(instruction, context)
+
+        llm = RecordingLLM(
+            output="df = execute_sql_query('SELECT 1 AS n')\n"
+            "result = {'type': 'number', 'value': 1}"
+        )
+        agent = Agent(sample_dataframes, config={"llm": llm})
+
+        agent.chat("How many rows are there?")
+        agent.follow_up("And how many columns?")
+        agent.follow_up("What about the first table only?")
+
+        assert len(prefixes) == 3
+        assert prefixes[0]
+        assert prefixes[1] == prefixes[0]
+        assert prefixes[2] == prefixes[0]
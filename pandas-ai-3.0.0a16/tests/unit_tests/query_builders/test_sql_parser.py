@@ -81,6 +81,19 @@ JOIN "department" AS d
         result = SQLParser.replace_table_and_column_names(query, table_mapping)
         assert result.strip() == expected.strip()
 
+    def test_normalize_query(self):
+        assert SQLParser.normalize_query(
+            "select  a,\n b FROM t where a = 1;"
+        ) == SQLParser.normalize_query("SELECT a, b FROM t WHERE a = 1")
+
+    def test_normalize_query_keeps_identifiers_case(self):
+        assert SQLParser.normalize_query('SELECT "Amount" FROM t') != (
+            SQLParser.normalize_query('SELECT "amount" FROM t')
+        )
+
+    def test_normalize_invalid_query(self):
+        assert SQLParser.normalize_query("not  a\nquery (") == "not a query ("
+
     def test_mysql_transpilation(self):
         query = '''SELECT COUNT(*) AS "total_rows"'''
         expected = """SELECT\n  COUNT(*) AS `total_rows`"""
@@ -1,7 +1,10 @@
+import json
+
 import pandas as pd
 import pytest
 
 from pandasai.core.response.dataframe import DataFrameResponse
+from pandasai.data_loader.query_result import DuckDBQueryResult
 
 
 def test_dataframe_response_initialization(sample_df):
@@ -48,3 +51,60 @@ def test_format_value_with_dataframe(sample_df):
     result = response.format_value(sample_df)
     assert isinstance(result, pd.DataFrame)
     pd.testing.assert_frame_equal(result, sample_df)
+
+
+@pytest.fixture
+def lazy_response(sample_df):
+    result = DuckDBQueryResult("SELECT * FROM sales", tables={"sales": sample_df})
+    return DataFrameResponse(result, "test_code")
+
+
+def test_lazy_dataframe_response_fetches_on_demand(lazy_response, sample_df):
+    assert lazy_response.is_lazy
+    assert lazy_response.row_count == len(sample_df)
+    pd.testing.assert_frame_equal(
+        lazy_response.head(1), pd.DataFrame(sample_df).head(1)
+    )
+    batches = list(lazy_response.iter_batches(2))
+    assert [len(batch) for batch in batches] == [2, 1]
+    assert lazy_response.to_arrow().num_rows == len(sample_df)
+    assert lazy_response.is_lazy
+
+
+def test_lazy_dataframe_response_to_parquet(lazy_response, sample_df, tmp_path):
+    path = str(tmp_path / "result.parquet")
+
+    lazy_response.to_parquet(path)
+
+    pd.testing.assert_frame_equal(pd.read_parquet(path), pd.DataFrame(sample_df))
+    assert lazy_response.is_lazy
+
+
+def test_lazy_dataframe_response_value_materializes(lazy_response, sample_df):
+    pd.testing.assert_frame_equal(lazy_response.value, pd.DataFrame(sample_df))
+    assert not lazy_response.is_lazy
+    assert lazy_response.row_count == len(sample_df)
+
+
+def test_lazy_dataframe_response_to_dict_serializes_preview(lazy_response):
+    lazy_response.preview_rows = 2
+
+    data = json.loads(lazy_response.to_json())
+
+    assert data["type"] == "dataframe"
+    assert data["row_count"] == 3
+    assert len(data["value"]["data"]) == 2
+    assert lazy_response.is_lazy
+
+
+def test_dataframe_response_batches_and_exports(sample_df, tmp_path):
+    response = DataFrameResponse(sample_df)
+    path = str(tmp_path / "result.parquet")
+
+    response.to_parquet(path)
+
+    assert response.row_count == len(sample_df)
+    assert [len(batch) for batch in response.iter_batches(2)] == [2, 1]
+    assert response.to_arrow().num_rows == len(sample_df)
+    assert len(pd.read_parquet(path)) == len(sample_df)
+    assert json.loads(response.to_json())["value"]["index"] == [0, 1, 2]
@@ -1,3 +1,4 @@
+import asyncio
 import unittest
 from unittest.mock import MagicMock, patch
 
@@ -54,6 +55,11 @@ class TestSandbox(unittest.TestCase):
         self.assertIn("a", result)
         self.assertEqual(result["a"], 20)
 
+    def test_aexecute(self):
+        result = asyncio.run(self.sandbox.aexecute("a = 30", {}))
+        self.assertEqual(result["a"], 30)
+        self.assertTrue(self.sandbox._started)
+
     def test_transfer_file(self):
         result = self.sandbox.transfer_file("sample_data", None)
         self.assertEqual(result, "Processed CSV: sample_data")
@@ -239,3 +239,43 @@ def test_push_command_error(mock_dataset_loader):
 
     assert result.exit_code == 0  # CLI handles the error gracefully
     assert "Error pushing dataset: Test error" in result.output
+
+
+@patch("pandasai.helpers.benchmark.run_benchmark")
+@patch("pandasai.load")
+def test_benchmark_command(mock_load, mock_run_benchmark, tmp_path):
+    """Test benchmark command"""
+    runner = CliRunner()
+    workload = tmp_path / "workload.jsonl"
+    workload.write_text('{"title": "What is the sum?"}\n')
+    recordings = tmp_path / "recordings.jsonl"
+    recordings.write_text("")
+    mock_run_benchmark.return_value.to_dict.return_value = {"throughput": 1.0}
+
+    result = runner.invoke(
+        cli,
+        [
+            "benchmark",
+            str(workload),
+            "--dataset",
+            "test-org/test-dataset",
+            "--recordings",
+            str(recordings),
+            "--concurrency",
+            "1",
+            "--concurrency",
+            "4",
+            "--field",
+            "title",
+            "--as-json",
+        ],
+    )
+
+    assert result.exit_code == 0, result.output
+    mock_load.assert_called_once_with("test-org/test-dataset")
+    assert [c.kwargs["concurrency"] for c in mock_run_benchmark.call_args_list] == [
+        1,
+        4,
+    ]
+    assert mock_run_benchmark.call_args.args[1] == ["What is the sum?"]
+    assert '"throughput": 1.0' in result.output
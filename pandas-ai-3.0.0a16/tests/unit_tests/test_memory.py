@@ -73,3 +73,89 @@ def test_to_openai_messages_without_agent_description():
     ]
 
     assert memory.to_openai_messages() == expected_messages
+
+
+def test_memory_without_token_budget_keeps_all_messages():
+    memory = Memory(memory_size=2)
+    for i in range(5):
+        memory.add(f"question {i}", is_user=True)
+
+    assert memory.summary == ""
+    assert memory.get_messages() == ["### QUERY\n question 3", "### QUERY\n question 4"]
+    assert len(memory.to_openai_messages()) == 5
+
+
+def test_memory_summarizes_messages_out_of_window():
+    memory = Memory(memory_size=2, max_tokens=1000)
+    for i in range(4):
+        memory.add(f"question {i}", is_user=True)
+
+    assert memory.summary == "- question 0\n- question 1"
+    assert memory.get_conversation() == (
+        "### SUMMARY OF EARLIER QUESTIONS\n- question 0\n- question 1\n"
+        "### QUERY\n question 2\n### QUERY\n question 3"
+    )
+    assert memory.get_previous_conversation() == (
+        "### SUMMARY OF EARLIER QUESTIONS\n- question 0\n- question 1\n"
+        "### QUERY\n question 2"
+    )
+    assert memory.to_openai_messages() == [
+        {
+            "role": "system",
+            "content": "### SUMMARY OF EARLIER QUESTIONS\n- question 0\n- question 1",
+        },
+        {"role": "user", "content": "question 2"},
+        {"role": "user", "content": "question 3"},
+    ]
+    assert memory.count() == 4
+
+
+def test_memory_fits_token_budget_with_tokenizer():
+    # One token per character, 15 tokens per message
+    memory = Memory(memory_size=10, max_tokens=40, tokenizer=len)
+    memory.add("aaaa", is_user=True)
+    memory.add("bbbb", is_user=True)
+    memory.add("cccc", is_user=True)
+
+    assert memory.get_messages() == ["### QUERY\n bbbb", "### QUERY\n cccc"]
+    assert memory.summary == "- aaaa"
+
+
+def test_memory_keeps_last_message_over_budget():
+    memory = Memory(memory_size=10, max_tokens=4)
+    memory.add("a first question", is_user=True)
+    memory.add("a very long question that does not fit in the budget", is_user=True)
+
+    assert memory.get_last_message().endswith("does not fit in the budget")
+    assert memory.get_messages() == [memory.get_last_message()]
+    # The summary is bounded to a quarter of the budget
+    assert memory.summary == ""
+
+
+def test_memory_summary_is_computed_once_per_eviction():
+    calls = []
+
+    def summarizer(summary, messages):
+        calls.append(messages)
+        return "summary"
+
+    memory = Memory(memory_size=1, max_tokens=1000, summarizer=summarizer)
+    memory.add("first", is_user=True)
+    memory.add("second", is_user=True)
+    for _ in range(3):
+        memory.get_conversation()
+        memory.to_openai_messages()
+
+    assert calls == [[{"message": "first", "is_user": True}]]
+
+
+def test_memory_clear_resets_summary():
+    memory = Memory(memory_size=1, max_tokens=1000)
+    memory.add("first", is_user=True)
+    memory.add("second", is_user=True)
+
+    memory.clear()
+
+    assert memory.summary == ""
+    assert memory.get_conversation() == ""
+    assert memory.to_openai_messages() == []